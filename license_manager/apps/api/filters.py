@@ -2,8 +2,11 @@
 Filters for the License API.
 """
 
+from django.conf import settings
 from django.db.models import Q
+from django.db.models.functions import Lower
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 
 from license_manager.apps.subscriptions.constants import UNASSIGNED
 from license_manager.apps.subscriptions.models import License
@@ -24,10 +27,47 @@ class LicenseFilter(filters.FilterSet):
 
     def filter_by_status(self, queryset, name, value):  # pylint: disable=unused-argument
         status_values = value.strip().split(',')
-        return queryset.filter(status__in=status_values).distinct()
+        return queryset.filter(status__in=status_values)
 
     # ignores revoked licenses that have been cleared of PII
     def filter_by_ignore_null_emails(self, queryset, name, value):  # pylint: disable=unused-argument
         if not value:
             return queryset
         return queryset.exclude(Q(user_email__isnull=True) & ~Q(status=UNASSIGNED))
+
+
+def search_licenses_by_email(queryset, search_term, mode=None):
+    """
+    Filters the given licenses to those whose email matches the search term, case-insensitively.
+
+    When ``mode``, which defaults to the ``LICENSE_EMAIL_SEARCH_MODE`` setting, is ``'prefix'``,
+    only emails that start with the search term match.
+    The lowercased email is then compared to the range of strings that start with the lowercased search term,
+    which the ``license_plan_lower_email_idx`` index serves for the licenses of a plan, rather than scanning every
+    license of the plan for the search term as the default ``'contains'`` mode does.
+    """
+    mode = mode or settings.LICENSE_EMAIL_SEARCH_MODE
+    search_term = search_term.strip().lower()
+    if mode != 'prefix' or not search_term:
+        return queryset.filter(user_email__icontains=search_term)
+
+    # The smallest string that sorts after every string starting with the search term.
+    upper_bound = search_term[:-1] + chr(ord(search_term[-1]) + 1)
+    return queryset.alias(
+        user_email_lower=Lower('user_email'),
+    ).filter(
+        user_email_lower__gte=search_term,
+        user_email_lower__lt=upper_bound,
+    )
+
+
+class LicenseEmailSearchFilter(SearchFilter):
+    """
+    Search filter for the ``user_email`` of licenses, which matches each search term
+    with ``search_licenses_by_email``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        for search_term in self.get_search_terms(request):
+            queryset = search_licenses_by_email(queryset, search_term)
+        return queryset
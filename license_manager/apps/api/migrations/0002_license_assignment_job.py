@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:28
+
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+        ('subscriptions', '0085_license_action_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LicenseAssignmentJob',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('actor_lms_user_id', models.IntegerField(blank=True, help_text='The id of the user who created the job, recorded as the actor of the assignments.', null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=32)),
+                ('notify_users', models.BooleanField(default=True)),
+                ('custom_template_text', models.JSONField(blank=True, default=dict, help_text='The greeting and closing of the license assignment emails.')),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('results_s3_object_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('subscription_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='license_assignment_jobs', to='subscriptions.subscriptionplan')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='LicenseAssignmentJobEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('user_sfid', models.CharField(blank=True, max_length=255, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('assigned', 'Assigned'), ('already_associated', 'Already associated'), ('failed', 'Failed')], default='pending', max_length=32)),
+                ('notes', models.CharField(blank=True, default='', max_length=255)),
+                ('license', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='subscriptions.license')),
+                ('license_assignment_job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='emails', to='api.licenseassignmentjob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['license_assignment_job', 'status', 'id'], name='assignment_job_email_status')],
+            },
+        ),
+    ]
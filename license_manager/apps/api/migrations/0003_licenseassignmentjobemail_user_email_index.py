@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_license_assignment_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='licenseassignmentjobemail',
+            index=models.Index(fields=['user_email'], name='assignment_job_email_user'),
+        ),
+    ]
@@ -1,9 +1,18 @@
 from functools import cached_property
 
+from edx_rbac import mixins as rbac_mixins
+from edx_rbac.utils import (
+    ALL_ACCESS_CONTEXT,
+    contexts_accessible_from_database,
+    contexts_accessible_from_jwt,
+)
 from rest_framework.exceptions import ParseError
 
 from license_manager.apps.api import utils
 from license_manager.apps.api_client.lms import LMSApiClient
+from license_manager.apps.core.instrumentation import (
+    record_permission_evaluation,
+)
 
 
 class UserDetailsFromJwtMixin:
@@ -36,3 +45,26 @@ class UserDetailsFromJwtMixin:
     @property
     def user_email(self):
         return utils.get_key_from_jwt(self.decoded_jwt, 'email')
+
+
+class PermissionRequiredForListingMixin(rbac_mixins.PermissionRequiredForListingMixin):
+    """
+    ``PermissionRequiredForListingMixin`` that reuses the decoded JWT of the request, and records the
+    evaluation of the contexts accessible to the requesting user.
+    """
+
+    @cached_property
+    def accessible_contexts(self):
+        record_permission_evaluation()
+        contexts_via_jwt = contexts_accessible_from_jwt(utils.get_decoded_jwt(self.request), self.allowed_roles)
+        contexts_via_db = set()
+
+        if self.role_assignment_class:
+            contexts_via_db = contexts_accessible_from_database(
+                self.request.user, self.allowed_roles, self.role_assignment_class
+            )
+
+        if self.request.user.is_superuser and self.superusers_can_access_anything:
+            contexts_via_db.add(ALL_ACCESS_CONTEXT)
+
+        return contexts_via_jwt | contexts_via_db
@@ -10,6 +10,8 @@ from uuid import uuid4
 
 from celery import current_app
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
 from django.db import models
 from model_utils.models import TimeStampedModel
 
@@ -18,7 +20,13 @@ from license_manager.apps.api.utils import (
     upload_file_to_s3,
 )
 from license_manager.apps.subscriptions import constants
-from license_manager.apps.subscriptions.models import License
+from license_manager.apps.subscriptions.constants import (
+    SALESFORCE_ID_LENGTH,
+    LicenseAssignmentJobEmailStatus,
+    LicenseAssignmentJobStatus,
+)
+from license_manager.apps.subscriptions.models import License, SubscriptionPlan
+from license_manager.apps.subscriptions.utils import localized_utcnow
 
 
 logger = logging.getLogger(__name__)
@@ -133,3 +141,217 @@ class BulkEnrollmentJob(TimeStampedModel):
             return create_presigned_url(settings.BULK_ENROLL_JOB_AWS_BUCKET, self.results_s3_object_name)
         else:
             return None
+
+
+class LicenseAssignmentJob(TimeStampedModel):
+    """
+    An object to track the async assignment of licenses to the (possibly tens of thousands of)
+    emails of an uploaded CSV. Each email is tracked by a ``LicenseAssignmentJobEmail``, so that
+    an interrupted job can be resumed from the emails that haven't been processed yet.
+     .. no_pii:
+    """
+    PROCESSING_STALLED_AFTER = datetime.timedelta(minutes=10)
+
+    uuid = models.UUIDField(
+        primary_key=True,
+        default=uuid4,
+        editable=False,
+        unique=True,
+    )
+
+    subscription_plan = models.ForeignKey(
+        SubscriptionPlan,
+        related_name='license_assignment_jobs',
+        on_delete=models.CASCADE,
+    )
+
+    actor_lms_user_id = models.IntegerField(
+        blank=True,
+        null=True,
+        help_text='The id of the user who created the job, recorded as the actor of the assignments.',
+    )
+
+    status = models.CharField(
+        max_length=32,
+        choices=LicenseAssignmentJobStatus.CHOICES,
+        default=LicenseAssignmentJobStatus.PENDING,
+    )
+
+    notify_users = models.BooleanField(default=True)
+
+    custom_template_text = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='The greeting and closing of the license assignment emails.',
+    )
+
+    completed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    results_s3_object_name = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        unique=False,
+    )
+
+    @classmethod
+    def create_license_assignment_job(
+        cls,
+        actor_lms_user_id,
+        subscription_plan,
+        emails_and_sfids,
+        notify_users=True,
+        custom_template_text=None,
+    ):
+        """
+        Creates a job to assign licenses of the given plan to the given emails, and enqueues
+        ``process_license_assignment_job_task`` to process it.
+
+        Arguments:
+            emails_and_sfids (dict): The Salesforce opportunity id (or None) of each lowercased email.
+        """
+        license_assignment_job = cls.objects.create(
+            subscription_plan=subscription_plan,
+            actor_lms_user_id=actor_lms_user_id,
+            notify_users=notify_users,
+            custom_template_text=custom_template_text or {},
+        )
+
+        job_emails = []
+        for user_email, user_sfid in emails_and_sfids.items():
+            job_email = LicenseAssignmentJobEmail(
+                license_assignment_job=license_assignment_job,
+                user_email=user_email,
+                user_sfid=user_sfid,
+            )
+            try:
+                validate_email(user_email)
+            except ValidationError:
+                job_email.status = LicenseAssignmentJobEmailStatus.FAILED
+                job_email.notes = 'invalid email address'
+            else:
+                if user_sfid and len(user_sfid) < SALESFORCE_ID_LENGTH:
+                    job_email.status = LicenseAssignmentJobEmailStatus.FAILED
+                    job_email.notes = 'invalid Salesforce opportunity id'
+            job_emails.append(job_email)
+        LicenseAssignmentJobEmail.objects.bulk_create(job_emails, batch_size=settings.LICENSE_ASSIGNMENT_JOB_BATCH_SIZE)
+
+        license_assignment_job.enqueue()
+        return license_assignment_job
+
+    def enqueue(self, countdown=None):
+        """
+        Enqueues the processing of the emails of this job that haven't been processed yet.
+        """
+        logger.info(f'enqueuing process_license_assignment_job_task for license_assignment_job_uuid={self.uuid}')
+        # avoid circular dependency, as for ``BulkEnrollmentJob``
+        current_app.send_task(
+            'license_manager.apps.api.tasks.process_license_assignment_job_task',
+            (str(self.uuid),),
+            countdown=countdown,
+        )
+
+    @property
+    def is_resumable(self):
+        """
+        Whether the job can be enqueued again: it failed, it's still waiting to be processed, or its processing
+        stalled (e.g. the worker processing it was killed), as a processing job touches ``modified`` every batch.
+        """
+        if self.status == LicenseAssignmentJobStatus.PROCESSING:
+            return self.modified < localized_utcnow() - self.PROCESSING_STALLED_AFTER
+        return self.status in (LicenseAssignmentJobStatus.PENDING, LicenseAssignmentJobStatus.FAILED)
+
+    def get_progress(self):
+        """
+        Returns the number of emails of this job in each ``LicenseAssignmentJobEmailStatus``, and in total.
+        """
+        progress = {status: 0 for status, _ in LicenseAssignmentJobEmailStatus.CHOICES}
+        status_counts = self.emails.values_list('status').annotate(count=models.Count('id')).order_by()
+        for status, count in status_counts:
+            progress[status] = count
+        progress['total'] = sum(progress.values())
+        return progress
+
+    def upload_results(self, file_name):
+        """
+        Upload results in the given file_name to an S3 bucket.
+        """
+        if settings.LICENSE_ASSIGNMENT_JOB_AWS_BUCKET:
+            self.results_s3_object_name = (
+                f'{self.subscription_plan.enterprise_customer_uuid}/{self.uuid}/License-Assignment-Results-'
+                f'{datetime.datetime.utcnow().isoformat()}.csv'
+            )
+            results_object_uri = upload_file_to_s3(
+                file_name,
+                settings.LICENSE_ASSIGNMENT_JOB_AWS_BUCKET,
+                object_name=self.results_s3_object_name,
+            )
+            self.save(update_fields=['results_s3_object_name', 'modified'])
+            return results_object_uri
+        else:
+            return None
+
+    def generate_download_url(self):
+        """
+        Generates an S3 download link for the results of this job.
+        """
+        if self.results_s3_object_name:
+            return create_presigned_url(settings.LICENSE_ASSIGNMENT_JOB_AWS_BUCKET, self.results_s3_object_name)
+        else:
+            return None
+
+
+class LicenseAssignmentJobEmail(models.Model):
+    """
+    An email to assign a license to as part of a ``LicenseAssignmentJob``, and the result of the assignment.
+
+    .. pii: Stores the email address (and optionally the Salesforce opportunity id) of a learner.
+    .. pii_types: email_address
+    .. pii_retirement: local_api
+    """
+    license_assignment_job = models.ForeignKey(
+        LicenseAssignmentJob,
+        related_name='emails',
+        on_delete=models.CASCADE,
+    )
+
+    user_email = models.EmailField(
+        blank=True,
+        null=True,
+    )
+
+    user_sfid = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+    )
+
+    status = models.CharField(
+        max_length=32,
+        choices=LicenseAssignmentJobEmailStatus.CHOICES,
+        default=LicenseAssignmentJobEmailStatus.PENDING,
+    )
+
+    license = models.ForeignKey(
+        License,
+        related_name='+',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+    )
+
+    notes = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['license_assignment_job', 'status', 'id'], name='assignment_job_email_status'),
+            # Serves the lookup of the emails of a user being retired.
+            models.Index(fields=['user_email'], name='assignment_job_email_user'),
+        ]
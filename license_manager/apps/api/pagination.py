@@ -4,12 +4,13 @@ Defines custom paginators used by subscription viewsets.
 from django.core.paginator import Paginator as DjangoPaginator
 from django.utils.functional import cached_property
 from edx_rest_framework_extensions.paginators import DefaultPagination
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 from license_manager.apps.api.serializers import (
     MinimalCustomerAgreementSerializer,
 )
-from license_manager.apps.subscriptions.models import CustomerAgreement
+from license_manager.apps.subscriptions.constants import UNASSIGNED
+from license_manager.apps.subscriptions.models import CustomerAgreement, License
 
 
 class PageNumberPaginationWithCount(PageNumberPagination):
@@ -32,6 +33,18 @@ class LicensePagination(PageNumberPaginationWithCount):
     max_page_size = 500
 
 
+class LicenseActionCursorPagination(CursorPagination):
+    """
+    A keyset paginator for the license action audit log. Pages are seeked to by their ``created`` position
+    rather than by an offset, so every page is served straight from the ``(..., created)`` composite indexes
+    of ``LicenseAction``, however deep into the log it is.
+    """
+    ordering = '-created'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
 class EstimatedCountDjangoPaginator(DjangoPaginator):
     """
     A lazy paginator that determines it's count from
@@ -80,6 +93,46 @@ class EstimatedCountLicensePagination(LicensePagination):
         return DjangoPaginator(queryset, page_size)
 
 
+class LicensesWithVirtualUnassignedLicenses:
+    """
+    A sequence of the licenses in a queryset, followed by one unsaved, unassigned ``License``
+    (with no ``uuid``) for each of the virtual unassigned licenses of a plan.
+
+    It supports just what django's ``Paginator`` needs of an object list, a ``count()`` and slicing,
+    so that pages are still read from the queryset with a LIMIT/OFFSET query.
+    """
+
+    def __init__(self, queryset, subscription_plan, num_virtual_unassigned_licenses):
+        self.queryset = queryset
+        self.subscription_plan = subscription_plan
+        self.num_virtual_unassigned_licenses = num_virtual_unassigned_licenses
+
+    @cached_property
+    def num_license_records(self):
+        return self.queryset.count()
+
+    def count(self):
+        return self.num_license_records + self.num_virtual_unassigned_licenses
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+
+        start, stop, _ = key.indices(self.count())
+        licenses = []
+        if start < self.num_license_records:
+            licenses.extend(self.queryset[start:min(stop, self.num_license_records)])
+        num_virtual_licenses = min(stop, self.count()) - max(start, self.num_license_records)
+        licenses.extend(
+            License(uuid=None, subscription_plan=self.subscription_plan, status=UNASSIGNED)
+            for _ in range(max(num_virtual_licenses, 0))
+        )
+        return licenses
+
+
 class LearnerLicensesPaginationCustomerAgreement(DefaultPagination):
     """
     Adds the customer agreement object to the learner-licenses endpoint.
@@ -13,3 +13,24 @@ class CanRetireUser(permissions.BasePermission):
 
     def has_permission(self, request, view):
         return request.user.username == settings.RETIREMENT_SERVICE_WORKER_USERNAME or request.user.is_superuser
+
+
+class CanSyncUserEmails(permissions.BasePermission):
+    """
+    Grant access to the user email changes API for the service user, and to superusers.
+    """
+
+    def has_permission(self, request, view):
+        return request.user.username == settings.USER_EMAIL_SYNC_SERVICE_WORKER_USERNAME or request.user.is_superuser
+
+
+class CanReadAllLicenseChanges(permissions.BasePermission):
+    """
+    Grant access to the license changes of all customers for the license change feed service users, and to superusers.
+    """
+
+    def has_permission(self, request, view):
+        return (
+            request.user.username in settings.LICENSE_CHANGE_FEED_SERVICE_WORKER_USERNAMES
+            or request.user.is_superuser
+        )
@@ -1,9 +1,12 @@
 from django.conf import settings
-from django.core.validators import MinLengthValidator
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import MinLengthValidator, validate_email
 from django.db.models import Q
 from rest_framework import serializers
 from rest_framework.fields import SerializerMethodField
 
+from license_manager.apps.api.models import LicenseAssignmentJob
+from license_manager.apps.subscriptions.change_feed import decode_cursor
 from license_manager.apps.subscriptions.constants import (
     ACTIVATED,
     ASSIGNED,
@@ -18,6 +21,7 @@ from license_manager.apps.subscriptions.exceptions import (
 from license_manager.apps.subscriptions.models import (
     CustomerAgreement,
     License,
+    LicenseAction,
     SubscriptionPlan,
     SubscriptionPlanRenewal,
 )
@@ -549,6 +553,34 @@ class AdminLicenseSerializer(serializers.ModelSerializer):
         ]
 
 
+class LicenseActionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the ``LicenseAction`` audit model.
+    """
+
+    license_uuid = serializers.UUIDField(source='license_id')
+    subscription_plan_uuid = serializers.UUIDField(source='subscription_plan_id')
+
+    class Meta:
+        model = LicenseAction
+        fields = [
+            'uuid',
+            'created',
+            'license_uuid',
+            'subscription_plan_uuid',
+            'enterprise_customer_uuid',
+            'action_type',
+            'actor_type',
+            'actor_lms_user_id',
+            'learner_lms_user_id',
+            'learner_email',
+            'learner_external_key',
+            'source',
+            'correlation_id',
+            'metadata',
+        ]
+
+
 # Action Serializers
 class SingleEmailSerializer(serializers.Serializer):  # pylint: disable=abstract-method
     """
@@ -568,6 +600,36 @@ class SingleEmailSerializer(serializers.Serializer):  # pylint: disable=abstract
         ]
 
 
+class NormalizedEmailListField(serializers.ListField):
+    """
+    A list of emails, which are stripped of whitespace and lowercased.
+
+    Each distinct email is validated once, with Django's email validator directly rather than
+    by running a child ``EmailField`` for every item, so that lists of tens of thousands
+    of emails are validated quickly. The list keeps its length and order.
+    """
+
+    def run_child_validation(self, data):
+        invalid_message = serializers.EmailField.default_error_messages['invalid']
+        normalized_emails = []
+        valid_emails = set()
+        errors = {}
+        for index, email in enumerate(data):
+            normalized_email = email.strip().lower() if isinstance(email, str) else None
+            if normalized_email not in valid_emails:
+                try:
+                    validate_email(normalized_email)
+                except DjangoValidationError:
+                    errors[index] = [invalid_message]
+                    continue
+                valid_emails.add(normalized_email)
+            normalized_emails.append(normalized_email)
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return normalized_emails
+
+
 class MultipleEmailsSerializer(serializers.Serializer):  # pylint: disable=abstract-method
     """
     Serializer for specifying multiple emails
@@ -735,6 +797,13 @@ class LicenseAdminAssignActionSerializer(CustomTextWithMultipleEmailsSerializer)
     Serializer for the license admin assign action.
     """
 
+    user_emails = NormalizedEmailListField(
+        child=serializers.EmailField(
+            allow_blank=False,
+            write_only=True,
+        ),
+        allow_empty=False,
+    )
     notify_users = serializers.BooleanField(required=False)
     user_sfids = serializers.ListField(
         child=serializers.CharField(
@@ -767,6 +836,79 @@ class LicenseAdminAssignActionSerializer(CustomTextWithMultipleEmailsSerializer)
         return super().validate(attrs)
 
 
+class LicenseAssignmentJobCreateSerializer(CustomTextSerializer):  # pylint: disable=abstract-method
+    """
+    Serializer for creating a license assignment job from an uploaded CSV of emails.
+    """
+
+    file = serializers.FileField(
+        write_only=True,
+        help_text='A CSV of learner emails, with an optional second column of Salesforce opportunity ids.',
+    )
+    notify_users = serializers.BooleanField(required=False, default=True)
+
+    class Meta:
+        fields = CustomTextSerializer.Meta.fields + [
+            'file',
+            'notify_users',
+        ]
+
+
+class LicenseAssignmentJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the status, progress and results of a ``LicenseAssignmentJob``.
+    """
+
+    subscription_plan_uuid = serializers.UUIDField(source='subscription_plan_id')
+    progress = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LicenseAssignmentJob
+        fields = [
+            'uuid',
+            'created',
+            'subscription_plan_uuid',
+            'status',
+            'notify_users',
+            'completed_at',
+            'progress',
+            'download_url',
+        ]
+
+    def get_progress(self, obj):
+        return obj.get_progress()
+
+    def get_download_url(self, obj):
+        return obj.generate_download_url()
+
+
+class UserEmailChangeSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Serializer for the new email address of a user.
+    """
+    lms_user_id = serializers.IntegerField()
+    new_email = serializers.EmailField()
+
+    class Meta:
+        fields = [
+            'lms_user_id',
+            'new_email',
+        ]
+
+
+class UserEmailChangesSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Serializer for a batch of changed user email addresses.
+    """
+    email_changes = UserEmailChangeSerializer(many=True, allow_empty=False)
+
+    class Meta:
+        fields = [
+            'email_changes',
+        ]
+
+
 class EnterpriseEnrollmentWithLicenseSubsidyQueryParamsSerializer(serializers.Serializer):  # pylint: disable=abstract-method
     """
     Serializer for the enterprise enrollment with license subsidy query params
@@ -850,6 +992,90 @@ class SubscriptionPlanQueryParamsSerializer(serializers.Serializer):  # pylint:
         ]
 
 
+class CustomerLicenseOverviewQueryParamsSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Serializer for the customer license overview query params
+    """
+
+    enterprise_customer_uuid = serializers.UUIDField(
+        required=True,
+        help_text='The UUID of the enterprise customer whose licenses are counted',
+    )
+    include_inactive = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Also count the licenses of inactive subscription plans if 'true'",
+    )
+    start_date = serializers.DateField(
+        required=False,
+        help_text='Only count the licenses of plans that expire on or after this date',
+    )
+    end_date = serializers.DateField(
+        required=False,
+        help_text='Only count the licenses of plans that start on or before this date',
+    )
+
+    def validate(self, attrs):
+        if attrs.get('start_date') and attrs.get('end_date') and attrs['start_date'] > attrs['end_date']:
+            raise serializers.ValidationError({'end_date': 'The end_date must not be before the start_date.'})
+        return attrs
+
+
+class LicenseChangeFeedQueryParamsSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Serializer for the license change feed query params
+    """
+
+    enterprise_customer_uuid = serializers.UUIDField(
+        required=False,
+        help_text='Only list the changes to the licenses of this enterprise customer',
+    )
+    cursor = serializers.CharField(
+        required=False,
+        help_text='The next_cursor returned with the previous page, omitted to start from the first change',
+    )
+    page_size = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=settings.LICENSE_CHANGE_FEED_MAX_PAGE_SIZE,
+        default=settings.LICENSE_CHANGE_FEED_PAGE_SIZE,
+        help_text='The maximum number of changes listed',
+    )
+
+    def validate_cursor(self, value):
+        """
+        Rejects cursors that were not returned by the change feed, so they are reported as a 400.
+        """
+        try:
+            decode_cursor(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc)) from exc
+        return value
+
+
+class LicenseActionQueryParamsSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Serializer for the license action (audit log) query params
+    """
+
+    enterprise_customer_uuid = serializers.UUIDField(
+        required=True,
+        help_text='The UUID of the enterprise customer whose license actions are listed',
+    )
+    subscription_uuid = serializers.UUIDField(
+        required=False,
+        help_text='Only list the actions taken on licenses of this subscription plan',
+    )
+    license_uuid = serializers.UUIDField(
+        required=False,
+        help_text='Only list the actions taken on this license',
+    )
+    cursor = serializers.CharField(
+        required=False,
+        help_text='Opaque cursor of the page to fetch, as given by the next and previous links of a response',
+    )
+
+
 class SubscriptionPlanProvisioningAdminQueryParamsSerializer(serializers.Serializer):  # pylint: disable=abstract-method
     """
     Serializer for the subscription plan (provisioning admin) query params
@@ -5,7 +5,7 @@ from datetime import datetime
 from tempfile import NamedTemporaryFile
 
 from braze.exceptions import BrazeClientError
-from celery import shared_task
+from celery import chain, shared_task
 from celery_utils.logged_task import LoggedTask
 from django.conf import settings
 from django.db import IntegrityError, transaction
@@ -17,34 +17,49 @@ from requests.exceptions import Timeout as RequestsTimeoutError
 
 import license_manager.apps.subscriptions.api as subscriptions_api
 from license_manager.apps.api import utils
-from license_manager.apps.api.models import BulkEnrollmentJob
+from license_manager.apps.api.models import (
+    BulkEnrollmentJob,
+    LicenseAssignmentJob,
+    LicenseAssignmentJobEmail,
+)
 from license_manager.apps.api_client.braze import BrazeApiClient
 from license_manager.apps.api_client.enterprise import EnterpriseApiClient
 from license_manager.apps.subscriptions.constants import (
     ACTIVATED,
+    ASSIGNED,
     ASSIGNMENT_EMAIL_BATCH_SIZE,
     DAYS_BEFORE_INITIAL_UTILIZATION_EMAIL_SENT,
     ENTERPRISE_BRAZE_ALIAS_LABEL,
+    LICENSE_BULK_OPERATION_BATCH_SIZE,
+    LICENSE_SOURCE_BULK_OPERATION_BATCH_SIZE,
     LICENSE_UTILIZATION_THRESHOLDS,
     NOTIFICATION_CHOICE_AND_CAMPAIGN_BY_THRESHOLD,
     PENDING_ACCOUNT_CREATION_BATCH_SIZE,
     REMINDER_EMAIL_BATCH_SIZE,
     REVOCABLE_LICENSE_STATUSES,
     TRACK_LICENSE_CHANGES_BATCH_SIZE,
+    TRACK_LICENSE_CHANGES_SUBTASK_SIZE,
     LicenseActionSource,
     LicenseActionType,
     LicenseActorType,
+    LicenseAssignmentJobEmailStatus,
+    LicenseAssignmentJobStatus,
     NotificationChoices,
+    SegmentEvents,
 )
 from license_manager.apps.subscriptions.event_utils import (
+    LICENSE_TRACKING_VALUES,
+    flush_segment_events,
     get_license_tracking_properties,
-    track_license_changes,
+    track_license_values_changes,
 )
 from license_manager.apps.subscriptions.models import (
     CustomerAgreement,
     License,
     LicenseAction,
     Notification,
+    SubscriptionLicenseSource,
+    SubscriptionLicenseSourceType,
     SubscriptionPlan,
 )
 from license_manager.apps.subscriptions.utils import (
@@ -63,6 +78,9 @@ MAX_TIME_LIMIT = 960
 
 LICENSE_DEBUG_PREFIX = '[LICENSE DEBUGGING]'
 
+# How long a license assignment job may hold the assignment lock of its plan while it processes a batch
+LICENSE_ASSIGNMENT_JOB_LOCK_TIMEOUT_SECONDS = 300
+
 # Magic strings for logging in notify/remind email tasks
 NOTIFY_EMAIL_ACTION_TYPE = 'notify'
 REMIND_EMAIL_ACTION_TYPE = 'remind'
@@ -254,6 +272,49 @@ def send_assignment_email_task(custom_template_text, email_recipient_list, subsc
     )
 
 
+@shared_task(base=LoggedTask, soft_time_limit=SOFT_TIME_LIMIT, time_limit=MAX_TIME_LIMIT)
+def link_and_notify_assigned_emails_task(user_emails, subscription_uuid, notify_users, custom_template_text):
+    """
+    Fans out the onboarding of newly assigned learners, so that an assignment only has to enqueue this one task.
+
+    For each batch of ``PENDING_ACCOUNT_CREATION_BATCH_SIZE`` learners, enqueues a chain of
+    link_learners_to_enterprise_task, create_braze_aliases_task and send_assignment_email_task.
+    The task signatures are immutable, hence the `si()` - we don't want the result of each task
+    passed to the next task in the chain.
+
+    If disable_onboarding_notifications is set to true on the CustomerAgreement or notify_users=False,
+    learners are only linked to the enterprise: no Braze alias is created and no license assignment email is sent.
+
+    Arguments:
+        user_emails (list of str): The emails licenses were assigned to.
+        subscription_uuid (str): UUID (string representation) of the plan of the assigned licenses.
+        notify_users (bool): Whether to send license assignment emails.
+        custom_template_text (dict): Dictionary containing `greeting` and `closing` keys to be used for customizing
+            the email template.
+    """
+    subscription_plan = SubscriptionPlan.objects.select_related('customer_agreement').get(uuid=subscription_uuid)
+    disable_onboarding_notifications = subscription_plan.customer_agreement.disable_onboarding_notifications
+
+    for pending_learner_batch in chunks(user_emails, PENDING_ACCOUNT_CREATION_BATCH_SIZE):
+        tasks = chain(
+            link_learners_to_enterprise_task.si(
+                pending_learner_batch,
+                subscription_plan.enterprise_customer_uuid,
+            ),
+        )
+        if notify_users and not disable_onboarding_notifications:
+            # Braze aliases must be created before we attempt to send assignment emails.
+            tasks.link(create_braze_aliases_task.si(pending_learner_batch))
+            tasks.link(
+                send_assignment_email_task.si(
+                    custom_template_text,
+                    pending_learner_batch,
+                    str(subscription_plan.uuid),
+                )
+            )
+        tasks.apply_async()
+
+
 @shared_task(base=LoggedTaskWithRetry, soft_time_limit=SOFT_TIME_LIMIT, time_limit=MAX_TIME_LIMIT)
 def send_reminder_email_task(custom_template_text, email_recipient_list, subscription_uuid):
     """
@@ -430,31 +491,27 @@ def execute_post_revocation_tasks(
         action_metadata['idempotency_key'] = idempotency_key
 
     try:
-        if idempotency_key and LicenseAction.objects.filter(
+        revoked_action = LicenseAction.create_idempotent(
             license=revoked_license,
+            subscription_plan=revoked_license.subscription_plan,
+            enterprise_customer_uuid=revoked_license.subscription_plan.enterprise_customer_uuid,
             action_type=LicenseActionType.REVOKED,
-            metadata__idempotency_key=idempotency_key,
-        ).exists():
+            actor_type=actor_type,
+            actor_lms_user_id=actor_lms_user_id,
+            learner_lms_user_id=revoked_license.lms_user_id,
+            learner_email=revoked_license.user_email,
+            source=source,
+            correlation_id=correlation_id,
+            idempotency_key=idempotency_key,
+            metadata=action_metadata,
+        )
+        if revoked_action is None:
             logger.info(
                 'Skipping duplicate revoked LicenseAction for license %s with idempotency_key %s',
                 revoked_license.uuid,
                 idempotency_key,
             )
             return
-        else:
-            LicenseAction.objects.create(
-                license=revoked_license,
-                subscription_plan=revoked_license.subscription_plan,
-                enterprise_customer_uuid=revoked_license.subscription_plan.enterprise_customer_uuid,
-                action_type=LicenseActionType.REVOKED,
-                actor_type=actor_type,
-                actor_lms_user_id=actor_lms_user_id,
-                learner_lms_user_id=revoked_license.lms_user_id,
-                learner_email=revoked_license.user_email,
-                source=source,
-                correlation_id=correlation_id,
-                metadata=action_metadata,
-            )
     except Exception:  # pylint: disable=broad-except
         logger.exception(
             'Failed to write revoked LicenseAction for license %s; continuing post-revocation tasks.',
@@ -572,6 +629,10 @@ def revoke_all_licenses_task(
     """
     Revokes all licenses associated with a subscription plan.
 
+    The licenses are revoked in chunks of ``LICENSE_BULK_OPERATION_BATCH_SIZE``, each in its own transaction
+    followed by the post-revocation tasks of its licenses, so that a retry after a failure only revokes the
+    licenses that are still revocable.
+
     Arguments:
         subscription_uuid (str): UUID (string representation) of the subscription to revoke all licenses for.
     """
@@ -583,29 +644,33 @@ def revoke_all_licenses_task(
 
     subscription_plan = SubscriptionPlan.objects.get(uuid=subscription_uuid)
 
-    with transaction.atomic():
-        subscription_licenses = subscription_plan.licenses.filter(
-            status__in=REVOCABLE_LICENSE_STATUSES,
-        )
+    subscription_licenses = subscription_plan.licenses.filter(
+        status__in=REVOCABLE_LICENSE_STATUSES,
+    )
+    license_uuids = list(subscription_licenses.order_by('uuid').values_list('uuid', flat=True))
 
+    for license_uuid_chunk in chunks(license_uuids, LICENSE_BULK_OPERATION_BATCH_SIZE):
         revocation_results = []
 
-        for sl in subscription_licenses:
-            try:
-                revocation_results.append(subscriptions_api.revoke_license(sl))
-            except Exception:
-                logger.error('Could not revoke license with uuid {} during revoke_all_licenses_task'.format(sl.uuid),
-                             exc_info=True)
-                raise
-
-    for result in revocation_results:
-        execute_post_revocation_tasks(
-            **result,
-            actor_lms_user_id=actor_lms_user_id,
-            actor_type=actor_type,
-            source=source,
-            correlation_id=correlation_id,
-        )
+        with transaction.atomic():
+            for sl in subscription_licenses.filter(uuid__in=license_uuid_chunk):
+                try:
+                    revocation_results.append(subscriptions_api.revoke_license(sl))
+                except Exception:
+                    logger.error(
+                        'Could not revoke license with uuid {} during revoke_all_licenses_task'.format(sl.uuid),
+                        exc_info=True,
+                    )
+                    raise
+
+        for result in revocation_results:
+            execute_post_revocation_tasks(
+                **result,
+                actor_lms_user_id=actor_lms_user_id,
+                actor_type=actor_type,
+                source=source,
+                correlation_id=correlation_id,
+            )
 
 
 def _send_bulk_enrollment_results_email(
@@ -984,7 +1049,12 @@ def send_utilization_threshold_reached_email_task(subscription_uuid):
 @shared_task(base=LoggedTaskWithRetry, soft_time_limit=SOFT_TIME_LIMIT, time_limit=MAX_TIME_LIMIT, bind=True)
 def track_license_changes_task(self, license_uuids, event_name, properties=None, is_batch_assignment=False):
     """
-    Calls ``track_license_changes()`` on some chunks of licenses.
+    Sends tracking events for changes to some licenses.
+
+    Lists of more than ``TRACK_LICENSE_CHANGES_SUBTASK_SIZE`` licenses are split across subtasks, which
+    can run in parallel. Each task loads its licenses in chunks of ``TRACK_LICENSE_CHANGES_BATCH_SIZE``,
+    in primary key order and joined with their plan and customer agreement, as ``values()`` rows
+    rather than model instances.
 
     Args:
         license_uuid (list): List of license uuids
@@ -996,17 +1066,35 @@ def track_license_changes_task(self, license_uuids, event_name, properties=None,
         None
     """
     properties = properties or {}
-    # We chunk these up as to not fetch too many license records from the DB in a single query.
-    # We're also limited in `track_license_changes` by the number of records
-    # this braze endpoint allows us to request at a time:
-    # https://www.braze.com/docs/api/endpoints/export/user_data/post_users_identifier/
-    for uuid_str_chunk in chunks(license_uuids, TRACK_LICENSE_CHANGES_BATCH_SIZE):
-        license_uuid_chunk = [uuid.UUID(uuid_str) for uuid_str in uuid_str_chunk]
-        licenses = License.objects.filter(uuid__in=license_uuid_chunk)
-        track_license_changes(licenses, event_name, properties, is_batch_assignment)
-        logger.info('Task {} tracked license changes for license uuids {}'.format(
+    sorted_license_uuids = sorted({uuid.UUID(str(license_uuid)) for license_uuid in license_uuids})
+
+    if len(sorted_license_uuids) > TRACK_LICENSE_CHANGES_SUBTASK_SIZE:
+        uuid_chunks = list(chunks(sorted_license_uuids, TRACK_LICENSE_CHANGES_SUBTASK_SIZE))
+        for uuid_chunk in uuid_chunks:
+            track_license_changes_task.delay(
+                [str(license_uuid) for license_uuid in uuid_chunk],
+                event_name,
+                properties,
+                is_batch_assignment,
+            )
+        logger.info('Task {} split tracking license changes for {} licenses across {} subtasks'.format(
             self.request.id,
-            license_uuid_chunk,
+            len(sorted_license_uuids),
+            len(uuid_chunks),
+        ))
+        return
+
+    for license_uuid_chunk in chunks(sorted_license_uuids, TRACK_LICENSE_CHANGES_BATCH_SIZE):
+        license_values_rows = License.objects.filter(
+            uuid__in=license_uuid_chunk,
+        ).order_by('uuid').values(*LICENSE_TRACKING_VALUES)
+        track_license_values_changes(license_values_rows, event_name, properties, is_batch_assignment)
+        flush_segment_events()
+        logger.info('Task {} tracked license changes for {} licenses, from {} to {}'.format(
+            self.request.id,
+            len(license_uuid_chunk),
+            license_uuid_chunk[0],
+            license_uuid_chunk[-1],
         ))
 
 
@@ -1020,11 +1108,202 @@ def update_user_email_for_licenses_task(lms_user_id, new_email):
         new_email (str): The email that will overwrite curent user_email fields
 
     """
+    subscriptions_api.sync_user_emails({int(lms_user_id): new_email})
+
+
+def _process_license_assignment_job_batch(license_assignment_job):
+    """
+    Assigns licenses to the next batch of pending emails of the given job, in a single transaction
+    that also records the result of each email, so that a job that's interrupted can be resumed
+    without assigning any email twice.
+
+    Returns:
+        int: The number of emails processed, 0 once there are none left.
+    """
+    subscription_plan = license_assignment_job.subscription_plan
+    with transaction.atomic():
+        job_emails = list(
+            license_assignment_job.emails.filter(
+                status=LicenseAssignmentJobEmailStatus.PENDING,
+            ).order_by('id')[:settings.LICENSE_ASSIGNMENT_JOB_BATCH_SIZE]
+        )
+        if not job_emails:
+            return 0
+
+        job_emails_by_email = {job_email.user_email: job_email for job_email in job_emails}
+        already_associated_licenses = subscription_plan.licenses.filter(
+            user_email__in=list(job_emails_by_email),
+            status__in=[ASSIGNED, ACTIVATED],
+        ).values_list('uuid', 'user_email')
+        for license_uuid, user_email in already_associated_licenses:
+            if job_email := job_emails_by_email.pop(user_email.lower(), None):
+                job_email.status = LicenseAssignmentJobEmailStatus.ALREADY_ASSOCIATED
+                job_email.license_id = license_uuid
+
+        # Claim the licenses to assign as a set, skipping any that a concurrent transaction is about to assign
+        subscription_plan.materialize_unassigned_licenses(len(job_emails_by_email))
+        claimed_licenses = list(
+            subscription_plan.unassigned_licenses.select_for_update(skip_locked=True)[:len(job_emails_by_email)]
+        )
+        now = localized_utcnow()
+        assigned_licenses = []
+        for job_email in job_emails_by_email.values():
+            if len(assigned_licenses) == len(claimed_licenses):
+                job_email.status = LicenseAssignmentJobEmailStatus.FAILED
+                job_email.notes = 'not enough licenses'
+                continue
+            unassigned_license = claimed_licenses[len(assigned_licenses)]
+            unassigned_license.user_email = job_email.user_email
+            unassigned_license.status = ASSIGNED
+            unassigned_license.activation_key = str(uuid.uuid4())
+            unassigned_license.assigned_date = now
+            unassigned_license.last_remind_date = now
+            assigned_licenses.append(unassigned_license)
+            job_email.status = LicenseAssignmentJobEmailStatus.ASSIGNED
+            job_email.license = unassigned_license
+
+        License.bulk_update(
+            assigned_licenses,
+            ['user_email', 'status', 'activation_key', 'assigned_date', 'last_remind_date'],
+        )
+
+        sfids_by_email = {
+            job_email.user_email: job_email.user_sfid
+            for job_email in job_emails_by_email.values() if job_email.user_sfid
+        }
+        license_source = SubscriptionLicenseSourceType.get_source_type(SubscriptionLicenseSourceType.AMT)
+        SubscriptionLicenseSource.objects.bulk_create([
+            SubscriptionLicenseSource(
+                license=assigned_license,
+                source_id=sfids_by_email[assigned_license.user_email],
+                source_type=license_source,
+            )
+            for assigned_license in assigned_licenses if assigned_license.user_email in sfids_by_email
+        ], batch_size=LICENSE_SOURCE_BULK_OPERATION_BATCH_SIZE)
+
+        LicenseAction.objects.bulk_create([
+            LicenseAction(
+                license=assigned_license,
+                subscription_plan=subscription_plan,
+                enterprise_customer_uuid=subscription_plan.enterprise_customer_uuid,
+                action_type=LicenseActionType.ASSIGNED,
+                actor_type=LicenseActorType.ADMIN,
+                actor_lms_user_id=license_assignment_job.actor_lms_user_id,
+                learner_email=assigned_license.user_email,
+                learner_external_key=sfids_by_email.get(assigned_license.user_email),
+                source=LicenseActionSource.ADMIN_API_BULK,
+                correlation_id=str(license_assignment_job.uuid),
+                metadata={
+                    'license_assignment_job_uuid': str(license_assignment_job.uuid),
+                    'batch_size': len(assigned_licenses),
+                },
+            ) for assigned_license in assigned_licenses
+        ], batch_size=LICENSE_BULK_OPERATION_BATCH_SIZE)
+
+        LicenseAssignmentJobEmail.objects.bulk_update(
+            job_emails,
+            ['status', 'license', 'notes'],
+            batch_size=settings.LICENSE_ASSIGNMENT_JOB_BATCH_SIZE,
+        )
+        # Shows that the job is still making progress, see ``LicenseAssignmentJob.is_resumable``
+        LicenseAssignmentJob.objects.filter(uuid=license_assignment_job.uuid).update(modified=now)
+
+        if assigned_licenses:
+            assigned_license_uuids = [str(assigned_license.uuid) for assigned_license in assigned_licenses]
+            assigned_emails = [assigned_license.user_email for assigned_license in assigned_licenses]
+            transaction.on_commit(lambda: track_license_changes_task.delay(
+                assigned_license_uuids,
+                SegmentEvents.LICENSE_ASSIGNED,
+                is_batch_assignment=True,
+            ))
+            transaction.on_commit(lambda: link_and_notify_assigned_emails_task.delay(
+                assigned_emails,
+                str(subscription_plan.uuid),
+                license_assignment_job.notify_users,
+                license_assignment_job.custom_template_text,
+            ))
 
-    user_licenses = License.objects.filter(
-        lms_user_id=lms_user_id,
+    logger.info(
+        f'Processed {len(job_emails)} emails of license_assignment_job_uuid={license_assignment_job.uuid}, '
+        f'assigning {len(assigned_licenses)} licenses'
     )
-    for lcs in user_licenses:
-        lcs.user_email = new_email
+    return len(job_emails)
+
+
+def _write_license_assignment_job_results(license_assignment_job):
+    """
+    Writes the result of each email of the given job to a CSV, and uploads it to S3.
+    """
+    with NamedTemporaryFile(mode='w', delete=False) as result_file:
+        result_writer = csv.writer(result_file)
+        result_writer.writerow(['email address', 'salesforce opportunity id', 'license uuid', 'status', 'notes'])
+        job_emails = license_assignment_job.emails.order_by('id').values_list(
+            'user_email', 'user_sfid', 'license_id', 'status', 'notes',
+        )
+        for user_email, user_sfid, license_uuid, status, notes in job_emails.iterator():
+            result_writer.writerow([user_email, user_sfid or '', license_uuid or '', status, notes])
+
+        result_file.close()
+        license_assignment_job.upload_results(result_file.name)
+
+
+@shared_task(base=LoggedTaskWithRetry, soft_time_limit=SOFT_TIME_LIMIT, time_limit=MAX_TIME_LIMIT)
+def process_license_assignment_job_task(license_assignment_job_uuid):
+    """
+    Assigns licenses to the next batch of pending emails of a license assignment job. While pending emails remain,
+    the task is enqueued again for the next batch, so that each batch runs within its own task time limit;
+    once none remain, the results of the job are written.
+
+    Each batch takes the assignment lock of the plan, so that the job never runs at the same time as the
+    ``assign`` view or another job for the same plan. When the plan is locked, the task is enqueued again
+    to resume the job later.
+
+    Arguments:
+        license_assignment_job_uuid (str): UUID (string representation) of the LicenseAssignmentJob to process.
+    """
+    license_assignment_job = LicenseAssignmentJob.objects.select_related(
+        'subscription_plan__customer_agreement',
+    ).get(uuid=license_assignment_job_uuid)
+    if license_assignment_job.status == LicenseAssignmentJobStatus.COMPLETED:
+        logger.info(f'license_assignment_job_uuid={license_assignment_job_uuid} was already completed')
+        return
+
+    subscription_plan = license_assignment_job.subscription_plan
+    license_assignment_job.status = LicenseAssignmentJobStatus.PROCESSING
+    license_assignment_job.save(update_fields=['status', 'modified'])
+    try:
+        lock_acquired = utils.acquire_subscription_plan_lock(
+            subscription_plan,
+            django_cache_timeout=LICENSE_ASSIGNMENT_JOB_LOCK_TIMEOUT_SECONDS,
+        )
+        if not lock_acquired:
+            logger.info(
+                f'Assignment is locked for subscription plan {subscription_plan.uuid}, retrying '
+                f'license_assignment_job_uuid={license_assignment_job_uuid} later'
+            )
+            license_assignment_job.status = LicenseAssignmentJobStatus.PENDING
+            license_assignment_job.save(update_fields=['status', 'modified'])
+            license_assignment_job.enqueue(countdown=settings.LICENSE_ASSIGNMENT_JOB_LOCKED_RETRY_SECONDS)
+            return
+
+        try:
+            num_processed = _process_license_assignment_job_batch(license_assignment_job)
+        finally:
+            utils.release_subscription_plan_lock(subscription_plan)
+
+        if num_processed and license_assignment_job.emails.filter(
+            status=LicenseAssignmentJobEmailStatus.PENDING,
+        ).exists():
+            license_assignment_job.enqueue()
+            return
+
+        _write_license_assignment_job_results(license_assignment_job)
+    except Exception:
+        logger.exception(f'failed process_license_assignment_job_task for {license_assignment_job_uuid}')
+        license_assignment_job.status = LicenseAssignmentJobStatus.FAILED
+        license_assignment_job.save(update_fields=['status', 'modified'])
+        raise
 
-    License.bulk_update(user_licenses, ['user_email'])
+    license_assignment_job.status = LicenseAssignmentJobStatus.COMPLETED
+    license_assignment_job.completed_at = localized_utcnow()
+    license_assignment_job.save(update_fields=['status', 'completed_at', 'modified'])
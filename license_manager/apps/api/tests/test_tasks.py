@@ -16,6 +16,7 @@ from freezegun import freeze_time
 from requests import models
 
 from license_manager.apps.api import tasks
+from license_manager.apps.api.models import LicenseAssignmentJob
 from license_manager.apps.api.tests.factories import BulkEnrollmentJobFactory
 from license_manager.apps.subscriptions import constants
 from license_manager.apps.subscriptions.api import revoke_license
@@ -35,6 +36,7 @@ from license_manager.apps.subscriptions.models import (
     License,
     LicenseAction,
     Notification,
+    SubscriptionLicenseSource,
     SubscriptionPlan,
 )
 from license_manager.apps.subscriptions.tests.factories import (
@@ -839,6 +841,7 @@ class RevokeAllLicensesTaskTests(TestCase):
         assert actions.first().metadata['idempotency_key'] == (
             f'corr-123:{original_license.uuid}:{constants.LicenseActionType.REVOKED}'
         )
+        assert actions.first().idempotency_key == actions.first().metadata['idempotency_key']
         # Both downstream tasks should have fired exactly once, from the first
         # (non-duplicate) invocation; the second, duplicate invocation must not
         # re-trigger enrollment revocation or the cap-reached email.
@@ -1141,11 +1144,11 @@ class BaseLicenseUtilizationEmailTaskTests(TestCase):
 class SendInitialUtilizationEmailTaskTests(BaseLicenseUtilizationEmailTaskTests):
     def _make_plan_eligible_for_email(self):
         """
-        Update plan history so that it's eligible for the initial utilization email.
+        Update when auto-apply was turned on for the plan so that it's eligible for the initial utilization email.
         """
-        latest_history = self.subscription_plan.history.latest()
-        latest_history.history_date = self.now - timedelta(days=DAYS_BEFORE_INITIAL_UTILIZATION_EMAIL_SENT)
-        latest_history.save()
+        SubscriptionPlan.objects.filter(uuid=self.subscription_plan.uuid).update(
+            auto_apply_enabled_at=self.now - timedelta(days=DAYS_BEFORE_INITIAL_UTILIZATION_EMAIL_SENT),
+        )
 
     @mock.patch('license_manager.apps.api.tasks.EnterpriseApiClient', return_value=mock.MagicMock())
     @mock.patch('license_manager.apps.api.tasks.BrazeApiClient')
@@ -1465,3 +1468,292 @@ class TrackLicenseChangesTests(TestCase):
             assert str(_license.uuid) in [props['license_uuid'] for props in actual_properties]
             assert _license.user_email in [props['assigned_email'] for props in actual_properties]
             assert _license.lms_user_id in [props['assigned_lms_user_id'] for props in actual_properties]
+
+    @mock.patch('license_manager.apps.api.tasks.TRACK_LICENSE_CHANGES_BATCH_SIZE', 2)
+    @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
+    def test_licenses_loaded_in_chunks(self, mock_track_event):
+        """
+        Tests that licenses are loaded with one query per chunk, including their plan, customer agreement
+        and the license they were renewed from.
+        """
+        renewed_licenses = LicenseFactory.create_batch(
+            5,
+            status=constants.ACTIVATED,
+            subscription_plan=self.subscription_plan,
+        )
+        for renewed_license in renewed_licenses:
+            LicenseFactory(renewed_to=renewed_license, subscription_plan=SubscriptionPlanFactory())
+
+        with self.assertNumQueries(3):
+            # pylint: disable=no-value-for-parameter
+            tasks.track_license_changes_task(
+                [str(_license.uuid) for _license in renewed_licenses],
+                constants.SegmentEvents.LICENSE_RENEWED,
+            )
+
+        assert mock_track_event.call_count == 5
+        properties_by_license_uuid = {
+            call[0][2]['license_uuid']: call[0][2] for call in mock_track_event.call_args_list
+        }
+        for renewed_license in renewed_licenses:
+            renewed_license.refresh_from_db()
+            assert properties_by_license_uuid[str(renewed_license.uuid)] == get_license_tracking_properties(
+                renewed_license,
+            )
+
+    @mock.patch('license_manager.apps.api.tasks.TRACK_LICENSE_CHANGES_SUBTASK_SIZE', 2)
+    @mock.patch('license_manager.apps.api.tasks.track_license_changes_task.delay')
+    @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
+    def test_large_license_lists_split_across_subtasks(self, mock_track_event, mock_track_delay):
+        """
+        Tests that lists of more licenses than a single task tracks are handed to subtasks in uuid order.
+        """
+        license_uuid_strs = [str(_license.uuid) for _license in LicenseFactory.create_batch(5)]
+
+        # pylint: disable=no-value-for-parameter
+        tasks.track_license_changes_task(
+            license_uuid_strs,
+            constants.SegmentEvents.LICENSE_CREATED,
+            properties={'counter': 1},
+        )
+
+        mock_track_event.assert_not_called()
+        assert mock_track_delay.call_count == 3
+        subtask_uuid_strs = []
+        for call in mock_track_delay.call_args_list:
+            uuid_chunk, event_name, properties, is_batch_assignment = call[0]
+            assert event_name == constants.SegmentEvents.LICENSE_CREATED
+            assert properties == {'counter': 1}
+            assert is_batch_assignment is False
+            subtask_uuid_strs.extend(uuid_chunk)
+        assert subtask_uuid_strs == sorted(license_uuid_strs)
+
+    @override_settings(SEGMENT_KEY='test-segment-key')
+    @mock.patch('license_manager.apps.subscriptions.event_utils.analytics')
+    @mock.patch('license_manager.apps.subscriptions.event_utils._track_batch_events_via_braze_alias')
+    def test_pending_learners_tracked_in_one_braze_batch(self, mock_braze_batch_track, mock_analytics):
+        """
+        Tests that the events of learners without an lms user id are sent to Braze as a single batch,
+        while the events of other learners are sent to Segment.
+        """
+        pending_licenses = [
+            LicenseFactory(
+                user_email=f'pending-{index}@example.com',
+                status=constants.ASSIGNED,
+                subscription_plan=self.subscription_plan,
+            )
+            for index in range(3)
+        ]
+        activated_license = LicenseFactory(
+            lms_user_id=1,
+            user_email='alice@example.com',
+            status=constants.ACTIVATED,
+            subscription_plan=self.subscription_plan,
+        )
+        # Creating the licenses tracked events of their own
+        mock_braze_batch_track.reset_mock()
+        mock_analytics.reset_mock()
+
+        # pylint: disable=no-value-for-parameter
+        tasks.track_license_changes_task(
+            [str(_license.uuid) for _license in pending_licenses + [activated_license]],
+            constants.SegmentEvents.LICENSE_ASSIGNED,
+        )
+
+        mock_braze_batch_track.assert_called_once()
+        event_name, properties_by_email = mock_braze_batch_track.call_args[0]
+        assert event_name == constants.SegmentEvents.LICENSE_ASSIGNED
+        assert sorted(properties_by_email) == sorted(_license.user_email for _license in pending_licenses)
+        mock_analytics.track.assert_called_once()
+        assert mock_analytics.track.call_args.kwargs['user_id'] == 1
+        mock_analytics.flush.assert_called_once()
+
+
+@override_settings(LICENSE_ASSIGNMENT_JOB_BATCH_SIZE=2)
+@mock.patch('license_manager.apps.api.models.current_app.send_task')
+@mock.patch('license_manager.apps.api.tasks.link_and_notify_assigned_emails_task.delay')
+@mock.patch('license_manager.apps.api.tasks.track_license_changes_task.delay')
+class ProcessLicenseAssignmentJobTaskTests(TestCase):
+    """
+    Tests for process_license_assignment_job_task.
+    """
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+        LicenseFactory.create_batch(3, subscription_plan=self.subscription_plan, status=UNASSIGNED)
+        self.already_associated_license = LicenseFactory(
+            subscription_plan=self.subscription_plan,
+            status=ASSIGNED,
+            user_email='bob@example.com',
+        )
+
+    def _create_job(self, emails_and_sfids):
+        return LicenseAssignmentJob.create_license_assignment_job(
+            1,
+            self.subscription_plan,
+            emails_and_sfids,
+            custom_template_text={'greeting': 'Hello', 'closing': 'Bye'},
+        )
+
+    def _process_job(self, license_assignment_job, mock_send_task):
+        """
+        Runs the task for the job, then again for each batch that it enqueues the task for.
+
+        Returns:
+            int: The number of times the task ran.
+        """
+        mock_send_task.reset_mock()
+        num_tasks = 0
+        while True:
+            with self.captureOnCommitCallbacks(execute=True):
+                tasks.process_license_assignment_job_task(str(license_assignment_job.uuid))
+            num_tasks += 1
+            if mock_send_task.call_count < num_tasks or mock_send_task.call_args.kwargs['countdown'] is not None:
+                break
+        license_assignment_job.refresh_from_db()
+        return num_tasks
+
+    def _get_email_statuses(self, license_assignment_job):
+        return dict(license_assignment_job.emails.values_list('user_email', 'status'))
+
+    def test_process_license_assignment_job(self, mock_track_delay, mock_notify_delay, mock_send_task):
+        license_assignment_job = self._create_job({
+            'alice@example.com': '0000000000000000AA',
+            'bob@example.com': None,
+            'carol@example.com': None,
+            'dave@example.com': None,
+            'erin@example.com': None,
+            'not-an-email': None,
+        })
+        mock_send_task.assert_called_once_with(
+            'license_manager.apps.api.tasks.process_license_assignment_job_task',
+            (str(license_assignment_job.uuid),),
+            countdown=None,
+        )
+
+        with mock.patch.object(LicenseAssignmentJob, 'upload_results') as mock_upload_results:
+            # A task for each batch of 2 of the 5 valid emails.
+            assert self._process_job(license_assignment_job, mock_send_task) == 3
+
+        assert license_assignment_job.status == constants.LicenseAssignmentJobStatus.COMPLETED
+        assert license_assignment_job.completed_at is not None
+        assert self._get_email_statuses(license_assignment_job) == {
+            'alice@example.com': constants.LicenseAssignmentJobEmailStatus.ASSIGNED,
+            'bob@example.com': constants.LicenseAssignmentJobEmailStatus.ALREADY_ASSOCIATED,
+            'carol@example.com': constants.LicenseAssignmentJobEmailStatus.ASSIGNED,
+            'dave@example.com': constants.LicenseAssignmentJobEmailStatus.ASSIGNED,
+            'erin@example.com': constants.LicenseAssignmentJobEmailStatus.FAILED,
+            'not-an-email': constants.LicenseAssignmentJobEmailStatus.FAILED,
+        }
+        assert license_assignment_job.get_progress() == {
+            'pending': 0, 'assigned': 3, 'already_associated': 1, 'failed': 2, 'total': 6,
+        }
+        assert set(
+            self.subscription_plan.licenses.filter(status=ASSIGNED).values_list('user_email', flat=True)
+        ) == {'alice@example.com', 'bob@example.com', 'carol@example.com', 'dave@example.com'}
+
+        alice_license = License.objects.get(user_email='alice@example.com')
+        assert SubscriptionLicenseSource.objects.get(license=alice_license).source_id == '0000000000000000AA'
+        alice_action = LicenseAction.objects.get(license=alice_license)
+        assert alice_action.correlation_id == str(license_assignment_job.uuid)
+        assert alice_action.learner_external_key == '0000000000000000AA'
+        assert LicenseAction.objects.filter(correlation_id=str(license_assignment_job.uuid)).count() == 3
+
+        # One batch assigned alice, the next carol and dave, and the last one assigned nobody.
+        assert mock_track_delay.call_count == 2
+        assert mock_notify_delay.call_count == 2
+        mock_notify_delay.assert_called_with(
+            ['carol@example.com', 'dave@example.com'],
+            str(self.subscription_plan.uuid),
+            True,
+            {'greeting': 'Hello', 'closing': 'Bye'},
+        )
+        mock_upload_results.assert_called_once()
+
+    def test_each_task_processes_one_batch(self, mock_track_delay, mock_notify_delay, mock_send_task):
+        license_assignment_job = self._create_job({
+            'alice@example.com': None,
+            'carol@example.com': None,
+            'dave@example.com': None,
+        })
+        mock_send_task.reset_mock()
+
+        with mock.patch.object(LicenseAssignmentJob, 'upload_results') as mock_upload_results:
+            with self.captureOnCommitCallbacks(execute=True):
+                tasks.process_license_assignment_job_task(str(license_assignment_job.uuid))
+
+        license_assignment_job.refresh_from_db()
+        assert license_assignment_job.status == constants.LicenseAssignmentJobStatus.PROCESSING
+        assert license_assignment_job.get_progress()['pending'] == 1
+        mock_send_task.assert_called_once_with(
+            'license_manager.apps.api.tasks.process_license_assignment_job_task',
+            (str(license_assignment_job.uuid),),
+            countdown=None,
+        )
+        mock_upload_results.assert_not_called()
+
+    def test_results_csv(self, mock_track_delay, mock_notify_delay, mock_send_task):
+        license_assignment_job = self._create_job({'bob@example.com': None})
+
+        with mock.patch.object(LicenseAssignmentJob, 'upload_results') as mock_upload_results:
+            self._process_job(license_assignment_job, mock_send_task)
+
+        [results_file_name] = mock_upload_results.call_args[0]
+        with open(results_file_name, encoding='utf-8') as results_file:
+            assert results_file.read().splitlines() == [
+                'email address,salesforce opportunity id,license uuid,status,notes',
+                f'bob@example.com,,{self.already_associated_license.uuid},already_associated,',
+            ]
+
+    def test_resume_only_processes_pending_emails(self, mock_track_delay, mock_notify_delay, mock_send_task):
+        license_assignment_job = self._create_job({'alice@example.com': None, 'carol@example.com': None})
+        license_assignment_job.emails.filter(user_email='alice@example.com').update(
+            status=constants.LicenseAssignmentJobEmailStatus.ASSIGNED,
+        )
+
+        self._process_job(license_assignment_job, mock_send_task)
+
+        assert license_assignment_job.status == constants.LicenseAssignmentJobStatus.COMPLETED
+        assert list(
+            self.subscription_plan.licenses.filter(status=ASSIGNED).values_list('user_email', flat=True).order_by(
+                'user_email',
+            )
+        ) == ['bob@example.com', 'carol@example.com']
+
+    def test_completed_job_is_not_processed_again(self, mock_track_delay, mock_notify_delay, mock_send_task):
+        license_assignment_job = self._create_job({'alice@example.com': None})
+        license_assignment_job.status = constants.LicenseAssignmentJobStatus.COMPLETED
+        license_assignment_job.save()
+
+        self._process_job(license_assignment_job, mock_send_task)
+
+        assert self._get_email_statuses(license_assignment_job) == {
+            'alice@example.com': constants.LicenseAssignmentJobEmailStatus.PENDING,
+        }
+
+    @mock.patch('license_manager.apps.api.tasks.utils.acquire_subscription_plan_lock', return_value=False)
+    def test_locked_plan_enqueues_job_again(
+        self, mock_acquire_lock, mock_track_delay, mock_notify_delay, mock_send_task,
+    ):
+        license_assignment_job = self._create_job({'alice@example.com': None})
+        mock_send_task.reset_mock()
+
+        self._process_job(license_assignment_job, mock_send_task)
+
+        assert license_assignment_job.status == constants.LicenseAssignmentJobStatus.PENDING
+        mock_send_task.assert_called_once_with(
+            'license_manager.apps.api.tasks.process_license_assignment_job_task',
+            (str(license_assignment_job.uuid),),
+            countdown=settings.LICENSE_ASSIGNMENT_JOB_LOCKED_RETRY_SECONDS,
+        )
+
+    def test_failed_job(self, mock_track_delay, mock_notify_delay, mock_send_task):
+        license_assignment_job = self._create_job({'alice@example.com': None})
+
+        with mock.patch.object(LicenseAssignmentJob, 'upload_results', side_effect=ValueError):
+            with pytest.raises(ValueError):
+                self._process_job(license_assignment_job, mock_send_task)
+
+        license_assignment_job.refresh_from_db()
+        assert license_assignment_job.status == constants.LicenseAssignmentJobStatus.FAILED
+        assert license_assignment_job.is_resumable
@@ -5,6 +5,7 @@ import logging
 from unittest import mock
 from uuid import uuid4
 
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 from edx_django_utils.cache.utils import TieredCache
 
@@ -233,3 +234,28 @@ class TestUtils(TestCase):
 
         updated_result_case3 = utils.make_swagger_var_param_optional(result_case3)
         self.assertEqual(updated_result_case3, result_case3)  # No change expected
+
+
+class GetEmailsAndSfidsFromCsvTests(TestCase):
+    """
+    Tests for get_emails_and_sfids_from_csv
+    """
+    def test_get_emails_and_sfids_from_csv(self):
+        csv_file = SimpleUploadedFile(
+            'emails.csv',
+            (
+                '\ufeffEmail,SFID\r\n Alice@Example.com , 0000000000000000AA\r\n\r\n'
+                'bob@example.com\r\nalice@example.com,x\r\n'
+            ).encode(),
+        )
+        assert utils.get_emails_and_sfids_from_csv(csv_file) == {
+            'alice@example.com': '0000000000000000AA',
+            'bob@example.com': None,
+        }
+
+    def test_csv_without_header(self):
+        csv_file = SimpleUploadedFile('emails.csv', b'alice@example.com\nnot-an-email\n')
+        assert utils.get_emails_and_sfids_from_csv(csv_file) == {
+            'alice@example.com': None,
+            'not-an-email': None,
+        }
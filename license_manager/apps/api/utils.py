@@ -1,9 +1,12 @@
 """ Utility functions. """
+import csv
 import logging
 import os
+import time
 import urllib
 import uuid
 from collections import defaultdict
+from contextlib import contextmanager
 
 import boto3
 from botocore.client import Config
@@ -15,7 +18,6 @@ from edx_django_utils.cache.utils import (
     get_cache_key,
 )
 from edx_django_utils.monitoring import set_custom_attribute
-from edx_rbac.utils import get_decoded_jwt
 from rest_framework.exceptions import ParseError, status
 
 from license_manager.apps.api_client.braze import BrazeApiClient
@@ -28,8 +30,16 @@ from license_manager.apps.subscriptions.exceptions import (
     LicenseNotFoundError,
     LicenseRevocationError,
 )
-from license_manager.apps.subscriptions.models import CustomerAgreement, License
-from license_manager.apps.subscriptions.utils import get_license_activation_link
+from license_manager.apps.subscriptions.identity_map import get_or_load
+from license_manager.apps.subscriptions.models import (
+    CustomerAgreement,
+    License,
+    SubscriptionPlan,
+)
+from license_manager.apps.subscriptions.utils import (
+    get_decoded_jwt,
+    get_license_activation_link,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -55,9 +65,26 @@ def get_customer_agreement_from_request_enterprise_uuid(request):
     Helper function to return the CustomerAgreement, if any, associated with the specified ``enterprise_customer_uuid``.
     """
     enterprise_customer_uuid = request.query_params.get('enterprise_customer_uuid')
-    return get_object_or_404(
+    return get_or_load(
         CustomerAgreement,
-        enterprise_customer_uuid=enterprise_customer_uuid,
+        'enterprise_customer_uuid',
+        enterprise_customer_uuid,
+        lambda: get_object_or_404(
+            CustomerAgreement,
+            enterprise_customer_uuid=enterprise_customer_uuid,
+        ),
+    )
+
+
+def get_subscription_plan_by_uuid(subscription_uuid):
+    """
+    Helper function to return the SubscriptionPlan, with its CustomerAgreement, with the given uuid, or None.
+    """
+    return get_or_load(
+        SubscriptionPlan,
+        'uuid',
+        subscription_uuid,
+        lambda: SubscriptionPlan.objects.select_related('customer_agreement').filter(uuid=subscription_uuid).first(),
     )
 
 
@@ -250,6 +277,49 @@ def get_custom_text(data):
     }
 
 
+@contextmanager
+def timed_phase(timings, phase_name):
+    """
+    Records how long the wrapped block took, in milliseconds, as ``timings[phase_name]``.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase_name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def get_server_timing_header(timings):
+    """
+    Returns the value of a ``Server-Timing`` response header reporting the given phase timings.
+    """
+    return ', '.join(f'{phase_name};dur={duration_ms}' for phase_name, duration_ms in timings.items())
+
+
+def get_emails_and_sfids_from_csv(csv_file):
+    """
+    Reads an uploaded CSV of learner emails, with an optional second column of Salesforce opportunity ids.
+    A header row (one without an email address in its first column) and blank rows are skipped.
+
+    Returns:
+        dict: The Salesforce id (or None) of each lowercased email, in the order they first appear in the CSV.
+    """
+    emails_and_sfids = {}
+    is_first_row = True
+    for row in csv.reader(csv_file.read().decode('utf-8-sig').splitlines()):
+        cells = [cell.strip() for cell in row]
+        if not cells or not cells[0]:
+            continue
+        email = cells[0].lower()
+        if is_first_row:
+            is_first_row = False
+            if '@' not in email:
+                continue
+        sfid = cells[1] if len(cells) > 1 and cells[1] else None
+        emails_and_sfids.setdefault(email, sfid)
+    return emails_and_sfids
+
+
 def _get_short_file_name(long_file_name):
     return long_file_name.split("/")[-1]
 
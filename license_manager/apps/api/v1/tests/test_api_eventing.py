@@ -80,8 +80,8 @@ class LicenseViewSetActionEventTests(LicenseViewSetActionMixin, EventTestCaseBas
                 # We should have events all called with the created event:
                 assert call[0][1] == constants.SegmentEvents.LICENSE_CREATED
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_dedupe_eventing(self, _, __):
         """
         Verify the assign endpoint deduplicates submitted emails.
@@ -107,8 +107,8 @@ class LicenseViewSetActionEventTests(LicenseViewSetActionMixin, EventTestCaseBas
             self._assert_licenses_assigned([self.test_email])
 
     @ddt.data(True, False)
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_eventing(self, use_superuser, _, __):
         """ Verify that assignment events are generated by the view action."""
         # Mock the calls to track_event specifically imported in the models file.
@@ -133,8 +133,8 @@ class LicenseViewSetActionEventTests(LicenseViewSetActionMixin, EventTestCaseBas
             self.assertEqual(actual_event_name, constants.SegmentEvents.LICENSE_ASSIGNED)
             self.assertCountEqual(list(actual_properties_by_email.keys()), user_emails)
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     @mock.patch('license_manager.apps.api.tasks.revoke_course_enrollments_for_user_task.delay')
     @mock.patch('license_manager.apps.api.tasks.send_revocation_cap_notification_email_task.delay')
     def test_bulk_revoked_event(self, *_):
@@ -211,7 +211,7 @@ class LicenseViewSetActionEventTests(LicenseViewSetActionMixin, EventTestCaseBas
         )
 
         with mock.patch('license_manager.apps.subscriptions.event_utils.track_event') as mock_track_event:
-            with freeze_time(NOW):
+            with freeze_time(NOW), self.captureOnCommitCallbacks(execute=True):
                 api.renew_subscription(renewal)
             renewal.refresh_from_db()
 
@@ -13,7 +13,9 @@ import ddt
 import pytest
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import DatabaseError
 from django.http import QueryDict
 from django.test import TestCase, override_settings
@@ -27,6 +29,14 @@ from edx_rest_framework_extensions.auth.jwt.tests.utils import (
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from license_manager.apps.api.models import (
+    LicenseAssignmentJob,
+    LicenseAssignmentJobEmail,
+)
+from license_manager.apps.api.tasks import (
+    link_and_notify_assigned_emails_task,
+    update_user_email_for_licenses_task,
+)
 from license_manager.apps.api.tests.factories import BulkEnrollmentJobFactory
 from license_manager.apps.api.utils import (
     acquire_subscription_plan_lock,
@@ -42,12 +52,16 @@ from license_manager.apps.api.v1.views import (
 )
 from license_manager.apps.core.models import User
 from license_manager.apps.subscriptions import constants
+from license_manager.apps.subscriptions.archive import archive_licenses
 from license_manager.apps.subscriptions.exceptions import LicenseRevocationError
 from license_manager.apps.subscriptions.models import (
+    ArchivedLicense,
+    AutoAppliedLicenseCount,
     CustomerAgreement,
     License,
     LicenseAction,
     SubscriptionLicenseSource,
+    SubscriptionPlan,
     SubscriptionsFeatureRole,
     SubscriptionsRoleAssignment,
 )
@@ -64,7 +78,10 @@ from license_manager.apps.subscriptions.tests.utils import (
     assert_license_fields_cleared,
     assert_pii_cleared,
 )
-from license_manager.apps.subscriptions.utils import localized_utcnow
+from license_manager.apps.subscriptions.utils import (
+    localized_datetime,
+    localized_utcnow,
+)
 
 
 def generate_random_email():
@@ -985,6 +1002,33 @@ def test_license_list_search_by_email(api_client, staff_user, boolean_toggle):
     _assert_license_response_correct(results_by_uuid[str(unassigned_license.uuid)], unassigned_license)
 
 
+@pytest.mark.django_db
+@override_settings(LICENSE_EMAIL_SEARCH_MODE='prefix')
+@pytest.mark.parametrize('search, expected_license_index', [
+    ('UNAS', 2),
+    ('assigned@', 1),
+    (' Activated@edx ', 3),
+    ('edx', None),
+    ('z', None),
+])
+def test_license_list_search_by_email_prefix(api_client, staff_user, search, expected_license_index):
+    """
+    Verify that in the prefix search mode, only licenses whose email starts with the search term, in any case,
+    are listed.
+    """
+    subscription_and_licenses = _subscription_and_licenses()
+    subscription = subscription_and_licenses[0]
+    _assign_role_via_jwt_or_db(api_client, staff_user, subscription.enterprise_customer_uuid, True)
+
+    response = _licenses_list_request(api_client, subscription.uuid, search=search)
+
+    assert status.HTTP_200_OK == response.status_code
+    expected_license_uuids = []
+    if expected_license_index is not None:
+        expected_license_uuids = [str(subscription_and_licenses[expected_license_index].uuid)]
+    assert [item['uuid'] for item in response.data['results']] == expected_license_uuids
+
+
 @pytest.mark.django_db
 def test_license_list_staff_user_200_custom_page_size(api_client, staff_user):
     subscription, _, _, _, _ = _subscription_and_licenses()
@@ -1005,6 +1049,45 @@ def test_license_list_staff_user_200_custom_page_size(api_client, staff_user):
     assert response.data['next'] is not None
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize('status_filter', [None, constants.UNASSIGNED])
+def test_license_list_virtual_unassigned_licenses(api_client, staff_user, status_filter):
+    """
+    Assert the virtual unassigned licenses of a plan are listed after its license records.
+    """
+    subscription, _, unassigned_license, _, _ = _subscription_and_licenses()
+    subscription.uses_virtual_unassigned_licenses = True
+    subscription.num_virtual_unassigned_licenses = 3
+    subscription.save()
+    _assign_role_via_jwt_or_db(
+        api_client,
+        staff_user,
+        subscription.enterprise_customer_uuid,
+        True,
+    )
+    num_license_records = 1 if status_filter else 4
+
+    response = _licenses_list_request(api_client, subscription.uuid, page_size=100, status=status_filter)
+
+    assert status.HTTP_200_OK == response.status_code
+    assert response.data['count'] == num_license_records + 3
+    results = response.data['results']
+    assert str(unassigned_license.uuid) in [item['uuid'] for item in results[:num_license_records]]
+    for item in results[num_license_records:]:
+        assert item['uuid'] is None
+        assert item['status'] == constants.UNASSIGNED
+        assert item['subscription_plan_uuid'] == str(subscription.uuid)
+
+    # Pages that straddle the license records and the virtual licenses are read from both.
+    response = _licenses_list_request(api_client, subscription.uuid, page_size=2, status=constants.UNASSIGNED)
+    assert [item['uuid'] for item in response.data['results']] == [str(unassigned_license.uuid), None]
+    assert response.data['num_pages'] == 2
+
+    # Virtual licenses aren't listed when the requested statuses exclude them.
+    response = _licenses_list_request(api_client, subscription.uuid, status=constants.ASSIGNED)
+    assert response.data['count'] == 1
+
+
 @pytest.mark.django_db
 def test_license_list_staff_user_200_estimated_license_count(api_client, staff_user):
     subscription, _, _, _, _ = _subscription_and_licenses()
@@ -1249,6 +1332,15 @@ class LicenseViewSetActionMixin:
         # Try to start every test with the regular user not being staff
         self.user.is_staff = False
 
+        # Run the task that fans out the onboarding of assigned learners synchronously,
+        # so that the tasks it enqueues can be asserted on
+        link_and_notify_patcher = mock.patch(
+            'license_manager.apps.api.v1.views.link_and_notify_assigned_emails_task.delay',
+            side_effect=link_and_notify_assigned_emails_task,
+        )
+        link_and_notify_patcher.start()
+        self.addCleanup(link_and_notify_patcher.stop)
+
     @classmethod
     def setUpTestData(cls):
         super().setUpTestData()
@@ -1281,6 +1373,15 @@ class LicenseViewSetActionMixin:
         self.subscription_plan.licenses.set(unassigned_licenses)
         return unassigned_licenses
 
+    def _use_virtual_unassigned_licenses(self, num_virtual_unassigned_licenses):
+        """
+        Helper that switches the subscription to a virtual pool of `num_virtual_unassigned_licenses`
+        unassigned licenses.
+        """
+        self.subscription_plan.uses_virtual_unassigned_licenses = True
+        self.subscription_plan.num_virtual_unassigned_licenses = num_virtual_unassigned_licenses
+        self.subscription_plan.save()
+
     def _assert_licenses_assigned(self, user_emails):
         """
         Helper that verifies that there is an assigned license associated with each email in `user_emails`.
@@ -1500,6 +1601,7 @@ class CustomerAgreementViewSetTests(LicenseViewSetActionMixin, TestCase):
         for _ in range(7):
             self.api_client.post(self.auto_apply_url)
         assert License.objects.filter(user_email=user_email).count() == 1
+        assert AutoAppliedLicenseCount.count_since(plan, localized_utcnow() - datetime.timedelta(hours=1)) == 1
 
         # Check whether tasks were run
         mock_send_assignment_email_task.assert_called_once_with(
@@ -1594,6 +1696,31 @@ class CustomerAgreementViewSetTests(LicenseViewSetActionMixin, TestCase):
             plan.uuid
         )
 
+    @mock.patch('license_manager.apps.api.tasks.send_utilization_threshold_reached_email_task.delay')
+    @mock.patch('license_manager.apps.api.v1.views.send_auto_applied_license_email_task.apply_async')
+    def test_auto_apply_virtual_unassigned_licenses(self, *args):  # pylint: disable=unused-argument
+        """
+        Endpoint should create the auto-applied License out of the virtual pool of unassigned licenses.
+        """
+        plan = SubscriptionPlanFactory.create(
+            customer_agreement=self.customer_agreement,
+            enterprise_catalog_uuid=self.enterprise_catalog_uuid,
+            is_active=True,
+            should_auto_apply_licenses=True,
+            uses_virtual_unassigned_licenses=True,
+            num_virtual_unassigned_licenses=2,
+        )
+
+        self._setup_request_jwt(user=self.super_user)
+        response = self.api_client.post(self.auto_apply_url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['status'] == 'activated'
+
+        plan.refresh_from_db()
+        assert plan.licenses.filter(auto_applied=True, status=constants.ACTIVATED).count() == 1
+        assert plan.num_virtual_unassigned_licenses == 1
+        assert plan.num_licenses == 2
+
 
 @ddt.ddt
 class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
@@ -1629,8 +1756,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         super().tearDown()
         self.mock_track_test_mocker.stop()
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_no_emails(self, mock_send_assignment_email_task, mock_link_learners_task):
         """
         Verify the assign endpoint returns a 400 if no user emails are provided.
@@ -1640,8 +1767,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         mock_send_assignment_email_task.assert_not_called()
         mock_link_learners_task.assert_not_called()
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     @ddt.data(True, False)
     def test_assign_non_admin_user(self, user_is_staff, mock_send_assignment_email_task, mock_link_learners_task):
         """
@@ -1651,8 +1778,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         self._test_and_assert_forbidden_user(self.assign_url, user_is_staff, mock_send_assignment_email_task)
         mock_link_learners_task.assert_not_called()
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_empty_emails(self, mock_send_assignment_email_task, mock_link_learners_task):
         """
         Verify the assign endpoint returns a 400 if the list of emails provided is empty.
@@ -1662,8 +1789,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         mock_send_assignment_email_task.assert_not_called()
         mock_link_learners_task.assert_not_called()
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_invalid_emails(self, mock_send_assignment_email_task, mock_link_learners_task):
         """
         Verify the assign endpoint returns a 400 if the list contains an invalid email.
@@ -1673,8 +1800,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         mock_send_assignment_email_task.assert_not_called()
         mock_link_learners_task.assert_not_called()
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_insufficient_licenses(self, mock_send_assignment_email_task, mock_link_learners_task):
         """
         Verify the assign endpoint returns a 400 if there are not enough unassigned licenses to assign to.
@@ -1687,8 +1814,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         mock_send_assignment_email_task.assert_not_called()
         mock_link_learners_task.assert_not_called()
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_insufficient_licenses_revoked(self, mock_send_assignment_email_task, mock_link_learners_task):
         """
         Verify the endpoint returns a 400 if there are not enough licenses to assign to considering revoked licenses
@@ -1701,8 +1828,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         mock_send_assignment_email_task.assert_not_called()
         mock_link_learners_task.assert_not_called()
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_already_associated_email(self, mock_send_assignment_email_task, mock_link_learners_task):
         """
         Verify the assign endpoint returns a 200 if there is already a license associated with a provided email.
@@ -1731,8 +1858,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
             self.subscription_plan.customer_agreement.enterprise_customer_uuid
         )
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     @ddt.data(True, False)
     def test_assign(self, use_superuser, mock_send_assignment_email_task, mock_link_learners_task):
         """
@@ -1777,10 +1904,51 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
             assert action.learner_external_key is None
             assert action.metadata['learner_external_key'] is None
 
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
+    def test_assign_virtual_unassigned_licenses(self, mock_send_assignment_email_task, mock_link_learners_task):
+        """
+        Verify the assign endpoint creates license records out of the virtual pool of unassigned licenses,
+        using any existing unassigned license records first.
+        """
+        self._create_available_licenses(num_licenses=1)
+        self._use_virtual_unassigned_licenses(5)
+        user_emails = ['bb8@mit.edu', 'r2d2@mit.edu', self.test_email]
+
+        response = self.api_client.post(self.assign_url, {'user_emails': user_emails})
+
+        assert response.status_code == status.HTTP_200_OK
+        self._assert_licenses_assigned(user_emails)
+        self.subscription_plan.refresh_from_db()
+        assert self.subscription_plan.num_virtual_unassigned_licenses == 3
+        assert not self.subscription_plan.unassigned_licenses.exists()
+        assert self.subscription_plan.num_licenses == 6
+        mock_send_assignment_email_task.assert_called()
+        mock_link_learners_task.assert_called()
+
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
+    def test_assign_insufficient_virtual_unassigned_licenses(
+        self, mock_send_assignment_email_task, mock_link_learners_task,
+    ):
+        """
+        Verify the assign endpoint returns a 400 if the virtual pool does not hold enough unassigned licenses.
+        """
+        self._use_virtual_unassigned_licenses(1)
+
+        response = self.api_client.post(self.assign_url, {'user_emails': ['bb8@mit.edu', self.test_email]})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        self.subscription_plan.refresh_from_db()
+        assert self.subscription_plan.num_virtual_unassigned_licenses == 1
+        assert not self.subscription_plan.licenses.exists()
+        mock_send_assignment_email_task.assert_not_called()
+        mock_link_learners_task.assert_not_called()
+
     @mock.patch('license_manager.apps.api.v1.views.logger.exception')
     @mock.patch('license_manager.apps.api.v1.views.LicenseAction.objects.bulk_create')
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_audit_failure_does_not_fail_assignment(
         self,
         mock_send_assignment_email_task,
@@ -1804,8 +1972,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         self.assertTrue(mock_link_learners_task.called)
         mock_log_exception.assert_called_once()
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     @mock.patch('license_manager.apps.api.utils.set_datadog_tags')
     @ddt.data(True, False)
     def test_assign_set_custom_tags(
@@ -1832,8 +2000,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         mock_set_tags_util.assert_called_with(tags_dict)
         assert response.status_code == status.HTTP_200_OK
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     @ddt.data(True, False)
     def test_assign_with_salesforce_ids(self, use_superuser, *arge, **kwargs):  # pylint: disable=unused-argument
         """
@@ -1905,8 +2073,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         assert response.json() == {'user_sfids': ['No Salesforce Ids provided.']}
         assert SubscriptionLicenseSource.objects.count() == 0
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     @ddt.data(True, False)
     def test_assign_is_locked(self, use_superuser, mock_send_assignment_email_task, mock_link_learners_task):
         """
@@ -1935,8 +2103,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         self.assertFalse(mock_send_assignment_email_task.called)
         self.assertFalse(mock_link_learners_task.called)
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     @mock.patch('license_manager.apps.api.v1.views.License.bulk_update')
     def test_assign_is_atomic(self, mock_bulk_update, mock_send_assignment_email_task, mock_link_learners_task):
         """
@@ -1965,8 +2133,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         for _license in self.subscription_plan.licenses.all():
             self.assertEqual(constants.UNASSIGNED, _license.status)
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_dedupe_input(self, mock_send_assignment_email_task, mock_link_learners_task):
         """
         Verify the assign endpoint deduplicates submitted emails.
@@ -1989,8 +2157,8 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
             self.subscription_plan.customer_agreement.enterprise_customer_uuid
         )
 
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_dedupe_casing_input(self, mock_send_assignment_email_task, mock_link_learners_task):
         """
         Verify the assign endpoint deduplicates submitted emails with different casing.
@@ -2013,6 +2181,50 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
             self.subscription_plan.customer_agreement.enterprise_customer_uuid
         )
 
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
+    def test_assign_normalizes_emails(self, mock_send_assignment_email_task, mock_link_learners_task):
+        """
+        Verify the assign endpoint strips and lowercases the submitted emails before trimming the emails
+        already associated with a license, and reports the time spent in each phase.
+        """
+        self._create_available_licenses()
+        assigned_license = LicenseFactory.create(user_email=self.test_email, status=constants.ASSIGNED)
+        self.subscription_plan.licenses.add(assigned_license)
+        user_emails = [f'  {self.test_email.upper()} ', ' Unassigned@Example.com']
+        with mock.patch('license_manager.apps.api.v1.views.constants.ASSIGNMENT_EMAIL_QUERY_CHUNK_SIZE', 1):
+            response = self.api_client.post(
+                self.assign_url,
+                {'greeting': self.greeting, 'closing': self.closing, 'user_emails': user_emails},
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['num_successful_assignments'] == 1
+        assert response.data['num_already_associated'] == 1
+        self._assert_licenses_assigned(['unassigned@example.com'])
+        mock_send_assignment_email_task.assert_called_with(
+            {'greeting': self.greeting, 'closing': self.closing},
+            ['unassigned@example.com'],
+            str(self.subscription_plan.uuid),
+        )
+        mock_link_learners_task.assert_called_with(
+            ['unassigned@example.com'],
+            self.subscription_plan.customer_agreement.enterprise_customer_uuid
+        )
+
+        timed_phases = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        assert timed_phases == ['validate', 'trim', 'assign', 'license_actions', 'enqueue']
+
+    def test_assign_invalid_email_errors_are_indexed(self):
+        """
+        Verify the assign endpoint reports each invalid email by its position in the submitted list.
+        """
+        response = self.api_client.post(
+            self.assign_url,
+            {'user_emails': ['valid@example.com', 'not-an-email', 'valid@example.com', 'not-an-email']},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.json()['user_emails']) == {'1', '3'}
+
     @ddt.data(
         (True, False, True),
         (True, True, False),
@@ -2020,9 +2232,9 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         (False, True, False),
     )
     @ddt.unpack
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.create_braze_aliases_task.si')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.create_braze_aliases_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_notify_users(
         self,
         notify_users,
@@ -2292,6 +2504,37 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         actual_response = response.data
         assert expected_response == actual_response
 
+    @ddt.data(
+        (None, [
+            {'status': constants.UNASSIGNED, 'count': 6},
+            {'status': constants.ASSIGNED, 'count': 3},
+        ]),
+        ('unassigned,assigned', [
+            {'status': constants.UNASSIGNED, 'count': 6},
+            {'status': constants.ASSIGNED, 'count': 3},
+        ]),
+        ('assigned', [
+            {'status': constants.ASSIGNED, 'count': 3},
+        ]),
+    )
+    @ddt.unpack
+    def test_license_overview_virtual_unassigned_licenses(self, status_filter, expected_response):
+        """
+        Verify that the overview endpoint counts virtual unassigned licenses as unassigned licenses.
+        """
+        unassigned_licenses = LicenseFactory.create_batch(1, status=constants.UNASSIGNED)
+        pending_licenses = LicenseFactory.create_batch(3, status=constants.ASSIGNED)
+        self.subscription_plan.licenses.set(unassigned_licenses + pending_licenses)
+        self._use_virtual_unassigned_licenses(5)
+
+        api_url = self.license_overview_url
+        if status_filter:
+            api_url += f'?status={status_filter}'
+
+        response = self.api_client.get(api_url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == expected_response
+
     @staticmethod
     def _get_csv_data_rows(response):
         """
@@ -2357,6 +2600,169 @@ class LicenseViewSetActionTests(LicenseViewSetActionMixin, TestCase):
         ).count()
         assert num_allocated_licenses == len(rows) - 1
 
+    def test_csv_action_virtual_unassigned_licenses(self):
+        """
+        Tests that the CSV action includes a row for each virtual unassigned license
+        when unassigned licenses are requested, and none otherwise.
+        """
+        assigned_license = LicenseFactory.create(status=constants.ASSIGNED)
+        unassigned_license = LicenseFactory.create(status=constants.UNASSIGNED)
+        self.subscription_plan.licenses.set([assigned_license, unassigned_license])
+        self._use_virtual_unassigned_licenses(2)
+
+        response = self.api_client.get(self.licenses_csv_url)
+        assert len(self._get_csv_data_rows(response)) == 2
+
+        response = self.api_client.get(self.licenses_csv_url + f'?status={constants.UNASSIGNED}')
+        rows = self._get_csv_data_rows(response)
+        status_index = rows[0].split(',').index('status')
+        assert [row.split(',')[status_index] for row in rows[1:]] == [constants.UNASSIGNED] * 3
+
+
+@mock.patch('license_manager.apps.api.models.current_app.send_task')
+class LicenseAssignmentJobViewTests(LicenseViewSetActionMixin, TestCase):
+    """
+    Tests for the license assignment job actions on the LicenseViewSet.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.assignment_jobs_url = reverse(
+            'api:v1:licenses-assignment-jobs',
+            kwargs={'subscription_uuid': cls.subscription_plan.uuid},
+        )
+
+    def _upload_csv(self, content, **data):
+        csv_file = SimpleUploadedFile('emails.csv', content.encode(), content_type='text/csv')
+        return self.api_client.post(self.assignment_jobs_url, {'file': csv_file, **data}, format='multipart')
+
+    def _get_assignment_job_url(self, license_assignment_job, viewname='api:v1:licenses-assignment-job'):
+        return reverse(viewname, kwargs={
+            'subscription_uuid': self.subscription_plan.uuid,
+            'job_uuid': license_assignment_job.uuid,
+        })
+
+    def test_create_assignment_job(self, mock_send_task):
+        """
+        Verify that a job is created for the deduplicated, lowercased emails of the CSV, and enqueued.
+        """
+        response = self._upload_csv(
+            'email,sfid\nAlice@example.com,0000000000000000AA\nbob@example.com\n\nalice@example.com\n',
+            notify_users=False,
+            greeting=self.greeting,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        license_assignment_job = LicenseAssignmentJob.objects.get(uuid=response.json()['uuid'])
+        assert license_assignment_job.subscription_plan == self.subscription_plan
+        assert license_assignment_job.actor_lms_user_id == self.user.id
+        assert not license_assignment_job.notify_users
+        assert license_assignment_job.custom_template_text == {'greeting': self.greeting, 'closing': ''}
+        assert list(license_assignment_job.emails.order_by('id').values_list('user_email', 'user_sfid')) == [
+            ('alice@example.com', '0000000000000000AA'),
+            ('bob@example.com', None),
+        ]
+        assert response.json()['status'] == constants.LicenseAssignmentJobStatus.PENDING
+        assert response.json()['progress']['pending'] == 2
+        mock_send_task.assert_called_once()
+
+    def test_create_assignment_job_no_emails(self, mock_send_task):
+        """
+        Verify that a CSV without any email is rejected.
+        """
+        response = self._upload_csv('email\n')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        mock_send_task.assert_not_called()
+
+    @override_settings(LICENSE_ASSIGNMENT_JOB_MAX_EMAILS=1)
+    def test_create_assignment_job_too_many_emails(self, mock_send_task):
+        """
+        Verify that a CSV with more than ``LICENSE_ASSIGNMENT_JOB_MAX_EMAILS`` emails is rejected.
+        """
+        response = self._upload_csv('alice@example.com\nbob@example.com\n')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        mock_send_task.assert_not_called()
+
+    def test_create_assignment_job_non_admin_user(self, mock_send_task):
+        """
+        Verify that users without the admin role can't create jobs.
+        """
+        self._test_and_assert_forbidden_user(self.assignment_jobs_url, False, mock_send_task)
+
+    def test_get_assignment_job(self, _):
+        """
+        Verify that a job is returned with the progress of its emails.
+        """
+        license_assignment_job = LicenseAssignmentJob.create_license_assignment_job(
+            self.user.id, self.subscription_plan, {'alice@example.com': None, 'not-an-email': None},
+        )
+
+        response = self.api_client.get(self._get_assignment_job_url(license_assignment_job))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['progress'] == {
+            'pending': 1, 'assigned': 0, 'already_associated': 0, 'failed': 1, 'total': 2,
+        }
+        assert response.json()['download_url'] is None
+
+    def test_get_assignment_job_of_other_plan_404(self, _):
+        """
+        Verify that the jobs of other plans aren't found.
+        """
+        license_assignment_job = LicenseAssignmentJob.create_license_assignment_job(
+            self.user.id, SubscriptionPlanFactory(), {'alice@example.com': None},
+        )
+
+        response = self.api_client.get(self._get_assignment_job_url(license_assignment_job))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_resume_assignment_job(self, mock_send_task):
+        """
+        Verify that a failed job is enqueued again.
+        """
+        license_assignment_job = LicenseAssignmentJob.create_license_assignment_job(
+            self.user.id, self.subscription_plan, {'alice@example.com': None},
+        )
+        LicenseAssignmentJob.objects.filter(uuid=license_assignment_job.uuid).update(
+            status=constants.LicenseAssignmentJobStatus.FAILED,
+        )
+        mock_send_task.reset_mock()
+
+        response = self.api_client.post(
+            self._get_assignment_job_url(license_assignment_job, viewname='api:v1:licenses-resume-assignment-job'),
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()['status'] == constants.LicenseAssignmentJobStatus.PENDING
+        mock_send_task.assert_called_once()
+
+    def test_resume_processing_assignment_job(self, _):
+        """
+        Verify that a processing job can only be resumed once it stopped making progress.
+        """
+        license_assignment_job = LicenseAssignmentJob.create_license_assignment_job(
+            self.user.id, self.subscription_plan, {'alice@example.com': None},
+        )
+        LicenseAssignmentJob.objects.filter(uuid=license_assignment_job.uuid).update(
+            status=constants.LicenseAssignmentJobStatus.PROCESSING,
+        )
+        resume_url = self._get_assignment_job_url(
+            license_assignment_job, viewname='api:v1:licenses-resume-assignment-job',
+        )
+
+        response = self.api_client.post(resume_url)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        # A job that stopped making progress can be resumed
+        LicenseAssignmentJob.objects.filter(uuid=license_assignment_job.uuid).update(
+            modified=localized_utcnow() - LicenseAssignmentJob.PROCESSING_STALLED_AFTER * 2,
+        )
+        response = self.api_client.post(resume_url)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
 
 @ddt.ddt
 class LicenseViewSetRevokeActionTests(LicenseViewSetActionMixin, TestCase):
@@ -2550,6 +2956,36 @@ class LicenseViewSetRevokeActionTests(LicenseViewSetActionMixin, TestCase):
 
         assert mock_execute_post_revocation_tasks.call_count == len(expected_revoked_emails)
 
+    @ddt.data(
+        ('AL', ['alice@example.com']),
+        ('example', []),
+    )
+    @ddt.unpack
+    @override_settings(LICENSE_EMAIL_SEARCH_MODE='prefix')
+    @mock.patch('license_manager.apps.api.v1.views.execute_post_revocation_tasks')
+    @mock.patch('license_manager.apps.api.v1.views.revoke_license')
+    def test_bulk_revoke_with_prefix_email_filter(
+            self, email_filter, expected_revoked_emails, mock_revoke_license, mock_execute_post_revocation_tasks
+    ):
+        """
+        Test that in the prefix search mode, the email filter of bulk_revoke matches the start of emails.
+        """
+        self._setup_request_jwt(user=self.user)
+        alice_license = LicenseFactory.create(user_email='alice@example.com', status=constants.ACTIVATED)
+        bob_license = LicenseFactory.create(user_email='bob@example.com', status=constants.ASSIGNED)
+        self.subscription_plan.licenses.set([alice_license, bob_license])
+
+        request_payload = {
+            'filters': [{'name': 'user_email', 'filter_value': email_filter}],
+        }
+
+        response = self.api_client.post(self.bulk_revoke_license_url, request_payload)
+        assert response.status_code == status.HTTP_200_OK
+
+        revoked_emails = [call_arg[0][0].user_email for call_arg in mock_revoke_license.call_args_list]
+        assert sorted(revoked_emails) == expected_revoked_emails
+        assert mock_execute_post_revocation_tasks.call_count == len(expected_revoked_emails)
+
     @mock.patch('license_manager.apps.api.v1.views.revoke_license')
     def test_bulk_revoke_no_valid_subscription_plan(self, mock_revoke_license):
         """
@@ -2769,10 +3205,10 @@ class LicenseViewSetRevokeActionTests(LicenseViewSetActionMixin, TestCase):
         {'is_revocation_cap_enabled': False},
     )
     @ddt.unpack
-    @mock.patch('license_manager.apps.api.v1.views.link_learners_to_enterprise_task.si')
+    @mock.patch('license_manager.apps.api.tasks.link_learners_to_enterprise_task.si')
     @mock.patch('license_manager.apps.api.tasks.revoke_course_enrollments_for_user_task.delay')
     @mock.patch('license_manager.apps.api.tasks.send_revocation_cap_notification_email_task.delay')
-    @mock.patch('license_manager.apps.api.v1.views.send_assignment_email_task.si')
+    @mock.patch('license_manager.apps.api.tasks.send_assignment_email_task.si')
     def test_assign_after_license_revoke_end_to_end(
         self,
         mock_send_assignment_email_task,
@@ -2988,6 +3424,14 @@ class LearnerLicensesViewsetTests(LicenseViewTestMixin, TestCase):
         url = self.base_url + '?' + query_params.urlencode()
         return self.api_client.get(url)
 
+    def _set_learner_entitlement_reads_enabled(self, enabled):
+        """
+        Helper to read licenses from the learner entitlement table, or not, for the rest of the test.
+        """
+        settings_override = override_settings(LEARNER_ENTITLEMENT_READS_ENABLED=enabled)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
     def test_endpoint_permissions_missing_role(self):
         """
         Verify the endpoint returns a 403 for users without the learner or admin role.
@@ -3097,7 +3541,8 @@ class LearnerLicensesViewsetTests(LicenseViewTestMixin, TestCase):
         ]
         assert customer_agreement_response['available_subscription_catalogs'] == expected_available_catalog_uuids
 
-    def test_endpoint_results_correctly_ordered(self):
+    @ddt.data(False, True)
+    def test_endpoint_results_correctly_ordered(self, entitlement_reads_enabled):
         """
         Test the ordering of responses from the endpoint matches the following:
             ORDER BY License.status ASC, License.SubscriptionPlan.expiration_date DESC
@@ -3108,6 +3553,7 @@ class LearnerLicensesViewsetTests(LicenseViewTestMixin, TestCase):
          - Assigned, expires in future
          - Assigned, expires before ^
         """
+        self._set_learner_entitlement_reads_enabled(entitlement_reads_enabled)
         self._assign_learner_roles()
 
         # Using SubscriptionPlan from LicenseViewTestMixin for first License
@@ -3173,7 +3619,9 @@ class LearnerLicensesViewsetTests(LicenseViewTestMixin, TestCase):
             assert actual['customer_agreement']['uuid'] == str(agreement.uuid)
             assert actual['subscription_plan']['uuid'] == str(plan.uuid)
 
-    def test_endpoint_respects_active_only_query_parameter(self):
+    @ddt.data(False, True)
+    def test_endpoint_respects_active_only_query_parameter(self, entitlement_reads_enabled):
+        self._set_learner_entitlement_reads_enabled(entitlement_reads_enabled)
         self._assign_learner_roles()
 
         # The license in this subscription should be listed first in the
@@ -3231,7 +3679,9 @@ class LearnerLicensesViewsetTests(LicenseViewTestMixin, TestCase):
         ]
         self.assertEqual(actual_license_uuids, expected_license_uuids)
 
-    def test_endpoint_respects_current_only_query_parameter(self):
+    @ddt.data(False, True)
+    def test_endpoint_respects_current_only_query_parameter(self, entitlement_reads_enabled):
+        self._set_learner_entitlement_reads_enabled(entitlement_reads_enabled)
         self._assign_learner_roles()
 
         # The license in this subscription should be listed first in the
@@ -3354,7 +3804,16 @@ class LearnerLicensesViewsetTests(LicenseViewTestMixin, TestCase):
         )
 
         # We should get still get the license
-        response = self._get_url_with_customer_uuid(self.enterprise_customer_uuid)
+        cache.clear()
+        with mock.patch(
+            'license_manager.apps.api.v1.views.update_user_email_for_licenses_task.delay',
+            side_effect=update_user_email_for_licenses_task,
+        ) as mock_update_email_delay:
+            response = self._get_url_with_customer_uuid(self.enterprise_customer_uuid)
+
+            # The sync is only enqueued once for the same change
+            self._get_url_with_customer_uuid(self.enterprise_customer_uuid)
+            mock_update_email_delay.assert_called_once_with(self.user.id, new_email)
 
         expected_license_uuids = [
             str(current_sub_license.uuid),
@@ -3369,6 +3828,45 @@ class LearnerLicensesViewsetTests(LicenseViewTestMixin, TestCase):
         self.assertEqual(results[0]['user_email'], new_email)
         self.assertEqual(current_sub_license.user_email, new_email)
 
+    def test_user_mixed_case_email(self):
+        """
+        Test that licenses holding the lowercased email of the user, as the user email changes API stores it,
+        aren't synced again when the user's JWT has the email in mixed case.
+        """
+        active_sub = SubscriptionPlanFactory.create(
+            customer_agreement=self.customer_agreement,
+            enterprise_catalog_uuid=self.enterprise_catalog_uuid,
+            expiration_date=self.now + datetime.timedelta(weeks=20),
+            is_active=True,
+        )
+        self.user.email = 'Mixed.Case@testing.edx.org'
+        current_sub_license = LicenseFactory(
+            lms_user_id=self.user.id,
+            user_email=self.user.email.lower(),
+            subscription_plan=active_sub,
+        )
+
+        _assign_role_via_jwt_or_db(
+            self.api_client,
+            self.user,
+            self.enterprise_customer_uuid,
+            assign_via_jwt=True,
+            system_role=constants.SYSTEM_ENTERPRISE_LEARNER_ROLE,
+            subscriptions_role=constants.SUBSCRIPTIONS_LEARNER_ROLE
+        )
+
+        cache.clear()
+        with mock.patch(
+            'license_manager.apps.api.v1.views.update_user_email_for_licenses_task.delay',
+        ) as mock_update_email_delay:
+            response = self._get_url_with_customer_uuid(self.enterprise_customer_uuid)
+            mock_update_email_delay.assert_not_called()
+
+        results = response.json()['results']  # pylint: disable=no-member
+        self.assertEqual(results[0]['user_email'], 'mixed.case@testing.edx.org')
+        current_sub_license.refresh_from_db()
+        self.assertEqual(current_sub_license.user_email, 'mixed.case@testing.edx.org')
+
 
 class EnterpriseEnrollmentWithLicenseSubsidyViewTests(LicenseViewTestMixin, TestCase):
     """
@@ -3852,6 +4350,192 @@ class LicenseSubsidyViewTests(LicenseViewTestMixin, TestCase):
             self.activated_license.uuid,
         )
 
+    @ddt.data(False, True)
+    @mock.patch('license_manager.apps.api.v1.views.utils.get_decoded_jwt')
+    @mock.patch('license_manager.apps.api.v1.views.get_subsidy_checksum', return_value='some-hash', autospec=True)
+    def test_get_subsidy_checks_every_catalog(
+        self, entitlement_reads_enabled, mock_get_subsidy_checksum, mock_get_decoded_jwt,
+    ):
+        """
+        Verify the catalogs of all of the user's plans are checked, and that the license of the plan expiring
+        furthest in the future whose catalog contains the course is returned, whether the licenses are read
+        from the learner entitlement table or not.
+        """
+        self._assign_learner_roles()
+        mock_get_decoded_jwt.return_value = self._decoded_jwt
+        later_plan = SubscriptionPlanFactory.create(
+            customer_agreement=self.active_subscription_for_customer.customer_agreement,
+            start_date=self.active_subscription_for_customer.start_date,
+            expiration_date=self.active_subscription_for_customer.expiration_date + datetime.timedelta(days=30),
+        )
+        LicenseFactory.create(status=constants.ACTIVATED, lms_user_id=self.lms_user_id, subscription_plan=later_plan)
+
+        with mock.patch.object(
+            SubscriptionPlan,
+            'contains_content',
+            autospec=True,
+            side_effect=lambda plan, content_ids: plan == self.active_subscription_for_customer,
+        ) as mock_contains_content:
+            with override_settings(LEARNER_ENTITLEMENT_READS_ENABLED=entitlement_reads_enabled):
+                response = self.api_client.get(self._get_url_with_params())
+
+        self._assert_correct_subsidy_response(response, mock_get_subsidy_checksum.return_value)
+        assert {call.args[0] for call in mock_contains_content.call_args_list} == {
+            self.active_subscription_for_customer,
+            later_plan,
+        }
+
+
+@ddt.ddt
+class CustomerLicenseOverviewViewTests(LicenseViewTestMixin, TestCase):
+    """
+    Tests for the CustomerLicenseOverviewView.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.active_plan = cls.active_subscription_for_customer
+        LicenseFactory.create_batch(3, status=constants.UNASSIGNED, subscription_plan=cls.active_plan)
+        LicenseFactory.create_batch(2, status=constants.ACTIVATED, subscription_plan=cls.active_plan)
+
+        cls.inactive_plan = SubscriptionPlanFactory.create(
+            customer_agreement=cls.customer_agreement,
+            is_active=False,
+            start_date=localized_datetime(2020, 1, 1),
+            expiration_date=localized_datetime(2021, 1, 1),
+            num_virtual_unassigned_licenses=4,
+        )
+        LicenseFactory.create(status=constants.REVOKED, subscription_plan=cls.inactive_plan)
+
+        # Another customer's licenses
+        LicenseFactory.create_batch(2, status=constants.ACTIVATED)
+
+    def _get_overview(self, **query_params):
+        query_dict = QueryDict(mutable=True)
+        query_dict['enterprise_customer_uuid'] = self.enterprise_customer_uuid
+        query_dict.update(query_params)
+        url = reverse('api:v1:customer-license-overview') + '?' + query_dict.urlencode()
+        return self.api_client.get(url)
+
+    def _assign_admin_roles(self):
+        _assign_role_via_jwt_or_db(self.api_client, self.user, self.enterprise_customer_uuid, assign_via_jwt=True)
+
+    def test_overview_requires_admin_role(self):
+        self._assign_learner_roles()
+        response = self._get_overview()
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_overview(self):
+        self._assign_admin_roles()
+        with self.assertNumQueries(3):
+            response = self._get_overview(include_inactive='true')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['licenses'] == {
+            constants.ACTIVATED: 2,
+            constants.ASSIGNED: 0,
+            constants.UNASSIGNED: 7,
+            constants.REVOKED: 1,
+        }
+        assert [plan['uuid'] for plan in response.data['subscriptions']] == [
+            str(self.active_plan.uuid),
+            str(self.inactive_plan.uuid),
+        ]
+        assert response.data['subscriptions'][1]['licenses'] == {
+            constants.ACTIVATED: 0,
+            constants.ASSIGNED: 0,
+            constants.UNASSIGNED: 4,
+            constants.REVOKED: 1,
+        }
+
+    @ddt.data(
+        ({}, ['active']),
+        ({'include_inactive': 'true', 'end_date': '2020-06-01'}, ['inactive']),
+        ({'include_inactive': 'true', 'start_date': '2021-01-02'}, ['active']),
+        ({'include_inactive': 'true', 'start_date': '2020-06-01', 'end_date': '2020-07-01'}, ['inactive']),
+    )
+    @ddt.unpack
+    def test_overview_filters_plans(self, query_params, expected_plans):
+        self._assign_admin_roles()
+        response = self._get_overview(**query_params)
+
+        assert response.status_code == status.HTTP_200_OK
+        plans = {'active': self.active_plan, 'inactive': self.inactive_plan}
+        assert [plan['uuid'] for plan in response.data['subscriptions']] == [
+            str(plans[plan_name].uuid) for plan_name in expected_plans
+        ]
+
+    def test_overview_invalid_date_range(self):
+        self._assign_admin_roles()
+        response = self._get_overview(start_date='2021-01-01', end_date='2020-01-01')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@override_settings(LICENSE_CHANGE_FEED_SETTLE_SECONDS=0, LICENSE_CHANGE_FEED_SERVICE_WORKER_USERNAMES=['feed_worker'])
+class LicenseChangeFeedViewTests(LicenseViewTestMixin, TestCase):
+    """
+    Tests for the LicenseChangeFeedView.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.customer_license = LicenseFactory.create(
+            status=constants.ACTIVATED,
+            subscription_plan=cls.active_subscription_for_customer,
+        )
+        cls.other_customer_license = LicenseFactory.create(status=constants.ACTIVATED)
+
+    def _get_changes(self, **query_params):
+        return self.api_client.get(reverse('api:v1:license-changes'), query_params)
+
+    def _assign_admin_roles(self):
+        _assign_role_via_jwt_or_db(self.api_client, self.user, self.enterprise_customer_uuid, assign_via_jwt=True)
+
+    def test_changes_requires_admin_role(self):
+        self._assign_learner_roles()
+        response = self._get_changes(enterprise_customer_uuid=self.enterprise_customer_uuid)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_changes_of_all_customers_requires_service_user(self):
+        self._assign_admin_roles()
+        response = self._get_changes()
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_changes_for_admin(self):
+        self._assign_admin_roles()
+        response = self._get_changes(enterprise_customer_uuid=self.enterprise_customer_uuid)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [change['uuid'] for change in response.data['results']] == [self.customer_license.uuid]
+        assert response.data['results'][0]['status'] == constants.ACTIVATED
+        assert not response.data['has_more']
+
+        # Polling from the cursor of the last page lists nothing until there are new changes.
+        response = self._get_changes(
+            enterprise_customer_uuid=self.enterprise_customer_uuid,
+            cursor=response.data['next_cursor'],
+        )
+        assert response.data['results'] == []
+        assert response.data['next_cursor']
+
+    def test_changes_for_service_user(self):
+        self.api_client.force_authenticate(user=UserFactory(username='feed_worker'))
+        response = self._get_changes(page_size=1)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 1
+        assert response.data['has_more']
+
+        response = self._get_changes(page_size=1, cursor=response.data['next_cursor'])
+        assert len(response.data['results']) == 1
+        assert not response.data['has_more']
+
+    def test_changes_invalid_query_params(self):
+        self.api_client.force_authenticate(user=UserFactory(username='feed_worker'))
+        assert self._get_changes(cursor='not-a-cursor').status_code == status.HTTP_400_BAD_REQUEST
+        assert self._get_changes(page_size=0).status_code == status.HTTP_400_BAD_REQUEST
+        assert self._get_changes(enterprise_customer_uuid='not-a-uuid').status_code == status.HTTP_400_BAD_REQUEST
+
 
 @ddt.ddt
 class UserRetirementViewTests(TestCase):
@@ -4019,6 +4703,127 @@ class UserRetirementViewTests(TestCase):
             with self.assertRaises(SubscriptionLicenseSource.DoesNotExist):
                 _license.source  # pylint: disable=pointless-statement
 
+    def test_retirement_of_license_assignment_job_emails(self):
+        """
+        The emails of license assignment jobs for the user being retired should be scrubbed,
+        including the ones that aren't linked to any license of the user.
+        """
+        license_assignment_job = LicenseAssignmentJob.objects.create(
+            subscription_plan=self.assigned_license.subscription_plan,
+            actor_lms_user_id=2,
+        )
+        linked_job_email = LicenseAssignmentJobEmail.objects.create(
+            license_assignment_job=license_assignment_job,
+            user_email=self.user_email.lower(),
+            user_sfid='00k000000000000000',
+            license=self.assigned_license,
+        )
+        failed_job_email = LicenseAssignmentJobEmail.objects.create(
+            license_assignment_job=license_assignment_job,
+            user_email=self.user_email.lower(),
+            user_sfid='00k000000000000000',
+            status=constants.LicenseAssignmentJobEmailStatus.FAILED,
+        )
+        account_job_email = LicenseAssignmentJobEmail.objects.create(
+            license_assignment_job=license_assignment_job,
+            user_email=self.user_to_retire.email.lower(),
+            status=constants.LicenseAssignmentJobEmailStatus.FAILED,
+        )
+        other_job_email = LicenseAssignmentJobEmail.objects.create(
+            license_assignment_job=license_assignment_job,
+            user_email='alice@example.com',
+        )
+
+        response = self._post_request(self.lms_user_id, self.original_username)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        for job_email in (linked_job_email, failed_job_email, account_job_email):
+            job_email.refresh_from_db()
+            assert job_email.user_email is None
+            assert job_email.user_sfid is None
+        other_job_email.refresh_from_db()
+        assert other_job_email.user_email == 'alice@example.com'
+
+    def test_retirement_of_archived_licenses(self):
+        """
+        Archived licenses associated with the user being retired should be restored and have their pii scrubbed.
+        """
+        archive_licenses(License.objects.filter(uuid=self.activated_license.uuid))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post_request(self.lms_user_id, self.original_username)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        assert not ArchivedLicense.objects.exists()
+        self.activated_license.refresh_from_db()
+        assert_pii_cleared(self.activated_license)
+        assert_historical_pii_cleared(self.activated_license)
+        assert_license_fields_cleared(self.activated_license)
+
+
+@ddt.ddt
+class UserEmailChangesViewTests(TestCase):
+    """
+    Tests for the user email changes view.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.api_client = APIClient()
+        self.sync_user = UserFactory(username=settings.USER_EMAIL_SYNC_SERVICE_WORKER_USERNAME)
+        self.api_client.force_authenticate(user=self.sync_user)
+        self.url = reverse('api:v1:user-email-changes')
+
+    def _post_request(self, email_changes):
+        return self.api_client.post(self.url, {'email_changes': email_changes}, format='json')
+
+    def test_email_changes_missing_permission(self):
+        """
+        Requests from non-superusers that aren't the email sync worker should result in a 403.
+        """
+        self.api_client.force_authenticate(user=UserFactory())
+        response = self._post_request([{'lms_user_id': 1, 'new_email': 'new@example.com'}])
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    @ddt.data(
+        [],
+        [{'lms_user_id': 1}],
+        [{'lms_user_id': 1, 'new_email': 'not-an-email'}],
+    )
+    def test_email_changes_invalid(self, email_changes):
+        """
+        Requests without a valid batch of changes should result in a 400.
+        """
+        response = self._post_request(email_changes)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_email_changes(self):
+        """
+        The licenses of each user should be updated to the last new email of the user in the batch, with history,
+        and licenses that already have the new email should be left alone.
+        """
+        alice_licenses = LicenseFactory.create_batch(2, lms_user_id=1, user_email='alice@example.com')
+        bob_license = LicenseFactory(lms_user_id=2, user_email='bob-new@example.com')
+        other_license = LicenseFactory(lms_user_id=3, user_email='carol@example.com')
+
+        with mock.patch('license_manager.apps.subscriptions.api.USER_EMAIL_SYNC_CHUNK_SIZE', 1):
+            response = self._post_request([
+                {'lms_user_id': 1, 'new_email': 'alice-old@example.com'},
+                {'lms_user_id': 1, 'new_email': 'Alice-New@example.com'},
+                {'lms_user_id': 2, 'new_email': 'bob-new@example.com'},
+            ])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'num_users': 2, 'num_licenses_updated': 2}
+        for alice_license in alice_licenses:
+            alice_license.refresh_from_db()
+            assert alice_license.user_email == 'alice-new@example.com'
+            assert alice_license.history.first().user_email == 'alice-new@example.com'
+        assert bob_license.history.count() == 1
+        other_license.refresh_from_db()
+        assert other_license.user_email == 'carol@example.com'
+
 
 class StaffLicenseLookupViewTests(LicenseViewTestMixin, TestCase):
     """
@@ -4134,6 +4939,40 @@ class StaffLicenseLookupViewTests(LicenseViewTestMixin, TestCase):
             },
         ], response.json())  # pylint: disable=no-member
 
+    def test_lookup_reads_through_archive(self):
+        """
+        Requests from admin users should return the archived licenses for the given email too.
+        """
+        self.api_client.force_authenticate(user=self.admin_user)
+        self._create_license(status=constants.ACTIVATED)
+        archived_license = self._create_license(
+            subscription_plan=self.other_subscription,
+            status=constants.REVOKED,
+            revoked_date=localized_utcnow() - datetime.timedelta(days=105),
+        )
+        archive_licenses(License.objects.filter(uuid=archived_license.uuid))
+
+        response = self._post_request(self.user.email)
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(
+            (result['status'], result['subscription_plan_title']) for result in response.json()
+        ) == [
+            (constants.ACTIVATED, self.active_subscription_for_customer.title),
+            (constants.REVOKED, self.other_subscription.title),
+        ]
+        assert response.json()[1]['activation_link'] == archived_license.activation_link
+
+    def test_lookup_only_archived_licenses(self):
+        """
+        Requests from admin users shouldn't 404 if the only licenses for the given email are archived.
+        """
+        self.api_client.force_authenticate(user=self.admin_user)
+        archive_licenses(License.objects.filter(uuid=self._create_license().uuid))
+
+        response = self._post_request(self.user.email)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 1
+
 
 class AdminLicenseLookupViewSetTestCase(LicenseViewTestMixin, TestCase):
     """
@@ -4207,3 +5046,150 @@ class AdminLicenseLookupViewSetTestCase(LicenseViewTestMixin, TestCase):
         self.assertIn("results", response.data)
         self.assertEqual(response.data["count"], 0)
         self.assertEqual(response.data["results"], [])
+
+    def test_lookup_reads_through_archive(self):
+        """
+        Test that the archived licenses of the learner are returned along with their other licenses.
+        """
+        self._create_license()
+        archived_license = self._create_license(subscription_plan=self.other_subscription)
+        archive_licenses(License.objects.filter(uuid=archived_license.uuid))
+        url = reverse('api:v1:admin-license-view')
+        self.api_client.force_authenticate(user=self.admin_user)
+        response = self.api_client.get(url, {
+            "user_email": self.user.email,
+            "enterprise_customer_uuid": self.enterprise_customer_uuid})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertIn(str(archived_license.uuid), [result["uuid"] for result in response.data["results"]])
+
+
+@ddt.ddt
+class LicenseActionViewSetTests(TestCase):
+    """
+    Tests for the LicenseActionViewSet.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = UserFactory()
+        cls.customer_agreement = CustomerAgreementFactory()
+        cls.enterprise_customer_uuid = cls.customer_agreement.enterprise_customer_uuid
+        cls.subscription_plan = SubscriptionPlanFactory(customer_agreement=cls.customer_agreement)
+        cls.other_subscription_plan = SubscriptionPlanFactory(customer_agreement=cls.customer_agreement)
+        cls.license = LicenseFactory(subscription_plan=cls.subscription_plan)
+        cls.other_license = LicenseFactory(subscription_plan=cls.subscription_plan)
+        cls.other_plan_license = LicenseFactory(subscription_plan=cls.other_subscription_plan)
+
+        now = localized_utcnow()
+        cls.actions = []
+        # Oldest actions first, so that the most recent action is the last one in the list.
+        for index, subscription_license in enumerate(
+            [cls.license, cls.other_license, cls.other_plan_license, cls.license, cls.license]
+        ):
+            action = LicenseAction.objects.create(
+                license=subscription_license,
+                subscription_plan=subscription_license.subscription_plan,
+                enterprise_customer_uuid=cls.enterprise_customer_uuid,
+                action_type=constants.LicenseActionType.ASSIGNED,
+                actor_type=constants.LicenseActorType.ADMIN,
+                source=constants.LicenseActionSource.ADMIN_API,
+            )
+            LicenseAction.objects.filter(uuid=action.uuid).update(created=now - datetime.timedelta(minutes=10 - index))
+            cls.actions.append(action)
+
+    def setUp(self):
+        super().setUp()
+        self.api_client = APIClient()
+        _assign_role_via_jwt_or_db(self.api_client, self.user, self.enterprise_customer_uuid, assign_via_jwt=True)
+
+    def _list_request(self, **query_params):
+        url = reverse('api:v1:license-actions-list')
+        return self.api_client.get(url, {'enterprise_customer_uuid': self.enterprise_customer_uuid, **query_params})
+
+    def _expected_action_uuids(self, license_uuids):
+        return [str(action.uuid) for action in reversed(self.actions) if action.license_id in license_uuids]
+
+    def test_list_by_customer(self):
+        response = self._list_request()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [action['uuid'] for action in response.data['results']] == self._expected_action_uuids(
+            [self.license.uuid, self.other_license.uuid, self.other_plan_license.uuid],
+        )
+        assert response.data['results'][0]['license_uuid'] == str(self.license.uuid)
+        assert response.data['results'][0]['subscription_plan_uuid'] == str(self.subscription_plan.uuid)
+
+    def test_list_by_plan(self):
+        response = self._list_request(subscription_uuid=self.subscription_plan.uuid)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [action['uuid'] for action in response.data['results']] == self._expected_action_uuids(
+            [self.license.uuid, self.other_license.uuid],
+        )
+
+    def test_list_by_license(self):
+        response = self._list_request(license_uuid=self.license.uuid)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [action['uuid'] for action in response.data['results']] == self._expected_action_uuids(
+            [self.license.uuid],
+        )
+
+    def test_list_by_archived_license(self):
+        archive_licenses(License.objects.filter(uuid=self.license.uuid))
+
+        response = self._list_request(license_uuid=self.license.uuid)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [action['uuid'] for action in response.data['results']] == self._expected_action_uuids(
+            [self.license.uuid],
+        )
+
+    def test_list_keyset_pagination(self):
+        expected_action_uuids = self._expected_action_uuids(
+            [self.license.uuid, self.other_license.uuid, self.other_plan_license.uuid],
+        )
+
+        listed_action_uuids = []
+        response = self._list_request(page_size=2)
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            listed_action_uuids.extend(action['uuid'] for action in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.api_client.get(response.data['next'])
+
+        assert listed_action_uuids == expected_action_uuids
+
+    @ddt.data(
+        {},
+        {'enterprise_customer_uuid': 'not-a-uuid'},
+    )
+    def test_list_invalid_enterprise_customer_uuid(self, query_params):
+        url = reverse('api:v1:license-actions-list')
+        response = self.api_client.get(url, query_params)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_list_learner_403(self):
+        _assign_role_via_jwt_or_db(
+            self.api_client,
+            self.user,
+            self.enterprise_customer_uuid,
+            assign_via_jwt=True,
+            system_role=constants.SYSTEM_ENTERPRISE_LEARNER_ROLE,
+        )
+
+        response = self._list_request()
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_list_no_access_to_requested_customer(self):
+        other_customer_agreement = CustomerAgreementFactory()
+
+        response = self._list_request(enterprise_customer_uuid=other_customer_agreement.enterprise_customer_uuid)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == []
@@ -71,6 +71,11 @@ router.register(
     viewset=views.CustomerAgreementViewSet,
     basename='customer-agreement',
 )
+router.register(
+    prefix=r'license-actions',
+    viewset=views.LicenseActionViewSet,
+    basename='license-actions',
+)
 router.register(
     prefix='provisioning-admins/customer-agreement',
     viewset=views.CustomerAgreementProvisioningAdminViewset,
@@ -114,6 +119,16 @@ urlpatterns = [
         views.LicenseSubsidyView.as_view(),
         name='license-subsidy',
     ),
+    re_path(
+        r'customer-license-overview',
+        views.CustomerLicenseOverviewView.as_view(),
+        name='customer-license-overview',
+    ),
+    re_path(
+        r'license-changes',
+        views.LicenseChangeFeedView.as_view(),
+        name='license-changes',
+    ),
     re_path(
         r'license-activation',
         views.LicenseActivationView.as_view(),
@@ -124,6 +139,11 @@ urlpatterns = [
         views.UserRetirementView.as_view(),
         name='user-retirement',
     ),
+    re_path(
+        r'user-email-changes',
+        views.UserEmailChangesView.as_view(),
+        name='user-email-changes',
+    ),
     re_path(
         r'staff_lookup_licenses',
         views.StaffLicenseLookupView.as_view(),
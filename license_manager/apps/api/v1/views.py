@@ -1,30 +1,34 @@
 import logging
 from collections import OrderedDict
-from contextlib import suppress
+from functools import partial
 from typing import Literal
 from uuid import uuid4
 
-from celery import chain
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import DatabaseError, transaction
-from django.db.models import Count
+from django.db.models import Count, Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from edx_django_utils.cache import get_cache_key
 from edx_rbac.decorators import permission_required
-from edx_rbac.mixins import (
-    PermissionRequiredForListingMixin,
-    PermissionRequiredMixin,
-)
+from edx_rbac.mixins import PermissionRequiredMixin
 from edx_rest_framework_extensions.auth.jwt.authentication import (
     JwtAuthentication,
 )
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import action
-from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.exceptions import (
+    ParseError,
+    PermissionDenied,
+    ValidationError,
+)
 from rest_framework.mixins import ListModelMixin
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
@@ -32,16 +36,29 @@ from rest_framework.views import APIView
 from rest_framework_csv.renderers import CSVRenderer
 
 from license_manager.apps.api import serializers, utils
-from license_manager.apps.api.filters import LicenseFilter
-from license_manager.apps.api.mixins import UserDetailsFromJwtMixin
-from license_manager.apps.api.models import BulkEnrollmentJob
-from license_manager.apps.api.permissions import CanRetireUser
+from license_manager.apps.api.filters import (
+    LicenseEmailSearchFilter,
+    LicenseFilter,
+    search_licenses_by_email,
+)
+from license_manager.apps.api.mixins import (
+    PermissionRequiredForListingMixin,
+    UserDetailsFromJwtMixin,
+)
+from license_manager.apps.api.models import (
+    BulkEnrollmentJob,
+    LicenseAssignmentJob,
+    LicenseAssignmentJobEmail,
+)
+from license_manager.apps.api.permissions import (
+    CanReadAllLicenseChanges,
+    CanRetireUser,
+    CanSyncUserEmails,
+)
 from license_manager.apps.api.tasks import (
-    create_braze_aliases_task,
     execute_post_revocation_tasks,
-    link_learners_to_enterprise_task,
+    link_and_notify_assigned_emails_task,
     revoke_all_licenses_task,
-    send_assignment_email_task,
     send_auto_applied_license_email_task,
     send_post_activation_email_task,
     send_reminder_email_task,
@@ -49,11 +66,16 @@ from license_manager.apps.api.tasks import (
     track_license_changes_task,
     update_user_email_for_licenses_task,
 )
+from license_manager.apps.api_client.concurrency import call_concurrently
+from license_manager.apps.core.db_routers import ReplicaReadsMixin
 from license_manager.apps.subscriptions import constants, event_utils
 from license_manager.apps.subscriptions.api import (
     renew_subscription,
     revoke_license,
+    sync_user_emails,
 )
+from license_manager.apps.subscriptions.archive import restore_archived_licenses
+from license_manager.apps.subscriptions.change_feed import get_license_changes
 from license_manager.apps.subscriptions.exceptions import (
     InvalidSubscriptionPlanPayloadError,
     LicenseActivationMissingError,
@@ -63,7 +85,10 @@ from license_manager.apps.subscriptions.exceptions import (
     RenewalProcessingError,
 )
 from license_manager.apps.subscriptions.models import (
+    ArchivedLicense,
+    AutoAppliedLicenseCount,
     CustomerAgreement,
+    LearnerEntitlement,
     License,
     LicenseAction,
     SubscriptionLicenseSource,
@@ -82,7 +107,9 @@ from license_manager.apps.subscriptions.utils import (
 from ..pagination import (
     EstimatedCountLicensePagination,
     LearnerLicensesPaginationCustomerAgreement,
+    LicenseActionCursorPagination,
     LicensePagination,
+    LicensesWithVirtualUnassignedLicenses,
 )
 
 
@@ -112,6 +139,7 @@ CUSTOMER_AGREEMENT_PROVISIONING_ADMIN_CRUD_API_TAG = "Customer Agreement CRUD (f
     ),
 )
 class CustomerAgreementViewSet(
+    ReplicaReadsMixin,
     PermissionRequiredForListingMixin,
     UserDetailsFromJwtMixin,
     viewsets.ReadOnlyModelViewSet,
@@ -186,6 +214,7 @@ class CustomerAgreementViewSet(
         """
         now = localized_utcnow()
 
+        subscription_plan.materialize_unassigned_licenses(1)
         auto_applied_license = subscription_plan.unassigned_licenses.select_related(
             'subscription_plan',
             'subscription_plan__customer_agreement',
@@ -203,8 +232,15 @@ class CustomerAgreementViewSet(
         auto_applied_license.auto_applied = True
 
         auto_applied_license.save()
-        event_utils.track_license_changes([auto_applied_license], constants.SegmentEvents.LICENSE_ACTIVATED)
-        event_utils.identify_braze_alias(lms_user_id, user_email)
+        AutoAppliedLicenseCount.increment(subscription_plan, now)
+        call_concurrently(
+            partial(
+                event_utils.track_license_changes,
+                [auto_applied_license],
+                constants.SegmentEvents.LICENSE_ACTIVATED,
+            ),
+            partial(event_utils.identify_braze_alias, lms_user_id, user_email),
+        )
         send_utilization_threshold_reached_email_task.delay(subscription_plan.uuid)
 
         return auto_applied_license
@@ -286,7 +322,7 @@ class CustomerAgreementViewSet(
             return Response(data=response_data, status=status.HTTP_200_OK)
 
         # Check if the plan has licenses available at all
-        if plan.unassigned_licenses.count() == 0:
+        if plan.num_unassigned_licenses == 0:
             error_message = (
                 'There are no licenses remaining in your organization. '
                 'Please contact your administrator for further assistance.'
@@ -386,7 +422,11 @@ class CustomerAgreementProvisioningAdminViewset(
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
 
-class LearnerSubscriptionViewSet(PermissionRequiredForListingMixin, viewsets.ReadOnlyModelViewSet):
+class LearnerSubscriptionViewSet(
+    ReplicaReadsMixin,
+    PermissionRequiredForListingMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """ Viewset for read operations on LearnerSubscriptionPlans."""
     authentication_classes = [JwtAuthentication, SessionAuthentication]
     permission_classes = [permissions.IsAuthenticated]
@@ -414,11 +454,21 @@ class LearnerSubscriptionViewSet(PermissionRequiredForListingMixin, viewsets.Rea
         Used for "retrieve" actions. Determines the context (enterprise UUID) to check
         against for role-based permissions.
         """
-        try:
-            subscription_plan = SubscriptionPlan.objects.get(uuid=self.requested_subscription_uuid)
-            return subscription_plan.customer_agreement.enterprise_customer_uuid
-        except SubscriptionPlan.DoesNotExist:
+        subscription_plan = utils.get_subscription_plan_by_uuid(self.requested_subscription_uuid)
+        if not subscription_plan:
             return None
+        return subscription_plan.customer_agreement.enterprise_customer_uuid
+
+    def get_object(self):
+        """
+        Returns the plan already loaded by ``get_permission_object``, once it's known to be part of the queryset.
+        """
+        subscription_plan = utils.get_subscription_plan_by_uuid(self.requested_subscription_uuid)
+        queryset = self.filter_queryset(self.get_queryset())
+        if not subscription_plan or not queryset.filter(pk=subscription_plan.pk).exists():
+            raise Http404('No SubscriptionPlan matches the given query.')
+        self.check_object_permissions(self.request, subscription_plan)
+        return subscription_plan
 
     @property
     def base_queryset(self):
@@ -633,6 +683,7 @@ class SubscriptionPlanProvisioningAdminViewset(
 
 
 class LearnerLicensesViewSet(
+    ReplicaReadsMixin,
     PermissionRequiredForListingMixin,
     ListModelMixin,
     UserDetailsFromJwtMixin,
@@ -749,6 +800,9 @@ class LearnerLicensesViewSet(
         Return all Licenses that are associated with the user email and each of the customer's SubscriptionPlans.
 
         Otherwise, return an empty QuerySet.
+
+        When ``LEARNER_ENTITLEMENT_READS_ENABLED`` is set, the licenses that aren't revoked are found with
+        an indexed read of the learner entitlements, rather than by joining licenses to plans and agreements.
         """
         if not self.enterprise_customer_uuid:
             return License.objects.none()
@@ -757,6 +811,22 @@ class LearnerLicensesViewSet(
         current_plans_only = self.request.query_params.get('current_plans_only', 'true').lower() == 'true'
         include_revoked = self.request.query_params.get('include_revoked', 'false').lower() == 'true'
 
+        if settings.LEARNER_ENTITLEMENT_READS_ENABLED and not include_revoked:
+            entitlements = LearnerEntitlement.for_user_and_customer(
+                user_email=self.user_email,
+                lms_user_id=self.lms_user_id,
+                enterprise_customer_uuid=self.enterprise_customer_uuid,
+                active_plans_only=active_plans_only,
+                current_plans_only=current_plans_only,
+            )
+            licenses = License.objects.filter(
+                uuid__in=[entitlement.license_id for entitlement in entitlements],
+            ).select_related(
+                'subscription_plan',
+                'subscription_plan__customer_agreement',
+            )
+            return licenses.order_by('status', '-subscription_plan__expiration_date')
+
         licenses = License.for_user_and_customer(
             user_email=self.user_email,
             lms_user_id=self.lms_user_id,
@@ -768,20 +838,40 @@ class LearnerLicensesViewSet(
             licenses = licenses.exclude(
                 status=constants.REVOKED,
             )
-        licenses = licenses.order_by('status', '-subscription_plan__expiration_date')
+        return licenses.order_by('status', '-subscription_plan__expiration_date')
 
-        # Update user_email on licenses if the user has changed their email.
-        # Ideally we would receive an event when a user changes their info from the lms and update
-        # licenses that way, but this will work for now.
-        license_with_outdated_email = next((lcs for lcs in licenses if lcs.user_email != self.user_email), None)
-        if license_with_outdated_email:
-            # This should be a very infrequent operation
-            update_user_email_for_licenses_task(self.lms_user_id, self.user_email)
+    def paginate_queryset(self, queryset):
+        """
+        Syncs the email of the licenses on the page if the user has changed their email.
+        """
+        page = super().paginate_queryset(queryset)
+        self._sync_outdated_license_emails(page if page is not None else queryset)
+        return page
 
-        return licenses
+    def _sync_outdated_license_emails(self, licenses):
+        """
+        If any of the given licenses still has the user's previous email, shows the current email on them and
+        enqueues an update of all the user's licenses, at most once per ``USER_EMAIL_SYNC_DEDUPE_SECONDS``.
+        Services that are told of email changes should send them to the user email changes API instead.
 
+        The email is lowercased, as ``sync_user_emails`` stores it.
+        """
+        if not self.user_email or not self.lms_user_id:
+            return
+        user_email = self.user_email.lower()
+        outdated_licenses = [lcs for lcs in licenses if lcs.user_email != user_email]
+        if not outdated_licenses:
+            return
 
-class BaseLicenseViewSet(PermissionRequiredForListingMixin, viewsets.ReadOnlyModelViewSet):
+        for lcs in outdated_licenses:
+            lcs.user_email = user_email
+
+        cache_key = get_cache_key(resource='user_email_sync', lms_user_id=self.lms_user_id, user_email=user_email)
+        if cache.add(cache_key, True, settings.USER_EMAIL_SYNC_DEDUPE_SECONDS):
+            update_user_email_for_licenses_task.delay(self.lms_user_id, user_email)
+
+
+class BaseLicenseViewSet(ReplicaReadsMixin, PermissionRequiredForListingMixin, viewsets.ReadOnlyModelViewSet):
     """
     Base Viewset for read operations on individual licenses in a given subscription plan.
     It's nested under a subscriptions router, so requests for (at most) one license in a given
@@ -794,7 +884,7 @@ class BaseLicenseViewSet(PermissionRequiredForListingMixin, viewsets.ReadOnlyMod
     authentication_classes = [JwtAuthentication, SessionAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, LicenseEmailSearchFilter]
     ordering_fields = [
         'user_email',
         'status',
@@ -826,6 +916,10 @@ class BaseLicenseViewSet(PermissionRequiredForListingMixin, viewsets.ReadOnlyMod
     def get_serializer_class(self):
         if self.action == 'assign':
             return serializers.LicenseAdminAssignActionSerializer
+        if self.action == 'assignment_jobs':
+            return serializers.LicenseAssignmentJobCreateSerializer
+        if self.action in ('assignment_job', 'resume_assignment_job'):
+            return serializers.LicenseAssignmentJobSerializer
         if self.action == 'remind':
             return serializers.LicenseAdminRemindActionSerializer
         if self.action == 'remind_all':
@@ -880,6 +974,9 @@ class LicenseAdminViewSet(BaseLicenseViewSet):
     Example requests:
     GET /api/v1/subscriptions/{subscription_plan_uuid}/licenses/
     POST /api/v1/subscriptions/{subscription_plan_uuid}/licenses/assign/
+    POST /api/v1/subscriptions/{subscription_plan_uuid}/licenses/assignment-jobs/
+    GET /api/v1/subscriptions/{subscription_plan_uuid}/licenses/assignment-jobs/{job_uuid}/
+    POST /api/v1/subscriptions/{subscription_plan_uuid}/licenses/assignment-jobs/{job_uuid}/resume/
     POST /api/v1/subscriptions/{subscription_plan_uuid}/licenses/remind/
     POST /api/v1/subscriptions/{subscription_plan_uuid}/licenses/remind-all/
     POST /api/v1/subscriptions/{subscription_plan_uuid}/licenses/revoke/
@@ -951,11 +1048,39 @@ class LicenseAdminViewSet(BaseLicenseViewSet):
 
         return queryset
 
+    def _get_num_virtual_unassigned_licenses_to_list(self, status_values=None):
+        """
+        Returns the number of virtual unassigned licenses of the plan (which have no license records)
+        to report as unassigned licenses, which is 0 if the request is filtered in a way that excludes them.
+        """
+        subscription_plan = self._get_subscription_plan()
+        if not subscription_plan or not subscription_plan.num_virtual_unassigned_licenses:
+            return 0
+        if self.active_only or self.request.query_params.get('search'):
+            return 0
+
+        if status_values is None and (status_filter := self.request.query_params.get('status')):
+            status_values = status_filter.strip().split(',')
+        if status_values is not None and constants.UNASSIGNED not in status_values:
+            return 0
+        return subscription_plan.num_virtual_unassigned_licenses
+
+    def paginate_queryset(self, queryset):
+        """
+        Lists the virtual unassigned licenses of the plan after its license records.
+        """
+        if num_virtual_unassigned_licenses := self._get_num_virtual_unassigned_licenses_to_list():
+            queryset = LicensesWithVirtualUnassignedLicenses(
+                queryset, self._get_subscription_plan(), num_virtual_unassigned_licenses,
+            )
+        return super().paginate_queryset(queryset)
+
     def _validate_data(self, data):
         """
         Helper that validates the data sent in from a POST request.
 
-        Raises an exception with the error in the serializer if the data is invalid.
+        Raises an exception with the error in the serializer if the data is invalid,
+        and returns the serializer otherwise.
         """
         serializer_class = self.get_serializer_class()
         serializer = serializer_class(data=data)
@@ -964,79 +1089,35 @@ class LicenseAdminViewSet(BaseLicenseViewSet):
         except ValidationError:
             logger.error("Received invalid input: %s", data)
             raise
+        return serializer
 
     def _trim_already_associated_emails(self, subscription_plan, user_emails):
         """
         Find any emails that have already been associated with a non-revoked license in the subscription
-        and remove from user_emails list.
+        and remove from user_emails list. The licenses are looked up ``ASSIGNMENT_EMAIL_QUERY_CHUNK_SIZE``
+        emails at a time, so that no single IN query gets too large.
         """
-        trimmed_emails = user_emails.copy()
-
-        already_associated_licenses = subscription_plan.licenses.filter(
-            user_email__in=user_emails,
-            status__in=[constants.ASSIGNED, constants.ACTIVATED],
-        )
         already_associated_emails = []
-        if already_associated_licenses:
-            already_associated_emails = list(
-                already_associated_licenses.values_list('user_email', flat=True)
+        for user_email_chunk in chunks(user_emails, constants.ASSIGNMENT_EMAIL_QUERY_CHUNK_SIZE):
+            already_associated_emails.extend(
+                subscription_plan.licenses.filter(
+                    user_email__in=user_email_chunk,
+                    status__in=[constants.ASSIGNED, constants.ACTIVATED],
+                ).values_list('user_email', flat=True)
             )
-            for email in already_associated_emails:
-                # Ignore error if email was already removed from the list e.g. email has multiple licenses assigned
-                with suppress(ValueError):
-                    trimmed_emails.remove(email.lower())
 
+        already_associated_email_set = {email.lower() for email in already_associated_emails}
+        trimmed_emails = [email for email in user_emails if email not in already_associated_email_set]
         return trimmed_emails, already_associated_emails
 
-    def _link_and_notify_assigned_emails(
-        self,
-        user_emails,
-        subscription_plan,
-        notify_users,
-        custom_template_text,
-    ):
-        """
-        Helper to create async chains of link_learners_to_enterprise_task, create_braze_aliases_task,
-        and send_assignment_email_task for each batch of users. The task signatures are immutable,
-        hence the `si()` - we don't want the result of each task passed to the next task in the chain.
-
-        If disable_onboarding_notifications is set to true on the CustomerAgreement or notify_users=False,
-        Braze aliases will be created but no license assignment email will be sent.
-        """
-
-        customer_agreement = subscription_plan.customer_agreement
-        disable_onboarding_notifications = customer_agreement.disable_onboarding_notifications
-
-        for pending_learner_batch in chunks(user_emails, constants.PENDING_ACCOUNT_CREATION_BATCH_SIZE):
-            tasks = chain(
-                link_learners_to_enterprise_task.si(
-                    pending_learner_batch,
-                    subscription_plan.enterprise_customer_uuid,
-                ),
-            )
-
-            if notify_users and not disable_onboarding_notifications:
-                # Braze aliases must be created before we attempt to send assignment emails.
-                tasks.link(
-                    create_braze_aliases_task.si(pending_learner_batch),
-                )
-                tasks.link(
-                    send_assignment_email_task.si(
-                        custom_template_text,
-                        pending_learner_batch,
-                        str(subscription_plan.uuid),
-                    )
-                )
-
-            tasks.apply_async()
-
     def _assign_new_licenses(self, subscription_plan, user_emails):
         """
         Assign licenses for the given user_emails (that have not already been revoked).
 
-        Returns a QuerySet of licenses that are assigned.
+        Returns a list of licenses that are assigned.
         """
-        licenses = subscription_plan.unassigned_licenses[:len(user_emails)]
+        subscription_plan.materialize_unassigned_licenses(len(user_emails))
+        licenses = list(subscription_plan.unassigned_licenses[:len(user_emails)])
         now = localized_utcnow()
         for unassigned_license, email in zip(licenses, user_emails):
             # Assign each email to a license and mark the license as assigned
@@ -1049,7 +1130,7 @@ class LicenseAdminViewSet(BaseLicenseViewSet):
         License.bulk_update(
             licenses,
             ['user_email', 'status', 'activation_key', 'assigned_date', 'last_remind_date'],
-            batch_size=10,
+            batch_size=constants.ASSIGNMENT_BULK_OPERATION_BATCH_SIZE,
         )
 
         return licenses
@@ -1128,35 +1209,37 @@ class LicenseAdminViewSet(BaseLicenseViewSet):
     def _assign(self, request, subscription_plan):
         """
         Helper that actually performs all the operations of bulk license assignment.
+
+        The time taken by each phase of the assignment is reported in the ``Server-Timing`` header of the response.
         """
-        # Validate the user_emails and text sent in the data
-        self._validate_data(request.data)
+        timings = {}
 
-        emails_and_sfids = []
-        # remove duplicate emails and convert to lowercase
-        if 'user_sfids' in request.data:
-            user_emails = map(str.lower, request.data.get('user_emails'))
-            user_sfids = request.data.get('user_sfids')
-            # remove whitespaces if there are any
-            user_sfids = [sfid and sfid.strip() for sfid in user_sfids]
+        # Validate the user_emails and text sent in the data, which normalizes the emails to lowercase
+        with utils.timed_phase(timings, 'validate'):
+            validated_data = self._validate_data(request.data).validated_data
 
-            emails_and_sfids = dict(zip(user_emails, user_sfids))
-            user_emails = list(emails_and_sfids.keys())
-        else:
-            # Dedupe all lowercase emails before turning back into a list for indexing
-            user_emails = list({email.lower() for email in request.data.get('user_emails', [])})
+            emails_and_sfids = {}
+            # remove duplicate emails
+            if 'user_sfids' in validated_data:
+                # remove whitespaces if there are any
+                user_sfids = [sfid and sfid.strip() for sfid in validated_data['user_sfids']]
+                emails_and_sfids = dict(zip(validated_data['user_emails'], user_sfids))
+                user_emails = list(emails_and_sfids.keys())
+            else:
+                user_emails = list(dict.fromkeys(validated_data['user_emails']))
 
-        user_emails, already_associated_emails = self._trim_already_associated_emails(
-            subscription_plan,
-            user_emails,
-        )
+        with utils.timed_phase(timings, 'trim'):
+            user_emails, already_associated_emails = self._trim_already_associated_emails(
+                subscription_plan,
+                user_emails,
+            )
 
         assigned_licenses = []
 
         if user_emails:
             try:
-                with transaction.atomic():
-                    available_licenses_count = subscription_plan.unassigned_licenses.count()
+                with utils.timed_phase(timings, 'assign'), transaction.atomic():
+                    available_licenses_count = subscription_plan.num_unassigned_licenses
                     required_licenses_count = len(user_emails)
 
                     if available_licenses_count < required_licenses_count:
@@ -1179,53 +1262,53 @@ class LicenseAdminViewSet(BaseLicenseViewSet):
                 correlation_id = str(uuid4())
                 actor_lms_user_id = request.user.id
 
-                try:
-                    LicenseAction.objects.bulk_create([
-                        LicenseAction(
-                            license=_license,
-                            subscription_plan=subscription_plan,
-                            enterprise_customer_uuid=subscription_plan.enterprise_customer_uuid,
-                            action_type=constants.LicenseActionType.ASSIGNED,
-                            actor_type=constants.LicenseActorType.ADMIN,
-                            actor_lms_user_id=actor_lms_user_id,
-                            learner_lms_user_id=_license.lms_user_id,
-                            learner_email=_license.user_email,
-                            learner_external_key=(
-                                (emails_and_sfids.get(_license.user_email) or None) if emails_and_sfids else None
-                            ),
-                            source=constants.LicenseActionSource.ADMIN_API_BULK,
-                            correlation_id=correlation_id,
-                            metadata={
-                                'batch_size': len(assigned_licenses),
-                                'requested_email_count': len(user_emails),
-                                'learner_external_key': (
-                                    (emails_and_sfids.get(_license.user_email) or None) if emails_and_sfids else None
-                                ),
-                            },
-                        ) for _license in assigned_licenses
-                    ], batch_size=constants.LICENSE_BULK_OPERATION_BATCH_SIZE)
-                except Exception:  # pylint: disable=broad-except
-                    logger.exception(
-                        'Failed to write assigned LicenseAction rows for subscription %s; continuing assignment flow.',
-                        subscription_plan.uuid,
+                with utils.timed_phase(timings, 'license_actions'):
+                    try:
+                        LicenseAction.objects.bulk_create([
+                            LicenseAction(
+                                license=_license,
+                                subscription_plan=subscription_plan,
+                                enterprise_customer_uuid=subscription_plan.enterprise_customer_uuid,
+                                action_type=constants.LicenseActionType.ASSIGNED,
+                                actor_type=constants.LicenseActorType.ADMIN,
+                                actor_lms_user_id=actor_lms_user_id,
+                                learner_lms_user_id=_license.lms_user_id,
+                                learner_email=_license.user_email,
+                                learner_external_key=emails_and_sfids.get(_license.user_email) or None,
+                                source=constants.LicenseActionSource.ADMIN_API_BULK,
+                                correlation_id=correlation_id,
+                                metadata={
+                                    'batch_size': len(assigned_licenses),
+                                    'requested_email_count': len(user_emails),
+                                    'learner_external_key': emails_and_sfids.get(_license.user_email) or None,
+                                },
+                            ) for _license in assigned_licenses
+                        ], batch_size=constants.ASSIGNMENT_BULK_OPERATION_BATCH_SIZE)
+                    except Exception:  # pylint: disable=broad-except
+                        logger.exception(
+                            'Failed to write assigned LicenseAction rows for subscription %s; '
+                            'continuing assignment flow.',
+                            subscription_plan.uuid,
+                        )
+
+                with utils.timed_phase(timings, 'enqueue'):
+                    # Track license changes and do any other tasks that may want to
+                    # read from the License DB table outside of the transaction.atomic() block,
+                    # so that they can read the committed and updated versions
+                    # of the now-assigned license records.
+                    track_license_changes_task.delay(
+                        [str(_license.uuid) for _license in assigned_licenses],
+                        constants.SegmentEvents.LICENSE_ASSIGNED,
+                        is_batch_assignment=True,
                     )
 
-                # Track license changes and do any other tasks that may want to
-                # read from the License DB table outside of the transaction.atomic() block,
-                # so that they can read the committed and updated versions
-                # of the now-assigned license records.
-                track_license_changes_task.delay(
-                    [str(_license.uuid) for _license in assigned_licenses],
-                    constants.SegmentEvents.LICENSE_ASSIGNED,
-                    is_batch_assignment=True,
-                )
-
-                self._link_and_notify_assigned_emails(
-                    user_emails=user_emails,
-                    subscription_plan=subscription_plan,
-                    notify_users=request.data.get('notify_users', True),
-                    custom_template_text=utils.get_custom_text(request.data),
-                )
+                    # A single task fans out the linking and notification of the learners in batches
+                    link_and_notify_assigned_emails_task.delay(
+                        user_emails,
+                        str(subscription_plan.uuid),
+                        request.data.get('notify_users', True),
+                        utils.get_custom_text(request.data),
+                    )
         else:
             logger.info('All given emails are already associated with a license.')
 
@@ -1240,7 +1323,91 @@ class LicenseAdminViewSet(BaseLicenseViewSet):
             ]
         }
 
-        return Response(data=response_data, status=status.HTTP_200_OK)
+        response = Response(data=response_data, status=status.HTTP_200_OK)
+        response['Server-Timing'] = utils.get_server_timing_header(timings)
+        return response
+
+    @action(detail=False, methods=['post'], url_path='assignment-jobs')
+    def assignment_jobs(self, request, subscription_uuid=None):  # pylint: disable=unused-argument
+        """
+        Given an uploaded CSV of emails, creates a job that assigns a license to each of them and sends
+        them activation emails asynchronously. Meant for assignments too large for the ``assign`` action.
+
+        The CSV has one email per row, and optionally a Salesforce opportunity id in a second column.
+        The progress of the job, and the results CSV once it's completed, are available from
+        the ``assignment_job`` action.
+
+        Example request:
+          POST /api/v1/subscriptions/{subscription_plan_uuid}/licenses/assignment-jobs/
+
+        Multipart payload:
+          file: the CSV of emails
+          notify_users: whether to send license assignment emails, defaults to true
+          greeting, closing: the custom text of the license assignment emails
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        emails_and_sfids = utils.get_emails_and_sfids_from_csv(serializer.validated_data['file'])
+        if not emails_and_sfids:
+            return Response('The uploaded file contains no emails.', status=status.HTTP_400_BAD_REQUEST)
+        if len(emails_and_sfids) > settings.LICENSE_ASSIGNMENT_JOB_MAX_EMAILS:
+            response_message = (
+                f'The uploaded file contains {len(emails_and_sfids)} emails, '
+                f'but at most {settings.LICENSE_ASSIGNMENT_JOB_MAX_EMAILS} can be assigned by one job.'
+            )
+            return Response(response_message, status=status.HTTP_400_BAD_REQUEST)
+
+        license_assignment_job = LicenseAssignmentJob.create_license_assignment_job(
+            request.user.id,
+            self._get_subscription_plan(),
+            emails_and_sfids,
+            notify_users=serializer.validated_data['notify_users'],
+            custom_template_text=utils.get_custom_text(serializer.validated_data),
+        )
+        return Response(
+            serializers.LicenseAssignmentJobSerializer(license_assignment_job).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    def _get_license_assignment_job(self, job_uuid):
+        return get_object_or_404(
+            LicenseAssignmentJob,
+            uuid=job_uuid,
+            subscription_plan=self._get_subscription_plan(),
+        )
+
+    @action(detail=False, methods=['get'], url_path=r'assignment-jobs/(?P<job_uuid>[^/.]+)')
+    def assignment_job(self, request, subscription_uuid=None, job_uuid=None):  # pylint: disable=unused-argument
+        """
+        Returns the status and progress of a license assignment job, with a link to download its results
+        once it's completed.
+
+        Example request:
+          GET /api/v1/subscriptions/{subscription_plan_uuid}/licenses/assignment-jobs/{job_uuid}/
+        """
+        license_assignment_job = self._get_license_assignment_job(job_uuid)
+        return Response(self.get_serializer(license_assignment_job).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path=r'assignment-jobs/(?P<job_uuid>[^/.]+)/resume')
+    def resume_assignment_job(self, request, subscription_uuid=None, job_uuid=None):  # pylint: disable=unused-argument
+        """
+        Enqueues a license assignment job that failed or stalled again, to process the emails it didn't get to.
+
+        Example request:
+          POST /api/v1/subscriptions/{subscription_plan_uuid}/licenses/assignment-jobs/{job_uuid}/resume/
+        """
+        license_assignment_job = self._get_license_assignment_job(job_uuid)
+        if not license_assignment_job.is_resumable:
+            return Response(
+                f'The license assignment job is {license_assignment_job.status} and cannot be resumed.',
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        license_assignment_job.status = constants.LicenseAssignmentJobStatus.PENDING
+        license_assignment_job.save(update_fields=['status', 'modified'])
+        license_assignment_job.enqueue()
+        return Response(self.get_serializer(license_assignment_job).data, status=status.HTTP_202_ACCEPTED)
 
     @action(detail=False, methods=['post'])
     def remind(self, request, subscription_uuid=None):
@@ -1371,20 +1538,24 @@ class LicenseAdminViewSet(BaseLicenseViewSet):
         filter_kwargs = {
             'subscription_plan': subscription_plan
         }
+        user_email_search_term = None
 
         for fltr in filters_from_request:
             filter_name = fltr['name']
             filter_value = fltr['filter_value']
 
             if filter_name == 'user_email':
-                filter_kwargs.update(user_email__icontains=filter_value)
+                user_email_search_term = filter_value
 
             if filter_name == 'status_in':
                 filter_kwargs.update(status__in=filter_value)
 
-        return License.objects.filter(
+        licenses = License.objects.filter(
             **filter_kwargs,
         )
+        if user_email_search_term is not None:
+            licenses = search_licenses_by_email(licenses, user_email_search_term)
+        return licenses
 
     @action(detail=False, methods=['post'], url_path='bulk-revoke')
     def bulk_revoke(self, request, subscription_uuid=None):
@@ -1586,29 +1757,114 @@ class LicenseAdminViewSet(BaseLicenseViewSet):
         """
         queryset = self.filter_queryset(self.get_queryset())
         queryset_values = queryset.values('status').annotate(count=Count('status')).order_by('-count')
-        license_overview = list(queryset_values)
+        license_overview = self._add_virtual_unassigned_licenses_to_overview(list(queryset_values))
         return Response(license_overview, status=status.HTTP_200_OK)
 
+    def _add_virtual_unassigned_licenses_to_overview(self, license_overview):
+        """
+        Counts the virtual unassigned licenses of the plan (which have no license records to aggregate)
+        as unassigned licenses, unless the overview is filtered in a way that excludes them.
+        """
+        num_virtual_unassigned_licenses = self._get_num_virtual_unassigned_licenses_to_list()
+        if not num_virtual_unassigned_licenses:
+            return license_overview
+
+        unassigned_overview = next(
+            (item for item in license_overview if item['status'] == constants.UNASSIGNED),
+            None,
+        )
+        if unassigned_overview:
+            unassigned_overview['count'] += num_virtual_unassigned_licenses
+        else:
+            license_overview.append({'status': constants.UNASSIGNED, 'count': num_virtual_unassigned_licenses})
+        return sorted(license_overview, key=lambda item: item['count'], reverse=True)
+
     @action(detail=False, methods=['get'])
     def csv(self, request, subscription_uuid):  # pylint: disable=unused-argument
         """
         Returns license data for a given subscription in CSV format.
 
-        Only includes licenses with a status of ACTIVATED, ASSIGNED, or REVOKED.
+        Only includes licenses with a status of ACTIVATED, ASSIGNED, or REVOKED, unless other
+        statuses are requested with the comma-separated ``status`` query param. When UNASSIGNED
+        is requested, a row is also included for each of the virtual unassigned licenses of the plan.
         """
         subscription = self._get_subscription_plan()
         enterprise_slug = subscription.customer_agreement.enterprise_customer_slug
-        licenses = subscription.licenses.filter(
-            status__in=[constants.ACTIVATED, constants.ASSIGNED, constants.REVOKED],
-        ).values('status', 'user_email', 'activation_date', 'last_remind_date', 'activation_key')
+        status_values = [constants.ACTIVATED, constants.ASSIGNED, constants.REVOKED]
+        if status_filter := request.query_params.get('status'):
+            status_values = status_filter.strip().split(',')
+        licenses = list(subscription.licenses.filter(
+            status__in=status_values,
+        ).values('status', 'user_email', 'activation_date', 'last_remind_date', 'activation_key'))
+        licenses.extend(
+            {
+                'status': constants.UNASSIGNED,
+                'user_email': None,
+                'activation_date': None,
+                'last_remind_date': None,
+                'activation_key': None,
+            }
+            for _ in range(self._get_num_virtual_unassigned_licenses_to_list(status_values))
+        )
         for lic in licenses:
             # We want to expose the full activation link rather than just the activation key
             lic['activation_link'] = get_license_activation_link(enterprise_slug, lic['activation_key'])
             lic.pop('activation_key', None)
-        csv_data = CSVRenderer().render(list(licenses))
+        csv_data = CSVRenderer().render(licenses)
         return Response(csv_data, status=status.HTTP_200_OK, content_type='text/csv')
 
 
+@extend_schema_view(
+    list=extend_schema(
+        summary='List LicenseActions',
+        description=(
+            'List the audit log of actions taken on the licenses of an enterprise customer, most recent first, '
+            'optionally narrowed down to a single subscription plan or license. Paginated with a cursor.'
+        ),
+        parameters=[serializers.LicenseActionQueryParamsSerializer],
+    ),
+)
+class LicenseActionViewSet(PermissionRequiredForListingMixin, ListModelMixin, viewsets.GenericViewSet):
+    """ Viewset for Admin only read operations on the LicenseAction audit log."""
+    authentication_classes = [JwtAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    serializer_class = serializers.LicenseActionSerializer
+    pagination_class = LicenseActionCursorPagination
+    permission_required = constants.SUBSCRIPTIONS_ADMIN_ACCESS_PERMISSION
+
+    # fields that control permissions for 'list' actions
+    list_lookup_field = 'enterprise_customer_uuid'
+    allowed_roles = [constants.SUBSCRIPTIONS_ADMIN_ROLE]
+    role_assignment_class = SubscriptionsRoleAssignment
+
+    @cached_property
+    def requested_query_params(self):
+        query_params_serializer = serializers.LicenseActionQueryParamsSerializer(data=self.request.query_params)
+        query_params_serializer.is_valid(raise_exception=True)
+        return query_params_serializer.validated_data
+
+    @property
+    def base_queryset(self):
+        """
+        Required by the `PermissionRequiredForListingMixin`.
+        For non-list actions, this is what's returned by `get_queryset()`.
+        For list actions, some non-strict subset of this is what's returned by `get_queryset()`.
+
+        Each filter combination is served by one of the ``idx_licaction_*`` composite indexes,
+        which also provide the ordering used by the cursor pagination.
+        """
+        query_params = self.requested_query_params
+        queryset = LicenseAction.objects.filter(
+            enterprise_customer_uuid=query_params['enterprise_customer_uuid'],
+        )
+        if query_params.get('license_uuid'):
+            queryset = queryset.filter(license_id=query_params['license_uuid'])
+        if query_params.get('subscription_uuid'):
+            queryset = queryset.filter(subscription_plan_id=query_params['subscription_uuid'])
+        return queryset
+
+
 class LicenseBaseView(UserDetailsFromJwtMixin, APIView):
     """
     Base view for creating specific, one-off views
@@ -1819,25 +2075,18 @@ class LicenseSubsidyView(LicenseBaseView):
             msg = 'You must supply the course_key query parameter'
             return Response(msg, status=status.HTTP_400_BAD_REQUEST)
         customer_agreement = utils.get_customer_agreement_from_request_enterprise_uuid(request)
-        user_activated_licenses = License.objects.filter(
-            subscription_plan__in=customer_agreement.subscriptions.all(),
-            lms_user_id=self.lms_user_id,
-            status=constants.ACTIVATED,
-        )
         # order licenses by their associated subscription plan expiration date
-        ordered_licenses_by_expiration = []
-        if user_activated_licenses:
-            ordered_licenses_by_expiration = sorted(
-                user_activated_licenses,
-                key=lambda user_license: user_license.subscription_plan.expiration_date,
-                reverse=True,
-            )
+        ordered_licenses_by_expiration = self._get_activated_entitlements(customer_agreement)
+
+        # The catalogs of the plans are independent of each other, so they are all checked at once.
+        courses_in_catalogs = call_concurrently(*[
+            partial(user_license.contains_content, [self.requested_course_key])
+            for user_license in ordered_licenses_by_expiration
+        ])
 
         # iterate through the ordered licenses to return the license subsidy data for the user's license
         # which is "valid" for the specified content key and expires furthest in the future.
-        for user_license in ordered_licenses_by_expiration:
-            subscription_plan = user_license.subscription_plan
-            course_in_catalog = subscription_plan.contains_content([self.requested_course_key])
+        for user_license, course_in_catalog in zip(ordered_licenses_by_expiration, courses_in_catalogs):
             if not course_in_catalog:
                 continue
 
@@ -1848,16 +2097,16 @@ class LicenseSubsidyView(LicenseBaseView):
             checksum_for_license = get_subsidy_checksum(
                 user_license.lms_user_id,
                 self.requested_course_key,
-                user_license.uuid,
+                user_license.license_id,
             )
 
             ordered_data = OrderedDict({
                 'discount_type': constants.PERCENTAGE_DISCOUNT_TYPE,
                 'discount_value': constants.LICENSE_DISCOUNT_VALUE,
                 'status': user_license.status,
-                'subsidy_id': user_license.uuid,
-                'start_date': subscription_plan.start_date,
-                'expiration_date': subscription_plan.expiration_date,
+                'subsidy_id': user_license.license_id,
+                'start_date': user_license.plan_start_date,
+                'expiration_date': user_license.plan_expiration_date,
                 'subsidy_checksum': checksum_for_license,
             })
             return Response(ordered_data)
@@ -1868,6 +2117,195 @@ class LicenseSubsidyView(LicenseBaseView):
         )
         return Response(msg, status=status.HTTP_404_NOT_FOUND)
 
+    def _get_activated_entitlements(self, customer_agreement):
+        """
+        Returns the entitlements of the user's activated licenses for the customer, ordered from the one whose plan
+        expires furthest in the future. When ``LEARNER_ENTITLEMENT_READS_ENABLED`` is set, they're read from the
+        learner entitlement table with one indexed query, otherwise they're built from the user's licenses.
+        """
+        if settings.LEARNER_ENTITLEMENT_READS_ENABLED:
+            return list(LearnerEntitlement.objects.filter(
+                lms_user_id=self.lms_user_id,
+                enterprise_customer_uuid=customer_agreement.enterprise_customer_uuid,
+                status=constants.ACTIVATED,
+            ).order_by('-plan_expiration_date'))
+
+        user_activated_licenses = License.objects.filter(
+            subscription_plan__in=customer_agreement.subscriptions.all(),
+            lms_user_id=self.lms_user_id,
+            status=constants.ACTIVATED,
+        ).select_related('subscription_plan')
+        entitlements = [
+            LearnerEntitlement.from_license(user_license)
+            for user_license in user_activated_licenses
+        ]
+        return sorted(entitlements, key=lambda entitlement: entitlement.plan_expiration_date, reverse=True)
+
+
+class CustomerLicenseOverviewView(ReplicaReadsMixin, LicenseBaseView):
+    """
+    View for an overview of the licenses of every subscription plan of an enterprise customer.
+
+    GET /api/v1/customer-license-overview/?enterprise_customer_uuid=the-uuid
+
+    Optional query params:
+      - include_inactive (boolean): Defaults to false. Also counts the licenses of inactive plans if true.
+      - start_date, end_date (YYYY-MM-DD): Only counts the licenses of plans whose term overlaps this date range.
+
+    Example Response:
+    {
+      "enterprise_customer_uuid": "378d5bf0-f67d-4bf7-8b2a-cbbc53d0f772",
+      "licenses": {"activated": 10, "assigned": 5, "unassigned": 85, "revoked": 2},
+      "subscriptions": [
+        {
+          "uuid": "fe9cc40e-24a7-47a0-b800-9a11288b3ec2",
+          "title": "Pied Piper - Plan A",
+          "start_date": "2020-12-01T00:00:00Z",
+          "expiration_date": "2021-06-30T00:00:00Z",
+          "is_active": true,
+          "licenses": {"activated": 10, "assigned": 5, "unassigned": 85, "revoked": 2}
+        }
+      ]
+    }
+
+    The licenses of all plans are counted with one grouped query, rather than with one ``overview``
+    request per plan, and the virtual unassigned licenses of plans are counted as unassigned.
+    """
+
+    @permission_required(
+        constants.SUBSCRIPTIONS_ADMIN_ACCESS_PERMISSION,
+        fn=lambda request: utils.get_context_for_customer_agreement_from_request(request),  # pylint: disable=unnecessary-lambda
+    )
+    def get(self, request):
+        """
+        Returns the number of licenses of each status for each of the customer's subscription plans, and in total.
+        """
+        query_params_serializer = serializers.CustomerLicenseOverviewQueryParamsSerializer(data=request.query_params)
+        query_params_serializer.is_valid(raise_exception=True)
+        query_params = query_params_serializer.validated_data
+
+        customer_agreement = utils.get_customer_agreement_from_request_enterprise_uuid(request)
+        subscription_plans = customer_agreement.subscriptions.all()
+        if not query_params['include_inactive']:
+            subscription_plans = subscription_plans.filter(is_active=True)
+        if query_params.get('start_date'):
+            subscription_plans = subscription_plans.filter(expiration_date__date__gte=query_params['start_date'])
+        if query_params.get('end_date'):
+            subscription_plans = subscription_plans.filter(start_date__date__lte=query_params['end_date'])
+        subscription_plans = list(subscription_plans.order_by('-start_date'))
+
+        count_by_status_by_plan_uuid = SubscriptionPlan.license_count_by_status_for_plans(subscription_plans)
+        total_count_by_status = {status_choice[0]: 0 for status_choice in constants.LICENSE_STATUS_CHOICES}
+        for count_by_status in count_by_status_by_plan_uuid.values():
+            for license_status, count in count_by_status.items():
+                total_count_by_status[license_status] += count
+
+        return Response({
+            'enterprise_customer_uuid': str(customer_agreement.enterprise_customer_uuid),
+            'licenses': total_count_by_status,
+            'subscriptions': [
+                {
+                    'uuid': str(subscription_plan.uuid),
+                    'title': subscription_plan.title,
+                    'start_date': subscription_plan.start_date,
+                    'expiration_date': subscription_plan.expiration_date,
+                    'is_active': subscription_plan.is_active,
+                    'licenses': count_by_status_by_plan_uuid[subscription_plan.uuid],
+                }
+                for subscription_plan in subscription_plans
+            ],
+        }, status=status.HTTP_200_OK)
+
+
+class LicenseChangeFeedView(ReplicaReadsMixin, LicenseBaseView):
+    """
+    View for the incremental feed of the changes to licenses, across all subscription plans of an enterprise
+    customer, or of all customers for the license change feed service users.
+
+    GET /api/v1/license-changes/?enterprise_customer_uuid=the-uuid&cursor=the-cursor
+
+    Optional query params:
+      - enterprise_customer_uuid (UUID): Only lists the changes to the licenses of this customer. Required unless
+        the requesting user is a license change feed service user or a superuser.
+      - cursor (str): The ``next_cursor`` of the previous page. Starts from the first change if omitted.
+      - page_size (int): The maximum number of changes listed, defaults to LICENSE_CHANGE_FEED_PAGE_SIZE.
+
+    Example Response:
+    {
+      "results": [
+        {
+          "uuid": "8a4b4c59-3ec6-4b10-9e4c-bb1b3a9dc2e6",
+          "status": "activated",
+          "user_email": "learner@example.com",
+          "lms_user_id": 1,
+          "subscription_plan_uuid": "fe9cc40e-24a7-47a0-b800-9a11288b3ec2",
+          "enterprise_customer_uuid": "378d5bf0-f67d-4bf7-8b2a-cbbc53d0f772",
+          "assigned_date": "2021-01-01T00:00:00Z",
+          "activation_date": "2021-01-02T00:00:00Z",
+          "revoked_date": null,
+          "modified": "2021-01-02T00:00:00.123456Z",
+          "deleted": false
+        },
+        {
+          "uuid": "0b7c6f24-9f9f-4e22-a0c5-6f8f3a2b1f6d",
+          "subscription_plan_uuid": "fe9cc40e-24a7-47a0-b800-9a11288b3ec2",
+          "modified": "2021-01-03T00:00:00.654321Z",
+          "deleted": true
+        }
+      ],
+      "next_cursor": "MjAyMS0wMS0wM1QwMDowMDowMC42NTQzMjErMDA6MDB8MGI3YzZmMjQtOWY5Zi00ZTIyLWEwYzUtNmY4ZjNhMmIxZjZk",
+      "has_more": false
+    }
+
+    Consumers keep the ``next_cursor`` of the last page they read, and poll from it for later changes.
+    """
+
+    def get(self, request):
+        """
+        Returns a page of the changes to licenses after the given cursor, in the order they were made.
+
+        Returns:
+            * 400 Bad Request - if the customer uuid, cursor or page size is invalid.
+            * 401 Unauthorized - if the requesting user is not authenticated.
+            * 403 Forbidden - if the requesting user is not an admin of the customer, or doesn't give a customer
+                and is not allowed to read the changes to the licenses of all customers.
+            * 200 OK - with the page of changes, the cursor of the next page and whether there are more changes.
+        """
+        query_params_serializer = serializers.LicenseChangeFeedQueryParamsSerializer(data=request.query_params)
+        query_params_serializer.is_valid(raise_exception=True)
+        query_params = query_params_serializer.validated_data
+
+        if CanReadAllLicenseChanges().has_permission(request, self):
+            return self._get_license_changes(query_params)
+        if query_params.get('enterprise_customer_uuid') is None:
+            raise PermissionDenied('An enterprise_customer_uuid is required.')
+        return self._get_customer_license_changes(request, query_params)
+
+    @permission_required(
+        constants.SUBSCRIPTIONS_ADMIN_ACCESS_PERMISSION,
+        fn=lambda request, query_params: utils.get_context_for_customer_agreement_from_request(request),
+    )
+    def _get_customer_license_changes(self, request, query_params):  # pylint: disable=unused-argument
+        """
+        Returns a page of the changes to the licenses of the customer, for admins of the customer.
+        """
+        return self._get_license_changes(query_params)
+
+    def _get_license_changes(self, query_params):
+        """
+        Returns a page of the changes to licenses after the cursor of ``query_params``.
+        """
+        changes, next_cursor, has_more = get_license_changes(
+            cursor=query_params.get('cursor'),
+            enterprise_customer_uuid=query_params.get('enterprise_customer_uuid'),
+            limit=query_params['page_size'],
+        )
+        return Response({
+            'results': changes,
+            'next_cursor': next_cursor,
+            'has_more': has_more,
+        }, status=status.HTTP_200_OK)
+
 
 class LicenseActivationView(LicenseBaseView):
     """
@@ -1923,12 +2361,15 @@ class LicenseActivationView(LicenseBaseView):
         invoke a post-activation notification task.
         """
         event_properties = event_utils.get_license_tracking_properties(user_license)
-        event_utils.track_event(
-            self.lms_user_id,
-            constants.SegmentEvents.LICENSE_ACTIVATED,
-            event_properties
+        call_concurrently(
+            partial(
+                event_utils.track_event,
+                self.lms_user_id,
+                constants.SegmentEvents.LICENSE_ACTIVATED,
+                event_properties,
+            ),
+            partial(event_utils.identify_braze_alias, self.lms_user_id, self.user_email),
         )
-        event_utils.identify_braze_alias(self.lms_user_id, self.user_email)
 
         customer_agreement = user_license.subscription_plan.customer_agreement
         if not customer_agreement.disable_onboarding_notifications:
@@ -1938,6 +2379,50 @@ class LicenseActivationView(LicenseBaseView):
             )
 
 
+class UserEmailChangesView(APIView):
+    """
+    View for syncing the emails of licenses with the new email addresses of their users.
+
+    POST /api/v1/user-email-changes/
+    {
+        "email_changes": [
+            {"lms_user_id": 1, "new_email": "new-email@example.com"},
+        ]
+    }
+
+    Only the last change of each user in a batch is applied.
+    """
+    authentication_classes = [JwtAuthentication]
+    permission_classes = [permissions.IsAuthenticated, CanSyncUserEmails]
+
+    @extend_schema(request=serializers.UserEmailChangesSerializer)
+    def post(self, request):
+        """
+        Updates the email of the licenses of each user in the batch.
+
+        Returns:
+            * 400 Bad Request - if the batch of changes is missing or invalid.
+            * 401 Unauthorized - if the requesting user is not authenticated.
+            * 403 Forbidden - if the requesting user is not allowed to sync user emails.
+            * 200 OK - with the number of users in the batch and the number of licenses updated.
+        """
+        serializer = serializers.UserEmailChangesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        new_email_by_lms_user_id = {
+            email_change['lms_user_id']: email_change['new_email']
+            for email_change in serializer.validated_data['email_changes']
+        }
+        num_licenses_updated = sync_user_emails(new_email_by_lms_user_id)
+        return Response(
+            {
+                'num_users': len(new_email_by_lms_user_id),
+                'num_licenses_updated': num_licenses_updated,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class UserRetirementView(APIView):
     """
     View for retiring users and their license data upon account deletion. Note that User data is deleted.
@@ -1976,8 +2461,17 @@ class UserRetirementView(APIView):
         lms_user_id = self._get_required_field(self.LMS_USER_ID)
         original_username = self._get_required_field(self.ORIGINAL_USERNAME)
 
+        # Restore the archived licenses of the user, so that their pii is scrubbed along with the other licenses
+        restore_archived_licenses(ArchivedLicense.objects.filter(lms_user_id=lms_user_id))
+
         # Scrub all pii on licenses associated with the user
         associated_licenses = License.objects.filter(lms_user_id=lms_user_id)
+        # The emails of the user are collected before the licenses are reset, to also scrub the emails of license
+        # assignment jobs that aren't linked to any of the licenses (e.g. failed or already associated ones).
+        user_emails = {
+            user_email.lower()
+            for user_email in associated_licenses.exclude(user_email__isnull=True).values_list('user_email', flat=True)
+        }
         for associated_license in associated_licenses:
             # Scrub all pii on the revoked licenses, but they should stay revoked and keep their other info as we
             # currently add an unassigned license to the subscription's license pool whenever one is revoked.
@@ -1991,6 +2485,9 @@ class UserRetirementView(APIView):
             associated_license.clear_historical_pii()
             associated_license.delete_source()
         associated_licenses_uuids = [license.uuid for license in associated_licenses]
+        LicenseAssignmentJobEmail.objects.filter(
+            Q(license__in=associated_licenses_uuids) | Q(user_email__in=user_emails),
+        ).update(user_email=None, user_sfid=None)
         message = 'Retired {} licenses with uuids: {} for user with lms_user_id {}'.format(
             len(associated_licenses_uuids),
             sorted(associated_licenses_uuids),
@@ -2002,6 +2499,10 @@ class UserRetirementView(APIView):
             User = get_user_model()
             user = User.objects.get(username=original_username)
             logger.info('Retiring user with id %r and lms_user_id %r', user.id, lms_user_id)
+            if user.email:
+                LicenseAssignmentJobEmail.objects.filter(
+                    user_email=user.email.lower(),
+                ).update(user_email=None, user_sfid=None)
             user.delete()
         except ObjectDoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
@@ -2015,7 +2516,7 @@ class UserRetirementView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class StaffLicenseLookupView(LicenseBaseView):
+class StaffLicenseLookupView(ReplicaReadsMixin, LicenseBaseView):
     """
     A class that allows users with staff permissions
     to lookup all licenses for a user, given the user's email address.
@@ -2051,6 +2552,8 @@ class StaffLicenseLookupView(LicenseBaseView):
     ]
     """
     permission_classes = [permissions.IsAdminUser]
+    # The lookup is a read, it's only a POST to keep emails out of URLs.
+    replica_read_methods = ('POST',)
 
     def post(self, request):
         """
@@ -2065,7 +2568,11 @@ class StaffLicenseLookupView(LicenseBaseView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user_licenses = License.by_user_email_or_lms_user_id(user_email=user_email)
+        # Licenses of plans that expired long ago are read through from the archive.
+        user_licenses = [
+            *License.by_user_email_or_lms_user_id(user_email=user_email),
+            *ArchivedLicense.by_user_email_or_lms_user_id(user_email=user_email),
+        ]
         if not user_licenses:
             return Response(
                 status=status.HTTP_404_NOT_FOUND,
@@ -2079,7 +2586,7 @@ class StaffLicenseLookupView(LicenseBaseView):
         )
 
 
-class AdminLicenseLookupViewSet(LicenseBaseView):
+class AdminLicenseLookupViewSet(ReplicaReadsMixin, LicenseBaseView):
     """
     A class that allows admins to lookup all licenses for a user with the provided
     user's email address and enterprise customer uuid.
@@ -2148,11 +2655,19 @@ class AdminLicenseLookupViewSet(LicenseBaseView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user_licenses = License.for_user_and_customer(
-            user_email=user_email,
-            lms_user_id=None,
-            enterprise_customer_uuid=enterprise_customer_uuid
-        )
+        # Licenses of plans that expired long ago are read through from the archive.
+        user_licenses = [
+            *License.for_user_and_customer(
+                user_email=user_email,
+                lms_user_id=None,
+                enterprise_customer_uuid=enterprise_customer_uuid
+            ),
+            *ArchivedLicense.for_user_and_customer(
+                user_email=user_email,
+                lms_user_id=None,
+                enterprise_customer_uuid=enterprise_customer_uuid,
+            ),
+        ]
         paginator = PageNumberPagination()
         licenses_page = paginator.paginate_queryset(user_licenses, request, view=self)
 
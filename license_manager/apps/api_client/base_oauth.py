@@ -3,6 +3,8 @@ import logging
 from django.conf import settings
 from edx_rest_api_client.client import OAuthAPIClient
 
+from license_manager.apps.core.instrumentation import outbound_response_hook
+
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +20,7 @@ class BaseOAuthClient:
             self.oauth2_client_id,
             self.oauth2_client_secret
         )
+        self.client.hooks['response'].append(outbound_response_hook(self.__class__.__name__))
 
     @property
     def oauth2_client_id(self):
@@ -3,6 +3,8 @@ import logging
 from braze.client import BrazeClient
 from django.conf import settings
 
+from license_manager.apps.core.instrumentation import outbound_call
+
 
 logger = logging.getLogger(__name__)
 
@@ -23,3 +25,7 @@ class BrazeApiClient(BrazeClient):
             api_url=settings.BRAZE_API_URL,
             app_id=settings.BRAZE_APP_ID
         )
+
+    def _make_request(self, data, endpoint, request_type):
+        with outbound_call('braze'):
+            return super()._make_request(data, endpoint, request_type)
@@ -0,0 +1,61 @@
+"""
+Concurrent fan-out of independent outbound calls.
+
+Views that make several independent calls to other services (the catalog service, LMS, Braze) can hand
+them to ``call_concurrently`` so that they wait on the slowest call, rather than on the sum of all of them.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from django.conf import settings
+
+
+_executor = None
+
+
+def _get_executor():
+    """
+    Returns the thread pool shared by every outbound call fan-out of the process, created on first use
+    so that it's never inherited by forked gunicorn workers.
+    """
+    global _executor  # pylint: disable=global-statement
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.OUTBOUND_CALL_MAX_WORKERS,
+            thread_name_prefix='outbound-call',
+        )
+    return _executor
+
+
+def call_concurrently(*calls):
+    """
+    Runs the given callables concurrently, and returns their results in the same order.
+
+    The first callable runs in the calling thread, and the others in the shared outbound call pool, with a copy
+    of the calling context so that their calls are still recorded by the hot path instrumentation. Only the first
+    callable may use the database, as the pool threads don't share the connections of the calling thread.
+
+    If any of the callables raises, the first such exception is re-raised once all of them have finished.
+    """
+    executor = _get_executor()
+    futures = [executor.submit(copy_context().run, call) for call in calls[1:]]
+
+    results = []
+    first_exception = None
+    if calls:
+        try:
+            results.append(calls[0]())
+        except Exception as exc:  # pylint: disable=broad-except
+            first_exception = exc
+            results.append(None)
+
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as exc:  # pylint: disable=broad-except
+            first_exception = first_exception or exc
+            results.append(None)
+
+    if first_exception is not None:
+        raise first_exception
+    return results
@@ -0,0 +1,68 @@
+import threading
+from functools import partial
+
+from django.test import TestCase
+
+from license_manager.apps.api_client.concurrency import call_concurrently
+from license_manager.apps.core.instrumentation import (
+    HotPathStats,
+    record_outbound_call,
+)
+
+
+class CallConcurrentlyTests(TestCase):
+    """
+    Tests for call_concurrently.
+    """
+
+    def test_results_in_order(self):
+        assert call_concurrently(partial(pow, 2, 3), partial(pow, 3, 2), partial(pow, 4, 1)) == [8, 9, 4]
+
+    def test_no_calls(self):
+        assert not call_concurrently()
+
+    def test_calls_run_concurrently(self):
+        """
+        Verify that the calls all run at the same time, by having each of them wait for the others.
+        """
+        barrier = threading.Barrier(3, timeout=5)
+        assert call_concurrently(barrier.wait, barrier.wait, barrier.wait) is not None
+
+    def test_first_call_runs_in_calling_thread(self):
+        calling_thread = threading.current_thread()
+        threads = call_concurrently(threading.current_thread, threading.current_thread)
+        assert threads[0] is calling_thread
+        assert threads[1] is not calling_thread
+
+    def test_exception_reraised_after_all_calls_finish(self):
+        finished = []
+
+        def fail():
+            raise ValueError('upstream error')
+
+        with self.assertRaisesRegex(ValueError, 'upstream error'):
+            call_concurrently(fail, partial(finished.append, True))
+        assert finished == [True]
+
+    def test_outbound_calls_recorded_from_pool(self):
+        stats = HotPathStats('request', name='test').start()
+        try:
+            call_concurrently(
+                partial(record_outbound_call, 'lms', 0.1),
+                partial(record_outbound_call, 'braze', 0.2),
+            )
+        finally:
+            stats.stop()
+        assert stats.outbound_calls == {'lms': {'count': 1, 'time': 0.1}, 'braze': {'count': 1, 'time': 0.2}}
+
+    def test_outbound_calls_recorded_from_pool_without_lost_updates(self):
+        def record_outbound_calls():
+            for _ in range(1000):
+                record_outbound_call('lms', 0.001)
+
+        stats = HotPathStats('request', name='test').start()
+        try:
+            call_concurrently(*[record_outbound_calls] * 4)
+        finally:
+            stats.stop()
+        assert stats.outbound_calls['lms']['count'] == 4000
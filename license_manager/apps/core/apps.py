@@ -0,0 +1,16 @@
+"""
+Defines the Django app config for core.
+"""
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    """
+    The app config for core.
+    """
+    name = 'license_manager.apps.core'
+
+    def ready(self):
+        # Connects the celery signal handlers that instrument tasks.
+        # pylint: disable=import-outside-toplevel,unused-import
+        from license_manager.apps.core import instrumentation
@@ -0,0 +1,328 @@
+"""
+Hot path instrumentation for requests and celery tasks.
+
+For each request (see ``HotPathInstrumentationMiddleware``) and each celery task (see the signal
+handlers below), records:
+
+- the number of DB queries, their total duration and the slowest of them, with normalized SQL
+- the number and latency of outbound calls, per service
+- cache hits and misses
+- the number of permission (edx-rbac rule) evaluations
+
+and reports them as custom monitoring attributes and as a single structured log line.
+A warning with a stack sample is logged when a request or task exceeds its DB query budget.
+"""
+import heapq
+import json
+import logging
+import re
+import threading
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.db import connections
+from edx_django_utils.monitoring import set_custom_attribute
+
+
+logger = logging.getLogger(__name__)
+
+CUSTOM_ATTRIBUTE_PREFIX = 'hot_path'
+STACK_SAMPLE_LIMIT = 15
+
+_current_stats = ContextVar('hot_path_stats', default=None)
+
+_STRING_LITERALS = re.compile(r"'(?:[^']|'')*'")
+_NUMERIC_LITERALS = re.compile(r'\b\d+\b')
+_PLACEHOLDERS = re.compile(r'%s')
+_IN_CLAUSES = re.compile(r'IN \(\?(?:, \?)*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """
+    Normalizes a SQL statement so that the queries issued by the same code path compare equal,
+    whatever their parameters and the length of their ``IN`` clauses.
+    """
+    sql = _STRING_LITERALS.sub('?', sql)
+    sql = _NUMERIC_LITERALS.sub('?', sql)
+    sql = _PLACEHOLDERS.sub('?', sql)
+    sql = _IN_CLAUSES.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def get_query_budget(name):
+    """
+    Returns the DB query budget of the view or task with the given name, or None if it has no budget.
+    """
+    return settings.HOT_PATH_QUERY_BUDGETS.get(name, settings.HOT_PATH_DEFAULT_QUERY_BUDGET)
+
+
+class HotPathStats:
+    """
+    The instrumentation data recorded for a single request or task.
+
+    The threads of ``call_concurrently`` record their outbound calls into the stats of the request that
+    started them, so the counters are only updated while holding the lock of the stats object.
+    """
+
+    def __init__(self, kind, name=None):
+        self.kind = kind
+        self.name = name
+        self.query_budget = get_query_budget(name) if name else None
+        self.db_query_count = 0
+        self.db_time = 0.0
+        self.slowest_queries = []
+        self.outbound_calls = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.permission_evaluations = 0
+        self.budget_exceeded = False
+        self._exit_stack = ExitStack()
+        self._context_token = None
+        self._lock = threading.Lock()
+
+    def set_name(self, name):
+        """
+        Names the request or task once it's known, which also determines its query budget.
+        """
+        self.name = name
+        self.query_budget = get_query_budget(name)
+
+    def start(self):
+        """
+        Makes this the current stats object, and starts recording the queries of every DB connection.
+        """
+        self._context_token = _current_stats.set(self)
+        for connection in connections.all():
+            self._exit_stack.enter_context(connection.execute_wrapper(self._record_query))
+        return self
+
+    def stop(self):
+        """
+        Stops recording and reports the recorded data.
+        """
+        self._exit_stack.close()
+        if self._context_token is not None:
+            _current_stats.reset(self._context_token)
+            self._context_token = None
+        self.report()
+
+    def _record_query(self, execute, sql, params, many, context):
+        """
+        A DB execute wrapper that times each query.
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.db_query_count += 1
+                self.db_time += duration
+                self._record_slow_query(duration, sql)
+                budget_just_exceeded = self._check_query_budget()
+            if budget_just_exceeded:
+                self._warn_query_budget_exceeded(sql)
+
+    def _record_slow_query(self, duration, sql):
+        """
+        Keeps the ``HOT_PATH_SLOW_QUERY_COUNT`` slowest queries in a min-heap keyed by duration.
+        """
+        entry = (duration, self.db_query_count, sql)
+        if len(self.slowest_queries) < settings.HOT_PATH_SLOW_QUERY_COUNT:
+            heapq.heappush(self.slowest_queries, entry)
+        elif duration > self.slowest_queries[0][0]:
+            heapq.heapreplace(self.slowest_queries, entry)
+
+    def _check_query_budget(self):
+        """
+        Returns whether the last query is the one that exceeded the query budget.
+        """
+        if self.budget_exceeded or self.query_budget is None or self.db_query_count <= self.query_budget:
+            return False
+        self.budget_exceeded = True
+        return True
+
+    def _warn_query_budget_exceeded(self, sql):
+        logger.warning(
+            'The %s %s exceeded its budget of %s DB queries with query: %s\nStack sample:\n%s',
+            self.kind,
+            self.name,
+            self.query_budget,
+            normalize_sql(sql),
+            ''.join(traceback.format_stack(limit=STACK_SAMPLE_LIMIT)),
+        )
+
+    def record_outbound_call(self, service, duration):
+        with self._lock:
+            calls = self.outbound_calls.setdefault(service, {'count': 0, 'time': 0.0})
+            calls['count'] += 1
+            calls['time'] += duration
+
+    def record_cache_lookup(self, hit):
+        """
+        Counts a cache lookup as a hit or a miss.
+        """
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def record_permission_evaluation(self):
+        with self._lock:
+            self.permission_evaluations += 1
+
+    def as_dict(self):
+        """
+        Returns a JSON-serializable summary of the recorded data, with durations in milliseconds.
+        """
+        with self._lock:
+            return self._as_dict()
+
+    def _as_dict(self):
+        return {
+            'kind': self.kind,
+            'name': self.name,
+            'db_query_count': self.db_query_count,
+            'db_time_ms': round(self.db_time * 1000, 2),
+            'db_query_budget': self.query_budget,
+            'db_query_budget_exceeded': self.budget_exceeded,
+            'slowest_queries': [
+                {'time_ms': round(duration * 1000, 2), 'sql': normalize_sql(sql)}
+                for duration, _, sql in sorted(self.slowest_queries, reverse=True)
+            ],
+            'outbound_calls': {
+                service: {'count': calls['count'], 'time_ms': round(calls['time'] * 1000, 2)}
+                for service, calls in self.outbound_calls.items()
+            },
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'permission_evaluations': self.permission_evaluations,
+        }
+
+    def report(self):
+        """
+        Reports the recorded data as custom monitoring attributes, and as a structured log line.
+        """
+        summary = self.as_dict()
+        set_custom_attribute(f'{CUSTOM_ATTRIBUTE_PREFIX}.db_query_count', summary['db_query_count'])
+        set_custom_attribute(f'{CUSTOM_ATTRIBUTE_PREFIX}.db_time_ms', summary['db_time_ms'])
+        set_custom_attribute(
+            f'{CUSTOM_ATTRIBUTE_PREFIX}.db_query_budget_exceeded', summary['db_query_budget_exceeded'],
+        )
+        if summary['slowest_queries']:
+            set_custom_attribute(f'{CUSTOM_ATTRIBUTE_PREFIX}.slowest_query', summary['slowest_queries'][0]['sql'])
+            set_custom_attribute(
+                f'{CUSTOM_ATTRIBUTE_PREFIX}.slowest_query_time_ms', summary['slowest_queries'][0]['time_ms'],
+            )
+        for service, calls in summary['outbound_calls'].items():
+            set_custom_attribute(f'{CUSTOM_ATTRIBUTE_PREFIX}.{service}.call_count', calls['count'])
+            set_custom_attribute(f'{CUSTOM_ATTRIBUTE_PREFIX}.{service}.time_ms', calls['time_ms'])
+        set_custom_attribute(f'{CUSTOM_ATTRIBUTE_PREFIX}.cache_hits', summary['cache_hits'])
+        set_custom_attribute(f'{CUSTOM_ATTRIBUTE_PREFIX}.cache_misses', summary['cache_misses'])
+        set_custom_attribute(f'{CUSTOM_ATTRIBUTE_PREFIX}.permission_evaluations', summary['permission_evaluations'])
+        logger.info('Hot path stats: %s', json.dumps(summary))
+
+
+def get_current_stats():
+    """
+    Returns the stats of the request or task being handled, or None outside of one.
+    """
+    return _current_stats.get()
+
+
+def record_outbound_call(service, duration):
+    """
+    Records an outbound call to ``service`` that took ``duration`` seconds.
+    """
+    stats = get_current_stats()
+    if stats is not None:
+        stats.record_outbound_call(service, duration)
+
+
+@contextmanager
+def outbound_call(service):
+    """
+    Context manager that records the wrapped block as an outbound call to ``service``.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_outbound_call(service, time.perf_counter() - start)
+
+
+def outbound_response_hook(service):
+    """
+    Returns a ``requests`` response hook that records each response of a session as an outbound call to ``service``.
+    """
+    def hook(response, *args, **kwargs):  # pylint: disable=unused-argument
+        record_outbound_call(service, response.elapsed.total_seconds())
+    return hook
+
+
+def record_cache_lookup(hit):
+    """
+    Records a cache hit, or a miss.
+    """
+    stats = get_current_stats()
+    if stats is not None:
+        stats.record_cache_lookup(hit)
+
+
+def record_permission_evaluation():
+    """
+    Records the evaluation of a permission rule.
+    """
+    stats = get_current_stats()
+    if stats is not None:
+        stats.record_permission_evaluation()
+
+
+class HotPathInstrumentationMiddleware:
+    """
+    Records the hot path instrumentation data of each request, named after the view it's routed to.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.HOT_PATH_INSTRUMENTATION_ENABLED:
+            return self.get_response(request)
+
+        stats = HotPathStats('request', name=request.path).start()
+        try:
+            return self.get_response(request)
+        finally:
+            stats.stop()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):  # pylint: disable=unused-argument
+        stats = get_current_stats()
+        if stats is not None and request.resolver_match:
+            stats.set_name(request.resolver_match.view_name)
+
+
+@task_prerun.connect
+def start_task_instrumentation(task=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Starts recording the hot path instrumentation data of a celery task.
+    """
+    if settings.HOT_PATH_INSTRUMENTATION_ENABLED:
+        task.request.hot_path_stats = HotPathStats('task', name=task.name).start()
+
+
+@task_postrun.connect
+def stop_task_instrumentation(task=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Stops recording and reports the hot path instrumentation data of a celery task.
+    """
+    stats = getattr(task.request, 'hot_path_stats', None)
+    if stats is not None:
+        task.request.hot_path_stats = None
+        stats.stop()
@@ -0,0 +1,109 @@
+"""Test core.db_routers."""
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from license_manager.apps.core import db_routers
+from license_manager.apps.core.models import User
+from license_manager.apps.subscriptions.tests.factories import UserFactory
+
+
+class _CountUsersView(db_routers.ReplicaReadsMixin, APIView):
+    """
+    Responds with the number of users, creating one first for unsafe requests.
+    """
+    permission_classes = []
+
+    def get(self, request):
+        return Response({'num_users': User.objects.count()})
+
+    def post(self, request):
+        UserFactory()
+        return Response({'num_users': User.objects.count()})
+
+
+@override_settings(REPLICA_DATABASE_ALIAS='replica')
+class ReplicaRouterTests(TestCase):
+    """
+    Tests of the replica router, against a replica database that is never written to,
+    so that reads from it see none of the users created by the tests.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory()
+        self.factory = APIRequestFactory()
+        self.middleware = db_routers.ReplicaStickinessMiddleware(self._call_view)
+        cache.clear()
+
+    def _call_view(self, request):
+        force_authenticate(request, user=self.user)
+        return _CountUsersView.as_view()(request)
+
+    def test_reads_go_to_primary_outside_replica_scope(self):
+        assert User.objects.count() == 1
+
+    def test_reads_go_to_replica_in_replica_scope(self):
+        with db_routers.use_replica_for_reads():
+            assert User.objects.count() == 0
+
+    def test_reads_go_to_primary_when_replica_scope_disabled(self):
+        with db_routers.use_replica_for_reads(enabled=False):
+            assert User.objects.count() == 1
+
+    @override_settings(REPLICA_DATABASE_ALIAS=None)
+    def test_reads_go_to_primary_without_replica(self):
+        with db_routers.use_replica_for_reads():
+            assert User.objects.count() == 1
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        with db_routers.use_replica_for_reads():
+            UserFactory()
+            assert User.objects.count() == 2
+        assert User.objects.using('replica').count() == 0
+
+    def test_objects_read_from_replica_are_written_to_primary(self):
+        with db_routers.use_replica_for_reads():
+            router = db_routers.ReplicaRouter()
+            assert router.db_for_write(User, instance=User(username='someone')) == 'default'
+            assert router.db_for_read(User) == 'default'
+
+    def test_read_batches_from_replica(self):
+        batches = []
+        for batch in db_routers.read_batches_from_replica(User.objects.all() for _ in range(2)):
+            batches.append(batch)
+            # Writes between batches don't stop the next batch from being read from the replica.
+            UserFactory()
+
+        assert batches == [[], []]
+        assert User.objects.count() == 3
+
+    def test_safe_request_reads_from_replica(self):
+        response = self.middleware(self.factory.get('/'))
+        assert response.data == {'num_users': 0}
+        assert not db_routers.is_sticky_to_primary(self.user)
+
+    def test_unsafe_request_reads_from_primary_and_sticks(self):
+        response = self.middleware(self.factory.post('/'))
+        assert response.data == {'num_users': 2}
+        assert db_routers.is_sticky_to_primary(self.user)
+
+        # The next safe request of the same user reads its own write.
+        response = self.middleware(self.factory.get('/'))
+        assert response.data == {'num_users': 2}
+
+    def test_safe_request_of_another_user_reads_from_replica(self):
+        self.middleware(self.factory.post('/'))
+        self.user = UserFactory()
+        response = self.middleware(self.factory.get('/'))
+        assert response.data == {'num_users': 0}
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_stickiness_expires(self):
+        self.middleware(self.factory.post('/'))
+        response = self.middleware(self.factory.get('/'))
+        assert response.data == {'num_users': 0}
@@ -0,0 +1,137 @@
+"""Test core.instrumentation."""
+import json
+from unittest import mock
+
+import ddt
+from celery import shared_task
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from license_manager.apps.core import instrumentation
+from license_manager.apps.core.models import User
+
+
+@shared_task
+def _count_users_task():
+    return User.objects.count() + User.objects.count()
+
+
+def _get_logged_stats(log_output):
+    """
+    Returns the summaries of every hot path stats log line in the given log output.
+    """
+    stats_prefix = 'Hot path stats: '
+    return [
+        json.loads(line.split(stats_prefix, 1)[1])
+        for line in log_output
+        if stats_prefix in line
+    ]
+
+
+@ddt.ddt
+class NormalizeSqlTests(TestCase):
+    """Tests of normalize_sql."""
+
+    @ddt.data(
+        (
+            'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, %s, %s) LIMIT 21',
+            'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (...) LIMIT ?',
+        ),
+        (
+            "UPDATE   \"a\"\n SET \"name\" = 'bob'  WHERE \"a\".\"id\" = %s",
+            'UPDATE "a" SET "name" = ? WHERE "a"."id" = ?',
+        ),
+    )
+    @ddt.unpack
+    def test_normalize_sql(self, sql, expected_sql):
+        assert instrumentation.normalize_sql(sql) == expected_sql
+
+
+class HotPathStatsTests(TestCase):
+    """Tests of HotPathStats."""
+
+    @override_settings(HOT_PATH_SLOW_QUERY_COUNT=2)
+    def test_records_queries_calls_and_cache_lookups(self):
+        stats = instrumentation.HotPathStats('test', name='test-stats').start()
+        try:
+            for _ in range(3):
+                User.objects.filter(id__in=[1, 2]).exists()
+            with instrumentation.outbound_call('segment'):
+                pass
+            instrumentation.outbound_response_hook('LMSApiClient')(mock.Mock(elapsed=mock.Mock(
+                total_seconds=mock.Mock(return_value=0.25),
+            )))
+            instrumentation.record_cache_lookup(hit=True)
+            instrumentation.record_cache_lookup(hit=False)
+            instrumentation.record_cache_lookup(hit=False)
+            instrumentation.record_permission_evaluation()
+        finally:
+            with mock.patch.object(instrumentation, 'set_custom_attribute') as mock_set_custom_attribute:
+                stats.stop()
+
+        summary = stats.as_dict()
+        assert summary['db_query_count'] == 3
+        assert summary['db_time_ms'] > 0
+        assert len(summary['slowest_queries']) == 2
+        assert summary['slowest_queries'][0]['sql'].endswith('IN (...) LIMIT ?')
+        assert summary['outbound_calls']['segment']['count'] == 1
+        assert summary['outbound_calls']['LMSApiClient'] == {'count': 1, 'time_ms': 250.0}
+        assert (summary['cache_hits'], summary['cache_misses']) == (1, 2)
+        assert summary['permission_evaluations'] == 1
+        mock_set_custom_attribute.assert_any_call('hot_path.db_query_count', 3)
+        mock_set_custom_attribute.assert_any_call('hot_path.LMSApiClient.call_count', 1)
+        mock_set_custom_attribute.assert_any_call('hot_path.cache_misses', 2)
+        mock_set_custom_attribute.assert_any_call('hot_path.permission_evaluations', 1)
+
+        # Nothing is recorded once the stats are stopped
+        User.objects.count()
+        instrumentation.record_cache_lookup(hit=True)
+        assert stats.db_query_count == 3
+        assert stats.cache_hits == 1
+        assert instrumentation.get_current_stats() is None
+
+
+class HotPathInstrumentationMiddlewareTests(TestCase):
+    """Tests of HotPathInstrumentationMiddleware."""
+
+    def test_request_stats_logged(self):
+        with self.assertLogs(instrumentation.logger, level='INFO') as logs:
+            self.client.get(reverse('health'))
+
+        [summary] = _get_logged_stats(logs.output)
+        assert summary['kind'] == 'request'
+        assert summary['name'] == 'health'
+        assert summary['db_query_count'] >= 1
+        assert summary['db_query_budget'] is None
+
+    @override_settings(HOT_PATH_QUERY_BUDGETS={'health': 0})
+    def test_query_budget_exceeded(self):
+        with self.assertLogs(instrumentation.logger, level='WARNING') as logs:
+            self.client.get(reverse('health'))
+
+        [warning] = [line for line in logs.output if line.startswith('WARNING')]
+        assert 'The request health exceeded its budget of 0 DB queries' in warning
+        assert 'Stack sample:' in warning
+
+    @override_settings(HOT_PATH_INSTRUMENTATION_ENABLED=False)
+    def test_disabled(self):
+        with mock.patch.object(instrumentation.HotPathStats, 'report') as mock_report:
+            self.client.get(reverse('health'))
+
+        mock_report.assert_not_called()
+
+
+class TaskInstrumentationTests(TestCase):
+    """Tests of the celery task instrumentation."""
+
+    @override_settings(HOT_PATH_DEFAULT_QUERY_BUDGET=1)
+    def test_task_stats_logged(self):
+        with self.assertLogs(instrumentation.logger, level='INFO') as logs:
+            _count_users_task.apply()
+
+        [summary] = _get_logged_stats(logs.output)
+        assert summary['kind'] == 'task'
+        assert summary['name'] == _count_users_task.name
+        assert summary['db_query_count'] == 2
+        assert summary['db_query_budget_exceeded']
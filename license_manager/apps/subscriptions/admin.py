@@ -5,7 +5,7 @@ from django.conf import settings
 from django.contrib import admin, messages
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import connection, transaction
+from django.db import transaction
 from django.http import HttpResponseRedirect
 from django.shortcuts import render
 from django.urls import reverse
@@ -21,7 +21,12 @@ from license_manager.apps.subscriptions.api import (
     sync_agreement_with_enterprise_customer,
     toggle_auto_apply_licenses,
 )
+from license_manager.apps.subscriptions.bulk_deletion import (
+    bulk_delete,
+    bulk_delete_licenses,
+)
 from license_manager.apps.subscriptions.constants import (
+    REVOKED,
     LicenseActionSource,
     LicenseActorType,
 )
@@ -35,9 +40,12 @@ from license_manager.apps.subscriptions.forms import (
     SubscriptionPlanRenewalForm,
 )
 from license_manager.apps.subscriptions.models import (
+    ArchivedLicense,
+    BatchJobCheckpoint,
     CustomerAgreement,
     CustomSubscriptionExpirationMessaging,
     License,
+    LicenseDeletionJob,
     LicenseEvent,
     LicenseTransferJob,
     Notification,
@@ -57,20 +65,21 @@ def get_related_object_link(admin_viewname, object_pk, object_str):
     )
 
 
-def _bulk_delete_request_handler(request, queryset, model_name, table_name, delete_action_method):
+def _bulk_delete_request_handler(request, queryset, model_name, delete_action_method):
     """
     Delete a large number of model instances, without listing each instance on the confirmation page.
     A confirmation page is still presented to the user.
     We achieve this as follows:
     * On the first POST (when the user selects the action and clicks "Go"), we take
-      the SQL from the queryset, with its parameters, and store it in the django cache.
+      the query of the queryset and store it in the django cache.
     * Our Form stores the cache key, which we'll need later.
     * We put the count of records into the rendered template.
     * In the template rendered to the user, they'll see a count and click "Confirm". The input
       name of the submit element routes the request back to here, with "confirm_deletion" as a key
       in the POST body.  The POST body will also have our cache key inside it.
     * Using the cache key, the ``if 'confirm_deletion'`` branch below will load the query
-      and params from the cache, then we'll execute it as a raw queryset.
+      from the cache, and delete its records in batches with ``bulk_delete``, each in its own transaction
+      and without sending a deletion signal per record.
 
     We do all this because deleting in bulk means we might want to delete more records than
     can be transferred back and forth via HTTP headers and query params.
@@ -78,7 +87,7 @@ def _bulk_delete_request_handler(request, queryset, model_name, table_name, dele
     if 'confirm_deletion' not in request.POST:
         cache_key = f'bulk-delete-admin-{model_name}:{uuid.uuid4()}'
         record_count = queryset.count()
-        cache.set(cache_key, queryset.query.sql_with_params(), 600)
+        cache.set(cache_key, queryset.query, 600)
 
         form = BulkDeleteForm(
             # _selected_action needs some model instance identifiers just for the routing to work,
@@ -101,24 +110,22 @@ def _bulk_delete_request_handler(request, queryset, model_name, table_name, dele
         )
     elif 'confirm_deletion' in request.POST:
         # process the confirmation of deletion of these records
-        cached_sql, params = cache.get(request.POST['cache_key'])
+        queryset_to_delete = queryset.model.objects.all()
+        queryset_to_delete.query = cache.get(request.POST['cache_key'])
         cache.delete(request.POST['cache_key'])
 
-        # grab everything after the FROM of our SELECT query,
-        # and turn it into a DELETE query. Strip the ORDER BY out of it.
-        delete_sql = f"DELETE `{table_name}` FROM {cached_sql.partition('FROM')[2]}"
-        delete_sql = delete_sql.partition('ORDER BY')[0]
-
         try:
-            with connection.cursor() as cursor:
-                cursor.execute(delete_sql, params)
+            if queryset.model is License:
+                num_deleted = bulk_delete_licenses(queryset_to_delete, history_user_id=request.user.id)
+            else:
+                num_deleted = bulk_delete(queryset_to_delete, history_user_id=request.user.id)
         except Exception as exc:  # pylint: disable=broad-except
             messages.add_message(request, messages.ERROR, exc)
         else:
             messages.add_message(
                 request,
                 messages.SUCCESS,
-                f"Successfully deleted {request.POST['record_count']} {model_name} records",
+                f"Successfully deleted {num_deleted} {model_name} records",
             )
 
         return HttpResponseRedirect(request.get_full_path())
@@ -281,7 +288,6 @@ class LicenseAdmin(DjangoQLSearchMixin, SimpleHistoryAdmin):
             request=request,
             queryset=queryset,
             model_name='License',
-            table_name='subscriptions_license',
             delete_action_method='delete_bulk_licenses',
         )
 
@@ -293,6 +299,8 @@ class SubscriptionPlanAdmin(DjangoQLSearchMixin, SimpleHistoryAdmin):
     # Do not include these fields on the create page.
     fields_skip_create = [
         'desired_num_licenses',
+        'num_virtual_unassigned_licenses',
+        'auto_apply_enabled_at',
     ]
     # This is not to be confused with readonly_fields of the BaseModelAdmin class.
     # This is only used for field display sorting purposes (they should appear lower on the page).
@@ -303,6 +311,9 @@ class SubscriptionPlanAdmin(DjangoQLSearchMixin, SimpleHistoryAdmin):
         'customer_agreement',
         'last_freeze_timestamp',
         'salesforce_opportunity_id',
+        'uses_virtual_unassigned_licenses',
+        'num_virtual_unassigned_licenses',
+        'auto_apply_enabled_at',
     ]
     # Writable fields appear higher on the page.
     writable_fields = [
@@ -440,13 +451,23 @@ class SubscriptionPlanAdmin(DjangoQLSearchMixin, SimpleHistoryAdmin):
     )
     def process_unused_licenses_post_freeze(self, request, queryset):
         """
-        Used as an action; this function deletes unused licenses after a plan is frozen.
+        Used as an action; this function freezes the selected plans, and enqueues a job per plan to delete
+        its unused licenses in the background.
         """
         try:
             with transaction.atomic():
                 for subscription_plan in queryset:
-                    delete_unused_licenses_post_freeze(subscription_plan)
-                messages.add_message(request, messages.SUCCESS, 'Successfully froze selected Subscription Plans.')
+                    delete_unused_licenses_post_freeze(
+                        subscription_plan,
+                        in_background=True,
+                        requested_by=request.user,
+                    )
+                messages.add_message(
+                    request,
+                    messages.SUCCESS,
+                    'Successfully froze selected Subscription Plans. Their unused licenses are being deleted by '
+                    'License Deletion Jobs.',
+                )
         except UnprocessableSubscriptionPlanFreezeError as exc:
             messages.add_message(request, messages.ERROR, exc)
 
@@ -458,14 +479,19 @@ class SubscriptionPlanAdmin(DjangoQLSearchMixin, SimpleHistoryAdmin):
         Delete all revoked licenses for the selected Subscription Plans. Good to use when
         you want to delete a plan with thousands of revoked licenses and don't want to worry
         about timeouts from the deletion confirmation page.
+
+        The licenses of each plan are deleted in the background by a ``LicenseDeletionJob``.
         """
         processed_plan_titles = []
         with transaction.atomic():
             for subscription_plan in queryset:
-                subscription_plan.revoked_licenses.delete()
+                LicenseDeletionJob.create_license_deletion_job(subscription_plan, REVOKED, requested_by=request.user)
                 processed_plan_titles.append(subscription_plan.title)
         messages.add_message(
-            request, messages.SUCCESS, f'Successfully deleted revoked licenses for plans {processed_plan_titles}.',
+            request,
+            messages.SUCCESS,
+            f'Started deleting revoked licenses for plans {processed_plan_titles}. '
+            'Their progress is shown by License Deletion Jobs.',
         )
 
     @admin.action(
@@ -914,6 +940,134 @@ class LicenseTransferJobAdmin(admin.ModelAdmin):
             transfer_job.process()
 
 
+@admin.register(LicenseDeletionJob)
+class LicenseDeletionJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'uuid',
+        'subscription_plan',
+        'license_status',
+        'status',
+        'num_licenses_deleted',
+        'modified',
+        'completed_at',
+    )
+
+    list_filter = (
+        'status',
+        'license_status',
+    )
+
+    search_fields = (
+        'subscription_plan__uuid__startswith',
+        'subscription_plan__title__istartswith',
+    )
+
+    list_select_related = ['subscription_plan']
+
+    readonly_fields = [
+        'subscription_plan',
+        'license_status',
+        'status',
+        'num_licenses_deleted',
+        'completed_at',
+        'requested_by',
+    ]
+
+    actions = ['enqueue_license_deletion_jobs']
+
+    def has_add_permission(self, request):
+        """
+        Jobs are only created by the actions of the subscription plan admin.
+        """
+        return False
+
+    @admin.action(description="Enqueue selected license deletion jobs again")
+    def enqueue_license_deletion_jobs(self, request, queryset):
+        """
+        Enqueues the selected jobs that aren't completed again, e.g. after they failed.
+        """
+        for license_deletion_job in queryset.filter(completed_at__isnull=True):
+            license_deletion_job.enqueue()
+
+
+@admin.register(BatchJobCheckpoint)
+class BatchJobCheckpointAdmin(admin.ModelAdmin):
+    list_display = (
+        'job_name',
+        'scope',
+        'shard_index',
+        'num_shards',
+        'num_batches',
+        'num_processed',
+        'modified',
+        'completed_at',
+    )
+
+    list_filter = (
+        'job_name',
+    )
+
+    search_fields = (
+        'job_name__startswith',
+        'scope__startswith',
+    )
+
+    readonly_fields = [
+        'job_name',
+        'scope',
+        'num_shards',
+        'shard_index',
+        'last_pk',
+        'num_batches',
+        'num_processed',
+        'metrics',
+        'completed_at',
+    ]
+
+    def has_add_permission(self, request):
+        """
+        Checkpoints are only recorded by the batch jobs of management commands.
+        """
+        return False
+
+
+@admin.register(ArchivedLicense)
+class ArchivedLicenseAdmin(admin.ModelAdmin):
+    list_display = (
+        'uuid',
+        'subscription_plan',
+        'status',
+        'user_email',
+        'archived_at',
+    )
+
+    list_filter = (
+        'status',
+    )
+
+    search_fields = (
+        'uuid__startswith',
+        'user_email',
+        'subscription_plan__uuid__startswith',
+    )
+
+    list_select_related = (
+        'subscription_plan',
+    )
+
+    def has_add_permission(self, request):
+        """
+        Licenses are only archived by the archive_expired_licenses command.
+        """
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """
+        Archived licenses are restored with the restore_archived_licenses command, rather than edited.
+        """
+        return False
+
+
 @admin.register(LicenseEvent)
 class LicenseEventAdmin(DjangoQLSearchMixin, admin.ModelAdmin):
     list_display = (
@@ -977,7 +1131,6 @@ class LicenseEventAdmin(DjangoQLSearchMixin, admin.ModelAdmin):
             request=request,
             queryset=queryset,
             model_name='LicenseEvent',
-            table_name='subscriptions_licenseevent',
             delete_action_method='delete_bulk_license_events',
         )
 
@@ -1009,6 +1162,5 @@ class SubscriptionLicenseSourceAdmin(DjangoQLSearchMixin, admin.ModelAdmin):
             request=request,
             queryset=queryset,
             model_name='SubscriptionLicenseSource',
-            table_name='subscriptions_subscriptionlicensesource',
             delete_action_method='delete_bulk_license_sources',
         )
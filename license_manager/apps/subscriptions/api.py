@@ -2,19 +2,25 @@
 Python APIs exposed by the Subscriptions app to other in-process apps.
 """
 import logging
+from datetime import timedelta
 from uuid import uuid4
 
 from django.db import transaction
 from requests.exceptions import HTTPError
 
 from license_manager.apps.api_client.enterprise import EnterpriseApiClient
-from license_manager.apps.subscriptions import event_utils
 
+from .bulk_deletion import bulk_delete_licenses
+from .change_feed import restamp_license_changes
 from .constants import (
     ACTIVATED,
     ASSIGNED,
+    LICENSE_EXPIRATION_BATCH_SIZE,
+    LICENSE_RENEWAL_CHUNK_SIZE,
+    LICENSE_RENEWAL_EVENT_BATCH_SIZE,
     REVOCABLE_LICENSE_STATUSES,
     UNASSIGNED,
+    USER_EMAIL_SYNC_CHUNK_SIZE,
     LicenseActionSource,
     LicenseActionType,
     LicenseActorType,
@@ -27,8 +33,8 @@ from .exceptions import (
     RenewalProcessingError,
     UnprocessableSubscriptionPlanFreezeError,
 )
-from .models import License, LicenseAction, SubscriptionPlan
-from .utils import localized_utcnow
+from .models import License, LicenseAction, LicenseDeletionJob, SubscriptionPlan
+from .utils import chunks, localized_utcnow
 
 
 logger = logging.getLogger(__name__)
@@ -82,9 +88,15 @@ def renew_subscription(
     actor_lms_user_id=None,
     source=LicenseActionSource.RENEWAL_JOB,
     correlation_id=None,
+    chunk_size=LICENSE_RENEWAL_CHUNK_SIZE,
 ):
     """
     Renew the subscription plan.
+
+    Original and future licenses are paired and renewed in keyset chunks of ``chunk_size``,
+    all inside a single transaction, so that renewing very large plans never materializes
+    every license in memory at once. Renewal events are tracked asynchronously, in batches,
+    once the transaction has been committed.
     """
     original_plan = subscription_plan_renewal.prior_subscription_plan
     original_licenses = _original_licenses_to_copy(
@@ -92,7 +104,7 @@ def renew_subscription(
         subscription_plan_renewal.license_types_to_copy,
     )
 
-    if subscription_plan_renewal.number_of_licenses < len(original_licenses):
+    if subscription_plan_renewal.number_of_licenses < original_licenses.count():
         raise RenewalProcessingError("Cannot renew for fewer than the number of original activated licenses.")
 
     future_plan = subscription_plan_renewal.renewed_subscription_plan
@@ -110,6 +122,7 @@ def renew_subscription(
             is_revocation_cap_enabled=subscription_plan_renewal.prior_subscription_plan.is_revocation_cap_enabled,
             revoke_max_percentage=subscription_plan_renewal.prior_subscription_plan.revoke_max_percentage,
             for_internal_use_only=subscription_plan_renewal.prior_subscription_plan.for_internal_use_only,
+            uses_virtual_unassigned_licenses=original_plan.uses_virtual_unassigned_licenses,
         )
 
     # When creating SubscriptionPlans in Django admin, we create enough
@@ -117,17 +130,18 @@ def renew_subscription(
     # If a user enters a non-zero number in this field while setting up a new
     # SubscriptionPlanRenewal (i.e. so that there's an existant plan to renew
     # into), we'll have to modify existing Licenses in the renewed plan.
-    licenses_for_renewal = list(future_plan.licenses.all())
+    licenses_for_renewal = future_plan.licenses.all()
 
     # Are there any licenses in the renewed plan that aren't UNASSIGNED?
     # because there shouldn't be
-    if any(_license.status != UNASSIGNED for _license in licenses_for_renewal):
+    if licenses_for_renewal.exclude(status=UNASSIGNED).exists():
         raise RenewalProcessingError(
             f"Renewal ID {subscription_plan_renewal.id} can't be processed; there are existing licenses "
             "in the renewed plan that are activated/assigned/revoked."
         )
 
-    if len(licenses_for_renewal) > subscription_plan_renewal.number_of_licenses:
+    num_licenses_for_renewal = licenses_for_renewal.count() + future_plan.num_virtual_unassigned_licenses
+    if num_licenses_for_renewal > subscription_plan_renewal.number_of_licenses:
         raise RenewalProcessingError("More licenses exist than were requested to be renewed.")
 
     with transaction.atomic():
@@ -135,8 +149,10 @@ def renew_subscription(
         future_plan.increase_num_licenses(
             subscription_plan_renewal.number_of_licenses - future_plan.num_licenses
         )
+        # Renewed licenses need concrete records in the future plan, even if it uses virtual unassigned licenses.
+        future_plan.materialize_unassigned_licenses(original_licenses.count())
 
-        _renew_all_licenses(
+        renewed_license_uuids = _renew_all_licenses(
             original_licenses,
             future_plan,
             is_auto_renewed,
@@ -145,6 +161,7 @@ def renew_subscription(
             actor_lms_user_id=actor_lms_user_id,
             source=source,
             correlation_id=correlation_id,
+            chunk_size=chunk_size,
         )
 
         if original_plan.should_auto_apply_licenses:
@@ -155,11 +172,19 @@ def renew_subscription(
             else:
                 toggle_auto_apply_licenses(customer_agreement_id, future_plan.uuid)
 
+        # The renewal may run for longer than the change feed waits for changes to commit.
+        restamp_license_changes(future_plan.licenses.all())
+        restamp_license_changes(original_plan.licenses.filter(renewed_to__subscription_plan=future_plan))
+
         subscription_plan_renewal.renewed_subscription_plan = future_plan
         subscription_plan_renewal.processed = True
         subscription_plan_renewal.processed_datetime = localized_utcnow()
         subscription_plan_renewal.save()
 
+        transaction.on_commit(
+            lambda: _track_renewed_licenses(renewed_license_uuids, is_auto_renewed)
+        )
+
 
 def _renew_all_licenses(
     original_licenses,
@@ -170,39 +195,105 @@ def _renew_all_licenses(
     actor_lms_user_id,
     source,
     correlation_id,
+    chunk_size=LICENSE_RENEWAL_CHUNK_SIZE,
 ):
     """
     We assume at this point that the future plan has at least as many licenses
-    as the number of licenses in the original plan.  Does a bulk update of
-    the renewed licenses.
-    """
-    future_licenses = []
-    renewed_license_pairs = []
+    as the number of licenses in the original plan.  Streams the original licenses
+    and the unassigned licenses of the future plan in primary-key ordered keyset chunks,
+    and does a bulk update of each chunk of renewed licenses.
 
+    Returns:
+        list: The (string) uuids of every renewed license in the future plan.
+    """
     if not correlation_id:
         correlation_id = str(uuid4())
 
-    for original_license, future_license in zip(original_licenses, future_plan.licenses.all()):
+    original_licenses = original_licenses.order_by('uuid')
+    future_licenses = future_plan.licenses.filter(status=UNASSIGNED).order_by('uuid')
+    renewed_license_uuids = []
+    last_original_uuid = None
+    last_future_uuid = None
+
+    while True:
+        original_chunk_queryset = original_licenses
+        if last_original_uuid:
+            original_chunk_queryset = original_chunk_queryset.filter(uuid__gt=last_original_uuid)
+        original_chunk = list(original_chunk_queryset[:chunk_size])
+        if not original_chunk:
+            break
+
+        future_chunk_queryset = future_licenses
+        if last_future_uuid:
+            future_chunk_queryset = future_chunk_queryset.filter(uuid__gt=last_future_uuid)
+        future_chunk = list(future_chunk_queryset[:len(original_chunk)])
+
+        renewed_license_pairs = _renew_license_chunk(original_chunk, future_chunk, future_plan, chunk_size)
+        _create_renewal_license_actions(
+            renewed_license_pairs,
+            future_plan,
+            is_auto_renewed,
+            subscription_plan_renewal,
+            actor_type=actor_type,
+            actor_lms_user_id=actor_lms_user_id,
+            source=source,
+            correlation_id=correlation_id,
+        )
+        renewed_license_uuids.extend(str(future_license.uuid) for _, future_license in renewed_license_pairs)
+
+        last_original_uuid = original_chunk[-1].uuid
+        if future_chunk:
+            last_future_uuid = future_chunk[-1].uuid
+        if len(original_chunk) < chunk_size:
+            break
+
+    return renewed_license_uuids
+
+
+def _renew_license_chunk(original_chunk, future_chunk, future_plan, chunk_size):
+    """
+    Copies the state of each original license onto its paired future license, and links
+    each original license to its renewal, with one set-based update per side of the pair.
+    """
+    renewed_license_pairs = list(zip(original_chunk, future_chunk))
+    assigned_date = localized_utcnow()
+    for original_license, future_license in renewed_license_pairs:
         future_license.status = original_license.status
         future_license.user_email = original_license.user_email
         future_license.lms_user_id = original_license.lms_user_id
         future_license.activation_key = original_license.activation_key
-        future_license.assigned_date = localized_utcnow()
+        future_license.assigned_date = assigned_date
         if original_license.status == ACTIVATED:
             future_license.activation_date = future_plan.start_date
-
-        future_licenses.append(future_license)
-        renewed_license_pairs.append((original_license, future_license))
         original_license.renewed_to = future_license
+
     License.bulk_update(
-        future_licenses,
+        [future_license for _, future_license in renewed_license_pairs],
         ['status', 'user_email', 'lms_user_id', 'activation_key', 'activation_date', 'assigned_date'],
+        batch_size=chunk_size,
     )
     License.bulk_update(
-        original_licenses,
+        [original_license for original_license, _ in renewed_license_pairs],
         ['renewed_to'],
+        batch_size=chunk_size,
     )
+    return renewed_license_pairs
+
 
+def _create_renewal_license_actions(
+    renewed_license_pairs,
+    future_plan,
+    is_auto_renewed,
+    subscription_plan_renewal,
+    actor_type,
+    actor_lms_user_id,
+    source,
+    correlation_id,
+):
+    """
+    Writes a RENEWED LicenseAction row for each renewed license pair.
+    Failing to write these rows never fails the renewal itself.
+    """
     try:
         with transaction.atomic():
             LicenseAction.objects.bulk_create([
@@ -236,18 +327,102 @@ def _renew_all_licenses(
             subscription_plan_renewal.id,
         )
 
-    event_utils.track_license_changes(future_licenses, SegmentEvents.LICENSE_RENEWED, {
-        'is_auto_renewed': is_auto_renewed
-    })
+
+def _track_renewed_licenses(renewed_license_uuids, is_auto_renewed):
+    """
+    Enqueues batches of asynchronous LICENSE_RENEWED event tracking for the given license uuids.
+    """
+    # Imported here to avoid a circular import, since the api tasks depend on this module.
+    from license_manager.apps.api.tasks import (  # pylint: disable=import-outside-toplevel
+        track_license_changes_task,
+    )
+
+    for license_uuid_batch in chunks(renewed_license_uuids, LICENSE_RENEWAL_EVENT_BATCH_SIZE):
+        track_license_changes_task.delay(
+            license_uuid_batch,
+            SegmentEvents.LICENSE_RENEWED,
+            {'is_auto_renewed': is_auto_renewed},
+        )
+
+
+def expire_subscription_plan(expired_subscription_plan):
+    """
+    Terminates the licensed course enrollments of the assigned and activated licenses of an expired plan, and marks
+    the expiration of the plan as processed unless terminating some of them failed.
+    """
+    # Imported here to avoid a circular import, since the api tasks depend on this module.
+    from license_manager.apps.api.tasks import (  # pylint: disable=import-outside-toplevel
+        license_expiration_task,
+    )
+
+    expired_licenses = []
+
+    for lcs in expired_subscription_plan.licenses.iterator():
+        if lcs.status in [ASSIGNED, ACTIVATED]:
+            expired_licenses.append(lcs)
+
+    any_failures = False
+
+    # Terminate the licensed course enrollments
+    for license_chunk in chunks(expired_licenses, LICENSE_EXPIRATION_BATCH_SIZE):
+        try:
+            license_chunk_uuids = [str(lcs.uuid) for lcs in license_chunk]
+
+            # We might be processing a plan that expired further in the past to fix bad data. We don't
+            # want to modify a course enrollment if it's been modified after the plan expiration because a user might
+            # have upgraded the course.
+            ignore_enrollments_modified_after = expired_subscription_plan.expiration_date.isoformat() \
+                if expired_subscription_plan.expiration_date < localized_utcnow() - timedelta(days=1) else None
+
+            license_expiration_task(
+                license_chunk_uuids,
+                ignore_enrollments_modified_after=ignore_enrollments_modified_after
+            )
+        except Exception:  # pylint: disable=broad-except
+            any_failures = True
+            msg = 'Failed to terminate course enrollments for learners in subscription: {}'.format(
+                expired_subscription_plan.uuid)
+            logger.exception(msg)
+
+    if not any_failures:
+        message = 'Terminated course enrollments for learners in subscription: {}'.format(
+            expired_subscription_plan.uuid)
+        logger.info(message)
+
+        expired_subscription_plan.expiration_processed = True
+        expired_subscription_plan.save(update_fields=['expiration_processed'])
+
+
+def process_subscription_plan_expiration(expired_subscription_plan):
+    """
+    Expires ``expired_subscription_plan`` and all of the prior plans of its renewal chain, unless it has a renewal,
+    in which case licensed course enrollments are kept until the last renewed plan expires.
+
+    Returns:
+        bool: Whether the expiration was processed.
+    """
+    renewal_for_plan = expired_subscription_plan.get_renewal()
+    if renewal_for_plan:
+        msg = 'Not processing expiration for subscription: {}, plan has a renewal.'.format(
+            expired_subscription_plan.uuid)
+        logger.info(msg)
+        return False
+
+    expire_subscription_plan(expired_subscription_plan)
+
+    # revoke licensed course enrollments for all previous plans
+    for prior_renewal in expired_subscription_plan.prior_renewals:
+        expire_subscription_plan(prior_renewal.prior_subscription_plan)
+    return True
 
 
 def _original_licenses_to_copy(original_plan, license_types_to_copy):
     """
-    Returns a list of licenses to copy from an original plan to
+    Returns a queryset of licenses to copy from an original plan to
     a future plan as part of the renewal process.
     """
     if license_types_to_copy == LicenseTypesToRenew.NOTHING:
-        return []
+        return original_plan.licenses.none()
 
     license_status_kwargs = {}
     if license_types_to_copy == LicenseTypesToRenew.ASSIGNED_AND_ACTIVATED:
@@ -255,21 +430,31 @@ def _original_licenses_to_copy(original_plan, license_types_to_copy):
     elif license_types_to_copy == LicenseTypesToRenew.ACTIVATED:
         license_status_kwargs = {'status': ACTIVATED}
 
-    return list(original_plan.licenses.filter(**license_status_kwargs))  # pylint: disable=possibly-used-before-assignment
+    return original_plan.licenses.filter(**license_status_kwargs)
 
 
-def delete_unused_licenses_post_freeze(subscription_plan):
+def delete_unused_licenses_post_freeze(subscription_plan, in_background=False, requested_by=None):
     """
     Processes a "freeze" request on a SubscriptionPlan. Any unassigned licenses will be deleted, but
     licenses in other states (e.g., activated, assigned, revoked) will persist.
 
     The ability for a Subscription Plan to be "frozen" relies on a configurable toggle.
+
+    Unassigned licenses are deleted in batches, without one deletion event per license. With ``in_background``,
+    they're deleted by a ``LicenseDeletionJob`` once the current transaction commits, rather than right away.
     """
     if not subscription_plan.can_freeze_unused_licenses:
         raise UnprocessableSubscriptionPlanFreezeError(
             f"Cannot freeze {subscription_plan}. The plan does not support freezing unused licenses."
         )
-    subscription_plan.unassigned_licenses.delete()
+    if in_background:
+        LicenseDeletionJob.create_license_deletion_job(subscription_plan, UNASSIGNED, requested_by=requested_by)
+    else:
+        bulk_delete_licenses(
+            subscription_plan.unassigned_licenses,
+            history_user_id=requested_by.id if requested_by else None,
+        )
+    subscription_plan.num_virtual_unassigned_licenses = 0
     subscription_plan.last_freeze_timestamp = localized_utcnow()
     subscription_plan.save()
 
@@ -293,6 +478,38 @@ def sync_agreement_with_enterprise_customer(customer_agreement):
         raise CustomerAgreementError(error_message) from exc
 
 
+def sync_user_emails(new_email_by_lms_user_id):
+    """
+    Updates the ``user_email`` of the licenses of each lms user id to their new email address.
+
+    The licenses of many users are loaded with one query per chunk of ``USER_EMAIL_SYNC_CHUNK_SIZE`` users,
+    and only the licenses with an outdated email are written back, in bulk and with history.
+    Emails are stored lowercased, whichever path they were synced from.
+
+    Args:
+        new_email_by_lms_user_id (dict): The new email address of each lms user id.
+
+    Returns:
+        int: The number of licenses updated.
+    """
+    num_licenses_updated = 0
+    for lms_user_id_chunk in chunks(list(new_email_by_lms_user_id), USER_EMAIL_SYNC_CHUNK_SIZE):
+        outdated_licenses = []
+        for user_license in License.objects.filter(lms_user_id__in=lms_user_id_chunk):
+            new_email = new_email_by_lms_user_id[user_license.lms_user_id].lower()
+            if user_license.user_email != new_email:
+                user_license.user_email = new_email
+                outdated_licenses.append(user_license)
+
+        License.bulk_update(outdated_licenses, ['user_email'])
+        num_licenses_updated += len(outdated_licenses)
+
+    logger.info(
+        'Synced the emails of %s users, updating %s licenses.', len(new_email_by_lms_user_id), num_licenses_updated,
+    )
+    return num_licenses_updated
+
+
 def toggle_auto_apply_licenses(customer_agreement_uuid, subscription_uuid):
     """
     Turn auto apply licenses on for the subscription with the given uuid and off for all other
@@ -0,0 +1,300 @@
+"""
+Cold archive of the licenses of plans that expired long ago.
+
+The licenses of a plan stay in the license table, and their historical records in the license history table,
+years after the plan expired, and every query on those tables pays for them. ``archive_licenses`` moves
+licenses, along with their historical records, license source and events, to the ``ArchivedLicense`` and
+``ArchivedHistoricalLicense`` tables, and ``restore_archived_licenses`` moves them back. Like ``bulk_delete``,
+both move rows in batches ordered by primary key, each in its own transaction and without per-row signals, so an
+interrupted run leaves whole batches moved and can simply be run again.
+
+The learner entitlements of archived licenses are deleted, and rebuilt when the licenses are restored. The
+license assignment job emails of archived licenses are unlinked from them, and linked again on restore. The
+license actions of archived licenses, which make up the audit log, stay where they are, since they don't
+reference licenses with a foreign key constraint.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from logging import getLogger
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Exists, OuterRef
+
+from .bulk_deletion import get_reverse_relations
+from .exceptions import LicenseArchiveError
+from .models import (
+    ArchivedHistoricalLicense,
+    ArchivedLicense,
+    LearnerEntitlement,
+    License,
+    LicenseEvent,
+    SubscriptionLicenseSource,
+    SubscriptionPlan,
+)
+from .utils import localized_utcnow
+
+
+logger = getLogger(__name__)
+
+# The relations to licenses that archival moves or unlinks, as (related model name, field name).
+ARCHIVED_LICENSE_RELATIONS = {
+    ('License', 'renewed_to'),
+    ('HistoricalLicense', 'renewed_to'),
+    ('LearnerEntitlement', 'license'),
+    ('SubscriptionLicenseSource', 'license'),
+    ('HistoricalSubscriptionLicenseSource', 'license'),
+    ('LicenseEvent', 'license'),
+    ('LicenseAction', 'license'),
+    ('LicenseAssignmentJobEmail', 'license'),
+}
+
+
+def _check_license_relations():
+    """
+    Raises if a relation to licenses was added that archival doesn't know how to handle.
+    """
+    unhandled_relations = {
+        (related_object.related_model.__name__, related_object.field.name)
+        for related_object in get_reverse_relations(License)
+    } - ARCHIVED_LICENSE_RELATIONS
+    if unhandled_relations:
+        raise LicenseArchiveError(f'Cannot archive licenses with relations from {sorted(unhandled_relations)}.')
+
+
+def _serialize(obj, fields):
+    """
+    Returns the values of the given ``fields`` of ``obj`` as strings, keeping the full precision of dates.
+    """
+    return {
+        field.attname: None if field.value_from_object(obj) is None else field.value_to_string(obj)
+        for field in fields
+    }
+
+
+def _deserialize(fields, values):
+    """
+    Returns the values of the given ``fields`` from ``values`` serialized by ``_serialize``.
+    """
+    return {field.attname: field.to_python(values[field.attname]) for field in fields if field.attname in values}
+
+
+def _move_in_batches(queryset, move_batch, batch_size, verb):
+    """
+    Calls ``move_batch`` with the rows of ``queryset`` in batches of ``batch_size`` rows ordered by primary key,
+    each batch in its own transaction, and returns the number of rows moved.
+    """
+    model = queryset.model
+    queryset = queryset.order_by('pk')
+    using = router.db_for_write(model)
+
+    num_moved = 0
+    last_pk = None
+    while True:
+        with transaction.atomic(using=using):
+            batch_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(batch_queryset[:batch_size])
+            if not batch:
+                break
+            move_batch(batch, using)
+
+        num_moved += len(batch)
+        last_pk = batch[-1].pk
+        logger.info(f'{verb} {num_moved} licenses so far.')
+    return num_moved
+
+
+def _archive_batch(licenses, using):
+    """
+    Moves the given licenses, with their historical records, source and events, to the archive tables, and unlinks
+    the license assignment job emails that reference them.
+    """
+    # pylint: disable=import-outside-toplevel
+    from license_manager.apps.api.models import LicenseAssignmentJobEmail
+
+    history_model = License.history.model
+    source_history_model = SubscriptionLicenseSource.history.model
+    license_uuids = [license_obj.uuid for license_obj in licenses]
+
+    sources = {
+        source.license_id: _serialize(source, SubscriptionLicenseSource._meta.concrete_fields)
+        for source in SubscriptionLicenseSource.objects.filter(license_id__in=license_uuids)
+    }
+    source_history = defaultdict(list)
+    for record in source_history_model.objects.filter(license_id__in=license_uuids).order_by('history_id'):
+        source_history[record.license_id].append(_serialize(record, source_history_model._meta.concrete_fields))
+    events = defaultdict(list)
+    for event in LicenseEvent.objects.filter(license_id__in=license_uuids).order_by('id'):
+        events[event.license_id].append(_serialize(event, LicenseEvent._meta.concrete_fields))
+    renewed_from_uuids = dict(
+        License.objects.filter(renewed_to_id__in=license_uuids).values_list('renewed_to_id', 'uuid'),
+    )
+    job_email_ids = defaultdict(list)
+    for job_email_id, license_uuid in LicenseAssignmentJobEmail.objects.filter(
+        license_id__in=license_uuids,
+    ).values_list('id', 'license_id').order_by('id'):
+        job_email_ids[license_uuid].append(job_email_id)
+
+    copied_fields = [field for field in License._meta.concrete_fields if field.attname != 'renewed_to_id']
+    ArchivedLicense.objects.using(using).bulk_create([
+        ArchivedLicense(
+            renewed_to_uuid=license_obj.renewed_to_id,
+            renewed_from_uuid=renewed_from_uuids.get(license_obj.uuid),
+            source=(
+                {'source': sources.get(license_obj.uuid), 'history': source_history[license_obj.uuid]}
+                if license_obj.uuid in sources or license_obj.uuid in source_history else None
+            ),
+            events=events[license_obj.uuid],
+            assignment_job_email_ids=job_email_ids[license_obj.uuid],
+            **{field.attname: getattr(license_obj, field.attname) for field in copied_fields},
+        )
+        for license_obj in licenses
+    ])
+    ArchivedHistoricalLicense.objects.using(using).bulk_create([
+        ArchivedHistoricalLicense(
+            history_id=record.history_id,
+            license_uuid=record.uuid,
+            history_date=record.history_date,
+            history_type=record.history_type,
+            history_change_reason=record.history_change_reason,
+            history_user_id=record.history_user_id,
+            values=_serialize(record, history_model.tracked_fields),
+        )
+        for record in history_model.objects.filter(uuid__in=license_uuids).iterator()
+    ])
+
+    # pylint: disable=protected-access
+    for queryset in [
+        history_model.objects.filter(uuid__in=license_uuids),
+        source_history_model.objects.filter(license_id__in=license_uuids),
+        SubscriptionLicenseSource.objects.filter(license_id__in=license_uuids),
+        LicenseEvent.objects.filter(license_id__in=license_uuids),
+        LearnerEntitlement.objects.filter(license_id__in=license_uuids),
+    ]:
+        queryset.using(using)._raw_delete(using)
+    License.objects.using(using).filter(renewed_to_id__in=license_uuids).update(
+        renewed_to=None,
+        modified=localized_utcnow(),
+    )
+    LicenseAssignmentJobEmail.objects.using(using).filter(license_id__in=license_uuids).update(license=None)
+    License._base_manager.using(using).filter(uuid__in=license_uuids)._raw_delete(using)
+
+
+def _restore_batch(archived_licenses, using):
+    """
+    Moves the given archived licenses, with their historical records, source and events, back to their tables, and
+    links the license assignment job emails that referenced them again.
+    """
+    # pylint: disable=import-outside-toplevel
+    from license_manager.apps.api.models import LicenseAssignmentJobEmail
+
+    history_model = License.history.model
+    source_history_model = SubscriptionLicenseSource.history.model
+    license_uuids = [archived_license.uuid for archived_license in archived_licenses]
+
+    copied_fields = [field for field in License._meta.concrete_fields if field.attname != 'renewed_to_id']
+    License.objects.using(using).bulk_create([
+        License(**{field.attname: getattr(archived_license, field.attname) for field in copied_fields})
+        for archived_license in archived_licenses
+    ])
+    history_model.objects.using(using).bulk_create([
+        history_model(
+            history_id=record.history_id,
+            history_date=record.history_date,
+            history_type=record.history_type,
+            history_change_reason=record.history_change_reason,
+            history_user_id=record.history_user_id,
+            **_deserialize(history_model.tracked_fields, record.values),
+        )
+        for record in ArchivedHistoricalLicense.objects.filter(license_uuid__in=license_uuids).iterator()
+    ])
+
+    sources, source_history, events = [], [], []
+    for archived_license in archived_licenses:
+        if archived_license.source and archived_license.source['source']:
+            sources.append(SubscriptionLicenseSource(
+                **_deserialize(SubscriptionLicenseSource._meta.concrete_fields, archived_license.source['source']),
+            ))
+        for values in (archived_license.source or {}).get('history', []):
+            source_history.append(source_history_model(
+                **_deserialize(source_history_model._meta.concrete_fields, values),
+            ))
+        for values in archived_license.events:
+            events.append(LicenseEvent(**_deserialize(LicenseEvent._meta.concrete_fields, values)))
+    SubscriptionLicenseSource.objects.using(using).bulk_create(sources)
+    source_history_model.objects.using(using).bulk_create(source_history)
+    LicenseEvent.objects.using(using).bulk_create(events)
+    for archived_license in archived_licenses:
+        if archived_license.assignment_job_email_ids:
+            LicenseAssignmentJobEmail.objects.using(using).filter(
+                id__in=archived_license.assignment_job_email_ids,
+                license=None,
+            ).update(license_id=archived_license.uuid)
+
+    # Renewal links are restored once both licenses are back in the license table.
+    restored_uuids = set(license_uuids)
+    hot_renewal_uuids = restored_uuids | set(License.objects.using(using).filter(
+        uuid__in=[
+            uuid for archived_license in archived_licenses
+            for uuid in (archived_license.renewed_to_uuid, archived_license.renewed_from_uuid) if uuid
+        ],
+    ).values_list('uuid', flat=True))
+    for archived_license in archived_licenses:
+        if archived_license.renewed_to_uuid in hot_renewal_uuids:
+            License.objects.using(using).filter(uuid=archived_license.uuid).update(
+                renewed_to_id=archived_license.renewed_to_uuid,
+            )
+        if archived_license.renewed_from_uuid in hot_renewal_uuids - restored_uuids:
+            License.objects.using(using).filter(uuid=archived_license.renewed_from_uuid, renewed_to=None).update(
+                renewed_to_id=archived_license.uuid,
+                modified=localized_utcnow(),
+            )
+
+    ArchivedHistoricalLicense.objects.using(using).filter(license_uuid__in=license_uuids).delete()
+    ArchivedLicense.objects.using(using).filter(uuid__in=license_uuids).delete()
+    transaction.on_commit(lambda: LearnerEntitlement.sync_licenses(license_uuids), using=using)
+
+
+def archive_licenses(queryset, batch_size=None):
+    """
+    Moves the licenses of ``queryset``, with their historical records, license sources and events, to the archive
+    tables, in batches of ``batch_size`` licenses that are each moved in their own transaction.
+
+    Returns:
+        int: The number of licenses archived.
+    """
+    _check_license_relations()
+    return _move_in_batches(
+        queryset,
+        _archive_batch,
+        batch_size or settings.LICENSE_ARCHIVE_BATCH_SIZE,
+        'Archived',
+    )
+
+
+def restore_archived_licenses(queryset, batch_size=None):
+    """
+    Moves the archived licenses of ``queryset``, with their historical records, license sources and events, back to
+    the license tables, in batches of ``batch_size`` licenses that are each moved in their own transaction.
+
+    Returns:
+        int: The number of licenses restored.
+    """
+    return _move_in_batches(
+        queryset,
+        _restore_batch,
+        batch_size or settings.LICENSE_ARCHIVE_BATCH_SIZE,
+        'Restored',
+    )
+
+
+def get_archivable_subscription_plans():
+    """
+    Returns the plans that expired more than ``LICENSE_ARCHIVE_AFTER_DAYS`` ago and still have licenses, those
+    that expired first first, so that licenses are archived before the licenses they were renewed to.
+    """
+    archive_before = localized_utcnow() - timedelta(days=settings.LICENSE_ARCHIVE_AFTER_DAYS)
+    return SubscriptionPlan.objects.filter(
+        Exists(License.objects.filter(subscription_plan=OuterRef('pk'))),
+        expiration_date__lt=archive_before,
+    ).order_by('expiration_date')
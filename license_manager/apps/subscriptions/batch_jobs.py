@@ -0,0 +1,264 @@
+"""
+Sharded, checkpointed batch jobs for the management commands that process large numbers of rows.
+
+A ``BatchJob`` splits the rows of a queryset into primary key ranges, one shard per worker, and processes the
+rows of each shard in batches ordered by primary key, fetching each batch with a single keyset query. When a
+job is run with more than one worker, each shard is processed by its own forked process, with a segment client
+of its own whose queued events are flushed after every batch, since forked processes exit without running the
+exit handler that flushes them. After every batch, the shard records its position in a ``BatchJobCheckpoint``,
+along with the number of rows processed and the metrics returned by the batches so far, so that an interrupted
+job can be run again with ``resume=True`` to pick up after the last batch each shard processed.
+
+Commands add the uniform ``--workers``, ``--batch-size`` and ``--resume`` arguments with
+``add_batch_job_arguments``.
+"""
+import multiprocessing
+import sys
+import time
+from collections import Counter
+from logging import getLogger
+from uuid import UUID
+
+from django.db import connections, models
+
+from license_manager.apps.core.db_routers import use_replica_for_reads
+
+from .event_utils import flush_segment_events, reset_segment_client
+from .exceptions import BatchJobError
+from .models import BatchJobCheckpoint
+
+
+logger = getLogger(__name__)
+
+UUID_SPACE_SIZE = 1 << 128
+
+
+def add_batch_job_arguments(parser, default_batch_size):
+    """
+    Adds the ``--workers``, ``--batch-size`` and ``--resume`` arguments of batch jobs to a command's ``parser``.
+    """
+    parser.add_argument(
+        '--workers',
+        action='store',
+        dest='workers',
+        type=int,
+        default=1,
+        help='The number of processes to split the rows to process between, by primary key range (default: 1).',
+    )
+    parser.add_argument(
+        '--batch-size',
+        action='store',
+        dest='batch_size',
+        type=int,
+        default=default_batch_size,
+        help=f'The number of rows to process in each batch (default: {default_batch_size}).',
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        dest='resume',
+        default=False,
+        help=(
+            'Resume each shard after the last batch it processed in the previous run with the same number of '
+            'workers, instead of starting over.'
+        ),
+    )
+
+
+def _run_in_process(target):
+    """
+    The entry point of a worker process, which exits with a non-zero status if ``target`` raises.
+    """
+    reset_segment_client()
+    exit_code = 0
+    try:
+        target()
+    except Exception:  # pylint: disable=broad-except
+        logger.exception('Batch job worker process failed.')
+        exit_code = 1
+    finally:
+        flush_segment_events()
+        connections.close_all()
+    sys.exit(exit_code)
+
+
+def _run_in_processes(targets):
+    """
+    Runs each of ``targets`` in its own forked process, waits for all of them, and returns their exit codes.
+    The database connections are closed first, so that every process opens its own rather than sharing ours.
+    """
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_run_in_process, args=(target,)) for target in targets]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return [process.exitcode for process in processes]
+
+
+class BatchJob:
+    """
+    Processes the rows of ``queryset`` in batches ordered by primary key, optionally split between worker
+    processes by primary key range, recording a checkpoint after every batch.
+
+    Args:
+        name (str): The name of the job its checkpoints are recorded under.
+        queryset: The rows to process. It's evaluated again for every batch, so it can exclude the rows
+            that were already processed. If it returns dicts, they must include the primary key.
+        process_batch (callable): Called with the list of rows of every batch. It can return a dict of
+            metrics, e.g. the number of rows that failed, which are summed per shard and in the job's totals.
+        scope (str): Distinguishes separate runs of the same job, e.g. one per enterprise customer.
+        batch_size (int): The number of rows of each batch.
+        use_replica (bool): Whether to read the batches from the read replica, when one is configured.
+        on_shard_completed (callable): Called with the checkpoint of every shard once it processed all of its
+            rows, in the process that ran the shard.
+    """
+
+    def __init__(
+        self, name, queryset, process_batch, scope='', batch_size=1000, use_replica=False, on_shard_completed=None,
+    ):
+        self.name = name
+        self.queryset = queryset
+        self.process_batch = process_batch
+        self.scope = scope
+        self.batch_size = batch_size
+        self.use_replica = use_replica
+        self.on_shard_completed = on_shard_completed
+
+    def get_shard_bounds(self, num_shards):
+        """
+        Splits the primary keys of the rows to process into ``num_shards`` ranges, and returns the inclusive lower
+        and exclusive upper bound of each, where None means unbounded. UUID primary keys are split evenly across
+        the space of UUIDs, other primary keys across the range of primary keys of the queryset.
+        """
+        if num_shards == 1:
+            return [(None, None)]
+
+        if isinstance(self.queryset.model._meta.pk, models.UUIDField):
+            boundaries = [UUID(int=UUID_SPACE_SIZE * index // num_shards) for index in range(1, num_shards)]
+        else:
+            pk_range = self.queryset.aggregate(min_pk=models.Min('pk'), max_pk=models.Max('pk'))
+            min_pk, max_pk = pk_range['min_pk'] or 0, pk_range['max_pk'] or 0
+            boundaries = [
+                min_pk + (max_pk - min_pk + 1) * index // num_shards for index in range(1, num_shards)
+            ]
+        return list(zip([None] + boundaries, boundaries + [None]))
+
+    def _get_checkpoints(self, num_shards, resume):
+        """
+        Returns the checkpoint of every shard, resetting the checkpoints of previous runs unless ``resume`` is set.
+        """
+        checkpoints = BatchJobCheckpoint.objects.filter(job_name=self.name, scope=self.scope)
+        if not resume:
+            checkpoints.delete()
+        return [
+            BatchJobCheckpoint.objects.get_or_create(
+                job_name=self.name,
+                scope=self.scope,
+                num_shards=num_shards,
+                shard_index=shard_index,
+            )[0]
+            for shard_index in range(num_shards)
+        ]
+
+    def _get_pk(self, row):
+        if isinstance(row, dict):
+            return row[self.queryset.model._meta.pk.attname]
+        return row.pk
+
+    def run_shard(self, checkpoint, lower_bound, upper_bound):
+        """
+        Processes the rows of a shard in batches, starting after the last row of its ``checkpoint``.
+        """
+        shard_queryset = self.queryset.order_by('pk')
+        if lower_bound is not None:
+            shard_queryset = shard_queryset.filter(pk__gte=lower_bound)
+        if upper_bound is not None:
+            shard_queryset = shard_queryset.filter(pk__lt=upper_bound)
+
+        while True:
+            started_at = time.monotonic()
+            batch_queryset = shard_queryset
+            if checkpoint.last_pk is not None:
+                batch_queryset = shard_queryset.filter(pk__gt=checkpoint.last_pk)
+            with use_replica_for_reads(enabled=self.use_replica):
+                batch = list(batch_queryset[:self.batch_size])
+            if not batch:
+                break
+
+            batch_metrics = self.process_batch(batch) or {}
+            flush_segment_events()
+            checkpoint.record_batch(self._get_pk(batch[-1]), len(batch), batch_metrics)
+            logger.info(
+                '[%s] %s shard %s/%s: batch %s of %s rows took %.3f seconds, metrics: %s',
+                self.name,
+                self.scope,
+                checkpoint.shard_index + 1,
+                checkpoint.num_shards,
+                checkpoint.num_batches,
+                len(batch),
+                time.monotonic() - started_at,
+                batch_metrics,
+            )
+            # A short batch is the last one, no need to query for the next.
+            if len(batch) < self.batch_size:
+                break
+
+        checkpoint.complete()
+        if self.on_shard_completed:
+            self.on_shard_completed(checkpoint)
+
+    def run(self, workers=1, resume=False):
+        """
+        Runs the job with one shard per worker, each in its own process if there is more than one worker.
+
+        Returns:
+            dict: The number of rows processed and batches of all shards, and the sums of their metrics.
+        """
+        if workers < 1:
+            raise ValueError('A batch job needs at least one worker.')
+
+        checkpoints = self._get_checkpoints(workers, resume)
+        shards = [
+            (checkpoint, lower_bound, upper_bound)
+            for checkpoint, (lower_bound, upper_bound) in zip(checkpoints, self.get_shard_bounds(workers))
+            if checkpoint.completed_at is None
+        ]
+        if len(shards) < workers:
+            logger.info(
+                '[%s] %s: skipping %s shards that were completed by the previous run.',
+                self.name,
+                self.scope,
+                workers - len(shards),
+            )
+
+        if workers == 1:
+            for shard in shards:
+                self.run_shard(*shard)
+        else:
+            exit_codes = _run_in_processes([
+                lambda shard=shard: self.run_shard(*shard) for shard in shards
+            ])
+            num_failed = len([exit_code for exit_code in exit_codes if exit_code != 0])
+            if num_failed:
+                raise BatchJobError(
+                    f'{num_failed} of {len(shards)} shards of {self.name} {self.scope} failed, '
+                    'run it again with --resume to retry them.'
+                )
+
+        return self.get_totals(workers)
+
+    def get_totals(self, num_shards):
+        """
+        Returns the number of rows processed and batches of all shards, and the sums of their metrics.
+        """
+        totals = Counter()
+        for checkpoint in BatchJobCheckpoint.objects.filter(
+            job_name=self.name,
+            scope=self.scope,
+            num_shards=num_shards,
+        ):
+            totals.update(checkpoint.metrics)
+            totals.update(num_processed=checkpoint.num_processed, num_batches=checkpoint.num_batches)
+        return dict(totals)
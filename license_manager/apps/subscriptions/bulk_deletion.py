@@ -0,0 +1,157 @@
+"""
+Chunked deletion of large numbers of rows, without per-row signals.
+
+``QuerySet.delete`` loads every row to delete into a deletion collector, and sends the ``post_delete`` signal
+of each of them. For licenses, whose ``post_delete`` receiver tracks a Segment event per license, deleting the
+unused licenses of a large plan that way takes hours. ``bulk_delete`` instead deletes rows in batches ordered by
+primary key, each in its own transaction, cascades to related rows with queryset operations, and writes the
+historical records of each batch with a single insert.
+"""
+from collections import Counter
+from logging import getLogger
+
+from django.conf import settings
+from django.db import models, router, transaction
+from django.utils import timezone
+from simple_history.utils import get_history_manager_for_model
+
+from .event_utils import track_licenses_deleted
+from .exceptions import BulkDeletionError
+
+
+logger = getLogger(__name__)
+
+BULK_DELETION_CHANGE_REASON = 'Bulk deletion'
+
+
+def _write_deletion_history(model, objs, history_user_id=None):
+    """
+    Writes the historical records of the deletion of ``objs`` with a single insert, if ``model`` keeps history.
+    """
+    if not hasattr(model._meta, 'simple_history_manager_attribute'):
+        return
+    if not getattr(settings, 'SIMPLE_HISTORY_ENABLED', True):
+        return
+
+    history_model = get_history_manager_for_model(model).model
+    history_date = timezone.now()
+    history_model.objects.bulk_create([
+        history_model(
+            history_date=history_date,
+            history_user_id=history_user_id,
+            history_change_reason=BULK_DELETION_CHANGE_REASON,
+            history_type='-',
+            **{field.attname: getattr(obj, field.attname) for field in history_model.tracked_fields},
+        )
+        for obj in objs
+    ])
+
+
+def get_reverse_relations(model):
+    """
+    Returns the relations of other models to ``model`` that deleting its rows affects, including hidden ones
+    (``related_name='+'``), as Django's deletion collector enumerates them.
+    """
+    return [
+        field for field in model._meta.get_fields(include_hidden=True)
+        if field.auto_created and not field.concrete and (field.one_to_one or field.one_to_many)
+    ]
+
+
+def _delete_related_rows(model, pks):
+    """
+    Applies the ``on_delete`` behaviour of every relation to ``model`` to the rows related to the given ``pks``.
+    """
+    for related_object in get_reverse_relations(model):
+        field_name = related_object.field.name
+        # pylint: disable=protected-access
+        related_rows = related_object.related_model._base_manager.filter(**{f'{field_name}__in': pks})
+        if related_object.on_delete is models.CASCADE:
+            related_rows.delete()
+        elif related_object.on_delete is models.SET_NULL:
+            related_rows.update(**{field_name: None})
+        elif related_object.on_delete is not models.DO_NOTHING:
+            raise BulkDeletionError(
+                f'Cannot bulk delete {model._meta.label} with a {related_object.on_delete.__name__} relation '
+                f'from {related_object.related_model._meta.label}.'
+            )
+
+
+def bulk_delete(queryset, batch_size=None, history_user_id=None, on_batch_deleted=None):
+    """
+    Deletes the rows of ``queryset`` in batches of ``batch_size`` rows ordered by primary key, each batch in its
+    own transaction, so that an interrupted deletion leaves whole batches deleted and can simply be run again.
+    No ``pre_delete`` or ``post_delete`` signals are sent.
+
+    Args:
+        queryset: The rows to delete. It's evaluated again for every batch, so rows that stop matching it
+            while the deletion runs (e.g. licenses that get assigned) aren't deleted.
+        batch_size (int): The number of rows to delete in each transaction.
+        history_user_id (int): The id of the user the historical records of the deletion are attributed to.
+        on_batch_deleted (callable): Called after every batch with the deleted objects, and the number of
+            rows deleted so far.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    model = queryset.model
+    batch_size = batch_size or settings.BULK_DELETION_BATCH_SIZE
+    queryset = queryset.order_by('pk')
+    using = router.db_for_write(model)
+
+    num_deleted = 0
+    last_pk = None
+    while True:
+        with transaction.atomic(using=using):
+            batch_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(batch_queryset[:batch_size])
+            if not batch:
+                break
+            pks = [obj.pk for obj in batch]
+            _write_deletion_history(model, batch, history_user_id=history_user_id)
+            _delete_related_rows(model, pks)
+            # pylint: disable=protected-access
+            model._base_manager.using(using).filter(pk__in=pks)._raw_delete(using)
+
+        num_deleted += len(batch)
+        last_pk = pks[-1]
+        logger.info(f'Deleted {num_deleted} {model._meta.verbose_name_plural} so far.')
+        if on_batch_deleted:
+            on_batch_deleted(batch, num_deleted)
+    return num_deleted
+
+
+def bulk_delete_licenses(queryset, batch_size=None, history_user_id=None, on_progress=None):
+    """
+    Deletes the licenses of ``queryset`` with ``bulk_delete``, and tracks a single aggregate event for each plan
+    that licenses were deleted from, instead of one LICENSE_DELETED event per license.
+
+    Args:
+        on_progress (callable): Called after every batch with the number of licenses deleted so far.
+
+    Returns:
+        int: The number of licenses deleted.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .models import SubscriptionPlan
+
+    num_deleted_by_plan = Counter()
+
+    def on_batch_deleted(deleted_licenses, num_deleted):
+        num_deleted_by_plan.update(license_obj.subscription_plan_id for license_obj in deleted_licenses)
+        if on_progress:
+            on_progress(num_deleted)
+
+    num_deleted = bulk_delete(
+        queryset,
+        batch_size=batch_size,
+        history_user_id=history_user_id,
+        on_batch_deleted=on_batch_deleted,
+    )
+
+    subscription_plans = SubscriptionPlan.objects.filter(
+        uuid__in=num_deleted_by_plan,
+    ).select_related('customer_agreement')
+    for subscription_plan in subscription_plans:
+        track_licenses_deleted(subscription_plan, num_deleted_by_plan[subscription_plan.uuid])
+    return num_deleted
@@ -0,0 +1,171 @@
+"""
+Incremental feed of the changes to licenses, for downstream consumers that keep a copy of license state.
+
+Rather than paging through every license of every plan again, a consumer pages through the licenses changed since
+the cursor it got with its last page. Pages are ordered by ``(modified, uuid)`` and seeked to by that position,
+so that every page is served from the ``license_modified_uuid_idx`` index, or ``license_customer_modified_idx``
+for the licenses of a customer. Deleted licenses are listed from their ``-`` historical records, dated by their
+``history_date``. Those are the most recent records of deleted licenses, which are never pruned.
+
+Changes are only listed once they are ``LICENSE_CHANGE_FEED_SETTLE_SECONDS`` old, so that a change whose
+transaction commits after a page was read, or that reaches the replica late, is still behind the cursor
+of the next page rather than ahead of it. A change that commits later than that after its ``modified`` was
+written is skipped for good, so every transaction that changes licenses must commit within that window:
+bulk operations commit a transaction per batch, and operations that must change all of their licenses in one
+long transaction, like renewals, call ``restamp_license_changes`` right before they commit.
+"""
+import base64
+from datetime import timedelta
+from uuid import UUID
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .models import License, SubscriptionPlan
+from .utils import localized_utcnow
+
+
+LICENSE_CHANGE_FIELDS = [
+    'uuid',
+    'status',
+    'user_email',
+    'lms_user_id',
+    'subscription_plan_id',
+    'enterprise_customer_uuid',
+    'assigned_date',
+    'activation_date',
+    'revoked_date',
+    'modified',
+]
+
+
+def restamp_license_changes(licenses):
+    """
+    Sets ``modified`` of the given queryset of licenses to now, with a single update, so that the changes of a
+    transaction that ran for longer than ``LICENSE_CHANGE_FEED_SETTLE_SECONDS`` are dated by when it commits
+    rather than by when it started, and aren't skipped by the feed.
+
+    Returns:
+        int: The number of licenses updated.
+    """
+    return licenses.update(modified=localized_utcnow())
+
+
+def encode_cursor(modified, uuid):
+    """
+    Returns the opaque cursor of the position ``(modified, uuid)`` in the feed.
+    """
+    return base64.urlsafe_b64encode(f'{modified.isoformat()}|{uuid}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Returns the position ``(modified, uuid)`` of the given opaque cursor.
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    try:
+        modified, uuid = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        parsed_modified, parsed_uuid = parse_datetime(modified), UUID(uuid)
+    except (TypeError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f'{cursor} is not a valid cursor.') from exc
+    if parsed_modified is None:
+        raise ValueError(f'{cursor} is not a valid cursor.')
+    return parsed_modified, parsed_uuid
+
+
+def _get_changed_licenses(position, settled_before, enterprise_customer_uuid, subscription_plan_uuids, limit):
+    """
+    Returns the first ``limit`` licenses changed after ``position``, in compact form.
+    """
+    licenses = License.objects.filter(modified__lt=settled_before)
+    if enterprise_customer_uuid is not None:
+        if settings.DENORMALIZED_LICENSE_CUSTOMER_LOOKUPS_ENABLED:
+            licenses = licenses.filter(enterprise_customer_uuid=enterprise_customer_uuid)
+        else:
+            licenses = licenses.filter(subscription_plan_id__in=subscription_plan_uuids)
+    if position is not None:
+        modified, uuid = position
+        licenses = licenses.filter(Q(modified__gt=modified) | Q(modified=modified, uuid__gt=uuid))
+
+    return [
+        {
+            'uuid': row['uuid'],
+            'status': row['status'],
+            'user_email': row['user_email'],
+            'lms_user_id': row['lms_user_id'],
+            'subscription_plan_uuid': row['subscription_plan_id'],
+            'enterprise_customer_uuid': row['enterprise_customer_uuid'],
+            'assigned_date': row['assigned_date'],
+            'activation_date': row['activation_date'],
+            'revoked_date': row['revoked_date'],
+            'modified': row['modified'],
+            'deleted': False,
+        }
+        for row in licenses.order_by('modified', 'uuid').values(*LICENSE_CHANGE_FIELDS)[:limit]
+    ]
+
+
+def _get_deleted_licenses(position, settled_before, subscription_plan_uuids, limit):
+    """
+    Returns the first ``limit`` licenses deleted after ``position``, in compact form.
+    """
+    deletions = License.history.filter(history_type='-', history_date__lt=settled_before)
+    if subscription_plan_uuids is not None:
+        deletions = deletions.filter(subscription_plan_id__in=subscription_plan_uuids)
+    if position is not None:
+        modified, uuid = position
+        deletions = deletions.filter(Q(history_date__gt=modified) | Q(history_date=modified, uuid__gt=uuid))
+
+    return [
+        {
+            'uuid': uuid,
+            'subscription_plan_uuid': subscription_plan_uuid,
+            'modified': history_date,
+            'deleted': True,
+        }
+        for uuid, subscription_plan_uuid, history_date in deletions.order_by('history_date', 'uuid').values_list(
+            'uuid', 'subscription_plan_id', 'history_date',
+        )[:limit]
+    ]
+
+
+def get_license_changes(cursor=None, enterprise_customer_uuid=None, limit=None):
+    """
+    Returns the licenses changed or deleted after ``cursor``, across all plans of the given customer or of all
+    customers, in ``(modified, uuid)`` order.
+
+    Args:
+        cursor (str): The cursor returned with the previous page, or None to start from the first change.
+        enterprise_customer_uuid (UUID): Only list the changes to the licenses of this customer.
+        limit (int): The maximum number of changes to list.
+
+    Returns:
+        tuple: The list of changes, the cursor of the next page, and whether there are more changes after it.
+    """
+    limit = limit or settings.LICENSE_CHANGE_FEED_PAGE_SIZE
+    position = decode_cursor(cursor) if cursor else None
+    settled_before = localized_utcnow() - timedelta(seconds=settings.LICENSE_CHANGE_FEED_SETTLE_SECONDS)
+    subscription_plan_uuids = None
+    if enterprise_customer_uuid is not None:
+        subscription_plan_uuids = list(SubscriptionPlan.objects.filter(
+            customer_agreement__enterprise_customer_uuid=enterprise_customer_uuid,
+        ).values_list('uuid', flat=True))
+
+    # Each query reads one more change than the page holds, to tell whether there are more changes after it.
+    changes = sorted(
+        [
+            *_get_changed_licenses(
+                position, settled_before, enterprise_customer_uuid, subscription_plan_uuids, limit + 1,
+            ),
+            *_get_deleted_licenses(position, settled_before, subscription_plan_uuids, limit + 1),
+        ],
+        key=lambda change: (change['modified'], change['uuid']),
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if changes:
+        cursor = encode_cursor(changes[-1]['modified'], changes[-1]['uuid'])
+    return changes, cursor, has_more
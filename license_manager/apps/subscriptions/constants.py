@@ -74,6 +74,9 @@ class SegmentEvents:
     LICENSE_REVOKED = 'edx.server.license-manager.license-lifecycle.revoked'
     LICENSE_NOT_ASSIGNED = 'edx.server.license-manager.license-lifecycle.not-assigned'
     LICENSE_ACTIVATED_180_DAYS_AGO = 'edx.server.license-manager.license.activated.180.days.ago'
+    LICENSES_PROVISIONED = 'edx.server.license-manager.subscription-plan.licenses-provisioned'
+    LICENSES_DELETED = 'edx.server.license-manager.subscription-plan.licenses-deleted'
+    LICENSES_MATERIALIZED = 'edx.server.license-manager.subscription-plan.licenses-materialized'
 
 
 # Template names used for emails
@@ -123,9 +126,21 @@ LICENSE_EXPIRATION_BATCH_SIZE = 100
 LICENSE_BULK_OPERATION_BATCH_SIZE = 100
 PENDING_ACCOUNT_CREATION_BATCH_SIZE = 50
 LICENSE_SOURCE_BULK_OPERATION_BATCH_SIZE = 100
-TRACK_LICENSE_CHANGES_BATCH_SIZE = 25
+# Number of licenses loaded per query by track_license_changes_task, and the number of licenses
+# above which it splits its work across subtasks
+TRACK_LICENSE_CHANGES_BATCH_SIZE = 1000
+TRACK_LICENSE_CHANGES_SUBTASK_SIZE = 10000
 ASSIGNMENT_EMAIL_BATCH_SIZE = 50
 REMINDER_EMAIL_BATCH_SIZE = 50
+# Number of original/future license pairs processed per keyset chunk during a renewal
+LICENSE_RENEWAL_CHUNK_SIZE = 1000
+# Number of renewed license uuids handed to each asynchronous event tracking task
+LICENSE_RENEWAL_EVENT_BATCH_SIZE = 500
+# Number of emails looked up per IN query, and licenses written per batch, by the assign action
+ASSIGNMENT_EMAIL_QUERY_CHUNK_SIZE = 1000
+ASSIGNMENT_BULK_OPERATION_BATCH_SIZE = 500
+# Number of users whose licenses are loaded per query when syncing changed user emails
+USER_EMAIL_SYNC_CHUNK_SIZE = 1000
 
 # Num distinct catalog query validation batch size
 VALIDATE_NUM_CATALOG_QUERIES_BATCH_SIZE = 100
@@ -211,3 +226,45 @@ class LicenseActionSource:
         (CELERY_TASK, 'Celery Task'),
         (RENEWAL_JOB, 'Renewal Job'),
     )
+
+
+class LicenseAssignmentJobStatus:
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    CHOICES = (
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (COMPLETED, 'Completed'),
+        (FAILED, 'Failed'),
+    )
+
+
+class LicenseDeletionJobStatus:
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    CHOICES = (
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (COMPLETED, 'Completed'),
+        (FAILED, 'Failed'),
+    )
+
+
+class LicenseAssignmentJobEmailStatus:
+    PENDING = 'pending'
+    ASSIGNED = 'assigned'
+    ALREADY_ASSOCIATED = 'already_associated'
+    FAILED = 'failed'
+
+    CHOICES = (
+        (PENDING, 'Pending'),
+        (ASSIGNED, 'Assigned'),
+        (ALREADY_ASSOCIATED, 'Already associated'),
+        (FAILED, 'Failed'),
+    )
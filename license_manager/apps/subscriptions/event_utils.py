@@ -11,8 +11,10 @@ from django.conf import settings
 from django.db.models import prefetch_related_objects
 
 from license_manager.apps.api import utils as api_utils
+from license_manager.apps.core.instrumentation import outbound_call
 from license_manager.apps.subscriptions.constants import (
     ENTERPRISE_BRAZE_ALIAS_LABEL,
+    SegmentEvents,
 )
 from license_manager.apps.subscriptions.utils import localized_utcnow
 
@@ -204,7 +206,8 @@ def track_event(lms_user_id, event_name, properties):
                 if assigned_email:
                     _track_batch_events_via_braze_alias(event_name, {assigned_email: properties})
             else:
-                analytics.track(user_id=lms_user_id, event=event_name, properties=properties)
+                with outbound_call('segment'):
+                    analytics.track(user_id=lms_user_id, event=event_name, properties=properties)
         except Exception as exc:  # pylint: disable=broad-except
             logger.exception(exc)
     else:
@@ -288,6 +291,189 @@ def track_license_changes(licenses, event_name, properties=None, is_batch_assign
             track_event(lcs.lms_user_id, event_name, event_properties)
 
 
+# The license, plan and customer agreement columns needed to build license tracking properties,
+# loaded with ``values()`` by ``track_license_changes_task``.
+LICENSE_TRACKING_VALUES = (
+    'uuid',
+    'activation_key',
+    '_renewed_from__uuid',
+    'assigned_date',
+    'activation_date',
+    'lms_user_id',
+    'user_email',
+    'auto_applied',
+    'subscription_plan__expiration_processed',
+    'subscription_plan__customer_agreement__uuid',
+    'subscription_plan__customer_agreement__enterprise_customer_uuid',
+    'subscription_plan__customer_agreement__enterprise_customer_slug',
+    'subscription_plan__customer_agreement__enterprise_customer_name',
+)
+
+
+def get_license_tracking_properties_from_values(license_values):
+    """
+    Builds the same properties as ``get_license_tracking_properties`` from a row of ``LICENSE_TRACKING_VALUES``,
+    without instantiating the license, its plan or its customer agreement.
+    """
+    renewed_from_uuid = license_values['_renewed_from__uuid']
+    license_data = {
+        "license_uuid": str(license_values['uuid']),
+        "license_activation_key": str(license_values['activation_key']),
+        "previous_license_uuid": str(renewed_from_uuid) if renewed_from_uuid else '',
+        "assigned_date": _iso_8601_format_string(license_values['assigned_date']),
+        "activation_date": _iso_8601_format_string(license_values['activation_date']),
+        "assigned_lms_user_id": (license_values['lms_user_id'] or ''),
+        "assigned_email": (license_values['user_email'] or ''),
+        "expiration_processed": license_values['subscription_plan__expiration_processed'],
+        "auto_applied": (license_values['auto_applied'] or False),
+    }
+
+    if license_values['subscription_plan__customer_agreement__uuid']:
+        license_data.update({
+            'enterprise_customer_uuid': str(
+                license_values['subscription_plan__customer_agreement__enterprise_customer_uuid']
+            ),
+            'customer_agreement_uuid': str(license_values['subscription_plan__customer_agreement__uuid']),
+            'enterprise_customer_slug': (
+                license_values['subscription_plan__customer_agreement__enterprise_customer_slug']
+            ),
+            'enterprise_customer_name': (
+                license_values['subscription_plan__customer_agreement__enterprise_customer_name']
+            ),
+        })
+    else:
+        logger.warning("Tried to set up Segment tracking data for license {},"
+                       "but missing subscription plan or customer agreement."
+                       .format(license_values['uuid']))
+
+    return license_data
+
+
+def track_license_values_changes(license_values_rows, event_name, properties, is_batch_assignment):
+    """
+    Sends the tracking events for some rows of ``LICENSE_TRACKING_VALUES``, like ``track_license_changes``
+    does for license objects.
+
+    Events of learners without an lms user id are sent to Braze in a single batch rather than one alias
+    and ``track_user`` request per license, and the Braze client splits that batch into the largest requests
+    the Braze API allows.
+    """
+    properties_by_email = {}
+    for license_values in license_values_rows:
+        event_properties = {**get_license_tracking_properties_from_values(license_values), **properties}
+        lms_user_id = license_values['lms_user_id']
+        user_email = license_values['user_email']
+        if is_batch_assignment or (not lms_user_id and user_email and getattr(settings, 'SEGMENT_KEY', None)):
+            properties_by_email[user_email] = event_properties
+        else:
+            track_event(lms_user_id, event_name, event_properties)
+
+    if not properties_by_email:
+        return
+
+    if is_batch_assignment:
+        _track_batch_events_via_braze_alias(event_name, properties_by_email)
+        return
+
+    try:  # As in track_event, we should never raise an exception when not able to send a tracking event
+        _track_batch_events_via_braze_alias(event_name, properties_by_email)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception(exc)
+
+
+def flush_segment_events():
+    """
+    Sends the events queued by the segment client, which drops new events once its queue is full.
+    Tasks that track many events call this between chunks of events.
+    """
+    if getattr(settings, 'SEGMENT_KEY', None):
+        try:
+            with outbound_call('segment'):
+                analytics.flush()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception(exc)
+
+
+def reset_segment_client():
+    """
+    Drops the segment client a forked process inherited from its parent, whose queue has no consumer thread in the
+    child, so that the next event tracked creates a client of the child's own.
+    """
+    analytics.default_client = None
+
+
+def _track_subscription_plan_event(subscription_plan, event_name, properties):
+    """
+    Send an event about licenses of a subscription plan that isn't about any one learner, tracked anonymously
+    on behalf of the plan.
+    """
+    if not (hasattr(settings, "SEGMENT_KEY") and settings.SEGMENT_KEY):
+        logger.warning(
+            "Event {} for plan {} not tracked because SEGMENT_KEY not set".format(event_name, subscription_plan.uuid)
+        )
+        return
+
+    properties = {
+        'subscription_plan_uuid': str(subscription_plan.uuid),
+        **properties,
+        **get_enterprise_tracking_properties(subscription_plan.customer_agreement),
+    }
+    try:  # We should never raise an exception when not able to send a tracking event
+        # There's no learner behind this event, so it is tracked anonymously on behalf of the plan.
+        with outbound_call('segment'):
+            analytics.track(anonymous_id=str(subscription_plan.uuid), event=event_name, properties=properties)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception(exc)
+
+
+def track_licenses_provisioned(subscription_plan, num_licenses):
+    """
+    Send a single aggregate event for a batch of licenses provisioned in a subscription plan,
+    used in place of one LICENSE_CREATED event per (unassigned) license.
+
+    Args:
+        subscription_plan: SubscriptionPlan object the licenses were provisioned in.
+        num_licenses (int): The number of licenses that were provisioned.
+    """
+    _track_subscription_plan_event(
+        subscription_plan,
+        SegmentEvents.LICENSES_PROVISIONED,
+        {'num_licenses_provisioned': num_licenses},
+    )
+
+
+def track_licenses_deleted(subscription_plan, num_licenses):
+    """
+    Send a single aggregate event for the licenses of a subscription plan deleted by a bulk deletion,
+    used in place of one LICENSE_DELETED event per license.
+
+    Args:
+        subscription_plan: SubscriptionPlan object the licenses were deleted from.
+        num_licenses (int): The number of licenses that were deleted.
+    """
+    _track_subscription_plan_event(
+        subscription_plan,
+        SegmentEvents.LICENSES_DELETED,
+        {'num_licenses_deleted': num_licenses},
+    )
+
+
+def track_licenses_materialized(subscription_plan, num_licenses):
+    """
+    Send a single aggregate event for the license records created out of the virtual unassigned licenses of a
+    subscription plan, used in place of one LICENSE_CREATED event per license.
+
+    Args:
+        subscription_plan: SubscriptionPlan object the licenses were materialized in.
+        num_licenses (int): The number of license records that were created.
+    """
+    _track_subscription_plan_event(
+        subscription_plan,
+        SegmentEvents.LICENSES_MATERIALIZED,
+        {'num_licenses_materialized': num_licenses},
+    )
+
+
 def get_enterprise_tracking_properties(customer_agreement):
     """
     Get the UUIDs from the database about the enterprise CustomerAgreement
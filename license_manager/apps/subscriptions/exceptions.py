@@ -126,3 +126,21 @@ class LicenseActivationMissingError(LicenseActivationError):
     An exception that occurs when no license with a given activation_key is found.
     """
     action = 'activation'
+
+
+class BatchJobError(Exception):
+    """
+    An exception raised when shards of a batch job fail in worker processes.
+    """
+
+
+class BulkDeletionError(Exception):
+    """
+    An exception raised when rows can't be bulk deleted, because of how a relation to them is deleted.
+    """
+
+
+class LicenseArchiveError(Exception):
+    """
+    An exception raised when licenses can't be archived, because of a relation to them that archival doesn't handle.
+    """
@@ -0,0 +1,207 @@
+"""
+Utilities for keeping the django-simple-history tables of the subscriptions app in check.
+"""
+from datetime import timedelta
+from logging import getLogger
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from simple_history.models import HistoricalRecords
+from simple_history.utils import (
+    get_history_manager_for_model,
+    get_history_model_for_model,
+)
+
+from .utils import chunks
+
+
+logger = getLogger(__name__)
+
+
+class IndexedHistoricalRecords(HistoricalRecords):
+    """
+    ``HistoricalRecords`` whose historical model has the given ``indexes``, since simple_history can only index
+    the history date of every historical model or of none of them, see ``SIMPLE_HISTORY_DATE_INDEX``.
+    """
+
+    def __init__(self, *args, indexes=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.indexes = indexes
+
+    def get_meta_options(self, model):
+        meta_fields = super().get_meta_options(model)
+        meta_fields['indexes'] = [*meta_fields.get('indexes', ()), *self.indexes]
+        return meta_fields
+
+
+def get_models_with_history():
+    """
+    Returns all models of the subscriptions app that keep historical records.
+    """
+    return [
+        model for model in apps.get_app_config('subscriptions').get_models()
+        if hasattr(model._meta, 'simple_history_manager_attribute')
+    ]
+
+
+def _get_prunable_history(model, cutoff):
+    """
+    Returns the historical records of ``model`` dated before ``cutoff``, excluding the most recent record
+    of each object so that every object keeps at least one record of its history.
+    """
+    history_model = get_history_model_for_model(model)
+    object_id_field = model._meta.pk.attname
+    newer_history = history_model.objects.filter(
+        **{object_id_field: OuterRef(object_id_field)},
+        history_date__gt=OuterRef('history_date'),
+    )
+    return history_model.objects.filter(
+        history_date__lt=cutoff,
+    ).filter(
+        Exists(newer_history),
+    ).order_by('history_id')
+
+
+def prune_history(model, retention_days, chunk_size=None, archive_stream=None, dry_run=False):
+    """
+    Deletes the historical records of ``model`` that are older than ``retention_days``, in chunks
+    of ``chunk_size`` records. The most recent record of each object is always kept.
+
+    Args:
+        model: A model class that keeps historical records.
+        retention_days (int): The number of days of history to keep.
+        chunk_size (int): The number of records to archive and delete at a time.
+        archive_stream: An optional writable text stream that each chunk is written to, as JSON lines,
+            before it is deleted.
+        dry_run (bool): If true, only count the records that would be pruned.
+
+    Returns:
+        int: The number of records that were (or, for a dry run, would have been) pruned.
+    """
+    chunk_size = chunk_size or settings.HISTORY_RETENTION_CHUNK_SIZE
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    prunable_history = _get_prunable_history(model, cutoff)
+    if dry_run:
+        return prunable_history.count()
+
+    history_model = get_history_model_for_model(model)
+    num_pruned = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(prunable_history[:chunk_size])
+            if not chunk:
+                break
+            if archive_stream is not None:
+                # Records are archived with their history_id, so they can be loaded back with loaddata.
+                archive_stream.write(serializers.serialize('jsonl', chunk))
+            history_model.objects.filter(history_id__in=[record.history_id for record in chunk]).delete()
+        num_pruned += len(chunk)
+        logger.info(f'Pruned {num_pruned} historical records of {model._meta.label} dated before {cutoff}.')
+    return num_pruned
+
+
+def get_history_row_counts():
+    """
+    Returns a list of ``(model label, number of historical records, number of live records)`` tuples,
+    for every model of the subscriptions app that keeps historical records, largest history first.
+    """
+    row_counts = [
+        (model._meta.label, get_history_model_for_model(model).objects.count(), model.objects.count())
+        for model in get_models_with_history()
+    ]
+    return sorted(row_counts, key=lambda row_count: row_count[1], reverse=True)
+
+
+def get_history_row_counts_by_plan(limit=None):
+    """
+    Returns a list of ``(subscription plan uuid, number of historical license records,
+    number of historical plan records)`` tuples, for the plans with the most historical license records.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .models import License, SubscriptionPlan
+
+    license_history_counts = get_history_model_for_model(License).objects.values(
+        'subscription_plan_id',
+    ).annotate(
+        num_records=Count('history_id'),
+    ).order_by('-num_records')
+    if limit:
+        license_history_counts = license_history_counts[:limit]
+    license_history_counts = list(license_history_counts)
+
+    plan_uuids = [row['subscription_plan_id'] for row in license_history_counts]
+    plan_history_counts = dict(
+        get_history_model_for_model(SubscriptionPlan).objects.filter(
+            uuid__in=plan_uuids,
+        ).values(
+            'uuid',
+        ).annotate(
+            num_records=Count('history_id'),
+        ).values_list('uuid', 'num_records')
+    )
+    return [
+        (row['subscription_plan_id'], row['num_records'], plan_history_counts.get(row['subscription_plan_id'], 0))
+        for row in license_history_counts
+    ]
+
+
+def _get_current_history_user_id():
+    """
+    Returns the id of the user of the request being handled, which the simple history middleware
+    would otherwise attribute historical records to.
+    """
+    request = getattr(HistoricalRecords.context, 'request', None)
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.id
+    return None
+
+
+def defer_history_writes(objs, model, update=False):
+    """
+    Hands the historical records of the given, already saved, objects to ``write_deferred_history_task``
+    once the current transaction commits, rather than writing them as part of it.
+
+    The state of the objects, the time and the acting user are captured now, so the deferred records
+    are the same as those ``bulk_create_with_history``/``bulk_update_with_history`` would have written.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .tasks import write_deferred_history_task
+
+    history_date = timezone.now().isoformat()
+    history_user_id = _get_current_history_user_id()
+    for objs_chunk in chunks(list(objs), settings.DEFERRED_HISTORY_WRITE_BATCH_SIZE):
+        serialized_objects = serializers.serialize('json', objs_chunk)
+        transaction.on_commit(
+            lambda serialized_objects=serialized_objects: write_deferred_history_task.delay(
+                model._meta.label,
+                serialized_objects,
+                history_date,
+                history_user_id=history_user_id,
+                update=update,
+            )
+        )
+
+
+def write_deferred_history(model_label, serialized_objects, history_date, history_user_id=None, update=False):
+    """
+    Writes the historical records of objects serialized by ``defer_history_writes``.
+    """
+    model = apps.get_model(model_label)
+    objs = [deserialized.object for deserialized in serializers.deserialize('json', serialized_objects)]
+    history_user = None
+    if history_user_id is not None:
+        history_user = get_user_model().objects.filter(id=history_user_id).first()
+    get_history_manager_for_model(model).bulk_history_create(
+        objs,
+        update=update,
+        default_user=history_user,
+        default_date=parse_datetime(history_date),
+    )
+    return len(objs)
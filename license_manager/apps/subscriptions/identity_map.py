@@ -0,0 +1,90 @@
+"""
+A request-scoped identity map for the licenses, subscription plans and customer agreements loaded by a request.
+
+Permission functions and views of the same request often look up the same rows (e.g. the license identified by
+an activation key, or the customer agreement of an enterprise). Lookups made through ``get_or_load`` are only
+loaded from the database once per request, and a row loaded by different lookups is always the same instance.
+
+The identity map is only active within ``identity_map_scope``, which ``IdentityMapMiddleware`` opens for each
+request. Elsewhere, for instance in celery tasks and management commands, every lookup hits the database.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+_current_identity_map = ContextVar('identity_map', default=None)
+
+
+class IdentityMap:
+    """
+    The objects loaded so far by the current request, by lookup and by primary key.
+    """
+
+    def __init__(self):
+        self.objects_by_lookup = {}
+        self.objects_by_pk = {}
+
+    def remember(self, obj):
+        """
+        Returns the instance already loaded for the row of ``obj`` if there is one, or ``obj`` itself.
+        """
+        return self.objects_by_pk.setdefault((obj._meta.label, obj.pk), obj)
+
+
+@contextmanager
+def identity_map_scope():
+    """
+    Context manager that keeps an identity map for the lookups of the wrapped block, which is discarded on exit.
+    """
+    token = _current_identity_map.set(IdentityMap())
+    try:
+        yield
+    finally:
+        _current_identity_map.reset(token)
+
+
+def get_or_load(model, lookup, value, load):
+    """
+    Returns the ``model`` object found by ``lookup`` for ``value``, calling ``load`` to fetch it from the database
+    only if it wasn't already loaded by the current request. Objects that aren't found are never remembered.
+
+    Args:
+        model: The model class of the object.
+        lookup (str): The name of the lookup, e.g. 'uuid' or 'activation_key'.
+        value: The value looked up, which must have a stable string representation.
+        load (callable): Returns the object, or None if there isn't one.
+    """
+    identity_map = _current_identity_map.get()
+    if identity_map is None:
+        return load()
+
+    key = (model._meta.label, lookup, str(value))
+    if key not in identity_map.objects_by_lookup:
+        obj = load()
+        if obj is None:
+            return None
+        identity_map.objects_by_lookup[key] = identity_map.remember(obj)
+    return identity_map.objects_by_lookup[key]
+
+
+def remember(obj):
+    """
+    Returns the instance already loaded by the current request for the row of ``obj``, or ``obj`` itself.
+    """
+    identity_map = _current_identity_map.get()
+    if identity_map is None or obj is None:
+        return obj
+    return identity_map.remember(obj)
+
+
+class IdentityMapMiddleware:
+    """
+    Keeps an identity map for the duration of each request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_map_scope():
+            return self.get_response(request)
@@ -0,0 +1,55 @@
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from license_manager.apps.subscriptions.archive import (
+    archive_licenses,
+    get_archivable_subscription_plans,
+)
+from license_manager.apps.subscriptions.models import License
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves the licenses of the plans that expired more than LICENSE_ARCHIVE_AFTER_DAYS ago, along with their '
+        'historical records, license sources and events, to the archive tables. The staff license lookups read '
+        'through to the archive, and restore_archived_licenses moves licenses back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            action='store',
+            dest='batch_size',
+            type=int,
+            default=settings.LICENSE_ARCHIVE_BATCH_SIZE,
+            help='The number of licenses archived in each transaction.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            dest='dry_run',
+            default=False,
+            help='Dry Run, log the number of licenses of each plan that would be archived without archiving them.',
+        )
+
+    def handle(self, *args, **options):
+        num_archived = 0
+        for subscription_plan in get_archivable_subscription_plans().iterator():
+            licenses = License.objects.filter(subscription_plan=subscription_plan)
+            if options['dry_run']:
+                num_licenses = licenses.count()
+                logger.info(f'[DRY RUN] Would archive {num_licenses} licenses of plan {subscription_plan.uuid}.')
+            else:
+                num_licenses = archive_licenses(licenses, batch_size=options['batch_size'])
+                logger.info(f'Archived {num_licenses} licenses of plan {subscription_plan.uuid}.')
+            num_archived += num_licenses
+
+        prefix = '[DRY RUN] Would have archived' if options['dry_run'] else 'Archived'
+        message = f'{prefix} {num_archived} licenses.'
+        logger.info(message)
+        self.stdout.write(message)
@@ -0,0 +1,89 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from license_manager.apps.subscriptions.models import (
+    AutoAppliedLicenseCount,
+    SubscriptionPlan,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Fills in when auto-applied licenses were last turned on for the auto-apply plans that were last turned on '
+        'before it was recorded, from the history of each plan, and rebuilds the hourly auto-applied license counts '
+        'of every plan with auto applied licenses from its licenses. Plans are backfilled one by one, so the command '
+        'can be interrupted and run again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            dest='dry_run',
+            help='Only log the number of plans that would be backfilled.',
+            default=False,
+        )
+
+    def _backfill_auto_apply_enabled_at(self, dry_run):
+        """
+        Fills in ``auto_apply_enabled_at`` of the auto-apply plans that are missing it, and returns how many were.
+        """
+        plans_to_backfill = SubscriptionPlan.objects.filter(
+            should_auto_apply_licenses=True,
+            auto_apply_enabled_at__isnull=True,
+        )
+        if dry_run:
+            return plans_to_backfill.count()
+
+        num_backfilled = 0
+        for subscription_plan in plans_to_backfill.iterator():
+            auto_apply_enabled_at = subscription_plan.auto_apply_licenses_turned_on_at_from_history()
+            if auto_apply_enabled_at is None:
+                logger.warning(
+                    'Plan %s has no history of auto-applied licenses being turned on.', subscription_plan.uuid,
+                )
+                continue
+            # Update rather than save the plan, so that the backfill doesn't add to its history.
+            num_backfilled += SubscriptionPlan.objects.filter(uuid=subscription_plan.uuid).update(
+                auto_apply_enabled_at=auto_apply_enabled_at,
+            )
+        return num_backfilled
+
+    def _rebuild_auto_applied_license_counts(self, dry_run):
+        """
+        Rebuilds the auto-applied license counts of the plans with auto applied licenses, and returns how many were.
+        """
+        plans_to_rebuild = SubscriptionPlan.objects.filter(
+            licenses__auto_applied=True,
+        ).distinct()
+        if dry_run:
+            return plans_to_rebuild.count()
+
+        num_rebuilt = 0
+        for subscription_plan in plans_to_rebuild.iterator():
+            num_buckets = AutoAppliedLicenseCount.rebuild_for_plan(subscription_plan)
+            logger.info(
+                'Rebuilt %s hourly auto-applied license counts of plan %s.', num_buckets, subscription_plan.uuid,
+            )
+            num_rebuilt += 1
+        return num_rebuilt
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        num_backfilled = self._backfill_auto_apply_enabled_at(dry_run)
+        num_rebuilt = self._rebuild_auto_applied_license_counts(dry_run)
+
+        message = (
+            '{} when auto-apply was turned on for {} plans, and {} the auto-applied license counts of {} plans.'
+        ).format(
+            'Would backfill' if dry_run else 'Backfilled',
+            num_backfilled,
+            'would rebuild' if dry_run else 'rebuilt',
+            num_rebuilt,
+        )
+        logger.info(message)
+        self.stdout.write(message)
@@ -0,0 +1,80 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from license_manager.apps.subscriptions.models import License, SubscriptionPlan
+from license_manager.apps.subscriptions.utils import localized_utcnow
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Fills in the enterprise customer uuid denormalized onto licenses, for the licenses created before it was '
+        'added. Licenses are updated plan by plan, in batches that are each committed on their own, so the command '
+        'can be interrupted and run again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            action='store',
+            dest='batch_size',
+            type=int,
+            help='The number of licenses to update with each query.',
+            default=5000,
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            dest='dry_run',
+            help='Only log the number of licenses that would be updated.',
+            default=False,
+        )
+
+    def _backfill_plan(self, subscription_plan, batch_size):
+        """
+        Fills in the enterprise customer uuid of the licenses of the given plan that are missing it, and bumps their
+        ``modified`` so that the license change feed lists the backfilled values.
+        """
+        enterprise_customer_uuid = subscription_plan.customer_agreement.enterprise_customer_uuid
+        licenses_to_backfill = License.objects.filter(
+            subscription_plan=subscription_plan,
+            enterprise_customer_uuid__isnull=True,
+        )
+        num_updated = 0
+        while True:
+            license_uuid_batch = list(licenses_to_backfill.values_list('uuid', flat=True)[:batch_size])
+            if not license_uuid_batch:
+                return num_updated
+            num_updated += License.objects.filter(uuid__in=license_uuid_batch).update(
+                enterprise_customer_uuid=enterprise_customer_uuid,
+                modified=localized_utcnow(),
+            )
+
+    def handle(self, *args, **options):
+        num_updated = 0
+        for subscription_plan in SubscriptionPlan.objects.select_related('customer_agreement').iterator():
+            if options['dry_run']:
+                num_updated += License.objects.filter(
+                    subscription_plan=subscription_plan,
+                    enterprise_customer_uuid__isnull=True,
+                ).count()
+                continue
+
+            num_plan_licenses_updated = self._backfill_plan(subscription_plan, options['batch_size'])
+            if num_plan_licenses_updated:
+                logger.info(
+                    'Backfilled the enterprise customer uuid of %s licenses of plan %s.',
+                    num_plan_licenses_updated,
+                    subscription_plan.uuid,
+                )
+            num_updated += num_plan_licenses_updated
+
+        message = '{} the enterprise customer uuid of {} licenses.'.format(
+            'Would backfill' if options['dry_run'] else 'Backfilled',
+            num_updated,
+        )
+        logger.info(message)
+        self.stdout.write(message)
@@ -0,0 +1,81 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from license_manager.apps.api.filters import search_licenses_by_email
+from license_manager.apps.subscriptions.models import License
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Shows the query plans, timings and number of matches of the searches of the licenses of a plan by email, '
+        'with the "contains" search mode, which scans the licenses of the plan, and with the indexed "prefix" search '
+        'mode. Nothing is written to the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--subscription-uuid',
+            action='store',
+            dest='subscription_uuid',
+            help='The uuid of the subscription plan to search the licenses of.',
+            required=True,
+        )
+        parser.add_argument(
+            '--search-term',
+            action='store',
+            dest='search_term',
+            help='The search term, as typed in the search box of the admin portal.',
+            required=True,
+        )
+        parser.add_argument(
+            '--num-searches',
+            action='store',
+            dest='num_searches',
+            type=int,
+            help='The number of times to time each search.',
+            default=20,
+        )
+
+    def _time_search(self, queryset, num_searches):
+        """
+        Runs the search of ``queryset`` ``num_searches`` times, and returns the mean duration in milliseconds.
+        """
+        start = time.perf_counter()
+        for _ in range(num_searches):
+            list(queryset.all())
+        return (time.perf_counter() - start) * 1000 / num_searches
+
+    def handle(self, *args, **options):
+        num_searches = options['num_searches']
+        if num_searches < 1:
+            raise CommandError('--num-searches must be at least 1')
+
+        plan_licenses = License.objects.filter(subscription_plan_id=options['subscription_uuid'])
+        searches = {}
+        for mode in ('contains', 'prefix'):
+            searches[mode] = search_licenses_by_email(
+                plan_licenses, options['search_term'], mode=mode,
+            ).values_list('uuid', flat=True)
+            self.stdout.write(f'Query plan of the {mode} search:')
+            self.stdout.write(searches[mode].explain())
+            self.stdout.write('')
+
+        results = {}
+        for mode, search in searches.items():
+            results[mode] = (
+                self._time_search(search, num_searches),
+                len(search),
+            )
+
+        message = (
+            f'Mean of {num_searches} searches: the contains search took {results["contains"][0]:.2f}ms '
+            f'and matched {results["contains"][1]} licenses, the prefix search took {results["prefix"][0]:.2f}ms '
+            f'and matched {results["prefix"][1]} licenses.'
+        )
+        logger.info(message)
+        self.stdout.write(message)
@@ -0,0 +1,101 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from license_manager.apps.subscriptions.models import License
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Shows the query plans and timings of the license lookups by user of the staff, admin and learner license '
+        'views, with the former single query filtering on user_email OR lms_user_id, and with the union of two '
+        'index-driven queries used now. Nothing is written to the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-email',
+            action='store',
+            dest='user_email',
+            help='The email of the user to look up the licenses of.',
+            required=True,
+        )
+        parser.add_argument(
+            '--lms-user-id',
+            action='store',
+            dest='lms_user_id',
+            type=int,
+            help='The lms user id of the user to look up the licenses of.',
+            required=True,
+        )
+        parser.add_argument(
+            '--enterprise-customer-uuid',
+            action='store',
+            dest='enterprise_customer_uuid',
+            help='The uuid of the enterprise customer to look up the licenses in.',
+            required=True,
+        )
+        parser.add_argument(
+            '--num-lookups',
+            action='store',
+            dest='num_lookups',
+            type=int,
+            help='The number of times to time each lookup.',
+            default=20,
+        )
+
+    def _time_lookup(self, lookup, num_lookups):
+        """
+        Runs ``lookup`` ``num_lookups`` times, and returns the mean duration in milliseconds.
+        """
+        start = time.perf_counter()
+        for _ in range(num_lookups):
+            lookup()
+        return (time.perf_counter() - start) * 1000 / num_lookups
+
+    def _write_plan(self, title, queryset):
+        self.stdout.write(f'{title}:')
+        self.stdout.write(queryset.explain())
+        self.stdout.write('')
+
+    def handle(self, *args, **options):
+        user_email = options['user_email']
+        lms_user_id = options['lms_user_id']
+        enterprise_customer_uuid = options['enterprise_customer_uuid']
+        num_lookups = options['num_lookups']
+        if num_lookups < 1:
+            raise CommandError('--num-lookups must be at least 1')
+
+        or_lookup = License.objects.filter(
+            Q(user_email=user_email) | Q(lms_user_id=lms_user_id),
+            subscription_plan__customer_agreement__enterprise_customer_uuid=enterprise_customer_uuid,
+        ).values_list('uuid', flat=True)
+        union_lookup = License.user_license_uuids(user_email, lms_user_id)
+        denormalized_union_lookup = License.user_license_uuids(user_email, lms_user_id, enterprise_customer_uuid)
+
+        self._write_plan('Query plan of the OR lookup joined to the customer agreement (before)', or_lookup)
+        self._write_plan('Query plan of the UNION lookup (after)', union_lookup)
+        self._write_plan(
+            'Query plan of the UNION lookup on the denormalized enterprise customer uuid (after backfill)',
+            denormalized_union_lookup,
+        )
+
+        or_ms = self._time_lookup(lambda: list(or_lookup.all()), num_lookups)
+        union_ms = self._time_lookup(
+            lambda: list(License.for_user_and_customer(user_email, lms_user_id, enterprise_customer_uuid)),
+            num_lookups,
+        )
+        denormalized_union_ms = self._time_lookup(lambda: list(denormalized_union_lookup.all()), num_lookups)
+
+        message = (
+            f'Mean of {num_lookups} lookups: OR lookup took {or_ms:.2f}ms, UNION lookup then primary key lookup took '
+            f'{union_ms:.2f}ms, UNION lookup on the denormalized enterprise customer uuid took '
+            f'{denormalized_union_ms:.2f}ms.'
+        )
+        logger.info(message)
+        self.stdout.write(message)
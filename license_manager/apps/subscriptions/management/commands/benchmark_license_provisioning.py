@@ -0,0 +1,99 @@
+import logging
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from license_manager.apps.subscriptions.models import SubscriptionPlan
+from license_manager.apps.subscriptions.tasks import (
+    PROVISION_LICENSES_BATCH_SIZE,
+)
+from license_manager.apps.subscriptions.utils import batch_counts
+
+
+logger = logging.getLogger(__name__)
+
+
+class _RollbackBenchmark(Exception):
+    """
+    Raised to roll back the licenses created while benchmarking a provisioning path.
+    """
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the standard license provisioning path against the fast provisioning mode, by provisioning '
+        'the given number of licenses into an existing plan with each. All created licenses are rolled back, and '
+        'no events are tracked for them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--subscription-plan-uuid',
+            action='store',
+            dest='subscription_plan_uuid',
+            help='UUID of an existing subscription plan to provision the benchmark licenses into.',
+            required=True,
+        )
+        parser.add_argument(
+            '--num-licenses',
+            action='store',
+            dest='num_licenses',
+            type=int,
+            help='The number of licenses to provision with each path.',
+            default=10000,
+        )
+        parser.add_argument(
+            '--fast-batch-size',
+            action='store',
+            dest='fast_batch_size',
+            type=int,
+            help='The insert batch size used by the fast provisioning mode.',
+            default=settings.FAST_LICENSE_PROVISIONING_BATCH_SIZE,
+        )
+
+    def _time_provisioning(self, provision):
+        """
+        Runs ``provision`` in a transaction that is always rolled back, and returns its duration in seconds.
+        """
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                provision()
+                elapsed = time.perf_counter() - start
+                raise _RollbackBenchmark()
+        except _RollbackBenchmark:
+            pass
+        return elapsed
+
+    def handle(self, *args, **options):
+        try:
+            subscription_plan = SubscriptionPlan.objects.get(uuid=options['subscription_plan_uuid'])
+        except SubscriptionPlan.DoesNotExist as exc:
+            raise CommandError(f"No subscription plan with uuid {options['subscription_plan_uuid']}") from exc
+
+        num_licenses = options['num_licenses']
+
+        def provision_standard():
+            # Mirrors provision_licenses_task
+            for batch_count in batch_counts(num_licenses, batch_size=PROVISION_LICENSES_BATCH_SIZE):
+                subscription_plan.increase_num_licenses(batch_count)
+
+        def provision_fast():
+            subscription_plan.bulk_provision_licenses(num_licenses, batch_size=options['fast_batch_size'])
+
+        # The licenses are rolled back, so no Segment events may be sent for them.
+        with mock.patch('license_manager.apps.subscriptions.models.track_license_changes'), \
+                mock.patch('license_manager.apps.subscriptions.models.track_licenses_provisioned'):
+            standard_seconds = self._time_provisioning(provision_standard)
+            fast_seconds = self._time_provisioning(provision_fast)
+
+        message = (
+            f'Provisioned {num_licenses} licenses: standard path took {standard_seconds:.2f}s '
+            f'({num_licenses / standard_seconds:.0f} licenses/s), fast mode took {fast_seconds:.2f}s '
+            f'({num_licenses / fast_seconds:.0f} licenses/s), a {standard_seconds / fast_seconds:.1f}x speedup.'
+        )
+        logger.info(message)
+        self.stdout.write(message)
@@ -0,0 +1,136 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from unittest import mock
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand
+
+from license_manager.apps.api_client.concurrency import call_concurrently
+from license_manager.apps.subscriptions.models import SubscriptionPlan
+
+
+logger = logging.getLogger(__name__)
+
+
+class _SlowCatalogApiClient:
+    """
+    Stands in for ``EnterpriseCatalogApiClient``, as a catalog service that takes ``latency`` seconds to respond
+    and only contains content in the catalog with the given uuid.
+    """
+
+    def __init__(self, latency, matching_catalog_uuid):
+        self.latency = latency
+        self.matching_catalog_uuid = matching_catalog_uuid
+
+    def __call__(self):
+        return self
+
+    def contains_content_items(self, catalog_uuid, content_ids):  # pylint: disable=unused-argument
+        time.sleep(self.latency)
+        return catalog_uuid == self.matching_catalog_uuid
+
+
+def _find_plan_serially(plans, content_ids):
+    """
+    Checks the catalog of each plan in turn, as ``LicenseSubsidyView`` used to.
+    """
+    for plan in plans:
+        if plan.contains_content(content_ids):
+            return plan
+    return None
+
+
+def _find_plan_concurrently(plans, content_ids):
+    """
+    Checks the catalogs of all plans at once, as ``LicenseSubsidyView`` does.
+    """
+    courses_in_catalogs = call_concurrently(*[partial(plan.contains_content, content_ids) for plan in plans])
+    for plan, course_in_catalog in zip(plans, courses_in_catalogs):
+        if course_in_catalog:
+            return plan
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the throughput of the license subsidy catalog lookup against a slow catalog service stub, '
+        'checking the catalogs of a learner\'s plans one after the other and then all at once. '
+        'Nothing is written to the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--num-plans',
+            action='store',
+            dest='num_plans',
+            type=int,
+            help='The number of plans with an activated license the learner has.',
+            default=4,
+        )
+        parser.add_argument(
+            '--upstream-latency-ms',
+            action='store',
+            dest='upstream_latency_ms',
+            type=int,
+            help='How long the catalog service stub takes to respond, in milliseconds.',
+            default=200,
+        )
+        parser.add_argument(
+            '--num-requests',
+            action='store',
+            dest='num_requests',
+            type=int,
+            help='The number of lookups to time with each strategy.',
+            default=32,
+        )
+        parser.add_argument(
+            '--concurrency',
+            action='store',
+            dest='concurrency',
+            type=int,
+            help='The number of lookups served at the same time, like the threads of a gunicorn worker.',
+            default=8,
+        )
+
+    def _time_lookups(self, find_plan, plans, num_requests, concurrency):
+        """
+        Serves ``num_requests`` lookups with ``find_plan``, and returns the elapsed time in seconds.
+        Every lookup is for new content, so none of them is served from the cache.
+        """
+        def lookup(_):
+            return find_plan(plans, [f'course-v1:benchmark+{uuid4()}'])
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lookup, range(num_requests)))
+        return time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        num_plans = options['num_plans']
+        num_requests = options['num_requests']
+        plans = [
+            SubscriptionPlan(uuid=uuid4(), enterprise_catalog_uuid=uuid4())
+            for _ in range(num_plans)
+        ]
+        # The course is only found in the last catalog checked, the worst case for serial lookups.
+        catalog_client = _SlowCatalogApiClient(
+            options['upstream_latency_ms'] / 1000,
+            plans[-1].enterprise_catalog_uuid,
+        )
+
+        with mock.patch('license_manager.apps.subscriptions.models.EnterpriseCatalogApiClient', new=catalog_client):
+            serial_seconds = self._time_lookups(_find_plan_serially, plans, num_requests, options['concurrency'])
+            concurrent_seconds = self._time_lookups(
+                _find_plan_concurrently, plans, num_requests, options['concurrency'],
+            )
+
+        message = (
+            f'Served {num_requests} lookups across {num_plans} plans: serial catalog checks took '
+            f'{serial_seconds:.2f}s ({num_requests / serial_seconds:.1f} requests/s), concurrent catalog checks took '
+            f'{concurrent_seconds:.2f}s ({num_requests / concurrent_seconds:.1f} requests/s), '
+            f'a {serial_seconds / concurrent_seconds:.1f}x speedup.'
+        )
+        logger.info(message)
+        self.stdout.write(message)
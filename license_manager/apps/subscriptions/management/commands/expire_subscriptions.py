@@ -1,17 +1,19 @@
+import hashlib
 import logging
 from datetime import datetime, timedelta
 
 from django.core.management.base import BaseCommand
 
-from license_manager.apps.api.tasks import license_expiration_task
-from license_manager.apps.subscriptions.constants import (
-    ACTIVATED,
-    ASSIGNED,
-    LICENSE_EXPIRATION_BATCH_SIZE,
+from license_manager.apps.core.db_routers import use_replica_for_reads
+from license_manager.apps.subscriptions.api import (
+    process_subscription_plan_expiration,
+)
+from license_manager.apps.subscriptions.batch_jobs import (
+    BatchJob,
+    add_batch_job_arguments,
 )
 from license_manager.apps.subscriptions.models import SubscriptionPlan
 from license_manager.apps.subscriptions.utils import (
-    chunks,
     localized_datetime_from_datetime,
     localized_utcnow,
 )
@@ -29,6 +31,7 @@ class Command(BaseCommand):
     )
 
     def add_arguments(self, parser):
+        add_batch_job_arguments(parser, default_batch_size=100)
         parser.add_argument(
             '--expired-after',
             action='store',
@@ -70,46 +73,13 @@ class Command(BaseCommand):
             default=False,
         )
 
-    def _expire_subscription_plan(self, expired_subscription_plan):
-        """
-        Expires a single subscription plan.
-        """
-        expired_licenses = []
-
-        for lcs in expired_subscription_plan.licenses.iterator():
-            if lcs.status in [ASSIGNED, ACTIVATED]:
-                expired_licenses.append(lcs)
-
-        any_failures = False
-
-        # Terminate the licensed course enrollments
-        for license_chunk in chunks(expired_licenses, LICENSE_EXPIRATION_BATCH_SIZE):
-            try:
-                license_chunk_uuids = [str(lcs.uuid) for lcs in license_chunk]
-
-                # We might be running this command against a plan that expired further in the past to fix bad data. We don't
-                # want to modify a course enrollment if it's been modified after the plan expiration because a user might have upgraded
-                # the course.
-                ignore_enrollments_modified_after = expired_subscription_plan.expiration_date.isoformat() \
-                    if expired_subscription_plan.expiration_date < localized_utcnow() - timedelta(days=1) else None
-
-                license_expiration_task(
-                    license_chunk_uuids,
-                    ignore_enrollments_modified_after=ignore_enrollments_modified_after
-                )
-            except Exception:  # pylint: disable=broad-except
-                any_failures = True
-                msg = 'Failed to terminate course enrollments for learners in subscription: {}'.format(
-                    expired_subscription_plan.uuid)
-                logger.exception(msg)
-
-        if not any_failures:
-            message = 'Terminated course enrollments for learners in subscription: {}'.format(
-                expired_subscription_plan.uuid)
-            logger.info(message)
-
-            expired_subscription_plan.expiration_processed = True
-            expired_subscription_plan.save(update_fields=['expiration_processed'])
+        parser.add_argument(
+            '--use-replica',
+            action='store_true',
+            dest='use_replica',
+            default=False,
+            help='If set, scan for expired subscription plans on the read replica, when one is configured.'
+        )
 
     def handle(self, *args, **options):
         expired_after_date = localized_datetime_from_datetime(
@@ -129,18 +99,22 @@ class Command(BaseCommand):
 
         if options['subscription_uuids']:
             filters = {'uuid__in': options['subscription_uuids'], 'expiration_date__lte': now}
+            scope = 'subscriptions {}'.format(
+                hashlib.sha1(','.join(sorted(options['subscription_uuids'])).encode()).hexdigest()
+            )
         else:
             filters = {'expiration_date__range': (expired_after_date, expired_before_date)}
+            scope = 'expired between {} and {}'.format(expired_after_date, expired_before_date)
 
             # process expired plans again if force flag = True
             if not options['force']:
                 filters['expiration_processed'] = False
 
-        expired_subscription_plans = SubscriptionPlan.objects.filter(
-            **filters
-        ).select_related('customer_agreement').prefetch_related('licenses').order_by('start_date')
+        expired_subscription_plans = SubscriptionPlan.objects.filter(**filters).select_related('customer_agreement')
+        with use_replica_for_reads(enabled=options['use_replica']):
+            any_expired_subscription_plans = expired_subscription_plans.exists()
 
-        if not expired_subscription_plans:
+        if not any_expired_subscription_plans:
             if options['subscription_uuids']:
                 message = 'No subscriptions with uuids {} have expired'.format(
                     options['subscription_uuids'])
@@ -153,25 +127,27 @@ class Command(BaseCommand):
                 return
 
         if not options['dry_run']:
-            for expired_subscription_plan in expired_subscription_plans:
-                renewal_for_plan = expired_subscription_plan.get_renewal()
-
-                # If there is a renewal, we do not want to revoke licensed course enrollments
-                # until the last renewed plan expires
-                if renewal_for_plan:
-                    msg = 'Not processing expiration for subscription: {}, plan has a renewal.'.format(
-                        expired_subscription_plan.uuid)
-                    logger.info(msg)
-                    continue
-
-                self._expire_subscription_plan(expired_subscription_plan)
-
-                prior_renewals = expired_subscription_plan.prior_renewals
-
-                # revoke licensed course enrollments for all previous plans
-                for prior_renewal in prior_renewals:
-                    self._expire_subscription_plan(prior_renewal.prior_subscription_plan)
+            def process_batch(subscription_plans):
+                num_expired = 0
+                # Within each batch, expire the plans that started first first.
+                for expired_subscription_plan in sorted(subscription_plans, key=lambda plan: plan.start_date):
+                    if process_subscription_plan_expiration(expired_subscription_plan):
+                        num_expired += 1
+                return {'num_expired': num_expired}
+
+            BatchJob(
+                'expire_subscriptions',
+                expired_subscription_plans,
+                process_batch,
+                scope=scope,
+                batch_size=options['batch_size'],
+                use_replica=options['use_replica'],
+            ).run(workers=options['workers'], resume=options['resume'])
         else:
-            message = 'Dry-run result subscriptions that would be processed: {}'.format(
-                [str(sub.uuid) for sub in expired_subscription_plans])
+            with use_replica_for_reads(enabled=options['use_replica']):
+                expired_subscription_uuids = [
+                    str(uuid)
+                    for uuid in expired_subscription_plans.order_by('start_date').values_list('uuid', flat=True)
+                ]
+            message = 'Dry-run result subscriptions that would be processed: {}'.format(expired_subscription_uuids)
             logger.info(message)
@@ -14,6 +14,7 @@ from license_manager.apps.subscriptions.constants import (
     LicenseActorType,
 )
 from license_manager.apps.subscriptions.models import SubscriptionPlanRenewal
+from license_manager.apps.subscriptions.tasks import renew_subscription_task
 from license_manager.apps.subscriptions.utils import localized_utcnow
 
 
@@ -42,6 +43,17 @@ class Command(BaseCommand):
             default=False
         )
 
+        parser.add_argument(
+            '--fan-out',
+            action='store_true',
+            dest='fan_out',
+            help=(
+                'Enqueue one celery task per renewal, so that independent renewals '
+                'are processed in parallel by workers'
+            ),
+            default=False
+        )
+
     worker = None
 
     def handle(self, *args, **options):
@@ -62,8 +74,20 @@ class Command(BaseCommand):
             logger.info('Processing {} renewals for subscriptions with uuids: {}'.format(
                 len(subscription_uuids), subscription_uuids))
 
-            renewed_subscription_uuids = []
             correlation_id = str(uuid4())
+            if options['fan_out']:
+                for renewal in renewals_to_be_processed:
+                    renew_subscription_task.delay(
+                        renewal.id,
+                        is_auto_renewed=True,
+                        correlation_id=correlation_id,
+                        subscription_plan_uuid=str(renewal.prior_subscription_plan.uuid),
+                    )
+                logger.info('Enqueued {} renewal tasks for subscriptions with uuids: {}'.format(
+                            len(subscription_uuids), subscription_uuids))
+                return
+
+            renewed_subscription_uuids = []
             for renewal in renewals_to_be_processed:
                 subscription_uuid = str(renewal.prior_subscription_plan.uuid)
                 try:
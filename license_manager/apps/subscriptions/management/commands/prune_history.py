@@ -0,0 +1,96 @@
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from license_manager.apps.subscriptions.history_utils import (
+    get_models_with_history,
+    prune_history,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Prunes the historical records that are older than the retention window configured for their model in '
+        'the HISTORY_RETENTION_DAYS setting, optionally archiving them to a JSON lines file first. The most recent '
+        'historical record of each object is always kept.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            dest='model_labels',
+            help='Label of a model to prune the history of (e.g. subscriptions.License), can be given multiple '
+                 'times. Defaults to every model in HISTORY_RETENTION_DAYS.',
+        )
+        parser.add_argument(
+            '--archive-file',
+            action='store',
+            dest='archive_file',
+            help='Path of a JSON lines file that pruned records are appended to before they are deleted.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            action='store',
+            dest='chunk_size',
+            type=int,
+            help='The number of records to archive and delete in each transaction.',
+            default=settings.HISTORY_RETENTION_CHUNK_SIZE,
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            dest='dry_run',
+            help='Only log the number of records that would be pruned.',
+            default=False,
+        )
+
+    def _get_models_to_prune(self, model_labels):
+        """
+        Returns ``(model, retention days)`` tuples for the requested models that have a retention window.
+        """
+        models_with_history = {model._meta.label: model for model in get_models_with_history()}
+        models_to_prune = []
+        for model_label in model_labels or settings.HISTORY_RETENTION_DAYS:
+            try:
+                model = apps.get_model(model_label)
+            except (LookupError, ValueError) as exc:
+                raise CommandError(f'Unknown model {model_label}') from exc
+            if model._meta.label not in models_with_history:
+                raise CommandError(f'{model_label} does not keep historical records')
+            if model._meta.label not in settings.HISTORY_RETENTION_DAYS:
+                raise CommandError(f'No history retention window is configured for {model_label}')
+            models_to_prune.append((model, settings.HISTORY_RETENTION_DAYS[model._meta.label]))
+        return models_to_prune
+
+    def handle(self, *args, **options):
+        models_to_prune = self._get_models_to_prune(options['model_labels'])
+
+        archive_stream = None
+        if options['archive_file'] and not options['dry_run']:
+            archive_stream = open(options['archive_file'], 'a', encoding='utf-8')  # pylint: disable=consider-using-with
+        try:
+            for model, retention_days in models_to_prune:
+                num_pruned = prune_history(
+                    model,
+                    retention_days,
+                    chunk_size=options['chunk_size'],
+                    archive_stream=archive_stream,
+                    dry_run=options['dry_run'],
+                )
+                message = '{} {} historical records of {} older than {} days.'.format(
+                    'Would prune' if options['dry_run'] else 'Pruned',
+                    num_pruned,
+                    model._meta.label,
+                    retention_days,
+                )
+                logger.info(message)
+                self.stdout.write(message)
+        finally:
+            if archive_stream is not None:
+                archive_stream.close()
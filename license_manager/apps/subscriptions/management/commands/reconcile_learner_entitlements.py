@@ -0,0 +1,63 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from license_manager.apps.subscriptions.models import (
+    LearnerEntitlement,
+    License,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the learner entitlements of every assigned or activated license from the licenses, their plans and '
+        'customer agreements, and deletes the entitlements of licenses that are no longer assigned or activated. '
+        'Meant to run nightly, to repair any entitlement missed by writes that skip the model layer. Licenses are '
+        'reconciled in batches that are each committed on their own, so the command can be interrupted and run again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            action='store',
+            dest='batch_size',
+            type=int,
+            help='The number of licenses to reconcile with each batch of queries.',
+            default=1000,
+        )
+
+    def _license_uuid_batches(self, batch_size):
+        """
+        Yields the uuids of the licenses that have, or should have, an entitlement, in batches ordered by uuid.
+        """
+        license_uuids = License.objects.filter(
+            status__in=LearnerEntitlement.ENTITLED_LICENSE_STATUSES,
+        ).values_list('uuid', flat=True).order_by('uuid')
+        last_uuid = None
+        while True:
+            batch_queryset = license_uuids if last_uuid is None else license_uuids.filter(uuid__gt=last_uuid)
+            license_uuid_batch = list(batch_queryset[:batch_size])
+            if not license_uuid_batch:
+                return
+            yield license_uuid_batch
+            last_uuid = license_uuid_batch[-1]
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        num_written = 0
+        for license_uuid_batch in self._license_uuid_batches(batch_size):
+            num_batch_written, _ = LearnerEntitlement.sync_licenses(license_uuid_batch, batch_size=batch_size)
+            num_written += num_batch_written
+
+        # Entitlements of licenses that were unassigned or revoked without updating them.
+        stale_license_uuids = LearnerEntitlement.objects.exclude(
+            license__status__in=LearnerEntitlement.ENTITLED_LICENSE_STATUSES,
+        ).values_list('license_id', flat=True)
+        _, num_deleted = LearnerEntitlement.sync_licenses(stale_license_uuids, batch_size=batch_size)
+
+        message = f'Reconciled {num_written} learner entitlements, and deleted {num_deleted} stale ones.'
+        logger.info(message)
+        self.stdout.write(message)
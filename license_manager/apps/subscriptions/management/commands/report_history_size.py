@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from license_manager.apps.subscriptions.history_utils import (
+    get_history_row_counts,
+    get_history_row_counts_by_plan,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Reports the number of historical records kept for each model of the subscriptions app, and for the '
+        'subscription plans with the most historical license records.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--num-plans',
+            action='store',
+            dest='num_plans',
+            type=int,
+            help='The number of subscription plans to report on, largest license history first.',
+            default=20,
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Historical records per model:')
+        for model_label, num_history_records, num_records in get_history_row_counts():
+            ratio = num_history_records / num_records if num_records else 0
+            self.stdout.write(
+                f'  {model_label}: {num_history_records} historical records for {num_records} records '
+                f'({ratio:.1f} per record)'
+            )
+
+        self.stdout.write('Historical records per subscription plan:')
+        for plan_uuid, num_license_history_records, num_plan_history_records in get_history_row_counts_by_plan(
+            limit=options['num_plans'],
+        ):
+            self.stdout.write(
+                f'  {plan_uuid}: {num_license_history_records} historical license records, '
+                f'{num_plan_history_records} historical plan records'
+            )
@@ -0,0 +1,58 @@
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from license_manager.apps.subscriptions.archive import restore_archived_licenses
+from license_manager.apps.subscriptions.models import ArchivedLicense
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves archived licenses, along with their historical records, license sources and events, back from the '
+        'archive tables to the license tables, either all the archived licenses of a plan or the given licenses.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--subscription-plan-uuid',
+            action='store',
+            dest='subscription_plan_uuid',
+            default=None,
+            help='Restore the archived licenses of the plan with this uuid.',
+        )
+        parser.add_argument(
+            '--license-uuids',
+            action='store',
+            dest='license_uuids',
+            default=None,
+            help='Comma separated uuids of the archived licenses to restore.',
+            type=lambda s: [str(uuid) for uuid in s.split(',')]
+        )
+        parser.add_argument(
+            '--batch-size',
+            action='store',
+            dest='batch_size',
+            type=int,
+            default=settings.LICENSE_ARCHIVE_BATCH_SIZE,
+            help='The number of licenses restored in each transaction.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['subscription_plan_uuid'] and not options['license_uuids']:
+            raise CommandError('Either --subscription-plan-uuid or --license-uuids is required.')
+
+        archived_licenses = ArchivedLicense.objects.all()
+        if options['subscription_plan_uuid']:
+            archived_licenses = archived_licenses.filter(subscription_plan_id=options['subscription_plan_uuid'])
+        if options['license_uuids']:
+            archived_licenses = archived_licenses.filter(uuid__in=options['license_uuids'])
+
+        num_restored = restore_archived_licenses(archived_licenses, batch_size=options['batch_size'])
+
+        message = f'Restored {num_restored} licenses.'
+        logger.info(message)
+        self.stdout.write(message)
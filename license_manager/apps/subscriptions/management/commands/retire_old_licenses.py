@@ -1,12 +1,13 @@
 import logging
-from datetime import timedelta
-from itertools import chain
 
 from django.core.management.base import BaseCommand
 
+from license_manager.apps.subscriptions.batch_jobs import (
+    BatchJob,
+    add_batch_job_arguments,
+)
 from license_manager.apps.subscriptions.constants import (
     ASSIGNED,
-    DAYS_TO_RETIRE,
     REVOKED,
     SegmentEvents,
 )
@@ -28,79 +29,104 @@ class Command(BaseCommand):
     )
 
     def add_arguments(self, parser):
-        parser.add_argument("--batch-size", required=False, type=int)
+        add_batch_job_arguments(parser, default_batch_size=1000)
+        parser.add_argument(
+            '--use-replica',
+            action='store_true',
+            dest='use_replica',
+            default=False,
+            help='If set, scan for licenses to retire on the read replica, when one is configured.'
+        )
+
+    def _retire_licenses(self, scope, queryset, retire_license, message, options):
+        """
+        Retires the licenses of ``queryset`` with ``retire_license`` as a batch job, and logs ``message`` with the
+        number and uuids of the licenses retired by each shard.
+        """
+        retired_license_uuids = []
+
+        def process_batch(licenses):
+            for license_obj in licenses:
+                retire_license(license_obj)
+                # Clear historical pii after removing pii from the license itself
+                license_obj.clear_historical_pii()
+                license_obj.delete_source()
+                retired_license_uuids.append(license_obj.uuid)
+
+        def on_shard_completed(checkpoint):  # pylint: disable=unused-argument
+            logger.info(message.format(len(retired_license_uuids), retired_license_uuids))
+
+        BatchJob(
+            'retire_old_licenses',
+            queryset,
+            process_batch,
+            scope=scope,
+            batch_size=options['batch_size'],
+            use_replica=options['use_replica'],
+            on_shard_completed=on_shard_completed,
+        ).run(workers=options['workers'], resume=options['resume'])
+
+    def _retire_expired_license(self, expired_license):
+        """
+        Revokes an expired license and clears its PII, tracking the revocation event.
+        """
+        # record event data BEFORE we clear the license data:
+        event_properties = get_license_tracking_properties(expired_license)
+
+        expired_license.clear_pii()
+        expired_license.status = REVOKED
+        expired_license.revoked_date = localized_utcnow()
+        expired_license.save()
+
+        event_properties = get_license_tracking_properties(expired_license)
+        track_event(expired_license.lms_user_id,
+                    SegmentEvents.LICENSE_REVOKED,
+                    event_properties)
+
+    def _retire_revoked_license(self, revoked_license):
+        revoked_license.clear_pii()
+        revoked_license.save()
+
+    def _retire_assigned_license(self, assigned_license):
+        assigned_license.reset_to_unassigned()
+        assigned_license.save()
 
     def handle(self, *args, **options):
-        batch_size_kwarg = {'batch_size': options['batch_size']} if options['batch_size'] else {}
-        expired_licenses_for_retirement = License.get_licenses_exceeding_purge_duration(
-            'subscription_plan__expiration_date',
-            **batch_size_kwarg,
-        )
-        expired_license_uuids = []
         # Scrub all pii on licenses whose subscription expired over 90 days ago, and mark the licenses as revoked
-        for expired_license in chain(*expired_licenses_for_retirement):
-            # record event data BEFORE we clear the license data:
-            event_properties = get_license_tracking_properties(expired_license)
-
-            expired_license.clear_pii()
-            expired_license.status = REVOKED
-            expired_license.revoked_date = localized_utcnow()
-            expired_license.save()
-
-            event_properties = get_license_tracking_properties(expired_license)
-            track_event(expired_license.lms_user_id,
-                        SegmentEvents.LICENSE_REVOKED,
-                        event_properties)
-
-            # Clear historical pii after removing pii from the license itself
-            expired_license.clear_historical_pii()
-            expired_license.delete_source()
-            expired_license_uuids.append(expired_license.uuid)
-
-        message = 'Retired {} expired licenses with uuids: {}'.format(len(expired_license_uuids), expired_license_uuids)
-        logger.info(message)
-
-        revoked_licenses_for_retirement = License.get_licenses_exceeding_purge_duration(
-            'revoked_date',
-            status=REVOKED,
-            subscription_plan__for_internal_use_only=False,
-            **batch_size_kwarg,
+        self._retire_licenses(
+            'expired',
+            License.get_licenses_exceeding_purge_duration('subscription_plan__expiration_date'),
+            self._retire_expired_license,
+            'Retired {} expired licenses with uuids: {}',
+            options,
         )
-        revoked_license_uuids = []
+
         # Scrub all pii on the revoked licenses, but they should stay revoked and keep their other info as we currently
         # add an unassigned license to the subscription's license pool whenever one is revoked.
-        for revoked_license in chain(*revoked_licenses_for_retirement):
-            revoked_license.clear_pii()
-            revoked_license.save()
-            # Clear historical pii after removing pii from the license itself
-            revoked_license.clear_historical_pii()
-            revoked_license.delete_source()
-            revoked_license_uuids.append(revoked_license.uuid)
-
-        message = 'Retired {} revoked licenses with uuids: {}'.format(len(revoked_license_uuids), revoked_license_uuids)
-        logger.info(message)
+        self._retire_licenses(
+            'revoked',
+            License.get_licenses_exceeding_purge_duration(
+                'revoked_date',
+                status=REVOKED,
+                subscription_plan__for_internal_use_only=False,
+            ),
+            self._retire_revoked_license,
+            'Retired {} revoked licenses with uuids: {}',
+            options,
+        )
 
         # Any license that was assigned but not activated before the associated agreement's
         # ``unactivated_license_duration`` elapsed should have its data scrubbed.
-        assigned_licenses_for_retirement = License.get_licenses_exceeding_purge_duration(
-            'assigned_date',
-            status=ASSIGNED,
-            subscription_plan__for_internal_use_only=False,
-            **batch_size_kwarg,
-        )
-        assigned_license_uuids = []
         # We place previously assigned licenses that are now retired back into the unassigned license pool, so we scrub
         # all data on them.
-        for assigned_license in chain(*assigned_licenses_for_retirement):
-            assigned_license.reset_to_unassigned()
-            assigned_license.save()
-            # Clear historical pii after removing pii from the license itself
-            assigned_license.clear_historical_pii()
-            assigned_license.delete_source()
-            assigned_license_uuids.append(assigned_license.uuid)
-
-        message = 'Retired {} assigned licenses that exceeded their inactivation duration with uuids: {}'.format(
-            len(assigned_license_uuids),
-            assigned_license_uuids,
+        self._retire_licenses(
+            'assigned',
+            License.get_licenses_exceeding_purge_duration(
+                'assigned_date',
+                status=ASSIGNED,
+                subscription_plan__for_internal_use_only=False,
+            ),
+            self._retire_assigned_license,
+            'Retired {} assigned licenses that exceeded their inactivation duration with uuids: {}',
+            options,
         )
-        logger.info(message)
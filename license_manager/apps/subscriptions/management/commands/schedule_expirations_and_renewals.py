@@ -0,0 +1,26 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from license_manager.apps.subscriptions.scheduling import (
+    schedule_due_expirations_and_renewals,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Enqueues a task for each plan expiration and renewal that is due within the scheduling horizon, to process '
+        'it when it comes due, and for each one that is overdue by up to the catch-up period, e.g. because its task '
+        'was lost. Each item is only enqueued once for the date it is due at, so the command is meant to run hourly, '
+        'as the catch-up sweep of the tasks enqueued when plans and renewals are saved.'
+    )
+
+    def handle(self, *args, **options):
+        num_expirations, num_renewals = schedule_due_expirations_and_renewals()
+
+        message = f'Enqueued {num_expirations} plan expirations and {num_renewals} renewals.'
+        logger.info(message)
+        self.stdout.write(message)
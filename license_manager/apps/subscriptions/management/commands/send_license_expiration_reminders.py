@@ -15,6 +15,11 @@ from django.core.management.base import BaseCommand
 
 from license_manager.apps.api import utils as api_utils
 from license_manager.apps.api_client.enterprise import EnterpriseApiClient
+from license_manager.apps.core.db_routers import use_replica_for_reads
+from license_manager.apps.subscriptions.batch_jobs import (
+    BatchJob,
+    add_batch_job_arguments,
+)
 from license_manager.apps.subscriptions.constants import (
     ACTIVATED,
     BRAZE_TIMESTAMP_FORMAT,
@@ -55,6 +60,15 @@ class Command(BaseCommand):
         'Sends Braze email reminders to learners with activated licenses expiring within a specified timeframe.'
     )
 
+    # Whether to scan for licenses on the read replica, see --use-replica.
+    use_replica = False
+
+    # The number of processes to send reminders from, see --workers.
+    workers = 1
+
+    # Whether to resume the batch jobs of the previous run, see --resume.
+    resume = False
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--enterprise-customer-uuid',
@@ -80,13 +94,13 @@ class Command(BaseCommand):
             default=False,
             help='If set, only log which licenses would be processed without sending emails.'
         )
+        add_batch_job_arguments(parser, default_batch_size=25)
         parser.add_argument(
-            '--batch-size',
-            action='store',
-            dest='batch_size',
-            type=int,
-            default=25,
-            help='Number of licenses to process and send in each batch (default: 25).'
+            '--use-replica',
+            action='store_true',
+            dest='use_replica',
+            default=False,
+            help='If set, scan for expiring licenses on the read replica, when one is configured.'
         )
 
     def _parse_enterprise_customer_uuids(self, uuids_string: str) -> list[str]:
@@ -161,35 +175,31 @@ class Command(BaseCommand):
         """
         return self._get_expiring_licenses_base_queryset(enterprise_customer_uuid, days_before_expiration)
 
-    def _get_expiring_licenses_in_batches(self, enterprise_customer_uuid, days_before_expiration, batch_size):
+    def _run_batch_job(self, enterprise_customer_uuid, days_before_expiration, dry_run, batch_size, process_batch):
         """
-        Get activated licenses in batches using a generator pattern.
-
-        Yields batches of licenses that are expiring within the specified number of days.
-        Uses stable pagination with pk ordering to efficiently process large result sets.
+        Processes the expiring licenses with ``process_batch`` as a batch job, and returns its totals.
 
         Args:
             enterprise_customer_uuid (str): UUID of the enterprise customer
             days_before_expiration (int): Number of days before expiration
+            dry_run (bool): Whether this is a dry run, which is checkpointed separately
             batch_size (int): Number of licenses per batch
+            process_batch (callable): Called with the list of License objects of every batch
 
-        Yields:
-            QuerySet of License objects (up to batch_size per batch)
+        Returns:
+            dict: The number of licenses processed, and the sums of the metrics returned by ``process_batch``
         """
-        # Get base queryset and add stable ordering for pagination
-        base_queryset = self._get_expiring_licenses_base_queryset(
-            enterprise_customer_uuid,
-            days_before_expiration
-        ).order_by('pk')
-
-        # Paginate through results in batches
-        queryset = base_queryset[:batch_size]
-        offset = 0
-        while queryset.exists():
-            yield queryset
-            # Get the last pk in the current batch to use as offset for next batch
-            offset = list(queryset)[-1].pk
-            queryset = base_queryset.filter(pk__gt=offset)[:batch_size]
+        scope = f'{enterprise_customer_uuid} {days_before_expiration} days before expiration'
+        if dry_run:
+            scope += ' dry run'
+        return BatchJob(
+            'send_license_expiration_reminders',
+            self._get_expiring_licenses_base_queryset(enterprise_customer_uuid, days_before_expiration),
+            process_batch,
+            scope=scope,
+            batch_size=batch_size,
+            use_replica=self.use_replica,
+        ).run(workers=self.workers, resume=self.resume)
 
     def _send_expiration_reminder_emails_batch(self, licenses, enterprise_customer):
         """
@@ -287,7 +297,8 @@ class Command(BaseCommand):
 
         # Get count of expiring licenses for logging
         licenses_count_queryset = self._get_expiring_licenses(enterprise_customer_uuid, days_before_expiration)
-        total_count = licenses_count_queryset.count()
+        with use_replica_for_reads(enabled=self.use_replica):
+            total_count = licenses_count_queryset.count()
 
         if total_count == 0:
             logger.info(
@@ -298,14 +309,14 @@ class Command(BaseCommand):
 
         logger.info(f'Found {total_count} licenses to process for enterprise {enterprise_customer_uuid}')
 
+        batch_num = 0
+
         if dry_run:
             logger.info(f'DRY RUN - Would send expiration reminders for enterprise {enterprise_customer_uuid}:')
-            batch_num = 0
-            for license_batch in self._get_expiring_licenses_in_batches(
-                enterprise_customer_uuid, days_before_expiration, batch_size
-            ):
+
+            def log_batch(license_list):
+                nonlocal batch_num
                 batch_num += 1
-                license_list = list(license_batch)
                 logger.info(f'  Batch {batch_num} ({len(license_list)} licenses):')
                 for license_obj in license_list:
                     logger.info(
@@ -313,6 +324,8 @@ class Command(BaseCommand):
                         f'User Email: {license_obj.user_email}, '
                         f'Expiration Date: {license_obj.subscription_plan.expiration_date.strftime("%Y-%m-%d")}'
                     )
+
+            self._run_batch_job(enterprise_customer_uuid, days_before_expiration, dry_run, batch_size, log_batch)
             return {'success_count': 0, 'failure_count': 0}
 
         # Get enterprise customer data from API
@@ -325,16 +338,9 @@ class Command(BaseCommand):
             )
             raise
 
-        # Process licenses in batches
-        success_count = 0
-        failure_count = 0
-        batch_num = 0
-
-        for license_batch in self._get_expiring_licenses_in_batches(
-            enterprise_customer_uuid, days_before_expiration, batch_size
-        ):
+        def send_batch(license_list):
+            nonlocal batch_num
             batch_num += 1
-            license_list = list(license_batch)
             logger.info(
                 f'Processing batch {batch_num} with {len(license_list)} licenses for enterprise {enterprise_customer_uuid}'
             )
@@ -351,13 +357,12 @@ class Command(BaseCommand):
                         license_obj.expiration_reminder_sent_date = now
 
                     License.bulk_update(successful_licenses, ['expiration_reminder_sent_date'])
-                    success_count += len(successful_licenses)
                     logger.info(f'Batch {batch_num}: Marked {len(successful_licenses)} licenses as sent')
 
                 if failed_licenses:
-                    failure_count += len(failed_licenses)
                     logger.warning(f'Batch {batch_num}: {len(failed_licenses)} licenses failed to send')
 
+                return {'success_count': len(successful_licenses), 'failure_count': len(failed_licenses)}
             except ValueError as exc:
                 # Configuration error - re-raise immediately
                 raise
@@ -365,7 +370,12 @@ class Command(BaseCommand):
                 logger.exception(
                     f'Unexpected error processing batch {batch_num} for enterprise {enterprise_customer_uuid}: {exc}'
                 )
-                failure_count += len(license_list)
+                return {'success_count': 0, 'failure_count': len(license_list)}
+
+        # Process licenses in batches
+        totals = self._run_batch_job(enterprise_customer_uuid, days_before_expiration, dry_run, batch_size, send_batch)
+        success_count = totals.get('success_count', 0)
+        failure_count = totals.get('failure_count', 0)
 
         logger.info(
             f'Completed processing for enterprise {enterprise_customer_uuid}. '
@@ -382,6 +392,9 @@ class Command(BaseCommand):
         days_before_expiration = options['days_before_expiration']
         dry_run = options['dry_run']
         batch_size = options['batch_size']
+        self.use_replica = options['use_replica']
+        self.workers = options['workers']
+        self.resume = options['resume']
 
         # Parse the enterprise customer UUIDs
         enterprise_customer_uuids = self._parse_enterprise_customer_uuids(enterprise_customer_uuids_string)
@@ -0,0 +1,43 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from license_manager.apps.subscriptions.models import ArchivedLicense, License
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+from license_manager.apps.subscriptions.utils import localized_utcnow
+
+
+@override_settings(LICENSE_ARCHIVE_AFTER_DAYS=3 * 365)
+class ArchiveExpiredLicensesCommandTests(TestCase):
+    command_name = 'archive_expired_licenses'
+
+    def setUp(self):
+        super().setUp()
+        now = localized_utcnow()
+        self.old_plan = SubscriptionPlanFactory(expiration_date=now - timedelta(days=4 * 365))
+        self.old_licenses = LicenseFactory.create_batch(3, subscription_plan=self.old_plan)
+        self.recent_plan = SubscriptionPlanFactory(expiration_date=now - timedelta(days=365))
+        self.recent_license = LicenseFactory(subscription_plan=self.recent_plan)
+
+    def test_archive_expired_licenses(self):
+        out = StringIO()
+        call_command(self.command_name, '--batch-size=2', stdout=out)
+
+        assert 'Archived 3 licenses.' in out.getvalue()
+        assert set(ArchivedLicense.objects.values_list('uuid', flat=True)) == {
+            license_obj.uuid for license_obj in self.old_licenses
+        }
+        assert list(License.objects.values_list('uuid', flat=True)) == [self.recent_license.uuid]
+
+    def test_archive_expired_licenses_dry_run(self):
+        out = StringIO()
+        call_command(self.command_name, '--dry-run', stdout=out)
+
+        assert '[DRY RUN] Would have archived 3 licenses.' in out.getvalue()
+        assert not ArchivedLicense.objects.exists()
+        assert License.objects.count() == 4
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from license_manager.apps.subscriptions.models import (
+    AutoAppliedLicenseCount,
+    SubscriptionPlan,
+)
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+from license_manager.apps.subscriptions.utils import localized_datetime
+
+
+class BackfillAutoApplyStateCommandTests(TestCase):
+    command_name = 'backfill_auto_apply_state'
+
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory(should_auto_apply_licenses=True)
+        self.turned_on_at = self.subscription_plan.history.latest().history_date
+        self.other_subscription_plan = SubscriptionPlanFactory(should_auto_apply_licenses=False)
+        # Plans last turned on before auto_apply_enabled_at was recorded
+        SubscriptionPlan.objects.update(auto_apply_enabled_at=None)
+
+        self.activation_date = localized_datetime(2024, 1, 1, 10, 30)
+        LicenseFactory.create_batch(
+            2, subscription_plan=self.subscription_plan, auto_applied=True, activation_date=self.activation_date,
+        )
+        LicenseFactory.create(
+            subscription_plan=self.other_subscription_plan,
+            auto_applied=True,
+            activation_date=self.activation_date + timedelta(hours=1),
+        )
+
+    def test_backfill(self):
+        with self.assertLogs(level='INFO') as log:
+            call_command(self.command_name)
+
+        self.subscription_plan.refresh_from_db()
+        self.other_subscription_plan.refresh_from_db()
+        assert self.subscription_plan.auto_apply_enabled_at == self.turned_on_at
+        assert self.other_subscription_plan.auto_apply_enabled_at is None
+        assert AutoAppliedLicenseCount.count_since(self.subscription_plan, self.activation_date) == 2
+        assert AutoAppliedLicenseCount.count_since(self.other_subscription_plan, self.activation_date) == 1
+        assert (
+            'Backfilled when auto-apply was turned on for 1 plans, '
+            'and rebuilt the auto-applied license counts of 2 plans.'
+        ) in log.output[-1]
+
+        # Running the command again doesn't count licenses twice
+        call_command(self.command_name)
+        assert AutoAppliedLicenseCount.count_since(self.subscription_plan, self.activation_date) == 2
+
+    def test_backfill_dry_run(self):
+        with self.assertLogs(level='INFO') as log:
+            call_command(self.command_name, '--dry-run')
+
+        self.subscription_plan.refresh_from_db()
+        assert self.subscription_plan.auto_apply_enabled_at is None
+        assert not AutoAppliedLicenseCount.objects.exists()
+        assert (
+            'Would backfill when auto-apply was turned on for 1 plans, '
+            'and would rebuild the auto-applied license counts of 2 plans.'
+        ) in log.output[-1]
@@ -0,0 +1,53 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from license_manager.apps.subscriptions.models import License
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+from license_manager.apps.subscriptions.utils import localized_utcnow
+
+
+class BackfillLicenseEnterpriseCustomerUuidsCommandTests(TestCase):
+    command_name = 'backfill_license_enterprise_customer_uuids'
+
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+        self.other_subscription_plan = SubscriptionPlanFactory()
+        LicenseFactory.create_batch(3, subscription_plan=self.subscription_plan)
+        LicenseFactory.create_batch(2, subscription_plan=self.other_subscription_plan)
+        # Licenses created before the enterprise customer uuid was denormalized onto them
+        License.objects.update(enterprise_customer_uuid=None)
+
+    def _assert_enterprise_customer_uuids(self, subscription_plan, expected_enterprise_customer_uuid):
+        enterprise_customer_uuids = set(
+            License.objects.filter(
+                subscription_plan=subscription_plan,
+            ).values_list('enterprise_customer_uuid', flat=True)
+        )
+        assert enterprise_customer_uuids == {expected_enterprise_customer_uuid}
+
+    def test_backfill(self):
+        backfill_started_at = localized_utcnow()
+        with self.assertLogs(level='INFO') as log:
+            call_command(self.command_name, '--batch-size', '2')
+
+        # The backfilled licenses are listed by the license change feed.
+        assert not License.objects.filter(modified__lt=backfill_started_at).exists()
+
+        for subscription_plan in (self.subscription_plan, self.other_subscription_plan):
+            self._assert_enterprise_customer_uuids(
+                subscription_plan,
+                subscription_plan.customer_agreement.enterprise_customer_uuid,
+            )
+        assert 'Backfilled the enterprise customer uuid of 5 licenses.' in log.output[-1]
+
+    def test_backfill_dry_run(self):
+        with self.assertLogs(level='INFO') as log:
+            call_command(self.command_name, '--dry-run')
+
+        for subscription_plan in (self.subscription_plan, self.other_subscription_plan):
+            self._assert_enterprise_customer_uuids(subscription_plan, None)
+        assert 'Would backfill the enterprise customer uuid of 5 licenses.' in log.output[-1]
@@ -0,0 +1,40 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from license_manager.apps.subscriptions.models import License
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+
+
+class BenchmarkLicenseEmailSearchCommandTests(TestCase):
+    command_name = 'benchmark_license_email_search'
+
+    def test_benchmark(self):
+        """
+        Verify that the query plans of each search are shown and the searches are timed and counted,
+        without anything being written to the database.
+        """
+        subscription_plan = SubscriptionPlanFactory()
+        LicenseFactory(subscription_plan=subscription_plan, user_email='bob@example.com')
+        LicenseFactory(subscription_plan=subscription_plan, user_email='alice.bobson@example.com')
+        num_licenses = License.objects.count()
+        out = StringIO()
+
+        call_command(
+            self.command_name,
+            '--subscription-uuid', str(subscription_plan.uuid),
+            '--search-term', 'Bob',
+            '--num-searches', '2',
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        assert 'Query plan of the contains search:' in output
+        assert 'Query plan of the prefix search:' in output
+        assert 'matched 2 licenses, the prefix search took' in output
+        assert output.strip().endswith('and matched 1 licenses.')
+        assert License.objects.count() == num_licenses
@@ -0,0 +1,39 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from license_manager.apps.subscriptions.models import License
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+
+
+class BenchmarkLicenseLookupsCommandTests(TestCase):
+    command_name = 'benchmark_license_lookups'
+
+    def test_benchmark(self):
+        """
+        Verify that the query plans of each lookup are shown and the lookups are timed,
+        without anything being written to the database.
+        """
+        subscription_plan = SubscriptionPlanFactory()
+        LicenseFactory(subscription_plan=subscription_plan, user_email='bob@example.com', lms_user_id=1)
+        num_licenses = License.objects.count()
+        out = StringIO()
+
+        call_command(
+            self.command_name,
+            '--user-email', 'bob@example.com',
+            '--lms-user-id', '1',
+            '--enterprise-customer-uuid', str(subscription_plan.customer_agreement.enterprise_customer_uuid),
+            '--num-lookups', '2',
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        assert 'Query plan of the OR lookup joined to the customer agreement (before):' in output
+        assert 'Query plan of the UNION lookup (after):' in output
+        assert 'Mean of 2 lookups: OR lookup took' in output
+        assert License.objects.count() == num_licenses
@@ -0,0 +1,44 @@
+from io import StringIO
+from unittest import mock
+from uuid import uuid4
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from license_manager.apps.subscriptions.tests.factories import (
+    SubscriptionPlanFactory,
+)
+
+
+@pytest.mark.django_db
+class BenchmarkLicenseProvisioningCommandTests(TestCase):
+    command_name = 'benchmark_license_provisioning'
+
+    @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
+    @mock.patch('license_manager.apps.subscriptions.event_utils._track_subscription_plan_event')
+    def test_benchmark_rolls_back_licenses(self, mock_track_subscription_plan_event, mock_track_event):
+        """
+        Verify that both provisioning paths are timed, and that no benchmark licenses are left behind, nor
+        events tracked for them.
+        """
+        subscription_plan = SubscriptionPlanFactory.create()
+        out = StringIO()
+
+        call_command(
+            self.command_name,
+            '--subscription-plan-uuid', str(subscription_plan.uuid),
+            '--num-licenses', '20',
+            '--fast-batch-size', '8',
+            stdout=out,
+        )
+
+        assert 'Provisioned 20 licenses: standard path took' in out.getvalue()
+        assert subscription_plan.licenses.count() == 0
+        mock_track_event.assert_not_called()
+        mock_track_subscription_plan_event.assert_not_called()
+
+    def test_benchmark_unknown_plan(self):
+        with self.assertRaises(CommandError):
+            call_command(self.command_name, '--subscription-plan-uuid', str(uuid4()))
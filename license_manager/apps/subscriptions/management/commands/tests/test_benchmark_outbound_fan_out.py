@@ -0,0 +1,28 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from license_manager.apps.subscriptions.models import SubscriptionPlan
+
+
+class BenchmarkOutboundFanOutCommandTests(TestCase):
+    command_name = 'benchmark_outbound_fan_out'
+
+    def test_benchmark(self):
+        """
+        Verify that both lookup strategies are timed, and that nothing is written to the database.
+        """
+        out = StringIO()
+
+        call_command(
+            self.command_name,
+            '--num-plans', '3',
+            '--upstream-latency-ms', '1',
+            '--num-requests', '4',
+            '--concurrency', '2',
+            stdout=out,
+        )
+
+        assert 'Served 4 lookups across 3 plans: serial catalog checks took' in out.getvalue()
+        assert not SubscriptionPlan.objects.exists()
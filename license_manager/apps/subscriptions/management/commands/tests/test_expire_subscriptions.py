@@ -5,6 +5,7 @@ from unittest import mock
 import pytest
 from django.core.management import call_command
 from django.test import TestCase
+from django.test.utils import override_settings
 
 from license_manager.apps.subscriptions.constants import (
     ACTIVATED,
@@ -14,6 +15,9 @@ from license_manager.apps.subscriptions.constants import (
     UNASSIGNED,
 )
 from license_manager.apps.subscriptions.models import License, SubscriptionPlan
+from license_manager.apps.subscriptions.tasks import (
+    track_license_expirations_task,
+)
 from license_manager.apps.subscriptions.tests.factories import (
     LicenseFactory,
     SubscriptionPlanFactory,
@@ -27,6 +31,7 @@ from license_manager.apps.subscriptions.utils import (
 
 @pytest.mark.django_db
 class ExpireSubscriptionsCommandTests(TestCase):
+    databases = {'default', 'replica'}
     command_name = 'expire_subscriptions'
     today = localized_utcnow()
 
@@ -78,7 +83,7 @@ class ExpireSubscriptionsCommandTests(TestCase):
 
     @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
     @mock.patch(
-        'license_manager.apps.subscriptions.management.commands.expire_subscriptions.license_expiration_task'
+        'license_manager.apps.api.tasks.license_expiration_task'
     )
     def test_1_subscription_expiring_today(self, mock_license_expiration_task, mock_track_event):
         """
@@ -95,9 +100,27 @@ class ExpireSubscriptionsCommandTests(TestCase):
         expired_subscription.refresh_from_db()
         self.assertTrue(expired_subscription.expiration_processed)
 
+    @override_settings(REPLICA_DATABASE_ALIAS='replica')
+    @mock.patch(
+        'license_manager.apps.api.tasks.license_expiration_task'
+    )
+    def test_scan_on_replica(self, mock_license_expiration_task):
+        """
+        With --use-replica, expired plans are looked up on the replica, which doesn't have the plan yet.
+        """
+        expired_subscription = self._create_expired_plan_with_licenses()
+
+        with self.assertLogs(level='INFO') as log:
+            call_command(self.command_name, '--use-replica')
+
+        assert 'No subscriptions have expired between' in log.output[0]
+        mock_license_expiration_task.assert_not_called()
+        expired_subscription.refresh_from_db()
+        self.assertFalse(expired_subscription.expiration_processed)
+
     @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
     @mock.patch(
-        'license_manager.apps.subscriptions.management.commands.expire_subscriptions.license_expiration_task'
+        'license_manager.apps.api.tasks.license_expiration_task'
     )
     def test_1_subscription_expiring_outside_date_range(self, mock_license_expiration_task, mock_track_event):
         """
@@ -124,7 +147,7 @@ class ExpireSubscriptionsCommandTests(TestCase):
 
     @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
     @mock.patch(
-        'license_manager.apps.subscriptions.management.commands.expire_subscriptions.license_expiration_task'
+        'license_manager.apps.api.tasks.license_expiration_task'
     )
     def test_subscriptions_expiring_within_range(self, mock_license_expiration_task, mock_track_event):
         """
@@ -176,7 +199,7 @@ class ExpireSubscriptionsCommandTests(TestCase):
 
     @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
     @mock.patch(
-        'license_manager.apps.subscriptions.management.commands.expire_subscriptions.license_expiration_task'
+        'license_manager.apps.api.tasks.license_expiration_task'
     )
     def test_subscriptions_expiring_within_range_forced(self, mock_license_expiration_task, mock_track_event):
         """
@@ -226,7 +249,7 @@ class ExpireSubscriptionsCommandTests(TestCase):
 
     @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
     @mock.patch(
-        'license_manager.apps.subscriptions.management.commands.expire_subscriptions.license_expiration_task'
+        'license_manager.apps.api.tasks.license_expiration_task'
     )
     def test_subscriptions_expiring_with_uuids(self, mock_license_expiration_task, mock_track_event):
         """
@@ -268,7 +291,7 @@ class ExpireSubscriptionsCommandTests(TestCase):
 
     @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
     @mock.patch(
-        'license_manager.apps.subscriptions.management.commands.expire_subscriptions.license_expiration_task'
+        'license_manager.apps.api.tasks.license_expiration_task'
     )
     def test_expiring_10k_licenses_batched(self, mock_license_expiration_task, mock_track_event):
         """
@@ -289,7 +312,7 @@ class ExpireSubscriptionsCommandTests(TestCase):
 
     @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
     @mock.patch(
-        'license_manager.apps.subscriptions.management.commands.expire_subscriptions.license_expiration_task'
+        'license_manager.apps.api.tasks.license_expiration_task'
     )
     def test_license_expiration_error(self, mock_license_expiration_task, mock_track_event):
         """
@@ -308,19 +331,32 @@ class ExpireSubscriptionsCommandTests(TestCase):
 
     @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
     @mock.patch(
-        'license_manager.apps.subscriptions.management.commands.expire_subscriptions.license_expiration_task'
+        'license_manager.apps.api.tasks.license_expiration_task'
     )
     def test_license_expiration_tracked(self, _, mock_track_event):
         """
-        Verifies that license expiration events are tracked
+        Verifies that license expiration events are tracked once the plan's expiration is processed,
+        except for unassigned licenses without a user.
         """
-        expired_subscription = self._create_expired_plan_with_licenses()
-        call_command(self.command_name)
-        assert mock_track_event.call_count == expired_subscription.licenses.count()
+        expired_subscription = self._create_expired_plan_with_licenses(unassigned_licenses_count=2)
+        unassigned_license = expired_subscription.unassigned_licenses.first()
+        unassigned_license.user_email = None
+        unassigned_license.save()
+
+        with mock.patch(
+            'license_manager.apps.subscriptions.tasks.track_license_expirations_task.delay',
+            side_effect=track_license_expirations_task,
+        ) as mock_track_license_expirations_task:
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command(self.command_name)
+                mock_track_event.assert_not_called()
+
+        mock_track_license_expirations_task.assert_called_once_with(str(expired_subscription.uuid))
+        assert mock_track_event.call_count == expired_subscription.licenses.count() - 1
 
     @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
     @mock.patch(
-        'license_manager.apps.subscriptions.management.commands.expire_subscriptions.license_expiration_task'
+        'license_manager.apps.api.tasks.license_expiration_task'
     )
     def test_subscription_with_renewal_not_processed(self, mock_license_expiration_task, mock_track_event):
         """
@@ -337,7 +373,7 @@ class ExpireSubscriptionsCommandTests(TestCase):
 
     @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
     @mock.patch(
-        'license_manager.apps.subscriptions.management.commands.expire_subscriptions.license_expiration_task'
+        'license_manager.apps.api.tasks.license_expiration_task'
     )
     def test_prior_plans_in_renewal_chain_processed(self, mock_license_expiration_task, mock_track_event):
         """
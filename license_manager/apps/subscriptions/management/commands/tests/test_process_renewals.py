@@ -128,3 +128,28 @@ class ProcessRenewalsCommandTests(TestCase):
             assert first_call_kwargs['source'] == constants.LicenseActionSource.RENEWAL_JOB
             assert first_call_kwargs['actor_type'] == constants.LicenseActorType.SYSTEM
             assert second_call_kwargs['correlation_id'] == first_call_kwargs['correlation_id']
+
+    @mock.patch('license_manager.apps.subscriptions.management.commands.process_renewals.renew_subscription')
+    @mock.patch('license_manager.apps.subscriptions.management.commands.process_renewals.renew_subscription_task')
+    def test_fan_out_renewals(self, mock_renew_subscription_task, mock_renew_subscription):
+        """
+        Verify that renewals are enqueued as one task each when fanning out.
+        """
+        subscription_plan_1 = self.create_subscription_with_renewal(
+            self.now + timedelta(hours=settings.SUBSCRIPTION_PLAN_RENEWAL_LOCK_PERIOD_HOURS))
+
+        subscription_plan_2 = self.create_subscription_with_renewal(self.now + timedelta(seconds=1))
+
+        with self.assertLogs(level='INFO') as log, freezegun.freeze_time(self.now):
+            call_command(self.command_name, '--fan-out')
+            assert mock_renew_subscription.call_count == 0
+            assert mock_renew_subscription_task.delay.call_count == 2
+            assert "Enqueued 2 renewal tasks for subscriptions with uuids: ['{}', '{}']".format(
+                subscription_plan_1.uuid, subscription_plan_2.uuid) in log.output[1]
+
+            first_call = mock_renew_subscription_task.delay.call_args_list[0]
+            second_call = mock_renew_subscription_task.delay.call_args_list[1]
+            assert first_call.args == (subscription_plan_1.renewal.id,)
+            assert first_call.kwargs['subscription_plan_uuid'] == str(subscription_plan_1.uuid)
+            assert first_call.kwargs['is_auto_renewed'] is True
+            assert first_call.kwargs['correlation_id'] == second_call.kwargs['correlation_id']
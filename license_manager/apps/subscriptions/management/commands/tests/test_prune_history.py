@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from freezegun import freeze_time
+
+from license_manager.apps.subscriptions.constants import ASSIGNED
+from license_manager.apps.subscriptions.models import License
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+from license_manager.apps.subscriptions.utils import localized_utcnow
+
+
+NOW = localized_utcnow()
+
+
+@override_settings(HISTORY_RETENTION_DAYS={'subscriptions.License': 30})
+class PruneHistoryCommandTests(TestCase):
+    command_name = 'prune_history'
+
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+        with freeze_time(NOW - timedelta(days=60)):
+            self.licenses = LicenseFactory.create_batch(2, subscription_plan=self.subscription_plan)
+        for license_obj in self.licenses:
+            license_obj.status = ASSIGNED
+            license_obj.save()
+
+    def _license_history(self):
+        return License.history.filter(subscription_plan=self.subscription_plan)
+
+    def test_prune_history(self):
+        with self.assertLogs(level='INFO') as log:
+            call_command(self.command_name)
+
+        assert self._license_history().count() == 2
+        assert set(self._license_history().values_list('history_type', flat=True)) == {'~'}
+        assert 'Pruned 2 historical records of subscriptions.License older than 30 days.' in log.output[-1]
+
+    def test_prune_history_archive_file(self):
+        with tempfile.TemporaryDirectory() as archive_dir:
+            archive_file = os.path.join(archive_dir, 'history.jsonl')
+            call_command(self.command_name, '--archive-file', archive_file)
+
+            with open(archive_file, encoding='utf-8') as archive:
+                archived_records = [json.loads(line) for line in archive]
+
+        assert len(archived_records) == 2
+        assert {record['fields']['uuid'] for record in archived_records} == {
+            str(license_obj.uuid) for license_obj in self.licenses
+        }
+
+    def test_prune_history_dry_run(self):
+        with self.assertLogs(level='INFO') as log:
+            call_command(self.command_name, '--dry-run')
+
+        assert self._license_history().count() == 4
+        assert 'Would prune 2 historical records of subscriptions.License' in log.output[-1]
+
+    def test_prune_history_invalid_models(self):
+        with self.assertRaisesRegex(CommandError, 'Unknown model'):
+            call_command(self.command_name, '--model', 'subscriptions.NotAModel')
+        with self.assertRaisesRegex(CommandError, 'does not keep historical records'):
+            call_command(self.command_name, '--model', 'subscriptions.LicenseEvent')
+        with self.assertRaisesRegex(CommandError, 'No history retention window'):
+            call_command(self.command_name, '--model', 'subscriptions.SubscriptionPlan')
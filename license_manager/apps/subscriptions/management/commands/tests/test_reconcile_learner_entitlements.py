@@ -0,0 +1,45 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from license_manager.apps.subscriptions.constants import (
+    ACTIVATED,
+    ASSIGNED,
+    REVOKED,
+)
+from license_manager.apps.subscriptions.models import (
+    LearnerEntitlement,
+    License,
+)
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+
+
+class ReconcileLearnerEntitlementsCommandTests(TestCase):
+    command_name = 'reconcile_learner_entitlements'
+
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+        self.assigned_licenses = LicenseFactory.create_batch(
+            3, subscription_plan=self.subscription_plan, status=ASSIGNED,
+        )
+        self.activated_license = LicenseFactory(subscription_plan=self.subscription_plan, status=ACTIVATED)
+        self.revoked_license = LicenseFactory(subscription_plan=self.subscription_plan, status=REVOKED)
+
+    def test_reconcile(self):
+        # Changes made with queryset updates, which skip the model layer
+        LearnerEntitlement.objects.filter(license=self.assigned_licenses[0]).delete()
+        License.objects.filter(uuid=self.assigned_licenses[1].uuid).update(user_email='new@example.com')
+        License.objects.filter(uuid=self.activated_license.uuid).update(status=REVOKED)
+
+        with self.assertLogs(level='INFO') as log:
+            call_command(self.command_name, '--batch-size', '2')
+
+        entitlements_by_license_id = {
+            entitlement.license_id: entitlement for entitlement in LearnerEntitlement.objects.all()
+        }
+        assert set(entitlements_by_license_id) == {lcs.uuid for lcs in self.assigned_licenses}
+        assert entitlements_by_license_id[self.assigned_licenses[1].uuid].user_email == 'new@example.com'
+        assert 'Reconciled 3 learner entitlements, and deleted 1 stale ones.' in log.output[-1]
@@ -0,0 +1,24 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+
+
+class ReportHistorySizeCommandTests(TestCase):
+    command_name = 'report_history_size'
+
+    def test_report_history_size(self):
+        subscription_plan = SubscriptionPlanFactory()
+        LicenseFactory.create_batch(3, subscription_plan=subscription_plan)
+
+        out = StringIO()
+        call_command(self.command_name, stdout=out)
+
+        output = out.getvalue()
+        assert 'subscriptions.License: 3 historical records for 3 records (1.0 per record)' in output
+        assert f'{subscription_plan.uuid}: 3 historical license records, 1 historical plan records' in output
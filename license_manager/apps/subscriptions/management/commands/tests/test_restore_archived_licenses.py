@@ -0,0 +1,45 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from license_manager.apps.subscriptions.models import ArchivedLicense, License
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+from license_manager.apps.subscriptions.utils import localized_utcnow
+
+
+@override_settings(LICENSE_ARCHIVE_AFTER_DAYS=3 * 365)
+class RestoreArchivedLicensesCommandTests(TestCase):
+    command_name = 'restore_archived_licenses'
+
+    def setUp(self):
+        super().setUp()
+        now = localized_utcnow()
+        self.plan = SubscriptionPlanFactory(expiration_date=now - timedelta(days=4 * 365))
+        self.licenses = LicenseFactory.create_batch(3, subscription_plan=self.plan)
+        call_command('archive_expired_licenses', stdout=StringIO())
+
+    def test_restore_plan(self):
+        out = StringIO()
+        call_command(self.command_name, f'--subscription-plan-uuid={self.plan.uuid}', stdout=out)
+
+        assert 'Restored 3 licenses.' in out.getvalue()
+        assert License.objects.filter(subscription_plan=self.plan).count() == 3
+        assert not ArchivedLicense.objects.exists()
+
+    def test_restore_licenses(self):
+        license_uuids = [str(license_obj.uuid) for license_obj in self.licenses[:2]]
+
+        call_command(self.command_name, f'--license-uuids={",".join(license_uuids)}', stdout=StringIO())
+
+        assert {str(uuid) for uuid in License.objects.values_list('uuid', flat=True)} == set(license_uuids)
+        assert ArchivedLicense.objects.get().uuid == self.licenses[2].uuid
+
+    def test_restore_requires_licenses(self):
+        with self.assertRaises(CommandError):
+            call_command(self.command_name)
@@ -0,0 +1,30 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from license_manager.apps.subscriptions.tests.factories import (
+    SubscriptionPlanFactory,
+)
+from license_manager.apps.subscriptions.utils import localized_utcnow
+
+
+class ScheduleExpirationsAndRenewalsCommandTests(TestCase):
+    command_name = 'schedule_expirations_and_renewals'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    @mock.patch('license_manager.apps.subscriptions.scheduling.expire_subscription_plan_task.apply_async')
+    def test_schedule_expirations_and_renewals(self, mock_expire):
+        subscription_plan = SubscriptionPlanFactory(expiration_date=localized_utcnow() + timedelta(hours=1))
+
+        out = StringIO()
+        call_command(self.command_name, stdout=out)
+
+        assert 'Enqueued 1 plan expirations and 0 renewals.' in out.getvalue()
+        assert mock_expire.call_args.kwargs['args'][0] == str(subscription_plan.uuid)
@@ -4,9 +4,12 @@ from datetime import timedelta
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.core.paginator import Paginator
 from django.db.models import Exists, OuterRef
 
+from license_manager.apps.subscriptions.batch_jobs import (
+    BatchJob,
+    add_batch_job_arguments,
+)
 from license_manager.apps.subscriptions.constants import (
     ACTIVATED,
     SegmentEvents,
@@ -32,6 +35,7 @@ class Command(BaseCommand):
         """
         Entry point to add arguments.
         """
+        add_batch_job_arguments(parser, default_batch_size=100)
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -62,7 +66,7 @@ class Command(BaseCommand):
             status=ACTIVATED
         ).select_related(
             'subscription_plan',
-        ).values('uuid', 'lms_user_id', 'user_email').order_by('activation_date')
+        ).values('uuid', 'lms_user_id', 'user_email')
 
         # Subquery to check for the existence of `LICENSE_ACTIVATED_180_DAYS_AGO` event
         event_exists_subquery = LicenseEvent.objects.filter(
@@ -90,28 +94,25 @@ class Command(BaseCommand):
         enterprise_customer_uuids = settings.CUSTOMERS_WITH_CUSTOM_LICENSE_EVENTS
         for enterprise_customer_uuid in enterprise_customer_uuids:
             logger.info('%s Processing started for licenses. Enterprise: [%s]', log_prefix, enterprise_customer_uuid)
-            self.trigger_events(enterprise_customer_uuid, log_prefix, fire_event)
+            self.trigger_events(enterprise_customer_uuid, log_prefix, fire_event, options)
             logger.info('%s Processing completed for licenses. Enterprise: [%s]', log_prefix, enterprise_customer_uuid)
 
         logger.info('%s Command completed.', log_prefix)
 
-    def trigger_events(self, enterprise_customer_uuid, log_prefix, fire_event):
+    def trigger_events(self, enterprise_customer_uuid, log_prefix, fire_event, options):
         """
         Trigger segment event for learners of an enterprise.
         """
         activated_licenses = self.activated_licenses(enterprise_customer_uuid)
 
-        if not activated_licenses:
+        if not activated_licenses.exists():
             logger.info(
                 '%s No licenses were found that were activated by a learner 180 days ago.',
                 log_prefix
             )
             return
 
-        paginator = Paginator(activated_licenses, 100)
-        for page_number in paginator.page_range:
-            licenses = paginator.page(page_number)
-
+        def process_batch(licenses):
             triggered_event_records = []
             user_ids = []
             for license in licenses:
@@ -142,3 +143,12 @@ class Command(BaseCommand):
 
             if triggered_event_records:
                 LicenseEvent.objects.bulk_create(triggered_event_records, batch_size=100)
+            return {'num_triggered': len(triggered_event_records)}
+
+        BatchJob(
+            'trigger_event_for_licenses',
+            activated_licenses,
+            process_batch,
+            scope=enterprise_customer_uuid if fire_event else f'{enterprise_customer_uuid} dry run',
+            batch_size=options['batch_size'],
+        ).run(workers=options['workers'], resume=options['resume'])
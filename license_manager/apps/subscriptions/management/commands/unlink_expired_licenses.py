@@ -4,10 +4,13 @@ from datetime import timedelta
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.core.paginator import Paginator
 from django.db.models import Exists, OuterRef
 
 from license_manager.apps.api_client.enterprise import EnterpriseApiClient
+from license_manager.apps.subscriptions.batch_jobs import (
+    BatchJob,
+    add_batch_job_arguments,
+)
 from license_manager.apps.subscriptions.constants import (
     ACTIVATED,
     ASSIGNED,
@@ -34,6 +37,7 @@ class Command(BaseCommand):
         """
         Entry point to add arguments.
         """
+        add_batch_job_arguments(parser, default_batch_size=100)
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -106,28 +110,25 @@ class Command(BaseCommand):
         enterprise_customer_uuids = settings.CUSTOMERS_WITH_EXPIRED_LICENSES_UNLINKING_ENABLED
         for enterprise_customer_uuid in enterprise_customer_uuids:
             logger.info('%s Unlinking started for licenses. Enterprise: [%s]', log_prefix, enterprise_customer_uuid)
-            self.unlink_expired_licenses(log_prefix, enterprise_customer_uuid, unlink)
+            self.unlink_expired_licenses(log_prefix, enterprise_customer_uuid, unlink, options)
             logger.info('%s Unlinking completed for licenses. Enterprise: [%s]', log_prefix, enterprise_customer_uuid)
 
         logger.info('%s Command completed.', log_prefix)
 
-    def unlink_expired_licenses(self, log_prefix, enterprise_customer_uuid, unlink):
+    def unlink_expired_licenses(self, log_prefix, enterprise_customer_uuid, unlink, options):
         """
         Unlink expired licenses.
         """
         expired_licenses = self.expired_licenses(log_prefix, enterprise_customer_uuid)
 
-        if not expired_licenses:
+        if not expired_licenses.exists():
             logger.info(
                 '%s No expired licenses were found for enterprise: [%s].',
                 log_prefix, enterprise_customer_uuid
             )
             return
 
-        paginator = Paginator(expired_licenses, 100)
-        for page_number in paginator.page_range:
-            licenses = paginator.page(page_number)
-
+        def process_batch(licenses):
             license_uuids = []
             user_emails = []
 
@@ -183,3 +184,12 @@ class Command(BaseCommand):
                 enterprise_customer_uuid,
                 license_uuids
             )
+            return {'num_unlinked': len(license_uuids) if unlink else 0}
+
+        BatchJob(
+            'unlink_expired_licenses',
+            expired_licenses,
+            process_batch,
+            scope=enterprise_customer_uuid if unlink else f'{enterprise_customer_uuid} dry run',
+            batch_size=options['batch_size'],
+        ).run(workers=options['workers'], resume=options['resume'])
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0083_add_license_action_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalsubscriptionplan',
+            name='num_virtual_unassigned_licenses',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='The number of unassigned licenses of this plan that do not (yet) have a license record. Only used when the plan uses virtual unassigned licenses.', verbose_name='Number of Virtual Unassigned Licenses'),
+        ),
+        migrations.AddField(
+            model_name='historicalsubscriptionplan',
+            name='uses_virtual_unassigned_licenses',
+            field=models.BooleanField(default=False, help_text='If enabled, unassigned capacity of this plan is tracked as a counter rather than as license records. License records are only created once seats are assigned or auto-applied.', verbose_name='Use Virtual Unassigned Licenses'),
+        ),
+        migrations.AddField(
+            model_name='subscriptionplan',
+            name='num_virtual_unassigned_licenses',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='The number of unassigned licenses of this plan that do not (yet) have a license record. Only used when the plan uses virtual unassigned licenses.', verbose_name='Number of Virtual Unassigned Licenses'),
+        ),
+        migrations.AddField(
+            model_name='subscriptionplan',
+            name='uses_virtual_unassigned_licenses',
+            field=models.BooleanField(default=False, help_text='If enabled, unassigned capacity of this plan is tracked as a counter rather than as license records. License records are only created once seats are assigned or auto-applied.', verbose_name='Use Virtual Unassigned Licenses'),
+        ),
+    ]
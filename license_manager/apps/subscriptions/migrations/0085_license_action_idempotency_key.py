@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:04
+
+from django.db import migrations, models
+
+
+def populate_idempotency_key(apps, schema_editor):
+    """
+    Copies the idempotency keys previously stored in the metadata of revoked actions to the new column.
+    Only the oldest action is kept as the owner of a key, should duplicates already exist.
+    """
+    LicenseAction = apps.get_model('subscriptions', 'LicenseAction')
+
+    seen_idempotency_keys = set()
+    actions_with_keys = LicenseAction.objects.filter(
+        metadata__has_key='idempotency_key',
+    ).order_by('created')
+    for action in actions_with_keys.iterator():
+        idempotency_key = action.metadata.get('idempotency_key')
+        if not idempotency_key or idempotency_key in seen_idempotency_keys:
+            continue
+        seen_idempotency_keys.add(idempotency_key)
+        LicenseAction.objects.filter(uuid=action.uuid).update(idempotency_key=idempotency_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0084_subscription_plan_virtual_unassigned_licenses'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='licenseaction',
+            name='idempotency_key',
+            field=models.CharField(blank=True, help_text="Optional key that identifies the operation that wrote this action, so that retried operations don't write duplicate actions.", max_length=255, null=True, unique=True),
+        ),
+        migrations.RunPython(populate_idempotency_key, migrations.RunPython.noop),
+    ]
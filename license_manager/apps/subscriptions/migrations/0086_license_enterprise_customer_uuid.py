@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0085_license_action_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='license',
+            name='enterprise_customer_uuid',
+            field=models.UUIDField(blank=True, editable=False, help_text="The uuid of the enterprise customer of the license's subscription plan.", null=True),
+        ),
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['user_email', 'status'], name='license_user_email_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['lms_user_id', 'status'], name='license_lms_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['enterprise_customer_uuid', 'status'], name='license_customer_status_idx'),
+        ),
+    ]
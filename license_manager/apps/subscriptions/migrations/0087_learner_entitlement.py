@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:50
+
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0086_license_enterprise_customer_uuid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearnerEntitlement',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('license', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='learner_entitlement', serialize=False, to='subscriptions.license')),
+                ('user_email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('lms_user_id', models.IntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('activated', 'Activated'), ('assigned', 'Assigned'), ('unassigned', 'Unassigned'), ('revoked', 'Revoked')], max_length=25)),
+                ('enterprise_customer_uuid', models.UUIDField()),
+                ('enterprise_catalog_uuid', models.UUIDField(blank=True, null=True)),
+                ('plan_start_date', models.DateTimeField()),
+                ('plan_expiration_date', models.DateTimeField()),
+                ('plan_is_active', models.BooleanField()),
+                ('subscription_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='subscriptions.subscriptionplan')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['lms_user_id', 'enterprise_customer_uuid'], name='entitlement_lms_user_idx'), models.Index(fields=['user_email', 'enterprise_customer_uuid'], name='entitlement_user_email_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:57
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0087_learner_entitlement'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(models.F('subscription_plan'), django.db.models.functions.text.Lower('user_email'), name='license_plan_lower_email_idx'),
+        ),
+    ]
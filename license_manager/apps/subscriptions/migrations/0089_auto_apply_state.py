@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0088_license_plan_lower_email_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalsubscriptionplan',
+            name='auto_apply_enabled_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='The time at which auto-applied licenses were last turned on for this Subscription Plan.', null=True),
+        ),
+        migrations.AddField(
+            model_name='subscriptionplan',
+            name='auto_apply_enabled_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='The time at which auto-applied licenses were last turned on for this Subscription Plan.', null=True),
+        ),
+        migrations.CreateModel(
+            name='AutoAppliedLicenseCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField(help_text='The start of the hour the licenses were auto applied in.')),
+                ('count', models.PositiveIntegerField(default=0, help_text='The number of licenses auto applied from the plan within the hour.')),
+                ('subscription_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auto_applied_license_counts', to='subscriptions.subscriptionplan')),
+            ],
+            options={
+                'unique_together': {('subscription_plan', 'bucket_start')},
+            },
+        ),
+    ]
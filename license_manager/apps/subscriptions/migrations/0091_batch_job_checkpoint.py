@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:14
+
+import django.core.serializers.json
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0090_license_deletion_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchJobCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('job_name', models.CharField(help_text='The name of the job, usually the name of the management command that runs it.', max_length=255)),
+                ('scope', models.CharField(blank=True, help_text='Distinguishes the separate runs of a job by a command, e.g. one per enterprise customer.', max_length=255)),
+                ('num_shards', models.PositiveIntegerField(help_text='The number of primary key ranges the rows to process were split into.')),
+                ('shard_index', models.PositiveIntegerField(help_text='The index of the primary key range of this shard.')),
+                ('last_pk', models.CharField(blank=True, help_text='The primary key of the last row processed by the shard.', max_length=255, null=True)),
+                ('num_batches', models.PositiveIntegerField(default=0)),
+                ('num_processed', models.PositiveIntegerField(default=0, help_text='The number of rows processed by the shard.')),
+                ('metrics', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='The sums of the metrics returned by the batches processed by the shard.')),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'unique_together': {('job_name', 'scope', 'num_shards', 'shard_index')},
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:26
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0091_batch_job_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedHistoricalLicense',
+            fields=[
+                ('history_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('license_uuid', models.UUIDField(db_index=True)),
+                ('history_date', models.DateTimeField()),
+                ('history_type', models.CharField(max_length=1)),
+                ('history_change_reason', models.CharField(blank=True, max_length=100, null=True)),
+                ('history_user_id', models.IntegerField(blank=True, null=True)),
+                ('values', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='The values of the tracked fields of the license in the historical record.')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedLicense',
+            fields=[
+                ('uuid', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('activated', 'Activated'), ('assigned', 'Assigned'), ('unassigned', 'Unassigned'), ('revoked', 'Revoked')], max_length=25)),
+                ('assigned_date', models.DateTimeField(blank=True, null=True)),
+                ('activation_date', models.DateTimeField(blank=True, null=True)),
+                ('activation_key', models.UUIDField(blank=True, null=True)),
+                ('last_remind_date', models.DateTimeField(blank=True, null=True)),
+                ('expiration_reminder_sent_date', models.DateTimeField(blank=True, null=True)),
+                ('subscription_plan_expiration_email_sent_date', models.DateTimeField(blank=True, null=True)),
+                ('revoked_date', models.DateTimeField(blank=True, null=True)),
+                ('user_email', models.EmailField(blank=True, db_index=True, max_length=254, null=True)),
+                ('lms_user_id', models.IntegerField(blank=True, db_index=True, null=True)),
+                ('renewed_to_uuid', models.UUIDField(blank=True, null=True)),
+                ('renewed_from_uuid', models.UUIDField(blank=True, help_text='The uuid of the license that was renewed to this one, which was unlinked from it on archival.', null=True)),
+                ('auto_applied', models.BooleanField(blank=True, null=True)),
+                ('enterprise_customer_uuid', models.UUIDField(blank=True, null=True)),
+                ('created', models.DateTimeField()),
+                ('modified', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('source', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='The license source of the license, with its historical records.', null=True)),
+                ('events', models.JSONField(blank=True, default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='The events triggered for the license.')),
+                ('subscription_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_licenses', to='subscriptions.subscriptionplan')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['enterprise_customer_uuid', 'user_email'], name='archived_license_customer_idx')],
+            },
+        ),
+    ]
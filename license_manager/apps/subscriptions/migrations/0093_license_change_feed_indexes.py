@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0092_license_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historicallicense',
+            index=models.Index(fields=['history_type', 'history_date', 'uuid'], name='hist_license_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['modified', 'uuid'], name='license_modified_uuid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['enterprise_customer_uuid', 'modified', 'uuid'], name='license_customer_modified_idx'),
+        ),
+    ]
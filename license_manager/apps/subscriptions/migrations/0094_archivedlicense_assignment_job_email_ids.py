@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0093_license_change_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedlicense',
+            name='assignment_job_email_ids',
+            field=models.JSONField(blank=True, default=list, help_text='The license assignment job emails that referenced the license, unlinked from it on archival.'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 """
 Models for the subscriptions app.
 """
+from collections import Counter
 from datetime import datetime, timedelta
 from logging import getLogger
 from math import ceil, inf
@@ -14,8 +15,9 @@ from django.core.validators import (
     MinLengthValidator,
     MinValueValidator,
 )
-from django.db import models, transaction
+from django.db import IntegrityError, connections, models, router, transaction
 from django.db.models import Q
+from django.db.models.functions import Greatest, Lower, TruncHour
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.forms import ValidationError
@@ -34,6 +36,10 @@ from simple_history.utils import (
 from license_manager.apps.api_client.enterprise_catalog import (
     EnterpriseCatalogApiClient,
 )
+from license_manager.apps.core.instrumentation import record_cache_lookup
+from license_manager.apps.subscriptions.bulk_deletion import (
+    bulk_delete_licenses,
+)
 from license_manager.apps.subscriptions.constants import (
     ACTIVATED,
     ASSIGNED,
@@ -46,6 +52,7 @@ from license_manager.apps.subscriptions.constants import (
     LicenseActionSource,
     LicenseActionType,
     LicenseActorType,
+    LicenseDeletionJobStatus,
     LicenseTypesToRenew,
     NotificationChoices,
     SegmentEvents,
@@ -54,6 +61,16 @@ from license_manager.apps.subscriptions.event_utils import (
     get_license_tracking_properties,
     track_event,
     track_license_changes,
+    track_licenses_materialized,
+    track_licenses_provisioned,
+)
+from license_manager.apps.subscriptions.history_utils import (
+    IndexedHistoricalRecords,
+    defer_history_writes,
+)
+from license_manager.apps.subscriptions.identity_map import (
+    get_or_load,
+    remember,
 )
 from license_manager.apps.subscriptions.sanitize import sanitize_html
 from license_manager.apps.subscriptions.utils import (
@@ -253,6 +270,28 @@ class CustomerAgreement(TimeStampedModel):
 
     history = HistoricalRecords()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_enterprise_customer_uuid = instance.__dict__.get('enterprise_customer_uuid')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Override to keep the enterprise customer uuid denormalized onto licenses and learner entitlements up to date.
+        """
+        super().save(*args, **kwargs)
+        loaded_enterprise_customer_uuid = getattr(self, '_loaded_enterprise_customer_uuid', None)
+        if loaded_enterprise_customer_uuid and loaded_enterprise_customer_uuid != self.enterprise_customer_uuid:
+            License.objects.filter(subscription_plan__customer_agreement=self).update(
+                enterprise_customer_uuid=self.enterprise_customer_uuid,
+                modified=localized_utcnow(),
+            )
+            LearnerEntitlement.objects.filter(subscription_plan__customer_agreement=self).update(
+                enterprise_customer_uuid=self.enterprise_customer_uuid,
+            )
+        self._loaded_enterprise_customer_uuid = self.enterprise_customer_uuid
+
     @property
     def net_days_until_expiration(self):
         """
@@ -682,6 +721,15 @@ class SubscriptionPlan(TimeStampedModel):
         )
     )
 
+    auto_apply_enabled_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text=_(
+            "The time at which auto-applied licenses were last turned on for this Subscription Plan."
+        )
+    )
+
     desired_num_licenses = models.PositiveIntegerField(
         blank=True,
         null=True,
@@ -693,6 +741,25 @@ class SubscriptionPlan(TimeStampedModel):
         ),
     )
 
+    uses_virtual_unassigned_licenses = models.BooleanField(
+        default=False,
+        verbose_name="Use Virtual Unassigned Licenses",
+        help_text=(
+            "If enabled, unassigned capacity of this plan is tracked as a counter rather than as license records. "
+            "License records are only created once seats are assigned or auto-applied."
+        ),
+    )
+
+    num_virtual_unassigned_licenses = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Number of Virtual Unassigned Licenses",
+        help_text=(
+            "The number of unassigned licenses of this plan that do not (yet) have a license record. "
+            "Only used when the plan uses virtual unassigned licenses."
+        ),
+    )
+
     @classmethod
     def get_current_plan(cls, enterprise_uuid):
         """
@@ -776,6 +843,17 @@ class SubscriptionPlan(TimeStampedModel):
         """
         return self.licenses.filter(status=UNASSIGNED)
 
+    @property
+    def num_unassigned_licenses(self):
+        """
+        Gets the number of unassigned licenses associated with the subscription, including any
+        virtual unassigned licenses that do not have a license record yet.
+
+        Returns:
+            int
+        """
+        return self.unassigned_licenses.count() + self.num_virtual_unassigned_licenses
+
     @property
     def assigned_licenses(self):
         """
@@ -810,10 +888,12 @@ class SubscriptionPlan(TimeStampedModel):
         licenses remains the same when one is revoked (and the revoked one no longer factors into the
         allocated) count.
 
+        Virtual unassigned licenses (see ``uses_virtual_unassigned_licenses``) are included in the count.
+
         Returns:
             int
         """
-        return self.licenses.exclude(status=REVOKED).count()
+        return self.licenses.exclude(status=REVOKED).count() + self.num_virtual_unassigned_licenses
 
     @property
     def num_allocated_licenses(self):
@@ -920,11 +1000,20 @@ class SubscriptionPlan(TimeStampedModel):
     def auto_apply_licenses_turned_on_at(self):
         """
         Returns the time of when auto-apply licenses was last turned on.
+
+        Plans that haven't been backfilled by the ``backfill_auto_apply_state`` command yet fall back
+        to the plan's history.
         """
 
         if not self.should_auto_apply_licenses:
             return None
 
+        return self.auto_apply_enabled_at or self.auto_apply_licenses_turned_on_at_from_history()
+
+    def auto_apply_licenses_turned_on_at_from_history(self):
+        """
+        Returns the time of when auto-apply licenses was last turned on, found by walking back the plan's history.
+        """
         result = None
 
         # pylint: disable=no-member
@@ -939,10 +1028,16 @@ class SubscriptionPlan(TimeStampedModel):
     def auto_applied_licenses_count_since(self, since=None):
         """
         Returns the number of licenses auto applied since a given time.
+
+        With ``AUTO_APPLIED_LICENSE_COUNTS_ENABLED``, the count is summed from the plan's hourly
+        auto-applied license counts instead, see ``AutoAppliedLicenseCount.count_since``.
         """
         if since is None:
             since = self.auto_apply_licenses_turned_on_at
 
+        if settings.AUTO_APPLIED_LICENSE_COUNTS_ENABLED:
+            return AutoAppliedLicenseCount.count_since(self, since)
+
         return self.licenses.filter(
             auto_applied=True,
             activation_date__gte=since
@@ -962,9 +1057,33 @@ class SubscriptionPlan(TimeStampedModel):
 
         for item in queryset:
             count_by_status[item['status']] = item['count']
+        count_by_status[UNASSIGNED] += self.num_virtual_unassigned_licenses
 
         return count_by_status
 
+    @classmethod
+    def license_count_by_status_for_plans(cls, subscription_plans):
+        """
+        Returns a dictionary keyed by the uuid of each of the given plans, and valued by the
+        ``license_count_by_status`` of that plan, with the licenses of all plans counted by one grouped query.
+        """
+        count_by_status_by_plan_uuid = {}
+        for subscription_plan in subscription_plans:
+            count_by_status = {status_choice[0]: 0 for status_choice in LICENSE_STATUS_CHOICES}
+            count_by_status[UNASSIGNED] += subscription_plan.num_virtual_unassigned_licenses
+            count_by_status_by_plan_uuid[subscription_plan.uuid] = count_by_status
+
+        queryset = License.objects.filter(
+            subscription_plan__in=list(count_by_status_by_plan_uuid),
+        ).values_list('subscription_plan_id', 'status').annotate(
+            count=models.Count('uuid'),
+        ).order_by()
+
+        for subscription_plan_uuid, status, count in queryset:
+            count_by_status_by_plan_uuid[subscription_plan_uuid][status] += count
+
+        return count_by_status_by_plan_uuid
+
     def get_renewal(self):
         """
         Helper to safely return the renewal associated with the subscription, or None if one does not exist.
@@ -987,9 +1106,75 @@ class SubscriptionPlan(TimeStampedModel):
         """
         Method to increase the number of licenses associated with an instance of SubscriptionPlan by num_new_licenses.
         """
+        if self.uses_virtual_unassigned_licenses:
+            self._increase_num_virtual_unassigned_licenses(num_new_licenses)
+            return
         new_licenses = [License(subscription_plan=self) for _ in range(num_new_licenses)]
         License.bulk_create(new_licenses)
 
+    def bulk_provision_licenses(self, num_new_licenses, batch_size=None):
+        """
+        Fast variant of ``increase_num_licenses`` for large plans. Licenses and their history
+        are written with large multi-row inserts, and a single aggregate event is tracked for
+        the whole batch instead of one LICENSE_CREATED event per license.
+        """
+        if num_new_licenses <= 0:
+            return
+        if self.uses_virtual_unassigned_licenses:
+            self._increase_num_virtual_unassigned_licenses(num_new_licenses)
+            return
+        License.bulk_provision(
+            self,
+            num_new_licenses,
+            batch_size=batch_size or settings.FAST_LICENSE_PROVISIONING_BATCH_SIZE,
+        )
+        track_licenses_provisioned(self, num_new_licenses)
+
+    def _increase_num_virtual_unassigned_licenses(self, num_new_licenses):
+        """
+        Adds seats to the virtual unassigned license pool of the plan with an atomic, in-database increment,
+        and tracks a single aggregate event for them.
+        """
+        if num_new_licenses <= 0:
+            return
+        SubscriptionPlan.objects.filter(pk=self.pk).update(
+            num_virtual_unassigned_licenses=models.F('num_virtual_unassigned_licenses') + num_new_licenses,
+        )
+        self.refresh_from_db(fields=['num_virtual_unassigned_licenses'])
+        track_licenses_provisioned(self, num_new_licenses)
+
+    def materialize_unassigned_licenses(self, num_licenses_needed):
+        """
+        For plans that use virtual unassigned licenses, makes sure that (up to) ``num_licenses_needed``
+        unassigned license records exist, by moving seats out of the virtual pool into new license records.
+        Callers about to assign or auto-apply licenses should call this before selecting ``unassigned_licenses``.
+
+        The plan row is locked while the pool is drawn down, so that concurrent callers never
+        materialize the same virtual seats twice. Like ``bulk_provision_licenses``, a single aggregate
+        event is tracked for the new records once the transaction commits, rather than one per license.
+
+        Returns:
+            int: The number of license records created.
+        """
+        if not self.uses_virtual_unassigned_licenses:
+            return 0
+
+        with transaction.atomic():
+            locked_plan = SubscriptionPlan.objects.select_for_update().get(pk=self.pk)
+            num_missing_licenses = num_licenses_needed - self.unassigned_licenses.count()
+            num_to_materialize = min(num_missing_licenses, locked_plan.num_virtual_unassigned_licenses)
+            if num_to_materialize > 0:
+                SubscriptionPlan.objects.filter(pk=self.pk).update(
+                    num_virtual_unassigned_licenses=models.F('num_virtual_unassigned_licenses') - num_to_materialize,
+                )
+                License.bulk_provision(self, num_to_materialize)
+                transaction.on_commit(
+                    lambda: track_licenses_materialized(self, num_to_materialize),
+                )
+            self.refresh_from_db(fields=['num_virtual_unassigned_licenses'])
+
+        return max(num_to_materialize, 0)
+
     def provision_licenses(self):
         """
         For a given subscription plan, try to provision it synchronously or asynchronously.
@@ -1011,6 +1196,7 @@ class SubscriptionPlan(TimeStampedModel):
         """
         cache_key = self.get_contains_content_cache_key(content_ids)
         cached_value = cache.get(cache_key, _CACHE_MISS)
+        record_cache_lookup(hit=cached_value is not _CACHE_MISS)
         if cached_value is not _CACHE_MISS:
             return cached_value
 
@@ -1027,6 +1213,56 @@ class SubscriptionPlan(TimeStampedModel):
 
     history = HistoricalRecords()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_customer_agreement_id = instance.__dict__.get('customer_agreement_id')
+        instance._loaded_entitlement_values = instance._get_entitlement_values()
+        instance._loaded_should_auto_apply_licenses = instance.__dict__.get('should_auto_apply_licenses')
+        return instance
+
+    def _get_entitlement_values(self):
+        """
+        Returns the values of the fields of the plan that are denormalized onto learner entitlements.
+        """
+        return {
+            field_name: self.__dict__.get(field_name)
+            for field_name in ['customer_agreement_id', *LearnerEntitlement.PLAN_FIELDS]
+        }
+
+    def save(self, *args, **kwargs):
+        """
+        Override to keep the enterprise customer uuid denormalized onto licenses up to date
+        when a plan is moved to another customer agreement, and the plan fields denormalized onto
+        learner entitlements up to date when any of them changes.
+
+        Also records when auto-applied licenses are turned on, and clears it when they are turned off.
+        """
+        if 'should_auto_apply_licenses' in self.__dict__:
+            if not self.should_auto_apply_licenses:
+                self.auto_apply_enabled_at = None
+            elif self._state.adding or not getattr(self, '_loaded_should_auto_apply_licenses', None):
+                self.auto_apply_enabled_at = localized_utcnow()
+            self._loaded_should_auto_apply_licenses = self.should_auto_apply_licenses
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'should_auto_apply_licenses' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'auto_apply_enabled_at'}
+
+        super().save(*args, **kwargs)
+        loaded_customer_agreement_id = getattr(self, '_loaded_customer_agreement_id', None)
+        if loaded_customer_agreement_id and loaded_customer_agreement_id != self.customer_agreement_id:
+            self.licenses.update(
+                enterprise_customer_uuid=self.customer_agreement.enterprise_customer_uuid,
+                modified=localized_utcnow(),
+            )
+        self._loaded_customer_agreement_id = self.customer_agreement_id
+
+        entitlement_values = self._get_entitlement_values()
+        loaded_entitlement_values = getattr(self, '_loaded_entitlement_values', None)
+        if loaded_entitlement_values and loaded_entitlement_values != entitlement_values:
+            LearnerEntitlement.sync_subscription_plan(self)
+        self._loaded_entitlement_values = entitlement_values
+
     class Meta:
         verbose_name = _("Subscription Plan")
         verbose_name_plural = _("Subscription Plans")
@@ -1205,6 +1441,16 @@ class License(TimeStampedModel):
     class Meta:
         indexes = [
             models.Index(fields=["subscription_plan", "status"], name="subscription_plan_status_idx"),
+            models.Index(fields=["user_email", "status"], name="license_user_email_status_idx"),
+            models.Index(fields=["lms_user_id", "status"], name="license_lms_user_status_idx"),
+            models.Index(fields=["enterprise_customer_uuid", "status"], name="license_customer_status_idx"),
+            # Serves the prefix searches of the licenses of a plan by email,
+            # see ``license_manager.apps.api.filters.search_licenses_by_email``.
+            models.Index(models.F("subscription_plan"), Lower("user_email"), name="license_plan_lower_email_idx"),
+            # Serve the keyset pages of the license change feed, globally and by customer,
+            # see ``license_manager.apps.subscriptions.change_feed``.
+            models.Index(fields=["modified", "uuid"], name="license_modified_uuid_idx"),
+            models.Index(fields=["enterprise_customer_uuid", "modified", "uuid"], name="license_customer_modified_idx"),
         ]
 
     uuid = models.UUIDField(
@@ -1304,7 +1550,23 @@ class License(TimeStampedModel):
         help_text="Whether or not License was auto-applied.",
     )
 
-    history = HistoricalRecords()
+    # Denormalized from the plan's customer agreement, so that the licenses of a customer can be looked up
+    # without joining through plans and agreements. Licenses created before this field was added are filled
+    # in by the ``backfill_license_enterprise_customer_uuids`` management command.
+    enterprise_customer_uuid = models.UUIDField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text=_("The uuid of the enterprise customer of the license's subscription plan."),
+    )
+
+    history = IndexedHistoricalRecords(
+        excluded_fields=['enterprise_customer_uuid'],
+        # Serves the deletions listed by the license change feed.
+        indexes=[
+            models.Index(fields=['history_type', 'history_date', 'uuid'], name='hist_license_type_date_idx'),
+        ],
+    )
 
     def __str__(self):
         """
@@ -1341,8 +1603,20 @@ class License(TimeStampedModel):
         """
         Override to ensure that full_clean()/clean() is always called.
         """
+        if self.enterprise_customer_uuid is None:
+            self.set_enterprise_customer_uuid()
         self.full_clean()
         super().save(*args, **kwargs)
+        if uncounted_auto_applied_at := getattr(self, '_uncounted_auto_applied_at', None):
+            AutoAppliedLicenseCount.decrement(self.subscription_plan_id, uncounted_auto_applied_at)
+            self._uncounted_auto_applied_at = None
+
+    def set_enterprise_customer_uuid(self):
+        """
+        Copies the enterprise customer uuid of the license's subscription plan onto the license.
+        """
+        if self.subscription_plan_id:
+            self.enterprise_customer_uuid = self.subscription_plan.customer_agreement.enterprise_customer_uuid
 
     @cached_property
     def activation_link(self):
@@ -1388,6 +1662,9 @@ class License(TimeStampedModel):
         the license after calling this, or use something like bulk_update which saves each object as part of its updates
         """
         logger.info(f'Reseting license {self.uuid} to unassigned.')
+        if self.auto_applied and self.activation_date:
+            # No longer counted as auto applied once it's saved, see ``save()``.
+            self._uncounted_auto_applied_at = self.activation_date
         self.status = UNASSIGNED
         self.user_email = None
         self.lms_user_id = None
@@ -1450,10 +1727,26 @@ class License(TimeStampedModel):
         However, django-simple-history provides utility functions to work around this.
 
         https://django-simple-history.readthedocs.io/en/2.12.0/common_issues.html#bulk-creating-and-queryset-updating
+
+        When ``DEFERRED_HISTORY_WRITES_ENABLED`` is set, the history is written asynchronously instead.
         """
-        bulk_create_with_history(license_objects, cls, batch_size=batch_size)
+        for license_object in license_objects:
+            if license_object.enterprise_customer_uuid is None:
+                license_object.set_enterprise_customer_uuid()
+
+        if settings.DEFERRED_HISTORY_WRITES_ENABLED:
+            cls.objects.bulk_create(license_objects, batch_size=batch_size)
+            defer_history_writes(license_objects, cls)
+        else:
+            bulk_create_with_history(license_objects, cls, batch_size=batch_size)
 
-        # Since bulk_create does not call post_save, handle tracking events manually:
+        # Since bulk_create does not call post_save, handle learner entitlements and tracking events manually:
+        entitled_license_uuids = [
+            license_object.uuid for license_object in license_objects
+            if license_object.status in LearnerEntitlement.ENTITLED_LICENSE_STATUSES
+        ]
+        if entitled_license_uuids:
+            LearnerEntitlement.sync_licenses(entitled_license_uuids, batch_size=batch_size)
         track_license_changes(license_objects, SegmentEvents.LICENSE_CREATED)
 
     @classmethod
@@ -1465,26 +1758,84 @@ class License(TimeStampedModel):
         However, django-simple-history provides utility functions to work around this.
 
         https://django-simple-history.readthedocs.io/en/2.12.0/common_issues.html#bulk-creating-and-queryset-updating
+
+        When ``DEFERRED_HISTORY_WRITES_ENABLED`` is set, the history is written asynchronously instead.
+
+        ``modified`` is updated along with the given fields, as ``bulk_update`` doesn't update it by itself, so that
+        the changes are picked up by the license change feed.
+        """
+        modified = localized_utcnow()
+        for license_object in license_objects:
+            license_object.modified = modified
+        field_names = [*field_names, 'modified'] if 'modified' not in field_names else field_names
+
+        if settings.DEFERRED_HISTORY_WRITES_ENABLED:
+            cls.objects.bulk_update(license_objects, field_names, batch_size=batch_size)
+            defer_history_writes(license_objects, cls, update=True)
+        else:
+            bulk_update_with_history(license_objects, cls, field_names, batch_size=batch_size)
+
+        if set(field_names) & {'status', 'user_email', 'lms_user_id', 'subscription_plan', 'subscription_plan_id'}:
+            LearnerEntitlement.sync_licenses(
+                [license_object.uuid for license_object in license_objects],
+                batch_size=batch_size,
+            )
+
+    @classmethod
+    def bulk_provision(cls, subscription_plan, num_licenses, batch_size=LICENSE_BULK_OPERATION_BATCH_SIZE):
+        """
+        Creates ``num_licenses`` unassigned licenses in the given plan, without tracking any per-license events.
+        UUIDs are generated in python, so each batch of licenses and its history rows are written with
+        one multi-row insert apiece, without having to read the new licenses back.
+
+        Returns:
+            list: The newly created licenses.
         """
-        bulk_update_with_history(license_objects, cls, field_names, batch_size=batch_size)
+        enterprise_customer_uuid = subscription_plan.customer_agreement.enterprise_customer_uuid
+        new_licenses = [
+            cls(uuid=uuid4(), subscription_plan=subscription_plan, enterprise_customer_uuid=enterprise_customer_uuid)
+            for _ in range(num_licenses)
+        ]
+        if settings.DEFERRED_HISTORY_WRITES_ENABLED:
+            cls.objects.bulk_create(new_licenses, batch_size=batch_size)
+            defer_history_writes(new_licenses, cls)
+        else:
+            bulk_create_with_history(new_licenses, cls, batch_size=batch_size)
+        return new_licenses
 
     @classmethod
     def by_user_email_or_lms_user_id(cls, user_email, lms_user_id=None):
         """
         Returns all licenses asssociated with the given user email or lms_user_id.
         """
-        if lms_user_id is not None:
-            qs = cls.objects.filter(
-                Q(user_email=user_email) | Q(lms_user_id=lms_user_id)
-            )
-        else:
-            qs = cls.objects.filter(Q(user_email=user_email))
-
-        return qs.select_related(
+        license_uuids = list(cls.user_license_uuids(user_email, lms_user_id))
+        return cls.objects.filter(uuid__in=license_uuids).select_related(
             'subscription_plan',
             'subscription_plan__customer_agreement',
         )
 
+    @classmethod
+    def user_license_uuids(cls, user_email, lms_user_id=None, enterprise_customer_uuid=None):
+        """
+        Returns a query of the uuids of the licenses associated with the given user email or lms_user_id, and
+        optionally with the given enterprise customer through the denormalized ``enterprise_customer_uuid``.
+
+        Rather than a single query filtering on ``user_email OR lms_user_id``, which the database may only serve
+        with an index merge or a full scan of the license table, this is the union of two queries that are each
+        served by an index. Django can't filter the union any further, so callers evaluate the (few) matching
+        uuids and look the licenses up by primary key.
+        """
+        filters = {}
+        if enterprise_customer_uuid is not None:
+            filters['enterprise_customer_uuid'] = enterprise_customer_uuid
+
+        license_uuids = cls.objects.filter(user_email=user_email, **filters).values_list('uuid', flat=True)
+        if lms_user_id is not None:
+            license_uuids = license_uuids.union(
+                cls.objects.filter(lms_user_id=lms_user_id, **filters).values_list('uuid', flat=True),
+            )
+        return license_uuids
+
     @classmethod
     def for_user_and_customer(
         cls,
@@ -1500,11 +1851,23 @@ class License(TimeStampedModel):
         and ``current_plans_only`` allow the caller to filter for licenses whose plans
         are marked ``active`` or that are current (the current time is within the plan's
         start/end range), respectively.
+
+        Once every license has its denormalized ``enterprise_customer_uuid``, and
+        ``DENORMALIZED_LICENSE_CUSTOMER_LOOKUPS_ENABLED`` is set, the customer is filtered on
+        by the index-driven queries themselves, rather than by joining to the customer agreement.
         """
-        queryset = cls.by_user_email_or_lms_user_id(user_email, lms_user_id)
-        kwargs = {
-            'subscription_plan__customer_agreement__enterprise_customer_uuid': enterprise_customer_uuid,
-        }
+        if settings.DENORMALIZED_LICENSE_CUSTOMER_LOOKUPS_ENABLED:
+            license_uuids = list(cls.user_license_uuids(user_email, lms_user_id, enterprise_customer_uuid))
+            queryset = cls.objects.filter(uuid__in=license_uuids).select_related(
+                'subscription_plan',
+                'subscription_plan__customer_agreement',
+            )
+            kwargs = {}
+        else:
+            queryset = cls.by_user_email_or_lms_user_id(user_email, lms_user_id)
+            kwargs = {
+                'subscription_plan__customer_agreement__enterprise_customer_uuid': enterprise_customer_uuid,
+            }
         if active_plans_only:
             kwargs['subscription_plan__is_active'] = True
         if current_plans_only:
@@ -1515,7 +1878,7 @@ class License(TimeStampedModel):
         return queryset.filter(**kwargs)
 
     @classmethod
-    def get_licenses_exceeding_purge_duration(cls, date_field_to_compare, batch_size=1000, **kwargs):
+    def get_licenses_exceeding_purge_duration(cls, date_field_to_compare, **kwargs):
         """
         Returns all licenses with non-null ``user_email`` values
         that have exceeded the purge duration specified by the related
@@ -1541,20 +1904,10 @@ class License(TimeStampedModel):
             date_field: localized_utcnow() - models.F(duration_before_purge_field),
         })
 
-        # ordered by primary key for stable pagination, which we'll rely on
-        # below to generate batches of result sets.
-        base_queryset = License.objects.filter(**kwargs).select_related(
+        return License.objects.filter(**kwargs).select_related(
             'subscription_plan',
             'subscription_plan__customer_agreement',
-        ).order_by('pk')
-
-        queryset = base_queryset[:batch_size]
-        offset = 0
-        while queryset.exists():
-            yield queryset
-            # Use values_list to efficiently fetch only the pk without materializing full objects
-            offset = list(queryset.values_list('pk', flat=True))[-1]
-            queryset = base_queryset.filter(pk__gt=offset)[:batch_size]
+        )
 
     @classmethod
     def get_licenses_by_email(cls, user_email):
@@ -1577,9 +1930,16 @@ class License(TimeStampedModel):
         """
         Helper to get a licenses in any current, active plan by activation_key and user_email.
         """
-        user_license = cls.get_licenses_by_email(user_email).filter(
-            activation_key=activation_key,
-        ).first()
+        user_license = get_or_load(
+            License,
+            'email_and_activation_key',
+            f'{user_email}:{activation_key}',
+            lambda: cls.get_licenses_by_email(user_email).filter(
+                activation_key=activation_key,
+            ).select_related(
+                'subscription_plan__customer_agreement',
+            ).first(),
+        )
 
         if not user_license:
             msg = f'No current license exists for the email {user_email} with activation key {activation_key}'
@@ -1604,11 +1964,13 @@ class License(TimeStampedModel):
         if license_with_activation_key.status == REVOKED:
             raise LicenseToActivateIsRevokedError(license_with_activation_key.uuid)
 
-        licenses_for_user_in_plan = list(
-            cls.get_licenses_by_email(user_email).filter(
+        # The license with the activation key is almost always the only one, and was usually
+        # loaded by the permission check of the request already.
+        licenses_for_user_in_plan = [
+            remember(_license) for _license in cls.get_licenses_by_email(user_email).filter(
                 subscription_plan=license_with_activation_key.subscription_plan,
             ).exclude(status=REVOKED)
-        )
+        ]
         if len(licenses_for_user_in_plan) > 1:
             logger.info(f'Cleaning up duplicate licenses during activation: {licenses_for_user_in_plan}')
             return cls._clean_up_duplicate_licenses(licenses_for_user_in_plan)
@@ -1651,180 +2013,965 @@ class License(TimeStampedModel):
         return sorted_licenses[0]
 
 
-class LicenseTransferJob(TimeStampedModel):
+class AutoAppliedLicenseCount(models.Model):
     """
-    A record to help run a job that "physically" transfers
-    a batch of licenses' SubscriptionPlan FKs from one plan
-    to another plan.
-
-    .. no_pii: This model has no PII
+    The number of licenses auto applied from a subscription plan within an hour.
+
+    License utilization emails sum these counts to report how many licenses were auto applied since
+    auto-applied licenses were turned on, rather than counting the plan's licenses. Like that count, a bucket
+    holds the auto-applied licenses of the plan whose activation date falls within the hour: counts are
+    incremented as licenses are auto applied, decremented as auto-applied licenses are reset to unassigned
+    (which clears their activation date), and moved along with licenses transferred to another plan. Revoked
+    licenses keep their activation date, and so stay counted. The ``backfill_auto_apply_state`` management
+    command rebuilds the counts from the licenses of each plan.
     """
-    CHUNK_SIZE = 100
-
-    customer_agreement = models.ForeignKey(
-        CustomerAgreement,
-        related_name='license_transfer_jobs',
-        on_delete=models.CASCADE,
-        null=False,
-        blank=False,
-    )
-    old_subscription_plan = models.ForeignKey(
-        SubscriptionPlan,
-        on_delete=models.CASCADE,
-        null=False,
-        blank=False,
-        related_name='license_transfer_jobs_old',
-        help_text=_("SubscriptionPlan from which licenses will be transferred."),
-    )
-    new_subscription_plan = models.ForeignKey(
+    subscription_plan = models.ForeignKey(
         SubscriptionPlan,
+        related_name='auto_applied_license_counts',
         on_delete=models.CASCADE,
-        null=False,
-        blank=False,
-        related_name='license_transfer_jobs_new',
-        help_text=_("SubscriptionPlan to which licenses will be transferred."),
-    )
-    completed_at = models.DateTimeField(
-        blank=True,
-        null=True,
-        help_text=_("The time at which the job was successfully processed."),
-    )
-    notes = models.TextField(
-        null=True,
-        blank=True,
-        help_text=_("Optionally, say something about why the licenses are being transferred."),
-    )
-    is_dry_run = models.BooleanField(
-        default=False,
-        help_text=_(
-            "If true, will report which licenses will be transferred in processed_results, "
-            "without actually transferring them."
-        ),
-    )
-    delimiter = models.CharField(
-        max_length=8,
-        choices=(
-            ('newline', _('Newline character')),
-            ('comma', _('Comma character')),
-            ('pipe', _('Pipe character')),
-        ),
-        null=False,
-        default='newline',
-    )
-    transfer_all = models.BooleanField(
-        default=False,
-        help_text=_("Set to true to transfer ALL licenses from old to new plan, regardless of status."),
-    )
-    license_uuids_raw = models.TextField(
-        null=True,
-        blank=True,
-        help_text=_("Delimitted (with newlines by default) list of license_uuids to transfer"),
     )
-    processed_results = models.JSONField(
-        null=True,
-        blank=True,
-        encoder=DjangoJSONEncoder,
-        help_text=_("Raw results of what licenses were changed, either in dry-run form, or actual form."),
+
+    bucket_start = models.DateTimeField(
+        help_text=_("The start of the hour the licenses were auto applied in."),
     )
 
-    history = HistoricalRecords()
+    count = models.PositiveIntegerField(
+        default=0,
+        help_text=_("The number of licenses auto applied from the plan within the hour."),
+    )
 
     class Meta:
-        verbose_name = _("License Transfer Job")
-        verbose_name_plural = _("License Transfer Jobs")
+        app_label = 'subscriptions'
+        unique_together = (
+            ('subscription_plan', 'bucket_start'),
+        )
 
     def __str__(self):
-        return f'{self.id}'
-
-    @property
-    def delimiter_char(self):
-        return {
-            'newline': '\n',
-            'comma': ',',
-            'pipe': '|',
-        }.get(self.delimiter, '\n')
+        """
+        Return human-readable string representation.
+        """
+        return (
+            f"<AutoAppliedLicenseCount plan={self.subscription_plan_id} "
+            f"bucket_start={self.bucket_start} count={self.count}>"
+        )
 
-    def clean(self):
+    @staticmethod
+    def get_bucket_start(timestamp):
         """
-        Validates that old and new subscription plans share the same customer agreement.
+        Returns the start of the hour ``timestamp`` falls in.
         """
-        super().clean()
-        if self.old_subscription_plan.customer_agreement != self.new_subscription_plan.customer_agreement:
-            raise ValidationError(
-                'LicenseTransferJob: Old and new subscription plans must have same customer_agreement.'
-            )
-        if not self.transfer_all and not self.license_uuids_raw:
-            raise ValidationError(
-                'LicenseTransferJob: Must specify either transfer_all or license_uuids_raw.'
-            )
+        return timestamp.replace(minute=0, second=0, microsecond=0)
 
-    def get_customer_agreement(self):
+    @classmethod
+    def _add(cls, subscription_plan_id, bucket_start, num_licenses):
+        """
+        Adds ``num_licenses`` (which may be negative) to the count of the given bucket, never taking it below 0.
+        """
+        bucket = cls.objects.filter(subscription_plan_id=subscription_plan_id, bucket_start=bucket_start)
+        if bucket.update(count=Greatest(models.F('count') + num_licenses, 0)) or num_licenses <= 0:
+            return
         try:
-            return self.customer_agreement
+            with transaction.atomic():
+                cls.objects.create(
+                    subscription_plan_id=subscription_plan_id, bucket_start=bucket_start, count=num_licenses,
+                )
+        except IntegrityError:
+            # The bucket was created by a concurrent auto-apply.
+            bucket.update(count=models.F('count') + num_licenses)
+
+    @classmethod
+    def increment(cls, subscription_plan, auto_applied_at):
+        """
+        Counts one more license auto applied from ``subscription_plan`` at ``auto_applied_at``.
+        """
+        cls._add(subscription_plan.pk, cls.get_bucket_start(auto_applied_at), 1)
+
+    @classmethod
+    def decrement(cls, subscription_plan_id, auto_applied_at):
+        """
+        Stops counting a license auto applied from the given plan at ``auto_applied_at``.
+        """
+        cls._add(subscription_plan_id, cls.get_bucket_start(auto_applied_at), -1)
+
+    @classmethod
+    def transfer(cls, licenses, old_subscription_plan, new_subscription_plan):
+        """
+        Moves the counts of the given licenses, about to be transferred, from the old plan to the new plan.
+        """
+        num_licenses_by_bucket = Counter(
+            cls.get_bucket_start(_license.activation_date)
+            for _license in licenses if _license.auto_applied and _license.activation_date
+        )
+        for bucket_start, num_licenses in num_licenses_by_bucket.items():
+            cls._add(old_subscription_plan.pk, bucket_start, -num_licenses)
+            cls._add(new_subscription_plan.pk, bucket_start, num_licenses)
+
+    @classmethod
+    def count_since(cls, subscription_plan, since):
+        """
+        Returns the number of licenses auto applied from ``subscription_plan`` since ``since``.
+
+        The counts of the hours after the one ``since`` falls in are summed, and when ``since`` isn't on
+        the hour, the licenses auto applied within the rest of its hour are counted from the plan's licenses.
+        """
+        is_on_the_hour = since == cls.get_bucket_start(since)
+        next_bucket_start = since if is_on_the_hour else cls.get_bucket_start(since) + timedelta(hours=1)
+        total = cls.objects.filter(
+            subscription_plan=subscription_plan,
+            bucket_start__gte=next_bucket_start,
+        ).aggregate(total=models.Sum('count'))['total'] or 0
+        if not is_on_the_hour:
+            total += subscription_plan.licenses.filter(
+                auto_applied=True,
+                activation_date__gte=since,
+                activation_date__lt=next_bucket_start,
+            ).count()
+        return total
+
+    @classmethod
+    def rebuild_for_plan(cls, subscription_plan):
+        """
+        Replaces the counts of ``subscription_plan`` with the counts of its auto applied licenses by activation hour.
+        Returns the number of buckets written.
+        """
+        counts_by_bucket = subscription_plan.licenses.filter(
+            auto_applied=True,
+            activation_date__isnull=False,
+        ).annotate(
+            bucket_start=TruncHour('activation_date'),
+        ).order_by().values('bucket_start').annotate(
+            num_licenses=models.Count('uuid'),
+        ).values_list('bucket_start', 'num_licenses')
+        buckets = [
+            cls(subscription_plan=subscription_plan, bucket_start=bucket_start, count=num_licenses)
+            for bucket_start, num_licenses in counts_by_bucket
+        ]
+        with transaction.atomic():
+            cls.objects.filter(subscription_plan=subscription_plan).delete()
+            cls.objects.bulk_create(buckets)
+        return len(buckets)
+
+
+class LearnerEntitlement(TimeStampedModel):
+    """
+    A learner's entitlement to the content of an enterprise customer through one of their assigned or activated
+    licenses, denormalized from the license, its subscription plan and the plan's customer agreement.
+
+    Learner-facing reads find the valid licenses of a user for a customer with one indexed read of this table,
+    rather than by joining licenses to plans and agreements and filtering on plan dates at query time. Rows are
+    kept up to date as licenses, plans and agreements are saved, and the ``reconcile_learner_entitlements``
+    management command rebuilds them nightly, to repair any row missed by writes that skip the model layer.
+
+    .. pii: Stores the email address and user id (from the lms) of the learner, copied from their license.
+    .. pii_types: id,email_address
+    .. pii_retirement: local_api
+    """
+    ENTITLED_LICENSE_STATUSES = (ASSIGNED, ACTIVATED)
+
+    # The path of the license field that each entitlement field is copied from.
+    LICENSE_FIELD_PATHS = {
+        'license_id': 'uuid',
+        'user_email': 'user_email',
+        'lms_user_id': 'lms_user_id',
+        'status': 'status',
+        'subscription_plan_id': 'subscription_plan_id',
+        'enterprise_customer_uuid': 'subscription_plan__customer_agreement__enterprise_customer_uuid',
+        'enterprise_catalog_uuid': 'subscription_plan__enterprise_catalog_uuid',
+        'plan_start_date': 'subscription_plan__start_date',
+        'plan_expiration_date': 'subscription_plan__expiration_date',
+        'plan_is_active': 'subscription_plan__is_active',
+    }
+
+    # The entitlement field that each field of a subscription plan is copied to.
+    PLAN_FIELDS = {
+        'enterprise_catalog_uuid': 'enterprise_catalog_uuid',
+        'start_date': 'plan_start_date',
+        'expiration_date': 'plan_expiration_date',
+        'is_active': 'plan_is_active',
+    }
+
+    license = models.OneToOneField(
+        License,
+        primary_key=True,
+        related_name='learner_entitlement',
+        on_delete=models.CASCADE,
+    )
+
+    user_email = models.EmailField(
+        blank=True,
+        null=True,
+    )
+
+    lms_user_id = models.IntegerField(
+        blank=True,
+        null=True,
+    )
+
+    status = models.CharField(
+        max_length=25,
+        choices=LICENSE_STATUS_CHOICES,
+    )
+
+    subscription_plan = models.ForeignKey(
+        SubscriptionPlan,
+        related_name='+',
+        on_delete=models.CASCADE,
+    )
+
+    enterprise_customer_uuid = models.UUIDField()
+
+    enterprise_catalog_uuid = models.UUIDField(
+        blank=True,
+        null=True,
+    )
+
+    plan_start_date = models.DateTimeField()
+
+    plan_expiration_date = models.DateTimeField()
+
+    plan_is_active = models.BooleanField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['lms_user_id', 'enterprise_customer_uuid'], name='entitlement_lms_user_idx'),
+            models.Index(fields=['user_email', 'enterprise_customer_uuid'], name='entitlement_user_email_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Return human-readable string representation.
+        """
+        return f"<LearnerEntitlement for License '{self.license_id}' of customer '{self.enterprise_customer_uuid}'>"
+
+    @classmethod
+    def from_license(cls, license_obj):
+        """
+        Returns an unsaved entitlement with the current values of the given license and its subscription plan.
+        """
+        subscription_plan = license_obj.subscription_plan
+        return cls(
+            license_id=license_obj.uuid,
+            user_email=license_obj.user_email,
+            lms_user_id=license_obj.lms_user_id,
+            status=license_obj.status,
+            subscription_plan_id=subscription_plan.uuid,
+            enterprise_customer_uuid=(
+                license_obj.enterprise_customer_uuid or subscription_plan.customer_agreement.enterprise_customer_uuid
+            ),
+            enterprise_catalog_uuid=subscription_plan.enterprise_catalog_uuid,
+            plan_start_date=subscription_plan.start_date,
+            plan_expiration_date=subscription_plan.expiration_date,
+            plan_is_active=subscription_plan.is_active,
+        )
+
+    @classmethod
+    def _upsert(cls, entitlements):
+        """
+        Inserts the given entitlements, or updates the existing rows of their licenses.
+        """
+        connection = connections[router.db_for_write(cls)]
+        cls.objects.bulk_create(
+            entitlements,
+            update_conflicts=True,
+            # Some databases (e.g. MySQL) upsert on any unique key and don't take the fields to upsert on.
+            unique_fields=['license'] if connection.features.supports_update_conflicts_with_target else None,
+            update_fields=[field_name for field_name in cls.LICENSE_FIELD_PATHS if field_name != 'license_id'] + [
+                'modified',
+            ],
+        )
+
+    @classmethod
+    def sync_license(cls, license_obj, created=False):
+        """
+        Brings the entitlement of the given license, which has just been saved, up to date with it.
+        """
+        if license_obj.status in cls.ENTITLED_LICENSE_STATUSES:
+            cls._upsert([cls.from_license(license_obj)])
+        elif not created:
+            cls.objects.filter(license_id=license_obj.uuid).delete()
+
+    @classmethod
+    def sync_licenses(cls, license_uuids, batch_size=LICENSE_BULK_OPERATION_BATCH_SIZE):
+        """
+        Brings the entitlements of the licenses with the given uuids up to date with the database, in batches
+        that each read the licenses with their plans in one query.
+
+        Returns:
+            tuple: The number of entitlements written, and the number of outdated entitlements deleted.
+        """
+        num_written = num_deleted = 0
+        for license_uuid_batch in chunks(list(license_uuids), batch_size):
+            rows = License.objects.filter(
+                uuid__in=license_uuid_batch,
+                status__in=cls.ENTITLED_LICENSE_STATUSES,
+            ).values_list(*cls.LICENSE_FIELD_PATHS.values())
+            entitlements = [cls(**dict(zip(cls.LICENSE_FIELD_PATHS, row))) for row in rows]
+
+            num_deleted += cls.objects.filter(
+                license_id__in=license_uuid_batch,
+            ).exclude(
+                license_id__in=[entitlement.license_id for entitlement in entitlements],
+            ).delete()[0]
+            if entitlements:
+                cls._upsert(entitlements)
+            num_written += len(entitlements)
+        return num_written, num_deleted
+
+    @classmethod
+    def sync_subscription_plan(cls, subscription_plan):
+        """
+        Copies the current values of the given plan and its customer agreement onto the entitlements of its licenses.
+        """
+        cls.objects.filter(subscription_plan=subscription_plan).update(
+            enterprise_customer_uuid=subscription_plan.customer_agreement.enterprise_customer_uuid,
+            modified=localized_utcnow(),
+            **{
+                entitlement_field: getattr(subscription_plan, plan_field)
+                for plan_field, entitlement_field in cls.PLAN_FIELDS.items()
+            },
+        )
+
+    @classmethod
+    def for_user_and_customer(
+        cls,
+        user_email,
+        lms_user_id,
+        enterprise_customer_uuid,
+        active_plans_only=False,
+        current_plans_only=False,
+    ):
+        """
+        Returns the entitlements of the given user email or lms_user_id to the given customer's content, optionally
+        only those through plans that are marked ``active`` or that are current, like
+        ``License.for_user_and_customer`` does for licenses.
+
+        Each lookup is served by one of the indexes of this table; as with ``License.user_license_uuids``, the
+        lookups by email and by lms_user_id are combined with a union that can't be filtered any further.
+        """
+        filters = {'enterprise_customer_uuid': enterprise_customer_uuid}
+        if active_plans_only:
+            filters['plan_is_active'] = True
+        if current_plans_only:
+            now = localized_utcnow()
+            filters['plan_start_date__lte'] = now
+            filters['plan_expiration_date__gte'] = now
+
+        entitlements = cls.objects.filter(user_email=user_email, **filters)
+        if lms_user_id is not None:
+            entitlements = entitlements.union(cls.objects.filter(lms_user_id=lms_user_id, **filters))
+        return entitlements
+
+    def contains_content(self, content_ids):
+        """
+        Checks whether the catalog of the entitlement's subscription plan contains the given content,
+        sharing the cached results of ``SubscriptionPlan.contains_content``.
+        """
+        subscription_plan = SubscriptionPlan(
+            uuid=self.subscription_plan_id,
+            enterprise_catalog_uuid=self.enterprise_catalog_uuid,
+        )
+        return subscription_plan.contains_content(content_ids)
+
+
+class LicenseTransferJob(TimeStampedModel):
+    """
+    A record to help run a job that "physically" transfers
+    a batch of licenses' SubscriptionPlan FKs from one plan
+    to another plan.
+
+    .. no_pii: This model has no PII
+    """
+    CHUNK_SIZE = 100
+
+    customer_agreement = models.ForeignKey(
+        CustomerAgreement,
+        related_name='license_transfer_jobs',
+        on_delete=models.CASCADE,
+        null=False,
+        blank=False,
+    )
+    old_subscription_plan = models.ForeignKey(
+        SubscriptionPlan,
+        on_delete=models.CASCADE,
+        null=False,
+        blank=False,
+        related_name='license_transfer_jobs_old',
+        help_text=_("SubscriptionPlan from which licenses will be transferred."),
+    )
+    new_subscription_plan = models.ForeignKey(
+        SubscriptionPlan,
+        on_delete=models.CASCADE,
+        null=False,
+        blank=False,
+        related_name='license_transfer_jobs_new',
+        help_text=_("SubscriptionPlan to which licenses will be transferred."),
+    )
+    completed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text=_("The time at which the job was successfully processed."),
+    )
+    notes = models.TextField(
+        null=True,
+        blank=True,
+        help_text=_("Optionally, say something about why the licenses are being transferred."),
+    )
+    is_dry_run = models.BooleanField(
+        default=False,
+        help_text=_(
+            "If true, will report which licenses will be transferred in processed_results, "
+            "without actually transferring them."
+        ),
+    )
+    delimiter = models.CharField(
+        max_length=8,
+        choices=(
+            ('newline', _('Newline character')),
+            ('comma', _('Comma character')),
+            ('pipe', _('Pipe character')),
+        ),
+        null=False,
+        default='newline',
+    )
+    transfer_all = models.BooleanField(
+        default=False,
+        help_text=_("Set to true to transfer ALL licenses from old to new plan, regardless of status."),
+    )
+    license_uuids_raw = models.TextField(
+        null=True,
+        blank=True,
+        help_text=_("Delimitted (with newlines by default) list of license_uuids to transfer"),
+    )
+    processed_results = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        help_text=_("Raw results of what licenses were changed, either in dry-run form, or actual form."),
+    )
+
+    history = HistoricalRecords()
+
+    class Meta:
+        verbose_name = _("License Transfer Job")
+        verbose_name_plural = _("License Transfer Jobs")
+
+    def __str__(self):
+        return f'{self.id}'
+
+    @property
+    def delimiter_char(self):
+        return {
+            'newline': '\n',
+            'comma': ',',
+            'pipe': '|',
+        }.get(self.delimiter, '\n')
+
+    def clean(self):
+        """
+        Validates that old and new subscription plans share the same customer agreement.
+        """
+        super().clean()
+        if self.old_subscription_plan.customer_agreement != self.new_subscription_plan.customer_agreement:
+            raise ValidationError(
+                'LicenseTransferJob: Old and new subscription plans must have same customer_agreement.'
+            )
+        if not self.transfer_all and not self.license_uuids_raw:
+            raise ValidationError(
+                'LicenseTransferJob: Must specify either transfer_all or license_uuids_raw.'
+            )
+
+    def get_customer_agreement(self):
+        try:
+            return self.customer_agreement
         except CustomerAgreement.DoesNotExist:
             return None
 
-    def get_license_uuids(self):
-        return [
-            raw_license_uuid.strip() for raw_license_uuid in
-            self.license_uuids_raw.split(self.delimiter_char)
-        ]
+    def get_license_uuids(self):
+        return [
+            raw_license_uuid.strip() for raw_license_uuid in
+            self.license_uuids_raw.split(self.delimiter_char)
+        ]
+
+    def get_licenses_to_transfer(self):
+        """
+        Yields successive chunked querysets of License records to transfer.
+        The licenses are from self.old_subscription_plan and will
+        only be in the (activated, assigned) statuses, unless ``transfer_all``
+        is True, in which case **all** licenses will be included.
+        """
+        if self.transfer_all:
+            licenses = License.objects.filter(subscription_plan=self.old_subscription_plan).order_by('uuid')
+            last_uuid = None
+            while True:
+                chunk_queryset = licenses if last_uuid is None else licenses.filter(uuid__gt=last_uuid)
+                license_uuid_chunk = list(chunk_queryset.values_list('uuid', flat=True)[:self.CHUNK_SIZE])
+                if not license_uuid_chunk:
+                    return
+                yield License.objects.filter(
+                    subscription_plan=self.old_subscription_plan,
+                    uuid__in=license_uuid_chunk,
+                )
+                last_uuid = license_uuid_chunk[-1]
+        else:
+            for license_uuid_chunk in chunks(self.get_license_uuids(), self.CHUNK_SIZE):
+                yield License.objects.filter(
+                    subscription_plan=self.old_subscription_plan,
+                    status__in=[ACTIVATED, ASSIGNED],
+                    uuid__in=license_uuid_chunk,
+                )
+
+    def process(self):
+        """
+        Processes this job, moving activated and assigned licenses
+        from the job's old subscription plan to the new subscription plan.
+        Is ``self.is_dry_run``, the licenses are not actually moved, but we
+        report via ``self.processed_results`` which licenses would have
+        been moved during this processing.
+
+        Each chunk of licenses is moved in its own transaction, so that the license change feed sees the
+        changes of every chunk soon after they were made. A job that fails part way through can be processed
+        again, which moves the licenses still left in the old plan.
+        """
+        if self.completed_at:
+            logger.info(f'{self} was already processed on {self.completed_at}')
+            return
+
+        processed_license_uuids = []
+        for license_queryset in self.get_licenses_to_transfer():
+            with transaction.atomic():
+                licenses = list(license_queryset)
+
+                if not self.is_dry_run:
+                    AutoAppliedLicenseCount.transfer(licenses, self.old_subscription_plan, self.new_subscription_plan)
+                    for _license in licenses:
+                        _license.subscription_plan = self.new_subscription_plan
+                        _license.set_enterprise_customer_uuid()
+                    License.bulk_update(licenses, ['subscription_plan', 'enterprise_customer_uuid'])
+
+            processed_license_uuids.extend([str(_lic.uuid) for _lic in licenses])
+
+        time_completed_at = localized_utcnow()
+        if not self.is_dry_run:
+            self.completed_at = time_completed_at
+
+        if not self.processed_results:
+            self.processed_results = []
+        self.processed_results.append(
+            {
+                'is_dry_run': self.is_dry_run,
+                'modified_licenses': processed_license_uuids,
+                'completed_at': time_completed_at,
+            }
+        )
+        self.save()
+
+
+class LicenseDeletionJob(TimeStampedModel):
+    """
+    A background job that deletes the licenses of a subscription plan in a given status, e.g. the unused
+    licenses of a plan being frozen, in batches with ``bulk_delete_licenses``. The number of licenses deleted
+    so far is recorded after every batch, and a failed job can be enqueued again to pick up where it stopped.
+
+    .. no_pii: This model has no PII
+    """
+    uuid = models.UUIDField(
+        primary_key=True,
+        default=uuid4,
+        editable=False,
+        unique=True,
+    )
+
+    subscription_plan = models.ForeignKey(
+        SubscriptionPlan,
+        related_name='license_deletion_jobs',
+        on_delete=models.CASCADE,
+    )
+
+    license_status = models.CharField(
+        max_length=25,
+        choices=LICENSE_STATUS_CHOICES,
+        help_text=_("The status of the licenses of the plan to delete."),
+    )
+
+    status = models.CharField(
+        max_length=32,
+        choices=LicenseDeletionJobStatus.CHOICES,
+        default=LicenseDeletionJobStatus.PENDING,
+    )
+
+    num_licenses_deleted = models.PositiveIntegerField(
+        default=0,
+        help_text=_("The number of licenses deleted so far."),
+    )
+
+    completed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='+',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        help_text=_("The user the historical records of the deleted licenses are attributed to."),
+    )
+
+    class Meta:
+        verbose_name = _("License Deletion Job")
+        verbose_name_plural = _("License Deletion Jobs")
+
+    def __str__(self):
+        return f'<LicenseDeletionJob {self.license_status} licenses of plan {self.subscription_plan_id}>'
+
+    @classmethod
+    def create_license_deletion_job(cls, subscription_plan, license_status, requested_by=None):
+        """
+        Creates a job to delete the licenses of ``subscription_plan`` in ``license_status``, and enqueues
+        ``process_license_deletion_job_task`` to process it once the current transaction commits.
+        """
+        license_deletion_job = cls.objects.create(
+            subscription_plan=subscription_plan,
+            license_status=license_status,
+            requested_by=requested_by,
+        )
+        license_deletion_job.enqueue()
+        return license_deletion_job
+
+    def enqueue(self):
+        """
+        Enqueues the processing of this job once the current transaction commits.
+        """
+        # pylint: disable=import-outside-toplevel
+        from .tasks import process_license_deletion_job_task
+
+        transaction.on_commit(lambda: process_license_deletion_job_task.delay(str(self.uuid)))
+
+    def process(self):
+        """
+        Deletes the licenses of the job, recording the number of licenses deleted after every batch.
+        """
+        num_previously_deleted = self.num_licenses_deleted
+        self.status = LicenseDeletionJobStatus.PROCESSING
+        self.save(update_fields=['status', 'modified'])
+
+        def record_progress(num_deleted):
+            self.num_licenses_deleted = num_previously_deleted + num_deleted
+            self.save(update_fields=['num_licenses_deleted', 'modified'])
+
+        try:
+            bulk_delete_licenses(
+                self.subscription_plan.licenses.filter(status=self.license_status),
+                history_user_id=self.requested_by_id,
+                on_progress=record_progress,
+            )
+        except Exception:
+            self.status = LicenseDeletionJobStatus.FAILED
+            self.save(update_fields=['status', 'modified'])
+            raise
+
+        self.status = LicenseDeletionJobStatus.COMPLETED
+        self.completed_at = localized_utcnow()
+        self.save(update_fields=['status', 'completed_at', 'modified'])
+
+
+class BatchJobCheckpoint(TimeStampedModel):
+    """
+    The position of one shard of a ``BatchJob`` run by a management command: the primary key of the last row
+    of the last batch the shard processed, and the number of batches, rows and the metrics it processed so far.
+    A job run with ``--resume`` starts each of its shards after the last row of its checkpoint.
+
+    .. no_pii: This model has no PII
+    """
+    job_name = models.CharField(
+        max_length=255,
+        help_text=_("The name of the job, usually the name of the management command that runs it."),
+    )
+
+    scope = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text=_("Distinguishes the separate runs of a job by a command, e.g. one per enterprise customer."),
+    )
+
+    num_shards = models.PositiveIntegerField(
+        help_text=_("The number of primary key ranges the rows to process were split into."),
+    )
+
+    shard_index = models.PositiveIntegerField(
+        help_text=_("The index of the primary key range of this shard."),
+    )
+
+    last_pk = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        help_text=_("The primary key of the last row processed by the shard."),
+    )
+
+    num_batches = models.PositiveIntegerField(
+        default=0,
+    )
+
+    num_processed = models.PositiveIntegerField(
+        default=0,
+        help_text=_("The number of rows processed by the shard."),
+    )
+
+    metrics = models.JSONField(
+        default=dict,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        help_text=_("The sums of the metrics returned by the batches processed by the shard."),
+    )
+
+    completed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        app_label = 'subscriptions'
+        unique_together = (
+            ('job_name', 'scope', 'num_shards', 'shard_index'),
+        )
+
+    def __str__(self):
+        return f'<BatchJobCheckpoint {self.job_name} {self.scope} shard {self.shard_index + 1}/{self.num_shards}>'
 
-    def get_licenses_to_transfer(self):
+    def record_batch(self, last_pk, num_processed, batch_metrics):
         """
-        Yields successive chunked querysets of License records to transfer.
-        The licenses are from self.old_subscription_plan and will
-        only be in the (activated, assigned) statuses, unless ``transfer_all``
-        is True, in which case **all** licenses will be included.
+        Records that the shard processed a batch of ``num_processed`` rows up to ``last_pk``.
         """
-        if self.transfer_all:
-            yield License.objects.filter(subscription_plan=self.old_subscription_plan)
-        else:
-            for license_uuid_chunk in chunks(self.get_license_uuids(), self.CHUNK_SIZE):
-                yield License.objects.filter(
-                    subscription_plan=self.old_subscription_plan,
-                    status__in=[ACTIVATED, ASSIGNED],
-                    uuid__in=license_uuid_chunk,
-                )
+        metrics = Counter(self.metrics)
+        metrics.update(batch_metrics)
+        self.last_pk = str(last_pk)
+        self.num_batches += 1
+        self.num_processed += num_processed
+        self.metrics = dict(metrics)
+        self.save(update_fields=['last_pk', 'num_batches', 'num_processed', 'metrics', 'modified'])
 
-    def process(self):
+    def complete(self):
         """
-        Processes this job, moving activated and assigned licenses
-        from the job's old subscription plan to the new subscription plan.
-        Is ``self.is_dry_run``, the licenses are not actually moved, but we
-        report via ``self.processed_results`` which licenses would have
-        been moved during this processing.
+        Records that the shard processed all of its rows.
         """
-        if self.completed_at:
-            logger.info(f'{self} was already processed on {self.completed_at}')
-            return
+        self.completed_at = localized_utcnow()
+        self.save(update_fields=['completed_at', 'modified'])
 
-        processed_license_uuids = []
-        with transaction.atomic():
-            for license_queryset in self.get_licenses_to_transfer():
-                licenses = list(license_queryset)
 
-                if not self.is_dry_run:
-                    for _license in licenses:
-                        _license.subscription_plan = self.new_subscription_plan
-                    License.bulk_update(licenses, ['subscription_plan'])
+class ArchivedLicense(models.Model):
+    """
+    A license of a plan that expired long ago, moved out of the license table by the ``archive_expired_licenses``
+    command along with its historical records, source and events, see ``license_manager.apps.subscriptions.archive``.
+    The staff license lookups read through to this table, and ``restore_archived_licenses`` moves licenses back.
 
-                processed_license_uuids.extend([str(_lic.uuid) for _lic in licenses])
+    .. pii: Stores email address and user id (from the lms) for a user, like ``License``.
+    .. pii_types: id,email_address
+    .. pii_retirement: local_api
+    """
+    uuid = models.UUIDField(
+        primary_key=True,
+        editable=False,
+    )
 
-        time_completed_at = localized_utcnow()
-        if not self.is_dry_run:
-            self.completed_at = time_completed_at
+    status = models.CharField(
+        max_length=25,
+        choices=LICENSE_STATUS_CHOICES,
+    )
 
-        if not self.processed_results:
-            self.processed_results = []
-        self.processed_results.append(
-            {
-                'is_dry_run': self.is_dry_run,
-                'modified_licenses': processed_license_uuids,
-                'completed_at': time_completed_at,
-            }
+    assigned_date = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    activation_date = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    activation_key = models.UUIDField(
+        blank=True,
+        null=True,
+    )
+
+    last_remind_date = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    expiration_reminder_sent_date = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    subscription_plan_expiration_email_sent_date = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    revoked_date = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    user_email = models.EmailField(
+        blank=True,
+        null=True,
+        db_index=True,
+    )
+
+    lms_user_id = models.IntegerField(
+        blank=True,
+        null=True,
+        db_index=True,
+    )
+
+    subscription_plan = models.ForeignKey(
+        SubscriptionPlan,
+        related_name='archived_licenses',
+        on_delete=models.CASCADE,
+    )
+
+    # Not foreign keys, since the licenses on either end of a renewal may be archived or not.
+    renewed_to_uuid = models.UUIDField(
+        blank=True,
+        null=True,
+    )
+
+    renewed_from_uuid = models.UUIDField(
+        blank=True,
+        null=True,
+        help_text=_("The uuid of the license that was renewed to this one, which was unlinked from it on archival."),
+    )
+
+    auto_applied = models.BooleanField(
+        blank=True,
+        null=True,
+    )
+
+    enterprise_customer_uuid = models.UUIDField(
+        blank=True,
+        null=True,
+    )
+
+    created = models.DateTimeField()
+
+    modified = models.DateTimeField()
+
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    source = models.JSONField(
+        blank=True,
+        null=True,
+        encoder=DjangoJSONEncoder,
+        help_text=_("The license source of the license, with its historical records."),
+    )
+
+    events = models.JSONField(
+        default=list,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        help_text=_("The events triggered for the license."),
+    )
+
+    assignment_job_email_ids = models.JSONField(
+        default=list,
+        blank=True,
+        help_text=_("The license assignment job emails that referenced the license, unlinked from it on archival."),
+    )
+
+    class Meta:
+        app_label = 'subscriptions'
+        indexes = [
+            models.Index(fields=['enterprise_customer_uuid', 'user_email'], name='archived_license_customer_idx'),
+        ]
+
+    def __str__(self):
+        return f"<ArchivedLicense with UUID '{self.uuid}' of SubscriptionPlan '{self.subscription_plan_id}'>"
+
+    @cached_property
+    def activation_link(self):
+        """
+        Returns the activation link that was displayed in the activation email sent to the learner.
+        """
+        return get_license_activation_link(
+            self.subscription_plan.customer_agreement.enterprise_customer_slug,
+            self.activation_key,
         )
-        self.save()
+
+    @classmethod
+    def by_user_email_or_lms_user_id(cls, user_email, lms_user_id=None):
+        """
+        Returns all archived licenses associated with the given user email or lms_user_id, like
+        ``License.by_user_email_or_lms_user_id`` does for licenses.
+        """
+        user_filter = Q(user_email=user_email)
+        if lms_user_id is not None:
+            user_filter |= Q(lms_user_id=lms_user_id)
+        return cls.objects.filter(user_filter).select_related(
+            'subscription_plan',
+            'subscription_plan__customer_agreement',
+        )
+
+    @classmethod
+    def for_user_and_customer(cls, user_email, lms_user_id, enterprise_customer_uuid):
+        """
+        Returns the archived licenses associated with the given user email or lms_user_id that are associated with a
+        particular customer's SubscriptionPlan, like ``License.for_user_and_customer`` does for licenses.
+        """
+        return cls.by_user_email_or_lms_user_id(user_email, lms_user_id).filter(
+            subscription_plan__customer_agreement__enterprise_customer_uuid=enterprise_customer_uuid,
+        )
+
+
+class ArchivedHistoricalLicense(models.Model):
+    """
+    A historical record of an archived license, moved out of the license history table along with the license.
+    Only the fields that identify the record are columns, the values of the license it recorded are kept as they
+    were in ``values``.
+
+    .. pii: Stores the email address and user id (from the lms) of the historical license in ``values``.
+    .. pii_types: id,email_address
+    .. pii_retirement: local_api
+    """
+    history_id = models.IntegerField(
+        primary_key=True,
+    )
+
+    license_uuid = models.UUIDField(
+        db_index=True,
+    )
+
+    history_date = models.DateTimeField()
+
+    history_type = models.CharField(
+        max_length=1,
+    )
+
+    history_change_reason = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+    )
+
+    history_user_id = models.IntegerField(
+        blank=True,
+        null=True,
+    )
+
+    values = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        help_text=_("The values of the tracked fields of the license in the historical record."),
+    )
+
+    class Meta:
+        app_label = 'subscriptions'
+
+    def __str__(self):
+        return f"<ArchivedHistoricalLicense {self.history_id} of License '{self.license_uuid}'>"
 
 
 class SubscriptionLicenseSourceType(TimeStampedModel):
@@ -1938,6 +3085,33 @@ class SubscriptionsRoleAssignment(UserRoleAssignment):
         """
         return cls.objects.filter(user__id=user.id, role__name=role_name)
 
+    @classmethod
+    def get_assignments_cache_key(cls, user_id):
+        return f'subscriptions_role_assignments:{user_id}'
+
+    @classmethod
+    def get_assignments(cls, user, role_names=None):
+        """
+        Return iterator of (rolename, context), like ``UserRoleAssignment.get_assignments``, from the cached
+        role assignments of the user. The cache is invalidated whenever one of their assignments is saved or deleted.
+        """
+        if user.is_anonymous:
+            return
+
+        cache_key = cls.get_assignments_cache_key(user.id)
+        assignments = cache.get(cache_key)
+        record_cache_lookup(hit=assignments is not None)
+        if assignments is None:
+            assignments = [
+                (assignment.role.name, assignment.get_context())
+                for assignment in cls.objects.filter(user=user).select_related('role')
+            ]
+            cache.set(cache_key, assignments, timeout=settings.ROLE_ASSIGNMENT_CACHE_TIMEOUT)
+
+        for role_name, context in assignments:
+            if not role_names or role_name in role_names:
+                yield role_name, context
+
     def __str__(self):
         """
         Return human-readable string representation.
@@ -2021,20 +3195,82 @@ def dispatch_license_create_events(sender, **kwargs):  # pylint: disable=unused-
                     event_properties)
 
 
+@receiver(post_save, sender=License)
+def sync_learner_entitlement(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Post save hook to keep the learner entitlement of a license up to date with it.
+    """
+    if kwargs.get('raw'):
+        return
+    LearnerEntitlement.sync_license(kwargs['instance'], created=kwargs.get('created', False))
+
+
+@receiver(post_save, sender=SubscriptionsRoleAssignment)
+@receiver(post_delete, sender=SubscriptionsRoleAssignment)
+def invalidate_role_assignments_cache(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drops the cached role assignments of the user whose role assignment was saved or deleted.
+    """
+    cache.delete(SubscriptionsRoleAssignment.get_assignments_cache_key(kwargs['instance'].user_id))
+
+
 @receiver(post_save, sender=SubscriptionPlan)
 def dispatch_license_expiration_event(sender, **kwargs):  # pylint: disable=unused-argument
     """
     Post save hook to handle tracking license lifecycle events:
     Sends an expiration event for all linked licenses when a top level subscription plan is marked as
     expired and individual license WASN'T renewed.
+
+    The events are sent by ``track_license_expirations_task`` once the save is committed.
     """
+    # pylint: disable=import-outside-toplevel
+    from .tasks import track_license_expirations_task
+
     # if we updated the expiration_processed field and it's true now:
     subscription_plan_obj = kwargs['instance']
     update_fields = kwargs.get('update_fields', None)
 
     if subscription_plan_obj and update_fields and 'expiration_processed' in update_fields:
-        expired_licenses = [lcs for lcs in subscription_plan_obj.licenses.all() if not lcs.renewed_to]
-        track_license_changes(expired_licenses, SegmentEvents.LICENSE_EXPIRED)
+        subscription_plan_uuid = str(subscription_plan_obj.uuid)
+        transaction.on_commit(lambda: track_license_expirations_task.delay(subscription_plan_uuid))
+
+
+@receiver(post_save, sender=SubscriptionPlan)
+def schedule_expiration_on_save(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Post save hook to enqueue the processing of the expiration of a plan, for when it expires, once the save is
+    committed. Only enqueues a task for plans that expire within the scheduling horizon, see ``scheduling``.
+    """
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('raw') or not settings.SCHEDULED_EXPIRATIONS_AND_RENEWALS_ENABLED:
+        return
+    if update_fields and 'expiration_date' not in update_fields:
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from .scheduling import schedule_subscription_plan_expiration
+
+    subscription_plan = kwargs['instance']
+    transaction.on_commit(lambda: schedule_subscription_plan_expiration(subscription_plan))
+
+
+@receiver(post_save, sender=SubscriptionPlanRenewal)
+def schedule_renewal_on_save(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Post save hook to enqueue the processing of a renewal, for when its prior plan gets locked for renewal, once
+    the save is committed. Only enqueues a task for renewals due within the scheduling horizon, see ``scheduling``.
+    """
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('raw') or not settings.SCHEDULED_EXPIRATIONS_AND_RENEWALS_ENABLED:
+        return
+    if update_fields and 'effective_date' not in update_fields:
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from .scheduling import schedule_renewal_processing
+
+    renewal = kwargs['instance']
+    transaction.on_commit(lambda: schedule_renewal_processing(renewal))
 
 
 class LicenseAction(TimeStampedModel):
@@ -2100,6 +3336,16 @@ class LicenseAction(TimeStampedModel):
         null=True,
         blank=True,
     )
+    idempotency_key = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        unique=True,
+        help_text=_(
+            "Optional key that identifies the operation that wrote this action, so that retried operations "
+            "don't write duplicate actions."
+        ),
+    )
     metadata = models.JSONField(
         default=dict,
         blank=True,
@@ -2152,9 +3398,29 @@ class LicenseAction(TimeStampedModel):
             raise ValidationError(errors)
 
     def save(self, *args, **kwargs):
-        self.full_clean(exclude=['license', 'subscription_plan'])
+        # The uniqueness of idempotency_key is left to the database, see create_idempotent.
+        self.full_clean(exclude=['license', 'subscription_plan', 'idempotency_key'])
         return super().save(*args, **kwargs)
 
+    @classmethod
+    def create_idempotent(cls, **kwargs):
+        """
+        Creates an action, unless an action with the same ``idempotency_key`` already exists.
+        The insert is attempted straight away and relies on the unique index on ``idempotency_key``,
+        so concurrent retries can't both write an action.
+
+        Returns:
+            LicenseAction: The created action, or None if it was a duplicate.
+        """
+        idempotency_key = kwargs.get('idempotency_key')
+        try:
+            with transaction.atomic():
+                return cls.objects.create(**kwargs)
+        except IntegrityError:
+            if idempotency_key and cls.objects.filter(idempotency_key=idempotency_key).exists():
+                return None
+            raise
+
     def __str__(self):
         return (
             f"LicenseAction [{self.action_type}] "
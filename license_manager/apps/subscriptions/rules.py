@@ -4,15 +4,18 @@ Rules needed to restrict access to the license management service.
 import crum
 import rules
 from edx_rbac.utils import (
-    get_decoded_jwt,
     request_user_has_implicit_access_via_jwt,
     user_has_access_via_database,
 )
 
+from license_manager.apps.core.instrumentation import (
+    record_permission_evaluation,
+)
 from license_manager.apps.subscriptions import constants
 from license_manager.apps.subscriptions.models import (
     SubscriptionsRoleAssignment,
 )
+from license_manager.apps.subscriptions.utils import get_decoded_jwt
 
 
 @rules.predicate
@@ -24,6 +27,7 @@ def has_implicit_access_to_subscriptions_admin(user, enterprise_customer_uuid):
     Returns:
         boolean: whether the request user has access.
     """
+    record_permission_evaluation()
     if not enterprise_customer_uuid:
         return False
 
@@ -41,6 +45,7 @@ def has_explicit_access_to_subscriptions_admin(user, enterprise_customer_uuid):
     Returns:
         boolean: whether the request user has access.
     """
+    record_permission_evaluation()
     if not enterprise_customer_uuid:
         return False
 
@@ -68,6 +73,7 @@ def has_implicit_access_to_subscriptions_learner(user, enterprise_customer_uuid)
     Returns:
         boolean: whether the request user has access.
     """
+    record_permission_evaluation()
     if not enterprise_customer_uuid:
         return False
 
@@ -86,6 +92,7 @@ def has_explicit_access_to_subscriptions_learner(user, enterprise_customer_uuid)
     Returns:
         boolean: whether the request user has access.
     """
+    record_permission_evaluation()
     if not enterprise_customer_uuid:
         return False
 
@@ -113,6 +120,7 @@ def has_implicit_access_to_subscription_plan_provisioning(user, enterprise_custo
     Returns:
         boolean: whether the request user has access.
     """
+    record_permission_evaluation()
     return request_user_has_implicit_access_via_jwt(
         get_decoded_jwt(crum.get_current_request()),
         constants.PROVISIONING_SUBSCRIPTION_ADMIN_ROLE,
@@ -135,6 +143,7 @@ def has_implicit_access_to_customer_agreement_provisioning(user, enterprise_cust
     Returns:
         boolean: whether the request user has access.
     """
+    record_permission_evaluation()
     return request_user_has_implicit_access_via_jwt(
         get_decoded_jwt(crum.get_current_request()),
         constants.PROVISIONING_CUSTOMER_AGREEMENT_ADMIN_ROLE,
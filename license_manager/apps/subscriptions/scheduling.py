@@ -0,0 +1,139 @@
+"""
+Just-in-time scheduling of subscription plan expirations and renewals.
+
+Rather than scanning once a day for the plans that expired and the renewals that came due within a window,
+a task is enqueued with an ETA for each plan expiration and renewal when the plan or renewal is saved, so that
+it's processed when it comes due and the work spreads across the day. Renewals are processed when their plan
+gets locked for renewal, ``SUBSCRIPTION_PLAN_RENEWAL_LOCK_PERIOD_HOURS`` before their effective date.
+
+Tasks are only enqueued for the items due within ``EXPIRATION_AND_RENEWAL_SCHEDULING_HORIZON_HOURS``, so
+that the broker doesn't hold them for months. The ``schedule_expirations_and_renewals`` command, run more
+often than that, enqueues the items as they come within the horizon, and catches up on the items that are
+overdue by up to ``EXPIRATION_AND_RENEWAL_CATCH_UP_DAYS``, e.g. because their task was lost.
+
+The task of an item is enqueued once for each date it's due at, which is remembered in the cache until
+``EXPIRATION_AND_RENEWAL_SCHEDULING_GRACE_PERIOD_SECONDS`` after that date. When the date of an item changes,
+a task is enqueued for the new date, and the task enqueued for the previous date does nothing when it runs.
+"""
+from datetime import timedelta
+from logging import getLogger
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import SubscriptionPlan, SubscriptionPlanRenewal
+from .tasks import expire_subscription_plan_task, renew_subscription_task
+from .utils import localized_utcnow
+
+
+logger = getLogger(__name__)
+
+SCHEDULED_TASK_CACHE_KEY = 'scheduled_task:{kind}:{key}:{due_at}'
+
+
+def _enqueue_once(kind, key, due_at, enqueue):
+    """
+    Calls ``enqueue`` unless it was already called for the item identified by ``kind`` and ``key`` due at
+    ``due_at``, and returns whether it was called.
+    """
+    seconds_until_due = max((due_at - localized_utcnow()).total_seconds(), 0)
+    timeout = int(seconds_until_due) + settings.EXPIRATION_AND_RENEWAL_SCHEDULING_GRACE_PERIOD_SECONDS
+    cache_key = SCHEDULED_TASK_CACHE_KEY.format(kind=kind, key=key, due_at=due_at.isoformat())
+    if not cache.add(cache_key, True, timeout):
+        return False
+    enqueue()
+    logger.info(f'Enqueued the {kind} of {key}, due at {due_at}.')
+    return True
+
+
+def _get_scheduling_horizon():
+    return localized_utcnow() + timedelta(hours=settings.EXPIRATION_AND_RENEWAL_SCHEDULING_HORIZON_HOURS)
+
+
+def get_renewal_processing_time(renewal):
+    """
+    Returns when ``renewal`` is due to be processed, which is when its prior plan gets locked for renewal.
+    """
+    return renewal.effective_date - timedelta(hours=settings.SUBSCRIPTION_PLAN_RENEWAL_LOCK_PERIOD_HOURS)
+
+
+def schedule_subscription_plan_expiration(subscription_plan):
+    """
+    Enqueues ``expire_subscription_plan_task`` to run when ``subscription_plan`` expires, if it expires within the
+    scheduling horizon and its expiration wasn't processed yet. Returns whether the task was enqueued.
+    """
+    expiration_date = subscription_plan.expiration_date
+    if subscription_plan.expiration_processed or expiration_date > _get_scheduling_horizon():
+        return False
+
+    subscription_plan_uuid = str(subscription_plan.uuid)
+    return _enqueue_once(
+        'expiration',
+        subscription_plan_uuid,
+        expiration_date,
+        lambda: expire_subscription_plan_task.apply_async(
+            args=(subscription_plan_uuid, expiration_date.isoformat()),
+            eta=expiration_date,
+        ),
+    )
+
+
+def schedule_renewal_processing(renewal):
+    """
+    Enqueues ``renew_subscription_task`` to run when ``renewal`` is due to be processed, if that's within the
+    scheduling horizon and it wasn't processed yet. Returns whether the task was enqueued.
+    """
+    processing_time = get_renewal_processing_time(renewal)
+    if renewal.processed or renewal.exempt_from_batch_processing or processing_time > _get_scheduling_horizon():
+        return False
+
+    return _enqueue_once(
+        'renewal',
+        renewal.id,
+        processing_time,
+        lambda: renew_subscription_task.apply_async(
+            kwargs={
+                'renewal_id': renewal.id,
+                'is_auto_renewed': True,
+                'correlation_id': str(uuid4()),
+                'subscription_plan_uuid': str(renewal.prior_subscription_plan_id),
+                'effective_date': renewal.effective_date.isoformat(),
+            },
+            eta=processing_time,
+        ),
+    )
+
+
+def schedule_due_expirations_and_renewals():
+    """
+    Enqueues the tasks of the plan expirations and renewals that are due within the scheduling horizon, or
+    overdue by up to the catch-up period, and weren't enqueued yet.
+
+    Returns:
+        tuple: The number of expirations and of renewals enqueued.
+    """
+    horizon = _get_scheduling_horizon()
+    catch_up_start = localized_utcnow() - timedelta(days=settings.EXPIRATION_AND_RENEWAL_CATCH_UP_DAYS)
+    lock_period = timedelta(hours=settings.SUBSCRIPTION_PLAN_RENEWAL_LOCK_PERIOD_HOURS)
+
+    # Plans with a renewal only expire with the last plan of their renewal chain.
+    subscription_plans = SubscriptionPlan.objects.filter(
+        expiration_processed=False,
+        expiration_date__gte=catch_up_start,
+        expiration_date__lte=horizon,
+        renewal__isnull=True,
+    )
+    num_expirations = len([
+        subscription_plan for subscription_plan in subscription_plans.iterator()
+        if schedule_subscription_plan_expiration(subscription_plan)
+    ])
+
+    renewals = SubscriptionPlanRenewal.objects.filter(
+        processed=False,
+        exempt_from_batch_processing=False,
+        effective_date__gte=catch_up_start + lock_period,
+        effective_date__lte=horizon + lock_period,
+    )
+    num_renewals = len([renewal for renewal in renewals.iterator() if schedule_renewal_processing(renewal)])
+    return num_expirations, num_renewals
@@ -3,18 +3,49 @@ Celery tasks for the subscriptions app.
 """
 import functools
 import logging
+from datetime import datetime
 
-from celery import shared_task
+from celery import chord, shared_task
 from celery_utils.logged_task import LoggedTask
-from django.db import IntegrityError
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.db.utils import OperationalError
 
 from license_manager.apps.api.utils import (
     acquire_subscription_plan_lock,
     release_subscription_plan_lock,
 )
-from license_manager.apps.subscriptions.models import SubscriptionPlan
-from license_manager.apps.subscriptions.utils import batch_counts
+from license_manager.apps.subscriptions.api import (
+    process_subscription_plan_expiration,
+    renew_subscription,
+)
+from license_manager.apps.subscriptions.constants import (
+    TRACK_LICENSE_CHANGES_BATCH_SIZE,
+    UNASSIGNED,
+    LicenseActionSource,
+    LicenseActorType,
+    SegmentEvents,
+)
+from license_manager.apps.subscriptions.event_utils import (
+    LICENSE_TRACKING_VALUES,
+    flush_segment_events,
+    track_license_values_changes,
+    track_licenses_provisioned,
+)
+from license_manager.apps.subscriptions.exceptions import RenewalProcessingError
+from license_manager.apps.subscriptions.history_utils import (
+    write_deferred_history,
+)
+from license_manager.apps.subscriptions.models import (
+    License,
+    LicenseDeletionJob,
+    SubscriptionPlan,
+    SubscriptionPlanRenewal,
+)
+from license_manager.apps.subscriptions.utils import (
+    batch_counts,
+    localized_utcnow,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -25,6 +56,21 @@ PROVISION_LICENSES_BATCH_SIZE = 300
 # 200 minutes will get you about 2 million licenses, give or take.
 PROVISION_LICENSES_TIME_LIMIT_SECONDS = 60 * 200
 
+# Lock held for the whole duration of a sharded fast provisioning run, see provision_licenses_fast_task.
+PROVISIONING_SHARDS_LOCK_KWARGS = {'operation': 'provision_licenses_shards'}
+
+# Renewals stream their licenses in chunks, but the largest plans can still take a while to renew.
+RENEW_SUBSCRIPTION_TIME_LIMIT_SECONDS = 60 * 60
+
+# Expiration events are sent in batches, but the largest plans still have a lot of licenses to send them for.
+TRACK_LICENSE_EXPIRATIONS_TIME_LIMIT_SECONDS = 60 * 60
+
+# Expiring a plan terminates the licensed course enrollments of all of its assigned and activated licenses.
+EXPIRE_SUBSCRIPTION_PLAN_TIME_LIMIT_SECONDS = 60 * 60
+
+# License deletion jobs commit every batch, so a job that runs out of time can be enqueued again to finish.
+LICENSE_DELETION_JOB_TIME_LIMIT_SECONDS = 60 * 60
+
 
 class RequiredTaskUnreadyError(Exception):
     """
@@ -96,24 +142,313 @@ def provision_licenses_task(self, subscription_plan_uuid=None):  # pylint: disab
         subscription_plan_uuid (str): UUID of the SubscriptionPlan object to provision licenses for.
     """
     subscription_plan = SubscriptionPlan.objects.get(uuid=subscription_plan_uuid)
+    _defer_while_provisioning_shards_in_flight(self, subscription_plan)
+    license_count_gap = _get_license_count_gap(self, subscription_plan)
+    if not license_count_gap:
+        return
+
+    # There's work to do, creating licenses! It should be safe to not re-check the license count between batches
+    # because we lock this subscription plan anyway (via @subscription_plan_semaphore decorator).
+    for batch_count in batch_counts(license_count_gap, batch_size=PROVISION_LICENSES_BATCH_SIZE):
+        subscription_plan.increase_num_licenses(batch_count)
+
+
+def _defer_while_provisioning_shards_in_flight(task, subscription_plan):
+    """
+    Shards of a fast provisioning run outlive the task that enqueued them (and so its semaphore lock),
+    so provisioning tasks must also wait for any in-flight shards of the same plan to finish.
+    """
+    if not acquire_subscription_plan_lock(subscription_plan, **PROVISIONING_SHARDS_LOCK_KWARGS):
+        logger.info(
+            f'Deferring task {task.name} with id {task.request.id} '
+            f'since licenses for subscription plan {subscription_plan.uuid} are still being provisioned by shards.'
+        )
+        raise task.retry(exc=RequiredTaskUnreadyError())
+    release_subscription_plan_lock(subscription_plan, **PROVISIONING_SHARDS_LOCK_KWARGS)
+
+
+@shared_task(base=LoggedTaskWithRetry)
+def write_deferred_history_task(model_label, serialized_objects, history_date, history_user_id=None, update=False):
+    """
+    Writes the historical records of a batch of objects that were bulk created or updated while
+    ``DEFERRED_HISTORY_WRITES_ENABLED`` was set.
+    """
+    num_written = write_deferred_history(
+        model_label,
+        serialized_objects,
+        history_date,
+        history_user_id=history_user_id,
+        update=update,
+    )
+    logger.info(f'Wrote {num_written} deferred historical records of {model_label}.')
+
+
+@shared_task(
+    base=LoggedTaskWithRetry,
+    soft_time_limit=LICENSE_DELETION_JOB_TIME_LIMIT_SECONDS,
+    time_limit=LICENSE_DELETION_JOB_TIME_LIMIT_SECONDS,
+)
+def process_license_deletion_job_task(license_deletion_job_uuid):
+    """
+    Deletes the licenses of a ``LicenseDeletionJob``, unless the job was already completed.
+    """
+    license_deletion_job = LicenseDeletionJob.objects.select_related('subscription_plan').get(
+        uuid=license_deletion_job_uuid,
+    )
+    if license_deletion_job.completed_at:
+        logger.info(f'License deletion job {license_deletion_job_uuid} was already completed.')
+        return
+
+    license_deletion_job.process()
+    logger.info(
+        f'License deletion job {license_deletion_job_uuid} deleted {license_deletion_job.num_licenses_deleted} '
+        f'{license_deletion_job.license_status} licenses of plan {license_deletion_job.subscription_plan_id}.'
+    )
+
+
+@shared_task(
+    base=LoggedTaskWithRetry,
+    soft_time_limit=TRACK_LICENSE_EXPIRATIONS_TIME_LIMIT_SECONDS,
+    time_limit=TRACK_LICENSE_EXPIRATIONS_TIME_LIMIT_SECONDS,
+)
+def track_license_expirations_task(subscription_plan_uuid):
+    """
+    Sends a LICENSE_EXPIRED event for each license of an expired plan that wasn't renewed, except for unassigned
+    licenses that have no user. Licenses are loaded in batches ordered by uuid, as ``values()`` rows joined with
+    their plan and customer agreement.
+    """
+    expired_licenses = License.objects.filter(
+        subscription_plan_id=subscription_plan_uuid,
+        renewed_to__isnull=True,
+    ).exclude(
+        status=UNASSIGNED,
+        user_email__isnull=True,
+        lms_user_id__isnull=True,
+    ).order_by('uuid')
+
+    num_tracked = 0
+    last_uuid = None
+    while True:
+        batch_queryset = expired_licenses if last_uuid is None else expired_licenses.filter(uuid__gt=last_uuid)
+        license_values_rows = list(batch_queryset.values(*LICENSE_TRACKING_VALUES)[:TRACK_LICENSE_CHANGES_BATCH_SIZE])
+        if not license_values_rows:
+            break
+        track_license_values_changes(license_values_rows, SegmentEvents.LICENSE_EXPIRED, {}, False)
+        flush_segment_events()
+        num_tracked += len(license_values_rows)
+        last_uuid = license_values_rows[-1]['uuid']
+
+    logger.info(f'Tracked the expiration of {num_tracked} licenses of plan {subscription_plan_uuid}.')
+
+
+@shared_task(
+    base=LoggedTaskWithRetry,
+    soft_time_limit=EXPIRE_SUBSCRIPTION_PLAN_TIME_LIMIT_SECONDS,
+    time_limit=EXPIRE_SUBSCRIPTION_PLAN_TIME_LIMIT_SECONDS,
+)
+def expire_subscription_plan_task(subscription_plan_uuid, expiration_date):
+    """
+    Processes the expiration of a plan, enqueued to run when it expires, see the ``scheduling`` module.
+    Does nothing if the expiration was already processed, or if the expiration date of the plan changed since
+    the task was enqueued for ``expiration_date``, since another task was then enqueued for the new date.
+    """
+    subscription_plan = SubscriptionPlan.objects.select_related(
+        'customer_agreement',
+    ).filter(uuid=subscription_plan_uuid).first()
+    if not subscription_plan or subscription_plan.expiration_processed:
+        logger.info(f'Skipping the expiration of plan {subscription_plan_uuid}, it was already processed or deleted.')
+        return
+    if subscription_plan.expiration_date != datetime.fromisoformat(expiration_date):
+        logger.info(
+            f'Skipping the expiration of plan {subscription_plan_uuid} on {expiration_date}, '
+            f'it now expires on {subscription_plan.expiration_date}.'
+        )
+        return
+    if subscription_plan.expiration_date > localized_utcnow():
+        logger.info(f'Skipping the expiration of plan {subscription_plan_uuid}, it has not expired yet.')
+        return
+
+    process_subscription_plan_expiration(subscription_plan)
+
+
+def _get_license_count_gap(task, subscription_plan):
+    """
+    Returns how many licenses must be created for the plan to reach its ``desired_num_licenses``,
+    logging why nothing needs to be done otherwise.
+    """
     if not subscription_plan.desired_num_licenses:
         logger.info(
-            f'Skipping task {self.name} with id {self.request.id} '
-            f'and args: {self.request.args}, kwargs: {self.request.kwargs}, '
+            f'Skipping task {task.name} with id {task.request.id} '
+            f'and args: {task.request.args}, kwargs: {task.request.kwargs}, '
             f'because desired_num_licenses is not set on this subscription plan.'
         )
-        return
+        return 0
     license_count_gap = subscription_plan.desired_num_licenses - subscription_plan.num_licenses
     if license_count_gap <= 0:
         logger.info(
-            f'Skipping task {self.name} with id {self.request.id} '
-            f'and args: {self.request.args}, kwargs: {self.request.kwargs}, '
+            f'Skipping task {task.name} with id {task.request.id} '
+            f'and args: {task.request.args}, kwargs: {task.request.kwargs}, '
             f'because the actual license count ({subscription_plan.num_licenses}) '
             f'already meets or exceeds the desired license count ({subscription_plan.desired_num_licenses}).'
         )
+        return 0
+    return license_count_gap
+
+
+@shared_task(
+    base=LoggedTaskWithRetry,
+    bind=True,
+    default_retry_delay=TASK_RETRY_SECONDS,
+    soft_time_limit=PROVISION_LICENSES_TIME_LIMIT_SECONDS,
+    time_limit=PROVISION_LICENSES_TIME_LIMIT_SECONDS,
+)
+@subscription_plan_semaphore()
+def provision_licenses_fast_task(self, subscription_plan_uuid=None):
+    """
+    Fast provisioning mode of ``provision_licenses_task``. Licenses are written with large multi-row
+    inserts (history included), and a single aggregate event is tracked for the plan.
+
+    When ``FAST_LICENSE_PROVISIONING_SHARD_SIZE`` is set and the plan needs more licenses than that, the work
+    is split into shards that are provisioned in parallel by ``provision_licenses_shard_task``. A plan-level lock
+    is held until the last shard completes, so that no other provisioning of the plan can run concurrently.
+
+    Args:
+        subscription_plan_uuid (str): UUID of the SubscriptionPlan object to provision licenses for.
+    """
+    subscription_plan = SubscriptionPlan.objects.get(uuid=subscription_plan_uuid)
+    if not acquire_subscription_plan_lock(
+        subscription_plan,
+        django_cache_timeout=PROVISION_LICENSES_TIME_LIMIT_SECONDS,
+        **PROVISIONING_SHARDS_LOCK_KWARGS,
+    ):
+        raise self.retry(exc=RequiredTaskUnreadyError())
+
+    shards_enqueued = False
+    try:
+        license_count_gap = _get_license_count_gap(self, subscription_plan)
+        if not license_count_gap:
+            return
+
+        shard_size = settings.FAST_LICENSE_PROVISIONING_SHARD_SIZE
+        if shard_size and license_count_gap > shard_size:
+            shard_tasks = [
+                provision_licenses_shard_task.si(str(subscription_plan.uuid), shard_count)
+                for shard_count in batch_counts(license_count_gap, batch_size=shard_size)
+            ]
+            logger.info(
+                f'Provisioning {license_count_gap} licenses for subscription plan {subscription_plan.uuid} '
+                f'across {len(shard_tasks)} shards.'
+            )
+            shards_enqueued = True
+            chord(shard_tasks)(
+                finish_sharded_license_provisioning_task.si(
+                    str(subscription_plan.uuid), license_count_gap,
+                ).on_error(fail_sharded_license_provisioning_task.si(str(subscription_plan.uuid)))
+            )
+            return
+
+        subscription_plan.bulk_provision_licenses(license_count_gap)
+    finally:
+        if not shards_enqueued:
+            release_subscription_plan_lock(subscription_plan, **PROVISIONING_SHARDS_LOCK_KWARGS)
+
+
+@shared_task(
+    base=LoggedTaskWithRetry,
+    soft_time_limit=PROVISION_LICENSES_TIME_LIMIT_SECONDS,
+    time_limit=PROVISION_LICENSES_TIME_LIMIT_SECONDS,
+)
+def provision_licenses_shard_task(subscription_plan_uuid, num_licenses):
+    """
+    Creates one shard of ``num_licenses`` unassigned licenses for a plan, see ``provision_licenses_fast_task``.
+    No events are tracked per shard.
+
+    The batches of the shard are created in a single transaction, so that a shard that fails part way through
+    creates no licenses at all, and retrying it never provisions more licenses than the shard was meant to.
+    """
+    subscription_plan = SubscriptionPlan.objects.get(uuid=subscription_plan_uuid)
+    with transaction.atomic():
+        for batch_count in batch_counts(num_licenses, batch_size=settings.FAST_LICENSE_PROVISIONING_BATCH_SIZE):
+            License.bulk_provision(subscription_plan, batch_count, batch_size=batch_count)
+
+
+@shared_task(base=LoggedTaskWithRetry)
+def finish_sharded_license_provisioning_task(subscription_plan_uuid, num_licenses):
+    """
+    Runs once every shard of a fast provisioning run has completed: tracks the aggregate
+    provisioning event for the plan and releases the plan-level provisioning lock.
+    """
+    subscription_plan = SubscriptionPlan.objects.get(uuid=subscription_plan_uuid)
+    track_licenses_provisioned(subscription_plan, num_licenses)
+    release_subscription_plan_lock(subscription_plan, **PROVISIONING_SHARDS_LOCK_KWARGS)
+
+
+@shared_task(base=LoggedTaskWithRetry)
+def fail_sharded_license_provisioning_task(subscription_plan_uuid):
+    """
+    Runs instead of ``finish_sharded_license_provisioning_task`` when a shard of a fast provisioning run
+    has failed for good: logs the failed run and releases the plan-level provisioning lock, so that
+    provisioning of the plan can be retried without waiting for the lock to time out.
+    """
+    subscription_plan = SubscriptionPlan.objects.get(uuid=subscription_plan_uuid)
+    logger.error(
+        f'Sharded license provisioning failed for subscription plan {subscription_plan.uuid}, '
+        f'{subscription_plan.num_licenses} of {subscription_plan.desired_num_licenses} licenses are provisioned.'
+    )
+    release_subscription_plan_lock(subscription_plan, **PROVISIONING_SHARDS_LOCK_KWARGS)
+
+
+@shared_task(
+    base=LoggedTaskWithRetry,
+    bind=True,
+    default_retry_delay=TASK_RETRY_SECONDS,
+    soft_time_limit=RENEW_SUBSCRIPTION_TIME_LIMIT_SECONDS,
+    time_limit=RENEW_SUBSCRIPTION_TIME_LIMIT_SECONDS,
+)
+@subscription_plan_semaphore()
+def renew_subscription_task(
+    self, renewal_id, is_auto_renewed=True, correlation_id=None, subscription_plan_uuid=None, effective_date=None,
+):  # pylint: disable=unused-argument
+    """
+    Processes a single SubscriptionPlanRenewal, so that independent renewals can be fanned out across workers.
+    The renewal is skipped if it has already been processed, which makes retries of this task safe.
+
+    Args:
+        renewal_id (int): Id of the SubscriptionPlanRenewal to process.
+        is_auto_renewed (bool): Whether the renewal is processed automatically, rather than by an admin.
+        correlation_id (str): Id shared by all LicenseAction rows written for a single batch of renewals.
+        subscription_plan_uuid (str): UUID of the prior SubscriptionPlan of the renewal, used to lock the plan.
+        effective_date (str): The effective date the renewal was scheduled for, see the ``scheduling`` module.
+            The renewal is skipped if its effective date changed since, or it was exempted from batch processing.
+    """
+    renewal = SubscriptionPlanRenewal.objects.select_related(
+        'prior_subscription_plan',
+        'prior_subscription_plan__customer_agreement',
+        'renewed_subscription_plan',
+    ).get(id=renewal_id)
+    if renewal.processed:
+        logger.info(
+            f'Skipping task {self.name} with id {self.request.id} '
+            f'because renewal {renewal_id} has already been processed.'
+        )
+        return
+    if effective_date and (
+        renewal.effective_date != datetime.fromisoformat(effective_date) or renewal.exempt_from_batch_processing
+    ):
+        logger.info(
+            f'Skipping task {self.name} with id {self.request.id} because renewal {renewal_id} '
+            f'is no longer scheduled to be processed for {effective_date}.'
+        )
         return
 
-    # There's work to do, creating licenses! It should be safe to not re-check the license count between batches
-    # because we lock this subscription plan anyway (via @subscription_plan_semaphore decorator).
-    for batch_count in batch_counts(license_count_gap, batch_size=PROVISION_LICENSES_BATCH_SIZE):
-        subscription_plan.increase_num_licenses(batch_count)
+    try:
+        renew_subscription(
+            renewal,
+            is_auto_renewed=is_auto_renewed,
+            actor_type=LicenseActorType.SYSTEM,
+            actor_lms_user_id=None,
+            source=LicenseActionSource.RENEWAL_JOB,
+            correlation_id=correlation_id,
+        )
+    except RenewalProcessingError:
+        logger.error(f'Could not automatically process renewal with id: {renewal_id}', exc_info=True)
@@ -8,18 +8,25 @@ from django.test import RequestFactory, TestCase
 
 from license_manager.apps.subscriptions.admin import (
     CustomerAgreementAdmin,
+    LicenseAdmin,
     SubscriptionPlanAdmin,
     SubscriptionPlanRenewalAdmin,
 )
 from license_manager.apps.subscriptions.constants import (
     LicenseActionSource,
     LicenseActorType,
+    LicenseDeletionJobStatus,
 )
 from license_manager.apps.subscriptions.models import (
     CustomerAgreement,
+    License,
+    LicenseDeletionJob,
     SubscriptionPlan,
     SubscriptionPlanRenewal,
 )
+from license_manager.apps.subscriptions.tasks import (
+    process_license_deletion_job_task,
+)
 from license_manager.apps.subscriptions.tests.factories import (
     CustomerAgreementFactory,
     LicenseFactory,
@@ -147,10 +154,14 @@ def test_select_subscription_for_auto_applied_licenses(mock_toggle_auto_apply_li
 
 
 @pytest.mark.django_db
+@mock.patch(
+    'license_manager.apps.subscriptions.tasks.process_license_deletion_job_task.delay',
+    side_effect=process_license_deletion_job_task,
+)
 @mock.patch('license_manager.apps.subscriptions.admin.messages.add_message')
-def test_delete_all_revoked_licenses(mock_add_message):
+def test_delete_all_revoked_licenses(mock_add_message, _, django_capture_on_commit_callbacks):
     """
-    Verify that creating a SubscriptionPlan creates its associated Licenses after it is created.
+    Verify that the admin action deletes all revoked licenses of the selected plans with license deletion jobs.
     """
     subscription_admin = SubscriptionPlanAdmin(SubscriptionPlan, AdminSite())
     request = RequestFactory()
@@ -170,18 +181,60 @@ def test_delete_all_revoked_licenses(mock_add_message):
     assert subscription_plan.revoked_licenses.count() == 10
 
     # Now use the admin action to delete all revoked licenses for the plan
-    subscription_admin.delete_all_revoked_licenses(
-        request,
-        SubscriptionPlan.objects.filter(uuid=subscription_plan.uuid),
-    )
+    with django_capture_on_commit_callbacks(execute=True):
+        subscription_admin.delete_all_revoked_licenses(
+            request,
+            SubscriptionPlan.objects.filter(uuid=subscription_plan.uuid),
+        )
     subscription_plan.refresh_from_db()
     assert subscription_plan.revoked_licenses.count() == 0
 
+    license_deletion_job = LicenseDeletionJob.objects.get(subscription_plan=subscription_plan)
+    assert license_deletion_job.license_status == REVOKED
+    assert license_deletion_job.status == LicenseDeletionJobStatus.COMPLETED
+    assert license_deletion_job.num_licenses_deleted == 10
+    assert license_deletion_job.requested_by == request.user
+
     mock_add_message.assert_called_once_with(
-        request, messages.SUCCESS, f"Successfully deleted revoked licenses for plans ['{subscription_plan.title}'].",
+        request,
+        messages.SUCCESS,
+        f"Started deleting revoked licenses for plans ['{subscription_plan.title}']. "
+        "Their progress is shown by License Deletion Jobs.",
     )
 
 
+@pytest.mark.django_db
+@mock.patch('license_manager.apps.subscriptions.admin.render')
+@mock.patch('license_manager.apps.subscriptions.admin.messages.add_message')
+def test_delete_bulk_licenses(mock_add_message, mock_render):
+    """
+    Verify that the bulk license deletion action deletes the licenses of the selected query once confirmed.
+    """
+    license_admin = LicenseAdmin(License, AdminSite())
+    subscription_plan = SubscriptionPlanFactory.create()
+    licenses_to_delete = LicenseFactory.create_batch(3, subscription_plan=subscription_plan, status=REVOKED)
+    license_to_keep = LicenseFactory.create(subscription_plan=subscription_plan)
+
+    request = RequestFactory().post('/admin/subscriptions/license/')
+    request.user = UserFactory()
+    license_admin.delete_bulk_licenses(
+        request,
+        License.objects.filter(subscription_plan=subscription_plan, status=REVOKED),
+    )
+    context = mock_render.call_args[0][2]
+    assert context['record_count'] == 3
+
+    request = RequestFactory().post(
+        '/admin/subscriptions/license/',
+        {'confirm_deletion': 'true', 'cache_key': context['form'].initial['cache_key']},
+    )
+    request.user = UserFactory()
+    license_admin.delete_bulk_licenses(request, License.objects.filter(uuid=licenses_to_delete[0].uuid))
+
+    assert list(License.objects.filter(subscription_plan=subscription_plan)) == [license_to_keep]
+    mock_add_message.assert_called_once_with(request, messages.SUCCESS, 'Successfully deleted 3 License records')
+
+
 @pytest.mark.django_db
 @mock.patch('license_manager.apps.subscriptions.admin.renew_subscription')
 def test_process_renewal_action_passes_audit_context(mock_renew_subscription):
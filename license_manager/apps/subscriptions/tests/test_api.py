@@ -9,6 +9,7 @@ from django.db.models.query import QuerySet
 from django.test import TestCase
 from requests.exceptions import HTTPError
 
+from license_manager.apps.api.tasks import track_license_changes_task
 from license_manager.apps.subscriptions import api, constants, exceptions, utils
 from license_manager.apps.subscriptions.models import (
     CustomerAgreement,
@@ -20,10 +21,12 @@ from license_manager.apps.subscriptions.tests.factories import (
     LicenseFactory,
     SubscriptionPlanFactory,
     SubscriptionPlanRenewalFactory,
+    UserFactory,
 )
 
 
 NOW = utils.localized_utcnow()
+TRACK_LICENSE_CHANGES_TASK_DELAY = 'license_manager.apps.api.tasks.track_license_changes_task.delay'
 
 
 @ddt.ddt
@@ -239,7 +242,9 @@ class RenewalProcessingTests(TestCase):
             number_of_licenses=1,
             license_types_to_copy=constants.LicenseTypesToRenew.ASSIGNED_AND_ACTIVATED
         )
-        api.renew_subscription(renewal)
+        with mock.patch(TRACK_LICENSE_CHANGES_TASK_DELAY, new=track_license_changes_task):
+            with self.captureOnCommitCallbacks(execute=True):
+                api.renew_subscription(renewal)
         assert mock_track_event.call_count == 2
         assert mock_track_event.call_args_list[0].args[1] == constants.SegmentEvents.LICENSE_CREATED
         assert mock_track_event.call_args_list[1].args[1] == constants.SegmentEvents.LICENSE_RENEWED
@@ -259,12 +264,117 @@ class RenewalProcessingTests(TestCase):
             number_of_licenses=1,
             license_types_to_copy=constants.LicenseTypesToRenew.ASSIGNED_AND_ACTIVATED
         )
-        api.renew_subscription(renewal, is_auto_renewed=True)
+        with mock.patch(TRACK_LICENSE_CHANGES_TASK_DELAY, new=track_license_changes_task):
+            with self.captureOnCommitCallbacks(execute=True):
+                api.renew_subscription(renewal, is_auto_renewed=True)
         assert mock_track_event.call_count == 2
         assert mock_track_event.call_args_list[0].args[1] == constants.SegmentEvents.LICENSE_CREATED
         assert mock_track_event.call_args_list[1].args[1] == constants.SegmentEvents.LICENSE_RENEWED
         self.assertTrue(mock_track_event.call_args_list[1].args[2]['is_auto_renewed'])
 
+    @mock.patch('license_manager.apps.subscriptions.event_utils.track_event')
+    def test_renewal_segment_events_wait_for_commit(self, mock_track_event):
+        prior_plan = SubscriptionPlanFactory()
+        LicenseFactory.create(
+            subscription_plan=prior_plan,
+            status=constants.ACTIVATED,
+            user_email='activated_user@example.com'
+        )
+        renewal = SubscriptionPlanRenewalFactory(
+            prior_subscription_plan=prior_plan,
+            number_of_licenses=1,
+            license_types_to_copy=constants.LicenseTypesToRenew.ASSIGNED_AND_ACTIVATED
+        )
+
+        with mock.patch(TRACK_LICENSE_CHANGES_TASK_DELAY) as mock_task_delay:
+            with self.captureOnCommitCallbacks() as callbacks:
+                api.renew_subscription(renewal)
+
+            # Only the LICENSE_CREATED event is tracked inline, renewal events wait on the commit.
+            assert mock_track_event.call_count == 1
+            assert mock_track_event.call_args_list[0].args[1] == constants.SegmentEvents.LICENSE_CREATED
+            mock_task_delay.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+
+        renewal.refresh_from_db()
+        mock_task_delay.assert_called_once_with(
+            [str(future_license.uuid) for future_license in renewal.renewed_subscription_plan.licenses.all()],
+            constants.SegmentEvents.LICENSE_RENEWED,
+            {'is_auto_renewed': False},
+        )
+
+    def test_renewal_processed_with_virtual_unassigned_licenses(self):
+        prior_plan = SubscriptionPlanFactory(uses_virtual_unassigned_licenses=True, num_virtual_unassigned_licenses=7)
+        for i in range(3):
+            LicenseFactory.create(
+                subscription_plan=prior_plan,
+                status=constants.ACTIVATED,
+                user_email='activated_user_{}@example.com'.format(i)
+            )
+        renewal = SubscriptionPlanRenewalFactory(
+            prior_subscription_plan=prior_plan,
+            number_of_licenses=10,
+            license_types_to_copy=constants.LicenseTypesToRenew.ASSIGNED_AND_ACTIVATED
+        )
+
+        with freezegun.freeze_time(NOW):
+            api.renew_subscription(renewal)
+
+        renewal.refresh_from_db()
+        future_plan = renewal.renewed_subscription_plan
+        # Only the renewed licenses are materialized, the rest of the renewed plan stays virtual.
+        self.assertTrue(future_plan.uses_virtual_unassigned_licenses)
+        self.assertEqual(future_plan.num_virtual_unassigned_licenses, 7)
+        self.assertEqual(future_plan.licenses.count(), 3)
+        self.assertEqual(future_plan.num_licenses, 10)
+        self._assert_all_licenses_renewed(future_plan)
+
+    @ddt.data(1, 3, 10, 50)
+    def test_renewal_processed_in_chunks(self, chunk_size):
+        prior_plan = SubscriptionPlanFactory()
+        for i in range(7):
+            LicenseFactory.create(
+                subscription_plan=prior_plan,
+                status=constants.ACTIVATED,
+                user_email='activated_user_{}@example.com'.format(i)
+            )
+        for i in range(4):
+            LicenseFactory.create(
+                subscription_plan=prior_plan,
+                status=constants.ASSIGNED,
+                activation_key=uuid.uuid4(),
+                user_email='assigned_user_{}@example.com'.format(i)
+            )
+        LicenseFactory.create_batch(3, subscription_plan=prior_plan, status=constants.UNASSIGNED)
+        future_plan = SubscriptionPlanFactory()
+        LicenseFactory.create_batch(5, subscription_plan=future_plan, status=constants.UNASSIGNED)
+        renewal = SubscriptionPlanRenewalFactory(
+            prior_subscription_plan=prior_plan,
+            renewed_subscription_plan=future_plan,
+            number_of_licenses=15,
+            license_types_to_copy=constants.LicenseTypesToRenew.ASSIGNED_AND_ACTIVATED
+        )
+
+        with freezegun.freeze_time(NOW):
+            api.renew_subscription(renewal, chunk_size=chunk_size)
+
+        future_plan.refresh_from_db()
+        self.assertEqual(future_plan.num_licenses, 15)
+        self.assertEqual(future_plan.licenses.filter(status=constants.ACTIVATED).count(), 7)
+        self.assertEqual(future_plan.licenses.filter(status=constants.ASSIGNED).count(), 4)
+        self.assertEqual(future_plan.unassigned_licenses.count(), 4)
+        self.assertEqual(prior_plan.licenses.filter(renewed_to__isnull=False).count(), 11)
+        self.assertEqual(
+            LicenseAction.objects.filter(
+                subscription_plan=future_plan,
+                action_type=constants.LicenseActionType.RENEWED,
+            ).count(),
+            11,
+        )
+        self._assert_all_licenses_renewed(future_plan)
+
     def test_renewal_creates_license_actions_with_provided_context(self):
         prior_plan = SubscriptionPlanFactory()
         activated_license = LicenseFactory.create(
@@ -530,6 +640,37 @@ class SubscriptionFreezeTests(TestCase):
 
         assert subscription_plan.last_freeze_timestamp == NOW
 
+    @mock.patch('license_manager.apps.subscriptions.tasks.process_license_deletion_job_task.delay')
+    def test_delete_unassigned_licenses_post_freeze_in_background(self, mock_delay):
+        subscription_plan = SubscriptionPlanFactory(can_freeze_unused_licenses=True)
+        LicenseFactory.create_batch(3, subscription_plan=subscription_plan, status=constants.UNASSIGNED)
+        user = UserFactory()
+
+        with self.captureOnCommitCallbacks(execute=True), freezegun.freeze_time(NOW):
+            api.delete_unused_licenses_post_freeze(subscription_plan, in_background=True, requested_by=user)
+
+        license_deletion_job = subscription_plan.license_deletion_jobs.get()
+        assert license_deletion_job.license_status == constants.UNASSIGNED
+        assert license_deletion_job.requested_by == user
+        mock_delay.assert_called_once_with(str(license_deletion_job.uuid))
+        # The licenses are left to the job, but the plan is frozen right away
+        assert subscription_plan.unassigned_licenses.count() == 3
+        assert subscription_plan.last_freeze_timestamp == NOW
+
+    def test_delete_virtual_unassigned_licenses_post_freeze(self):
+        subscription_plan = SubscriptionPlanFactory(
+            can_freeze_unused_licenses=True,
+            uses_virtual_unassigned_licenses=True,
+            num_virtual_unassigned_licenses=10,
+        )
+        LicenseFactory.create_batch(2, subscription_plan=subscription_plan, status=constants.ASSIGNED)
+
+        api.delete_unused_licenses_post_freeze(subscription_plan)
+
+        subscription_plan.refresh_from_db()
+        assert subscription_plan.num_virtual_unassigned_licenses == 0
+        assert subscription_plan.num_licenses == 2
+
 
 class CustomerAgreementSyncTests(TestCase):
     """
@@ -0,0 +1,175 @@
+"""
+Tests for the archive module.
+"""
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+
+from license_manager.apps.api.models import (
+    LicenseAssignmentJob,
+    LicenseAssignmentJobEmail,
+)
+from license_manager.apps.subscriptions.archive import (
+    archive_licenses,
+    get_archivable_subscription_plans,
+    restore_archived_licenses,
+)
+from license_manager.apps.subscriptions.constants import ACTIVATED, REVOKED
+from license_manager.apps.subscriptions.models import (
+    ArchivedHistoricalLicense,
+    ArchivedLicense,
+    LearnerEntitlement,
+    License,
+    LicenseEvent,
+    SubscriptionLicenseSource,
+)
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionLicenseSourceFactory,
+    SubscriptionPlanFactory,
+)
+from license_manager.apps.subscriptions.utils import localized_utcnow
+
+
+class ArchiveTests(TestCase):
+    """
+    Tests for archiving and restoring licenses.
+    """
+
+    def setUp(self):
+        super().setUp()
+        now = localized_utcnow()
+        self.subscription_plan = SubscriptionPlanFactory(
+            start_date=now - timedelta(days=5 * 365),
+            expiration_date=now - timedelta(days=4 * 365),
+        )
+        self.license = LicenseFactory(
+            subscription_plan=self.subscription_plan,
+            status=ACTIVATED,
+            user_email='learner@example.com',
+            lms_user_id=1,
+            activation_date=now - timedelta(days=5 * 365),
+        )
+        self.license.status = REVOKED
+        self.license.revoked_date = now - timedelta(days=4 * 365)
+        self.license.save()
+        self.source = SubscriptionLicenseSourceFactory(license=self.license)
+        self.event = LicenseEvent.objects.create(license=self.license, event_name='license-activated')
+        self.other_license = LicenseFactory(subscription_plan=self.subscription_plan)
+
+    def _get_license_values(self, license_obj):
+        return {field.attname: getattr(license_obj, field.attname) for field in License._meta.concrete_fields}
+
+    def test_archive_and_restore(self):
+        license_values = self._get_license_values(self.license)
+        history_values = list(self.license.history.order_by('history_id').values())
+        source_values = SubscriptionLicenseSource.objects.filter(pk=self.source.pk).values().get()
+        source_history_values = list(self.source.history.order_by('history_id').values())
+
+        assert archive_licenses(License.objects.filter(subscription_plan=self.subscription_plan), batch_size=1) == 2
+
+        assert not License.objects.filter(subscription_plan=self.subscription_plan).exists()
+        assert not License.history.filter(uuid=self.license.uuid).exists()
+        assert not SubscriptionLicenseSource.objects.exists()
+        assert not LicenseEvent.objects.exists()
+        archived_license = ArchivedLicense.objects.get(uuid=self.license.uuid)
+        assert archived_license.user_email == 'learner@example.com'
+        assert archived_license.status == REVOKED
+        assert [event['event_name'] for event in archived_license.events] == ['license-activated']
+        assert ArchivedHistoricalLicense.objects.filter(license_uuid=self.license.uuid).count() == len(history_values)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            assert restore_archived_licenses(ArchivedLicense.objects.all()) == 2
+
+        assert not ArchivedLicense.objects.exists()
+        assert not ArchivedHistoricalLicense.objects.exists()
+        restored_license = License.objects.get(uuid=self.license.uuid)
+        assert self._get_license_values(restored_license) == license_values
+        assert list(restored_license.history.order_by('history_id').values()) == history_values
+        assert SubscriptionLicenseSource.objects.filter(pk=self.source.pk).values().get() == source_values
+        assert list(self.source.history.order_by('history_id').values()) == source_history_values
+        assert list(LicenseEvent.objects.values_list('id', 'license_id', 'event_name')) == [
+            (self.event.id, self.license.uuid, 'license-activated'),
+        ]
+
+    def test_archive_deletes_learner_entitlements(self):
+        active_license = LicenseFactory(subscription_plan=self.subscription_plan, status=ACTIVATED)
+        LearnerEntitlement.sync_licenses([active_license.uuid])
+
+        archive_licenses(License.objects.filter(uuid=active_license.uuid))
+        assert not LearnerEntitlement.objects.filter(license_id=active_license.uuid).exists()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            restore_archived_licenses(ArchivedLicense.objects.all())
+        assert LearnerEntitlement.objects.filter(license_id=active_license.uuid).exists()
+
+    def test_archive_and_restore_assignment_job_emails(self):
+        license_assignment_job = LicenseAssignmentJob.objects.create(subscription_plan=self.subscription_plan)
+        job_email = LicenseAssignmentJobEmail.objects.create(
+            license_assignment_job=license_assignment_job,
+            user_email=self.license.user_email,
+            license=self.license,
+        )
+
+        archive_licenses(License.objects.filter(uuid=self.license.uuid))
+        job_email.refresh_from_db()
+        assert job_email.license is None
+        assert ArchivedLicense.objects.get(uuid=self.license.uuid).assignment_job_email_ids == [job_email.id]
+
+        restore_archived_licenses(ArchivedLicense.objects.all())
+        job_email.refresh_from_db()
+        assert job_email.license_id == self.license.uuid
+
+    def test_archive_and_restore_renewal_links(self):
+        renewed_license = LicenseFactory(status=ACTIVATED)
+        self.license.renewed_to = renewed_license
+        self.license.save()
+
+        # The license renewed to is archived first, e.g. because its plan is archived first.
+        archive_licenses(License.objects.filter(uuid=renewed_license.uuid))
+        self.license.refresh_from_db()
+        assert self.license.renewed_to is None
+        assert ArchivedLicense.objects.get(uuid=renewed_license.uuid).renewed_from_uuid == self.license.uuid
+
+        archive_licenses(License.objects.filter(uuid=self.license.uuid))
+        assert ArchivedLicense.objects.get(uuid=self.license.uuid).renewed_to_uuid is None
+
+        restore_archived_licenses(ArchivedLicense.objects.filter(uuid=self.license.uuid))
+        restore_archived_licenses(ArchivedLicense.objects.filter(uuid=renewed_license.uuid))
+        self.license.refresh_from_db()
+        assert self.license.renewed_to_id == renewed_license.uuid
+
+    def test_restore_renewal_links_in_same_batch(self):
+        renewed_license = LicenseFactory(status=ACTIVATED)
+        self.license.renewed_to = renewed_license
+        self.license.save()
+
+        archive_licenses(License.objects.filter(uuid__in=[self.license.uuid, renewed_license.uuid]))
+        restore_archived_licenses(ArchivedLicense.objects.all())
+
+        self.license.refresh_from_db()
+        assert self.license.renewed_to_id == renewed_license.uuid
+
+    @override_settings(LICENSE_ARCHIVE_AFTER_DAYS=3 * 365)
+    def test_get_archivable_subscription_plans(self):
+        now = localized_utcnow()
+        older_plan = SubscriptionPlanFactory(expiration_date=now - timedelta(days=5 * 365))
+        LicenseFactory(subscription_plan=older_plan)
+        # Plans that expired recently and plans without licenses aren't archived.
+        LicenseFactory(subscription_plan=SubscriptionPlanFactory(expiration_date=now - timedelta(days=365)))
+        SubscriptionPlanFactory(expiration_date=now - timedelta(days=5 * 365))
+
+        assert list(get_archivable_subscription_plans()) == [older_plan, self.subscription_plan]
+
+    def test_by_user_email_or_lms_user_id(self):
+        archive_licenses(License.objects.filter(uuid=self.license.uuid))
+
+        assert list(ArchivedLicense.by_user_email_or_lms_user_id('learner@example.com')) == [
+            ArchivedLicense.objects.get(uuid=self.license.uuid),
+        ]
+        assert ArchivedLicense.by_user_email_or_lms_user_id('other@example.com', lms_user_id=1).count() == 1
+        assert ArchivedLicense.for_user_and_customer(
+            'learner@example.com',
+            None,
+            self.subscription_plan.customer_agreement.enterprise_customer_uuid,
+        ).count() == 1
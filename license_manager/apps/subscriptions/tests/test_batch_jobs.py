@@ -0,0 +1,193 @@
+"""
+Tests for the batch_jobs module.
+"""
+from unittest import mock
+from uuid import UUID
+
+from django.test import TestCase, override_settings
+
+from license_manager.apps.subscriptions.batch_jobs import (
+    BatchJob,
+    _run_in_process,
+)
+from license_manager.apps.subscriptions.constants import ACTIVATED, UNASSIGNED
+from license_manager.apps.subscriptions.event_utils import track_event
+from license_manager.apps.subscriptions.exceptions import BatchJobError
+from license_manager.apps.subscriptions.models import (
+    BatchJobCheckpoint,
+    License,
+)
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+
+
+def _run_inline(targets):
+    """
+    Stands in for ``_run_in_processes``, running every target in this process.
+    """
+    for target in targets:
+        target()
+    return [0] * len(targets)
+
+
+def _run_inline_in_worker_entry_point(targets):
+    """
+    Stands in for ``_run_in_processes``, running every target through the entry point of worker processes in this
+    process.
+    """
+    exit_codes = []
+    for target in targets:
+        try:
+            _run_in_process(target)
+        except SystemExit as exc:
+            exit_codes.append(exc.code)
+    return exit_codes
+
+
+class BatchJobTests(TestCase):
+    """
+    Tests for ``BatchJob``.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+        self.licenses = sorted(
+            LicenseFactory.create_batch(5, subscription_plan=self.subscription_plan, status=UNASSIGNED),
+            key=lambda license_obj: license_obj.pk,
+        )
+        LicenseFactory(subscription_plan=self.subscription_plan, status=ACTIVATED)
+        self.queryset = License.objects.filter(status=UNASSIGNED)
+        self.batches = []
+
+    def _process_batch(self, batch):
+        self.batches.append([license_obj.uuid for license_obj in batch])
+        return {'num_seen': len(batch)}
+
+    def _get_job(self, process_batch=None, queryset=None):
+        return BatchJob(
+            'test_job',
+            self.queryset if queryset is None else queryset,
+            process_batch or self._process_batch,
+            scope='test scope',
+            batch_size=2,
+        )
+
+    def test_run(self):
+        totals = self._get_job().run()
+
+        assert self.batches == [
+            [license_obj.uuid for license_obj in self.licenses[:2]],
+            [license_obj.uuid for license_obj in self.licenses[2:4]],
+            [self.licenses[4].uuid],
+        ]
+        assert totals == {'num_processed': 5, 'num_batches': 3, 'num_seen': 5}
+        checkpoint = BatchJobCheckpoint.objects.get(job_name='test_job', scope='test scope')
+        assert checkpoint.last_pk == str(self.licenses[4].pk)
+        assert checkpoint.completed_at is not None
+
+    def test_run_shard_queries(self):
+        checkpoint = BatchJobCheckpoint.objects.create(job_name='test_job', num_shards=1, shard_index=0)
+        # A query for each batch, an update of the checkpoint after each batch, and one to complete it.
+        with self.assertNumQueries(7):
+            self._get_job(process_batch=lambda batch: None).run_shard(checkpoint, None, None)
+
+    def test_run_values_queryset(self):
+        self._get_job(
+            process_batch=self.batches.append,
+            queryset=self.queryset.values('uuid', 'user_email'),
+        ).run()
+        assert [len(batch) for batch in self.batches] == [2, 2, 1]
+        checkpoint = BatchJobCheckpoint.objects.get(job_name='test_job')
+        assert checkpoint.last_pk == str(self.licenses[4].pk)
+
+    def test_resume(self):
+        def process_batch(batch):
+            if len(self.batches) == 1:
+                raise Exception('fail')
+            return self._process_batch(batch)
+
+        with self.assertRaises(Exception):
+            self._get_job(process_batch=process_batch).run()
+
+        totals = self._get_job().run(resume=True)
+
+        assert self.batches == [
+            [license_obj.uuid for license_obj in self.licenses[:2]],
+            [license_obj.uuid for license_obj in self.licenses[2:4]],
+            [self.licenses[4].uuid],
+        ]
+        assert totals == {'num_processed': 5, 'num_batches': 3, 'num_seen': 5}
+
+    def test_resume_skips_completed_shards(self):
+        self._get_job().run()
+        self.batches = []
+
+        totals = self._get_job().run(resume=True)
+
+        assert not self.batches
+        assert totals['num_processed'] == 5
+
+    def test_run_without_resume_starts_over(self):
+        self._get_job().run()
+        self.batches = []
+
+        self._get_job().run()
+
+        assert len(self.batches) == 3
+
+    def test_get_shard_bounds(self):
+        assert self._get_job().get_shard_bounds(1) == [(None, None)]
+        assert self._get_job().get_shard_bounds(2) == [
+            (None, UUID(int=1 << 127)),
+            (UUID(int=1 << 127), None),
+        ]
+
+    @mock.patch('license_manager.apps.subscriptions.batch_jobs._run_in_processes', side_effect=_run_inline)
+    def test_run_with_workers(self, mock_run_in_processes):
+        totals = self._get_job().run(workers=3)
+
+        assert len(mock_run_in_processes.call_args.args[0]) == 3
+        assert sorted(uuid for batch in self.batches for uuid in batch) == [
+            license_obj.uuid for license_obj in self.licenses
+        ]
+        assert totals['num_processed'] == 5
+        assert BatchJobCheckpoint.objects.filter(
+            job_name='test_job', num_shards=3, completed_at__isnull=False,
+        ).count() == 3
+
+    @override_settings(SEGMENT_KEY='test-key')
+    @mock.patch('license_manager.apps.subscriptions.batch_jobs.connections')
+    @mock.patch('license_manager.apps.subscriptions.event_utils.analytics')
+    @mock.patch(
+        'license_manager.apps.subscriptions.batch_jobs._run_in_processes',
+        side_effect=_run_inline_in_worker_entry_point,
+    )
+    def test_run_with_workers_sends_segment_events(self, _, mock_analytics, __):
+        inherited_client = mock.Mock()
+        mock_analytics.default_client = inherited_client
+
+        def process_batch(batch):
+            for license_obj in batch:
+                track_event(1, 'test-event', {'license_uuid': str(license_obj.uuid)})
+
+        self._get_job(process_batch=process_batch).run(workers=2)
+
+        assert mock_analytics.default_client is not inherited_client
+        assert mock_analytics.track.call_count == 5
+        # The events of every batch are flushed before the next batch, and before the worker exits.
+        tracked_since_flush = 0
+        for method_call in mock_analytics.method_calls:
+            if method_call == mock.call.flush():
+                tracked_since_flush = 0
+            else:
+                tracked_since_flush += 1
+                assert tracked_since_flush <= 2
+        assert mock_analytics.method_calls[-1] == mock.call.flush()
+
+    @mock.patch('license_manager.apps.subscriptions.batch_jobs._run_in_processes', return_value=[0, 1])
+    def test_run_with_failed_workers(self, _):
+        with self.assertRaises(BatchJobError):
+            self._get_job().run(workers=2)
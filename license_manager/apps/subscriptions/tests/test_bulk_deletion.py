@@ -0,0 +1,171 @@
+"""
+Tests for the bulk_deletion module.
+"""
+from unittest import mock
+
+from django.test import TestCase
+
+from license_manager.apps.api.models import (
+    LicenseAssignmentJob,
+    LicenseAssignmentJobEmail,
+)
+from license_manager.apps.subscriptions.bulk_deletion import (
+    BULK_DELETION_CHANGE_REASON,
+    bulk_delete,
+    bulk_delete_licenses,
+)
+from license_manager.apps.subscriptions.constants import (
+    ACTIVATED,
+    REVOKED,
+    UNASSIGNED,
+    LicenseDeletionJobStatus,
+)
+from license_manager.apps.subscriptions.models import (
+    LearnerEntitlement,
+    License,
+    LicenseDeletionJob,
+)
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+    UserFactory,
+)
+
+
+class BulkDeletionTests(TestCase):
+    """
+    Tests for the chunked, signal-free deletion of licenses.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+        self.other_subscription_plan = SubscriptionPlanFactory()
+        self.unassigned_licenses = LicenseFactory.create_batch(
+            5, subscription_plan=self.subscription_plan, status=UNASSIGNED,
+        )
+        self.activated_license = LicenseFactory(
+            subscription_plan=self.subscription_plan,
+            status=ACTIVATED,
+            user_email='learner@example.com',
+            lms_user_id=1,
+        )
+        self.other_unassigned_licenses = LicenseFactory.create_batch(
+            2, subscription_plan=self.other_subscription_plan, status=UNASSIGNED,
+        )
+
+    @mock.patch('license_manager.apps.subscriptions.models.track_event')
+    def test_bulk_delete_in_batches(self, mock_track_event):
+        progress = []
+        num_deleted = bulk_delete(
+            License.objects.filter(status=UNASSIGNED),
+            batch_size=3,
+            on_batch_deleted=lambda batch, num_deleted: progress.append((len(batch), num_deleted)),
+        )
+
+        assert num_deleted == 7
+        assert progress == [(3, 3), (3, 6), (1, 7)]
+        assert list(License.objects.all()) == [self.activated_license]
+        mock_track_event.assert_not_called()
+
+    def test_bulk_delete_writes_history(self):
+        user = UserFactory()
+        bulk_delete(self.subscription_plan.unassigned_licenses, history_user_id=user.id)
+
+        deletion_records = License.history.filter(history_type='-')
+        assert {record.uuid for record in deletion_records} == {
+            license_obj.uuid for license_obj in self.unassigned_licenses
+        }
+        for record in deletion_records:
+            assert record.history_user == user
+            assert record.history_change_reason == BULK_DELETION_CHANGE_REASON
+            assert record.subscription_plan_id == self.subscription_plan.uuid
+
+    def test_bulk_delete_cascades_to_related_rows(self):
+        renewed_license = LicenseFactory(subscription_plan=self.other_subscription_plan, status=ACTIVATED)
+        self.unassigned_licenses[0].renewed_to = renewed_license
+        self.unassigned_licenses[0].save()
+        assert LearnerEntitlement.objects.filter(license=self.activated_license).exists()
+
+        bulk_delete(License.objects.filter(uuid__in=[renewed_license.uuid, self.activated_license.uuid]))
+
+        assert not LearnerEntitlement.objects.filter(license=self.activated_license).exists()
+        self.unassigned_licenses[0].refresh_from_db()
+        assert self.unassigned_licenses[0].renewed_to is None
+
+    def test_bulk_delete_sets_hidden_relations_to_null(self):
+        license_assignment_job = LicenseAssignmentJob.objects.create(
+            subscription_plan=self.subscription_plan,
+            actor_lms_user_id=1,
+        )
+        job_email = LicenseAssignmentJobEmail.objects.create(
+            license_assignment_job=license_assignment_job,
+            user_email=self.activated_license.user_email,
+            license=self.activated_license,
+        )
+
+        bulk_delete(License.objects.filter(uuid=self.activated_license.uuid))
+
+        assert not License.objects.filter(uuid=self.activated_license.uuid).exists()
+        job_email.refresh_from_db()
+        assert job_email.license is None
+
+    @mock.patch('license_manager.apps.subscriptions.bulk_deletion.track_licenses_deleted')
+    def test_bulk_delete_licenses_tracks_aggregate_events(self, mock_track_licenses_deleted):
+        progress = []
+        num_deleted = bulk_delete_licenses(
+            License.objects.filter(status=UNASSIGNED),
+            batch_size=4,
+            on_progress=progress.append,
+        )
+
+        assert num_deleted == 7
+        assert progress == [4, 7]
+        mock_track_licenses_deleted.assert_has_calls([
+            mock.call(self.subscription_plan, 5),
+            mock.call(self.other_subscription_plan, 2),
+        ], any_order=True)
+        assert mock_track_licenses_deleted.call_count == 2
+
+
+class LicenseDeletionJobTests(TestCase):
+    """
+    Tests for the ``LicenseDeletionJob`` model.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+        LicenseFactory.create_batch(3, subscription_plan=self.subscription_plan, status=REVOKED)
+        self.unassigned_license = LicenseFactory(subscription_plan=self.subscription_plan, status=UNASSIGNED)
+        self.license_deletion_job = LicenseDeletionJob.objects.create(
+            subscription_plan=self.subscription_plan,
+            license_status=REVOKED,
+        )
+
+    def test_process(self):
+        with self.settings(BULK_DELETION_BATCH_SIZE=2):
+            self.license_deletion_job.process()
+
+        self.license_deletion_job.refresh_from_db()
+        assert self.license_deletion_job.status == LicenseDeletionJobStatus.COMPLETED
+        assert self.license_deletion_job.num_licenses_deleted == 3
+        assert self.license_deletion_job.completed_at is not None
+        assert list(self.subscription_plan.licenses.all()) == [self.unassigned_license]
+
+    @mock.patch('license_manager.apps.subscriptions.models.bulk_delete_licenses', side_effect=Exception('fail'))
+    def test_process_failure(self, _):
+        with self.assertRaises(Exception):
+            self.license_deletion_job.process()
+
+        self.license_deletion_job.refresh_from_db()
+        assert self.license_deletion_job.status == LicenseDeletionJobStatus.FAILED
+        assert self.license_deletion_job.completed_at is None
+
+    @mock.patch('license_manager.apps.subscriptions.tasks.process_license_deletion_job_task.delay')
+    def test_create_license_deletion_job_enqueues_on_commit(self, mock_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            license_deletion_job = LicenseDeletionJob.create_license_deletion_job(self.subscription_plan, UNASSIGNED)
+            mock_delay.assert_not_called()
+
+        mock_delay.assert_called_once_with(str(license_deletion_job.uuid))
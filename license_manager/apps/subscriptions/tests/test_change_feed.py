@@ -0,0 +1,155 @@
+"""
+Tests for the change_feed module.
+"""
+from datetime import timedelta
+from unittest import mock
+from uuid import UUID
+
+import ddt
+from django.test import TestCase, override_settings
+
+from license_manager.apps.subscriptions.bulk_deletion import bulk_delete
+from license_manager.apps.subscriptions.change_feed import (
+    decode_cursor,
+    encode_cursor,
+    get_license_changes,
+    restamp_license_changes,
+)
+from license_manager.apps.subscriptions.constants import ACTIVATED, REVOKED
+from license_manager.apps.subscriptions.models import License
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+from license_manager.apps.subscriptions.utils import localized_utcnow
+
+
+@ddt.ddt
+@override_settings(LICENSE_CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedTests(TestCase):
+    """
+    Tests for listing the changes to licenses.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+        self.other_plan = SubscriptionPlanFactory()
+        self.licenses = LicenseFactory.create_batch(3, subscription_plan=self.subscription_plan)
+        self.other_license = LicenseFactory(subscription_plan=self.other_plan)
+
+    def _get_all_changes(self, **kwargs):
+        """
+        Returns the changes of every page, read in pages of two changes.
+        """
+        all_changes, cursor, has_more = [], None, True
+        while has_more:
+            changes, cursor, has_more = get_license_changes(cursor=cursor, limit=2, **kwargs)
+            all_changes.extend(changes)
+        return all_changes, cursor
+
+    def test_cursor_round_trip(self):
+        modified = localized_utcnow()
+        uuid = UUID('8a4b4c59-3ec6-4b10-9e4c-bb1b3a9dc2e6')
+        assert decode_cursor(encode_cursor(modified, uuid)) == (modified, uuid)
+
+    @ddt.data('not-a-cursor', encode_cursor(localized_utcnow(), 'not-a-uuid'), 'bm90LWEtZGF0ZXx1dWlk')
+    def test_invalid_cursor(self, cursor):
+        with self.assertRaises(ValueError):
+            decode_cursor(cursor)
+
+    def test_changes_in_order(self):
+        changes, _ = self._get_all_changes()
+
+        expected_licenses = sorted(
+            [*self.licenses, self.other_license],
+            key=lambda license_obj: (license_obj.modified, license_obj.uuid),
+        )
+        assert [change['uuid'] for change in changes] == [license_obj.uuid for license_obj in expected_licenses]
+        assert not any(change['deleted'] for change in changes)
+        assert changes[0]['subscription_plan_uuid'] == expected_licenses[0].subscription_plan_id
+
+    def test_changes_with_the_same_modified_date(self):
+        License.objects.update(modified=localized_utcnow() - timedelta(minutes=1))
+
+        changes, _ = self._get_all_changes()
+
+        assert [change['uuid'] for change in changes] == sorted(
+            license_obj.uuid for license_obj in [*self.licenses, self.other_license]
+        )
+
+    def test_changes_after_cursor(self):
+        _, cursor = self._get_all_changes()
+        assert get_license_changes(cursor=cursor) == ([], cursor, False)
+
+        license_obj = self.licenses[0]
+        license_obj.status = ACTIVATED
+        license_obj.save()
+
+        changes, next_cursor, has_more = get_license_changes(cursor=cursor)
+        assert [(change['uuid'], change['status']) for change in changes] == [(license_obj.uuid, ACTIVATED)]
+        assert next_cursor != cursor
+        assert not has_more
+
+    def test_bulk_updated_changes_after_cursor(self):
+        _, cursor = self._get_all_changes()
+
+        for license_obj in self.licenses:
+            license_obj.status = REVOKED
+        License.bulk_update(self.licenses, ['status'])
+
+        changes, _, _ = get_license_changes(cursor=cursor)
+        assert {change['uuid'] for change in changes} == {license_obj.uuid for license_obj in self.licenses}
+
+    def test_restamped_changes_after_cursor(self):
+        # A change made long ago by a transaction that only just committed.
+        License.objects.filter(uuid=self.licenses[0].uuid).update(modified=localized_utcnow() - timedelta(hours=1))
+        _, cursor = self._get_all_changes()
+
+        restamp_license_changes(License.objects.filter(uuid=self.licenses[0].uuid))
+
+        changes, _, _ = get_license_changes(cursor=cursor)
+        assert [change['uuid'] for change in changes] == [self.licenses[0].uuid]
+
+    def test_deleted_licenses(self):
+        _, cursor = self._get_all_changes()
+
+        deleted_uuid, bulk_deleted_uuid = self.licenses[0].uuid, self.licenses[1].uuid
+        self.licenses[0].delete()
+        bulk_delete(License.objects.filter(uuid=bulk_deleted_uuid))
+
+        changes, _ = self._get_all_changes()
+        assert [change['uuid'] for change in changes if change['deleted']] == [deleted_uuid, bulk_deleted_uuid]
+        assert changes[-1] == {
+            'uuid': bulk_deleted_uuid,
+            'subscription_plan_uuid': self.subscription_plan.uuid,
+            'modified': changes[-1]['modified'],
+            'deleted': True,
+        }
+
+        changes, _, _ = get_license_changes(cursor=cursor)
+        assert [change['uuid'] for change in changes] == [deleted_uuid, bulk_deleted_uuid]
+
+    @ddt.data(True, False)
+    def test_changes_of_customer(self, denormalized_lookups_enabled):
+        enterprise_customer_uuid = self.subscription_plan.customer_agreement.enterprise_customer_uuid
+        customer_license_uuids = {license_obj.uuid for license_obj in self.licenses}
+        self.licenses[2].delete()
+        self.other_license.delete()
+
+        with override_settings(DENORMALIZED_LICENSE_CUSTOMER_LOOKUPS_ENABLED=denormalized_lookups_enabled):
+            changes, _ = self._get_all_changes(enterprise_customer_uuid=enterprise_customer_uuid)
+
+        assert {change['uuid'] for change in changes} == customer_license_uuids
+        assert [change['deleted'] for change in changes] == [False, False, True]
+
+    @override_settings(LICENSE_CHANGE_FEED_SETTLE_SECONDS=60)
+    def test_unsettled_changes_are_not_listed(self):
+        assert get_license_changes() == ([], None, False)
+
+        with mock.patch(
+            'license_manager.apps.subscriptions.change_feed.localized_utcnow',
+            return_value=localized_utcnow() + timedelta(minutes=2),
+        ):
+            changes, _, _ = get_license_changes()
+        assert len(changes) == 4
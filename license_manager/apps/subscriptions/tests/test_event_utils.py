@@ -15,6 +15,7 @@ from license_manager.apps.subscriptions.event_utils import (
     _track_batch_events_via_braze_alias,
     get_license_tracking_properties,
     track_license_changes,
+    track_licenses_provisioned,
 )
 from license_manager.apps.subscriptions.tests.factories import (
     LicenseFactory,
@@ -117,3 +118,21 @@ def test_track_event_via_braze_alias(mock_braze_client):
     _track_batch_events_via_braze_alias(test_event_name, {test_email: test_event_properties})
     mock_braze_client.return_value.create_braze_alias.assert_any_call([test_email], ENTERPRISE_BRAZE_ALIAS_LABEL)
     mock_braze_client.return_value.track_user.assert_any_call(attributes=[expected_attributes], events=[expected_event])
+
+
+@mark.django_db
+@mock.patch('license_manager.apps.subscriptions.event_utils.analytics.track')
+def test_track_licenses_provisioned(mock_analytics_track, settings):
+    settings.SEGMENT_KEY = 'test-segment-key'
+    subscription_plan = SubscriptionPlanFactory.create()
+
+    track_licenses_provisioned(subscription_plan, 1000)
+
+    mock_analytics_track.assert_called_once()
+    call_kwargs = mock_analytics_track.call_args.kwargs
+    assert call_kwargs['anonymous_id'] == str(subscription_plan.uuid)
+    assert call_kwargs['event'] == SegmentEvents.LICENSES_PROVISIONED
+    assert call_kwargs['properties']['num_licenses_provisioned'] == 1000
+    assert call_kwargs['properties']['subscription_plan_uuid'] == str(subscription_plan.uuid)
+    assert call_kwargs['properties']['enterprise_customer_uuid'] == \
+        str(subscription_plan.customer_agreement.enterprise_customer_uuid)
@@ -0,0 +1,183 @@
+"""
+Tests for the history_utils module.
+"""
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+
+import ddt
+from django.db import transaction
+from django.test import TestCase, override_settings
+from freezegun import freeze_time
+
+from license_manager.apps.subscriptions import history_utils
+from license_manager.apps.subscriptions.constants import ASSIGNED
+from license_manager.apps.subscriptions.models import License
+from license_manager.apps.subscriptions.tasks import write_deferred_history_task
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+from license_manager.apps.subscriptions.utils import localized_utcnow
+
+
+WRITE_DEFERRED_HISTORY_TASK_DELAY = 'license_manager.apps.subscriptions.tasks.write_deferred_history_task.delay'
+NOW = localized_utcnow()
+
+
+class _RollbackError(Exception):
+    pass
+
+
+@ddt.ddt
+@override_settings(DEFERRED_HISTORY_WRITES_ENABLED=True, DEFERRED_HISTORY_WRITE_BATCH_SIZE=2)
+class DeferredHistoryWritesTests(TestCase):
+    """
+    Tests for writing the history of bulk license operations asynchronously.
+    """
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+
+    @mock.patch(WRITE_DEFERRED_HISTORY_TASK_DELAY, new=write_deferred_history_task)
+    def test_bulk_create_defers_history(self):
+        licenses = [License(subscription_plan=self.subscription_plan) for _ in range(5)]
+
+        with freeze_time(NOW), self.captureOnCommitCallbacks() as callbacks:
+            License.bulk_create(licenses)
+            # No history is written as part of the bulk operation itself
+            assert not License.history.filter(subscription_plan=self.subscription_plan).exists()
+
+        # One writer task per batch of licenses
+        assert len(callbacks) == 3
+        for callback in callbacks:
+            callback()
+
+        history = License.history.filter(subscription_plan=self.subscription_plan)
+        assert history.count() == 5
+        assert {record.uuid for record in history} == {license_obj.uuid for license_obj in licenses}
+        assert {record.history_type for record in history} == {'+'}
+        assert {record.history_date for record in history} == {NOW}
+
+    @mock.patch(WRITE_DEFERRED_HISTORY_TASK_DELAY, new=write_deferred_history_task)
+    def test_bulk_update_defers_history(self):
+        licenses = LicenseFactory.create_batch(3, subscription_plan=self.subscription_plan)
+        for license_obj in licenses:
+            license_obj.status = ASSIGNED
+            license_obj.user_email = f'{license_obj.uuid}@example.com'
+
+        with self.captureOnCommitCallbacks(execute=True):
+            License.bulk_update(licenses, ['status', 'user_email'])
+
+        updated_history = License.history.filter(subscription_plan=self.subscription_plan, history_type='~')
+        assert updated_history.count() == 3
+        for record in updated_history:
+            assert record.status == ASSIGNED
+            assert record.user_email == f'{record.uuid}@example.com'
+
+    @mock.patch(WRITE_DEFERRED_HISTORY_TASK_DELAY)
+    def test_deferred_history_not_written_on_rollback(self, mock_write_deferred_history_delay):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(_RollbackError):
+                with transaction.atomic():
+                    self.subscription_plan.bulk_provision_licenses(2)
+                    raise _RollbackError()
+
+        assert not callbacks
+        mock_write_deferred_history_delay.assert_not_called()
+        assert not self.subscription_plan.licenses.exists()
+
+
+@ddt.ddt
+class PruneHistoryTests(TestCase):
+    """
+    Tests for pruning historical records past their retention window.
+    """
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+        with freeze_time(NOW - timedelta(days=100)):
+            self.licenses = LicenseFactory.create_batch(3, subscription_plan=self.subscription_plan)
+        with freeze_time(NOW - timedelta(days=50)):
+            for license_obj in self.licenses[:2]:
+                license_obj.status = ASSIGNED
+                license_obj.save()
+        with freeze_time(NOW - timedelta(days=10)):
+            self.licenses[0].user_email = 'bob@example.com'
+            self.licenses[0].save()
+
+    def _license_history(self):
+        return License.history.filter(subscription_plan=self.subscription_plan)
+
+    @ddt.data(
+        # Only the records older than the window that aren't the latest record of their license are pruned.
+        {'retention_days': 200, 'expected_num_pruned': 0},
+        {'retention_days': 75, 'expected_num_pruned': 2},
+        {'retention_days': 30, 'expected_num_pruned': 3},
+        {'retention_days': 0, 'expected_num_pruned': 3},
+    )
+    @ddt.unpack
+    def test_prune_history(self, retention_days, expected_num_pruned):
+        assert self._license_history().count() == 6
+
+        with freeze_time(NOW):
+            num_pruned = history_utils.prune_history(License, retention_days, chunk_size=1)
+
+        assert num_pruned == expected_num_pruned
+        assert self._license_history().count() == 6 - expected_num_pruned
+        # Every license keeps its most recent historical record
+        for license_obj in self.licenses:
+            assert license_obj.history.first().history_date == license_obj.history.latest().history_date
+
+    def test_prune_history_dry_run(self):
+        with freeze_time(NOW):
+            num_pruned = history_utils.prune_history(License, 30, dry_run=True)
+
+        assert num_pruned == 3
+        assert self._license_history().count() == 6
+
+    def test_prune_history_archive(self):
+        archive_stream = io.StringIO()
+        latest_history_ids = {license_obj.history.latest().history_id for license_obj in self.licenses}
+        pruned_history_ids = set(
+            self._license_history().filter(
+                history_date__lt=NOW - timedelta(days=30),
+            ).exclude(
+                history_id__in=latest_history_ids,
+            ).values_list('history_id', flat=True)
+        )
+
+        with freeze_time(NOW):
+            history_utils.prune_history(License, 30, chunk_size=2, archive_stream=archive_stream)
+
+        archived_records = [json.loads(line) for line in archive_stream.getvalue().splitlines()]
+        assert {record['pk'] for record in archived_records} == pruned_history_ids
+        assert {record['model'] for record in archived_records} == {'subscriptions.historicallicense'}
+
+
+class HistoryRowCountTests(TestCase):
+    """
+    Tests for the historical record counts reported per model and per plan.
+    """
+    def test_history_row_counts(self):
+        small_plan = SubscriptionPlanFactory()
+        large_plan = SubscriptionPlanFactory()
+        LicenseFactory.create_batch(1, subscription_plan=small_plan)
+        large_plan_licenses = LicenseFactory.create_batch(2, subscription_plan=large_plan)
+        for license_obj in large_plan_licenses:
+            license_obj.status = ASSIGNED
+            license_obj.save()
+
+        row_counts = {
+            label: (num_history, num_live)
+            for label, num_history, num_live in history_utils.get_history_row_counts()
+        }
+        assert row_counts['subscriptions.License'] == (5, 3)
+        assert row_counts['subscriptions.SubscriptionPlan'] == (2, 2)
+
+        assert history_utils.get_history_row_counts_by_plan() == [
+            (large_plan.uuid, 4, 1),
+            (small_plan.uuid, 1, 1),
+        ]
+        assert history_utils.get_history_row_counts_by_plan(limit=1) == [(large_plan.uuid, 4, 1)]
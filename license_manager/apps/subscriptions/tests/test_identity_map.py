@@ -0,0 +1,106 @@
+"""
+Tests for the identity_map module.
+"""
+from uuid import uuid4
+
+from django.test import RequestFactory, TestCase
+
+from license_manager.apps.subscriptions import identity_map
+from license_manager.apps.subscriptions.constants import ASSIGNED
+from license_manager.apps.subscriptions.models import License, SubscriptionPlan
+from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
+    SubscriptionPlanFactory,
+)
+
+
+class IdentityMapTests(TestCase):
+    """
+    Tests for the request-scoped identity map.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+
+    def _load_plan(self, subscription_uuid=None):
+        subscription_uuid = subscription_uuid or self.subscription_plan.uuid
+        return identity_map.get_or_load(
+            SubscriptionPlan,
+            'uuid',
+            subscription_uuid,
+            lambda: SubscriptionPlan.objects.filter(uuid=subscription_uuid).first(),
+        )
+
+    def test_lookups_hit_the_database_outside_scope(self):
+        with self.assertNumQueries(2):
+            first_plan = self._load_plan()
+            second_plan = self._load_plan()
+        assert first_plan == second_plan
+        assert first_plan is not second_plan
+
+    def test_lookups_are_loaded_once_in_scope(self):
+        with identity_map.identity_map_scope():
+            with self.assertNumQueries(1):
+                first_plan = self._load_plan()
+                second_plan = self._load_plan()
+        assert first_plan is second_plan
+
+    def test_objects_not_found_are_not_remembered(self):
+        missing_uuid = uuid4()
+        with identity_map.identity_map_scope():
+            with self.assertNumQueries(2):
+                assert self._load_plan(missing_uuid) is None
+                assert self._load_plan(missing_uuid) is None
+
+    def test_different_lookups_share_instances(self):
+        with identity_map.identity_map_scope():
+            plan = self._load_plan()
+            plan_by_title = identity_map.get_or_load(
+                SubscriptionPlan,
+                'title',
+                plan.title,
+                lambda: SubscriptionPlan.objects.get(title=plan.title),
+            )
+            assert plan_by_title is plan
+            assert identity_map.remember(SubscriptionPlan.objects.get(uuid=plan.uuid)) is plan
+
+    def test_scope_is_discarded_on_exit(self):
+        with identity_map.identity_map_scope():
+            first_plan = self._load_plan()
+        with identity_map.identity_map_scope():
+            second_plan = self._load_plan()
+        assert first_plan is not second_plan
+
+    def test_middleware_keeps_identity_map_for_each_request(self):
+        plans = []
+
+        def get_response(request):  # pylint: disable=unused-argument
+            plans.extend([self._load_plan(), self._load_plan()])
+
+        middleware = identity_map.IdentityMapMiddleware(get_response)
+        middleware(RequestFactory().get('/'))
+        middleware(RequestFactory().get('/'))
+
+        assert plans[0] is plans[1]
+        assert plans[2] is plans[3]
+        assert plans[0] is not plans[2]
+
+    def test_license_for_activation_reuses_license_loaded_by_activation_key(self):
+        user_license = LicenseFactory(
+            status=ASSIGNED,
+            user_email='learner@example.com',
+            activation_key=uuid4(),
+            subscription_plan=self.subscription_plan,
+        )
+        with identity_map.identity_map_scope():
+            license_by_key = License.get_license_by_email_and_activation_key(
+                'learner@example.com', user_license.activation_key,
+            )
+            # Only the check for duplicate licenses hits the database
+            with self.assertNumQueries(1):
+                license_for_activation = License.license_for_activation(
+                    'learner@example.com', user_license.activation_key,
+                )
+                assert license_for_activation.subscription_plan.customer_agreement is not None
+        assert license_for_activation is license_by_key
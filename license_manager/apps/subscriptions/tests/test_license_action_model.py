@@ -3,10 +3,11 @@ Tests for the LicenseAction model (ENT-12031).
 """
 
 from datetime import timedelta
+from unittest import mock
 from uuid import uuid4
 
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.test import TestCase
 from django.utils import timezone
 
@@ -339,6 +340,57 @@ class TestLicenseActionModel(TestCase):
         self._create_action(action_type=LicenseActionType.REVOKED)
         self.assertEqual(self.license.actions.count(), 3)
 
+    # =========================================================
+    # Idempotency key
+    # =========================================================
+
+    def test_idempotency_key_is_unique(self):
+        """
+        The database rejects a second action with the same idempotency_key.
+        """
+        self._create_action(idempotency_key='corr-1:revoked')
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                self._create_action(idempotency_key='corr-1:revoked')
+        # Actions without a key are never considered duplicates
+        self._create_action()
+        self._create_action()
+        self.assertEqual(self.license.actions.count(), 3)
+
+    def test_create_idempotent(self):
+        """
+        create_idempotent writes an action once per idempotency_key, and skips duplicates.
+        """
+        action_kwargs = {
+            "license": self.license,
+            "subscription_plan": self.subscription_plan,
+            "enterprise_customer_uuid": self.enterprise_customer_uuid,
+            "action_type": LicenseActionType.REVOKED,
+            "actor_type": LicenseActorType.SYSTEM,
+            "source": LicenseActionSource.CELERY_TASK,
+            "idempotency_key": "corr-1:revoked",
+        }
+        action = LicenseAction.create_idempotent(**action_kwargs)
+        self.assertIsNotNone(action)
+        self.assertIsNone(LicenseAction.create_idempotent(**action_kwargs))
+        self.assertEqual(LicenseAction.objects.filter(idempotency_key="corr-1:revoked").count(), 1)
+
+    def test_create_idempotent_reraises_other_integrity_errors(self):
+        """
+        Integrity errors that aren't caused by a duplicate idempotency_key are not swallowed.
+        """
+        with mock.patch.object(LicenseAction.objects, 'create', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                LicenseAction.create_idempotent(
+                    license=self.license,
+                    subscription_plan=self.subscription_plan,
+                    enterprise_customer_uuid=self.enterprise_customer_uuid,
+                    action_type=LicenseActionType.REVOKED,
+                    actor_type=LicenseActorType.SYSTEM,
+                    source=LicenseActionSource.CELERY_TASK,
+                    idempotency_key="corr-2:revoked",
+                )
+
     # =========================================================
     # No regression on existing License model
     # =========================================================
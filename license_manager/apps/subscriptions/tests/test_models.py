@@ -8,19 +8,28 @@ import pytest
 from django.core.cache import cache
 from django.forms import ValidationError
 from django.test import TestCase
+from django.test.utils import override_settings
 
 from license_manager.apps.subscriptions.constants import (
     ACTIVATED,
     ASSIGNED,
     REVOKED,
+    SUBSCRIPTIONS_ADMIN_ROLE,
+    SUBSCRIPTIONS_LEARNER_ROLE,
     UNASSIGNED,
     SegmentEvents,
 )
 from license_manager.apps.subscriptions.models import (
+    AutoAppliedLicenseCount,
+    CustomerAgreement,
+    LearnerEntitlement,
     License,
     LicenseTransferJob,
     Notification,
     SubscriptionLicenseSourceType,
+    SubscriptionPlan,
+    SubscriptionsFeatureRole,
+    SubscriptionsRoleAssignment,
 )
 from license_manager.apps.subscriptions.tests.factories import (
     CustomerAgreementFactory,
@@ -28,6 +37,7 @@ from license_manager.apps.subscriptions.tests.factories import (
     SubscriptionLicenseSourceFactory,
     SubscriptionPlanFactory,
     SubscriptionPlanRenewalFactory,
+    UserFactory,
 )
 from license_manager.apps.subscriptions.utils import (
     localized_datetime,
@@ -171,6 +181,30 @@ class SubscriptionsModelTests(TestCase):
         Tests that auto_apply_licenses_turned_on_at returns the correct time.
         """
         subscription_plan = SubscriptionPlanFactory.create()
+        assert subscription_plan.auto_apply_enabled_at is None
+        subscription_plan.should_auto_apply_licenses = True
+        subscription_plan.save()
+        auto_apply_licenses_turned_on_at = subscription_plan.auto_apply_enabled_at
+        assert auto_apply_licenses_turned_on_at is not None
+
+        subscription_plan = SubscriptionPlan.objects.get(uuid=subscription_plan.uuid)
+        subscription_plan.is_active = True
+        subscription_plan.save()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(subscription_plan.auto_apply_licenses_turned_on_at, auto_apply_licenses_turned_on_at)
+
+        subscription_plan.should_auto_apply_licenses = False
+        subscription_plan.save(update_fields=['should_auto_apply_licenses'])
+        subscription_plan.refresh_from_db()
+        assert subscription_plan.auto_apply_enabled_at is None
+
+    def test_auto_apply_licenses_turned_on_at_from_history(self):
+        """
+        Tests that auto_apply_licenses_turned_on_at falls back to the plan's history for plans
+        that were last turned on before auto_apply_enabled_at was recorded.
+        """
+        subscription_plan = SubscriptionPlanFactory.create()
         subscription_plan.should_auto_apply_licenses = True
         subscription_plan.save()
         auto_apply_licenses_turned_on_at = subscription_plan.history.latest().history_date
@@ -178,6 +212,8 @@ class SubscriptionsModelTests(TestCase):
         subscription_plan.is_active = True
         subscription_plan.save()
         latest_history_date = subscription_plan.history.latest().history_date
+        SubscriptionPlan.objects.filter(uuid=subscription_plan.uuid).update(auto_apply_enabled_at=None)
+        subscription_plan = SubscriptionPlan.objects.get(uuid=subscription_plan.uuid)
 
         self.assertEqual(subscription_plan.auto_apply_licenses_turned_on_at, auto_apply_licenses_turned_on_at)
         self.assertNotEqual(subscription_plan.auto_apply_licenses_turned_on_at, latest_history_date)
@@ -203,6 +239,188 @@ class SubscriptionsModelTests(TestCase):
         )
         self.assertEqual(subscription_plan.auto_applied_licenses_count_since(timestamp_2), 5)
 
+    def _auto_apply_license(self, subscription_plan, activation_date):
+        """
+        Helper that creates a license auto applied from the plan at ``activation_date``, and counts it.
+        """
+        auto_applied_license = LicenseFactory.create(
+            subscription_plan=subscription_plan, status=ACTIVATED, auto_applied=True, activation_date=activation_date,
+        )
+        AutoAppliedLicenseCount.increment(subscription_plan, activation_date)
+        return auto_applied_license
+
+    @override_settings(AUTO_APPLIED_LICENSE_COUNTS_ENABLED=True)
+    def test_auto_applied_licenses_count_since_from_counts(self):
+        """
+        Tests that the auto-applied license count is summed from the plan's hourly counts, with the licenses
+        auto applied within the rest of the hour the given time falls in counted from the plan's licenses.
+        """
+        subscription_plan = SubscriptionPlanFactory.create(should_auto_apply_licenses=True)
+        other_subscription_plan = SubscriptionPlanFactory.create(should_auto_apply_licenses=True)
+        timestamp_1 = localized_datetime(2024, 1, 1, 10, 30)
+        timestamp_2 = timestamp_1 + timedelta(hours=2)
+        self._auto_apply_license(subscription_plan, timestamp_1)
+        for _ in range(3):
+            self._auto_apply_license(subscription_plan, timestamp_2)
+        self._auto_apply_license(other_subscription_plan, timestamp_2)
+
+        assert AutoAppliedLicenseCount.objects.filter(subscription_plan=subscription_plan).count() == 2
+        with self.assertNumQueries(1):
+            self.assertEqual(subscription_plan.auto_applied_licenses_count_since(localized_datetime(2024, 1, 1, 10)), 4)
+        self.assertEqual(subscription_plan.auto_applied_licenses_count_since(timestamp_1), 4)
+        self.assertEqual(subscription_plan.auto_applied_licenses_count_since(timestamp_1 + timedelta(minutes=20)), 3)
+        self.assertEqual(subscription_plan.auto_applied_licenses_count_since(timestamp_1 + timedelta(hours=1)), 3)
+        self.assertEqual(subscription_plan.auto_applied_licenses_count_since(timestamp_2 + timedelta(minutes=1)), 0)
+        self.assertEqual(subscription_plan.auto_applied_licenses_count_since(timestamp_2 + timedelta(hours=1)), 0)
+
+    def test_auto_applied_license_counts_follow_license_count(self):
+        """
+        Tests that the hourly auto-applied license counts keep matching the count of the plan's licenses
+        as auto-applied licenses are revoked, reset to unassigned and transferred to another plan.
+        """
+        subscription_plan = SubscriptionPlanFactory.create(should_auto_apply_licenses=True)
+        other_subscription_plan = SubscriptionPlanFactory.create(
+            customer_agreement=subscription_plan.customer_agreement,
+        )
+        since = localized_datetime(2024, 1, 1, 10)
+        licenses = [
+            self._auto_apply_license(subscription_plan, since + timedelta(minutes=minutes))
+            for minutes in (10, 20, 30, 90)
+        ]
+
+        def assert_counts_match():
+            for plan in (subscription_plan, other_subscription_plan):
+                with override_settings(AUTO_APPLIED_LICENSE_COUNTS_ENABLED=False):
+                    expected_count = plan.auto_applied_licenses_count_since(since)
+                with override_settings(AUTO_APPLIED_LICENSE_COUNTS_ENABLED=True):
+                    assert plan.auto_applied_licenses_count_since(since) == expected_count
+            return subscription_plan.auto_applied_licenses_count_since(since)
+
+        assert assert_counts_match() == 4
+
+        # Revoked licenses keep their activation date, and so are still counted.
+        licenses[0].revoke()
+        assert assert_counts_match() == 4
+
+        licenses[1].reset_to_unassigned()
+        licenses[1].save()
+        assert assert_counts_match() == 3
+
+        LicenseTransferJob.objects.create(
+            customer_agreement=subscription_plan.customer_agreement,
+            old_subscription_plan=subscription_plan,
+            new_subscription_plan=other_subscription_plan,
+            license_uuids_raw='\n'.join([str(licenses[2].uuid), str(licenses[3].uuid)]),
+        ).process()
+        assert assert_counts_match() == 1
+        assert other_subscription_plan.auto_applied_licenses_count_since(since) == 2
+
+    def test_rebuild_auto_applied_license_counts(self):
+        """
+        Tests that the hourly auto-applied license counts of a plan are rebuilt from its licenses.
+        """
+        subscription_plan = SubscriptionPlanFactory.create(should_auto_apply_licenses=True)
+        timestamp = localized_datetime(2024, 1, 1, 10, 30)
+        LicenseFactory.create_batch(
+            2, subscription_plan=subscription_plan, auto_applied=True, activation_date=timestamp,
+        )
+        LicenseFactory.create(
+            subscription_plan=subscription_plan, auto_applied=True, activation_date=timestamp + timedelta(hours=1),
+        )
+        LicenseFactory.create(subscription_plan=subscription_plan, auto_applied=False, activation_date=timestamp)
+        AutoAppliedLicenseCount.increment(subscription_plan, timestamp + timedelta(days=1))
+
+        assert AutoAppliedLicenseCount.rebuild_for_plan(subscription_plan) == 2
+        counts = AutoAppliedLicenseCount.objects.filter(
+            subscription_plan=subscription_plan,
+        ).order_by('bucket_start').values_list('bucket_start', 'count')
+        assert list(counts) == [
+            (localized_datetime(2024, 1, 1, 10), 2),
+            (localized_datetime(2024, 1, 1, 11), 1),
+        ]
+
+    @mock.patch('license_manager.apps.subscriptions.models.track_licenses_provisioned')
+    @mock.patch('license_manager.apps.subscriptions.models.track_license_changes')
+    def test_bulk_provision_licenses(self, mock_track_license_changes, mock_track_licenses_provisioned):
+        """
+        Tests that fast provisioning creates licenses with history, tracking only a single aggregate event.
+        """
+        subscription_plan = SubscriptionPlanFactory.create()
+
+        subscription_plan.bulk_provision_licenses(7, batch_size=3)
+
+        assert subscription_plan.unassigned_licenses.count() == 7
+        assert License.history.filter(subscription_plan=subscription_plan, history_type='+').count() == 7
+        mock_track_license_changes.assert_not_called()
+        mock_track_licenses_provisioned.assert_called_once_with(subscription_plan, 7)
+
+    @mock.patch('license_manager.apps.subscriptions.models.track_licenses_provisioned')
+    def test_increase_num_virtual_unassigned_licenses(self, mock_track_licenses_provisioned):
+        """
+        Tests that plans using virtual unassigned licenses only count new licenses, without creating records.
+        """
+        subscription_plan = SubscriptionPlanFactory.create(uses_virtual_unassigned_licenses=True)
+        LicenseFactory.create_batch(2, subscription_plan=subscription_plan, status=ASSIGNED)
+        LicenseFactory.create_batch(1, subscription_plan=subscription_plan, status=REVOKED)
+
+        subscription_plan.increase_num_licenses(5)
+        subscription_plan.bulk_provision_licenses(3)
+
+        assert subscription_plan.num_virtual_unassigned_licenses == 8
+        assert not subscription_plan.unassigned_licenses.exists()
+        assert subscription_plan.num_unassigned_licenses == 8
+        assert subscription_plan.num_licenses == 10
+        assert subscription_plan.license_count_by_status()[UNASSIGNED] == 8
+        assert mock_track_licenses_provisioned.call_count == 2
+
+    @ddt.data(
+        # Existing unassigned records are used before the virtual pool is drawn down.
+        {'num_unassigned': 2, 'num_virtual': 5, 'num_needed': 4, 'expected_materialized': 2},
+        {'num_unassigned': 0, 'num_virtual': 5, 'num_needed': 5, 'expected_materialized': 5},
+        # The virtual pool can't be overdrawn.
+        {'num_unassigned': 1, 'num_virtual': 2, 'num_needed': 10, 'expected_materialized': 2},
+        {'num_unassigned': 3, 'num_virtual': 5, 'num_needed': 2, 'expected_materialized': 0},
+    )
+    @ddt.unpack
+    @mock.patch('license_manager.apps.subscriptions.models.track_license_changes')
+    @mock.patch('license_manager.apps.subscriptions.models.track_licenses_materialized')
+    def test_materialize_unassigned_licenses(
+        self, mock_track_licenses_materialized, mock_track_license_changes,
+        num_unassigned, num_virtual, num_needed, expected_materialized,
+    ):
+        """
+        Tests that only the missing unassigned license records are created out of the virtual pool,
+        and that a single aggregate event is tracked for them.
+        """
+        subscription_plan = SubscriptionPlanFactory.create(
+            uses_virtual_unassigned_licenses=True,
+            num_virtual_unassigned_licenses=num_virtual,
+        )
+        LicenseFactory.create_batch(num_unassigned, subscription_plan=subscription_plan)
+        num_licenses = subscription_plan.num_licenses
+
+        mock_track_license_changes.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            assert subscription_plan.materialize_unassigned_licenses(num_needed) == expected_materialized
+
+        assert subscription_plan.num_virtual_unassigned_licenses == num_virtual - expected_materialized
+        assert subscription_plan.unassigned_licenses.count() == num_unassigned + expected_materialized
+        assert subscription_plan.num_licenses == num_licenses
+        mock_track_license_changes.assert_not_called()
+        if expected_materialized:
+            mock_track_licenses_materialized.assert_called_once_with(subscription_plan, expected_materialized)
+        else:
+            mock_track_licenses_materialized.assert_not_called()
+
+    def test_materialize_unassigned_licenses_without_virtual_licenses(self):
+        """
+        Tests that plans that don't use virtual unassigned licenses never get new records.
+        """
+        subscription_plan = SubscriptionPlanFactory.create()
+
+        assert subscription_plan.materialize_unassigned_licenses(5) == 0
+        assert not subscription_plan.licenses.exists()
+
 
 class NotificationTests(TestCase):
     """
@@ -434,6 +652,64 @@ class LicenseModelTests(TestCase):
 
         self.assertCountEqual(actual_licenses, expected_licenses)
 
+    @ddt.data(False, True)
+    def test_for_user_and_customer_by_email_or_lms_user_id(self, denormalized_lookups_enabled):
+        """
+        Test that licenses are looked up by either the user's email or lms user id, only in the given customer.
+        """
+        lms_user_id_license = LicenseFactory.create(
+            user_email='bob-old-email@example.com',
+            lms_user_id=42,
+            subscription_plan=self.active_current_plan,
+        )
+        # The same user's license in another customer's plan
+        LicenseFactory.create(user_email=self.user_email, lms_user_id=42, subscription_plan=self.subscription_plan)
+
+        with override_settings(DENORMALIZED_LICENSE_CUSTOMER_LOOKUPS_ENABLED=denormalized_lookups_enabled):
+            actual_licenses = License.for_user_and_customer(
+                user_email=self.user_email,
+                lms_user_id=42,
+                enterprise_customer_uuid=self.enterprise_customer_uuid,
+                active_plans_only=True,
+                current_plans_only=True,
+            )
+            self.assertCountEqual(actual_licenses, [self.active_current_license, lms_user_id_license])
+
+    def test_enterprise_customer_uuid_is_denormalized(self):
+        """
+        Test that licenses are given the enterprise customer uuid of their plan however they're created.
+        """
+        created_licenses = [LicenseFactory.create(subscription_plan=self.active_current_plan)]
+        bulk_created_licenses = [License(subscription_plan=self.active_current_plan) for _ in range(2)]
+        License.bulk_create(bulk_created_licenses)
+        created_licenses.extend(bulk_created_licenses)
+        created_licenses.extend(License.bulk_provision(self.active_current_plan, 2))
+
+        for created_license in created_licenses:
+            created_license.refresh_from_db()
+            assert created_license.enterprise_customer_uuid == self.enterprise_customer_uuid
+
+    def test_enterprise_customer_uuid_follows_plan_and_agreement(self):
+        """
+        Test that the denormalized enterprise customer uuid of licenses is updated when their plan is moved
+        to another customer agreement, or the customer agreement's enterprise customer changes.
+        """
+        subscription_plan = SubscriptionPlanFactory.create(customer_agreement=self.customer_agreement)
+        plan_license = LicenseFactory.create(subscription_plan=subscription_plan)
+
+        other_customer_agreement = CustomerAgreementFactory.create()
+        subscription_plan = SubscriptionPlan.objects.get(uuid=subscription_plan.uuid)
+        subscription_plan.customer_agreement = other_customer_agreement
+        subscription_plan.save()
+        plan_license.refresh_from_db()
+        assert plan_license.enterprise_customer_uuid == other_customer_agreement.enterprise_customer_uuid
+
+        other_customer_agreement = CustomerAgreement.objects.get(uuid=other_customer_agreement.uuid)
+        other_customer_agreement.enterprise_customer_uuid = uuid.uuid4()
+        other_customer_agreement.save()
+        plan_license.refresh_from_db()
+        assert plan_license.enterprise_customer_uuid == other_customer_agreement.enterprise_customer_uuid
+
     @ddt.data(ASSIGNED, ACTIVATED)
     def test_save(self, new_status):
         """
@@ -482,6 +758,145 @@ class CustomerAgreementTests(TestCase):
             assert self.customer_agreement.net_days_until_expiration == expected_days
 
 
+class LearnerEntitlementTests(TestCase):
+    """
+    Tests for the LearnerEntitlement model.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user_email = 'learner@example.com'
+        cls.lms_user_id = 1234
+        cls.customer_agreement = CustomerAgreementFactory()
+        cls.enterprise_customer_uuid = cls.customer_agreement.enterprise_customer_uuid
+        cls.subscription_plan = SubscriptionPlanFactory(
+            customer_agreement=cls.customer_agreement,
+            is_active=True,
+            start_date=localized_utcnow() - timedelta(days=30),
+            expiration_date=localized_utcnow() + timedelta(days=365),
+        )
+
+    def _get_entitlement(self, license_obj):
+        return LearnerEntitlement.objects.filter(license=license_obj).first()
+
+    def test_entitlement_follows_saved_license(self):
+        """
+        Test that saving a license creates, updates and deletes its entitlement as it's assigned,
+        activated and unassigned.
+        """
+        license_obj = LicenseFactory(subscription_plan=self.subscription_plan, status=UNASSIGNED)
+        assert self._get_entitlement(license_obj) is None
+
+        license_obj.status = ASSIGNED
+        license_obj.user_email = self.user_email
+        license_obj.save()
+        entitlement = self._get_entitlement(license_obj)
+        assert entitlement.status == ASSIGNED
+        assert entitlement.user_email == self.user_email
+        assert entitlement.enterprise_customer_uuid == self.enterprise_customer_uuid
+        assert entitlement.enterprise_catalog_uuid == self.subscription_plan.enterprise_catalog_uuid
+        assert entitlement.plan_expiration_date == self.subscription_plan.expiration_date
+        assert entitlement.plan_is_active
+
+        license_obj.activate(self.lms_user_id)
+        entitlement = self._get_entitlement(license_obj)
+        assert entitlement.status == ACTIVATED
+        assert entitlement.lms_user_id == self.lms_user_id
+
+        license_obj.reset_to_unassigned()
+        license_obj.save()
+        assert self._get_entitlement(license_obj) is None
+
+    def test_entitlements_follow_bulk_license_changes(self):
+        """
+        Test that bulk created and bulk updated licenses have up to date entitlements.
+        """
+        licenses = [
+            License(subscription_plan=self.subscription_plan, status=ASSIGNED, user_email=f'{i}@example.com')
+            for i in range(3)
+        ]
+        License.bulk_create(licenses)
+        assert LearnerEntitlement.objects.filter(license__in=licenses).count() == 3
+
+        licenses[0].status = REVOKED
+        licenses[1].user_email = 'new@example.com'
+        License.bulk_update(licenses, ['status', 'user_email'])
+        assert self._get_entitlement(licenses[0]) is None
+        assert self._get_entitlement(licenses[1]).user_email == 'new@example.com'
+        assert self._get_entitlement(licenses[2]).user_email == '2@example.com'
+
+    def test_entitlements_follow_plan_and_agreement(self):
+        """
+        Test that the plan values copied onto entitlements are updated when the plan or its agreement change.
+        """
+        license_obj = LicenseFactory(
+            subscription_plan=self.subscription_plan,
+            status=ACTIVATED,
+            user_email=self.user_email,
+        )
+
+        subscription_plan = SubscriptionPlan.objects.get(uuid=self.subscription_plan.uuid)
+        subscription_plan.is_active = False
+        subscription_plan.expiration_date = localized_utcnow() + timedelta(days=30)
+        subscription_plan.save()
+        entitlement = self._get_entitlement(license_obj)
+        assert not entitlement.plan_is_active
+        assert entitlement.plan_expiration_date == subscription_plan.expiration_date
+
+        customer_agreement = CustomerAgreement.objects.get(uuid=self.customer_agreement.uuid)
+        customer_agreement.enterprise_customer_uuid = uuid.uuid4()
+        customer_agreement.save()
+        entitlement = self._get_entitlement(license_obj)
+        assert entitlement.enterprise_customer_uuid == customer_agreement.enterprise_customer_uuid
+
+    def test_plan_save_without_changes_skips_entitlements(self):
+        """
+        Test that saving a plan doesn't update its entitlements unless one of the values they copy has changed.
+        """
+        subscription_plan = SubscriptionPlan.objects.get(uuid=self.subscription_plan.uuid)
+        with mock.patch.object(LearnerEntitlement, 'sync_subscription_plan') as mock_sync:
+            subscription_plan.title = 'A new title'
+            subscription_plan.save()
+        mock_sync.assert_not_called()
+
+    def test_for_user_and_customer(self):
+        """
+        Test that entitlements are found by user email or lms_user_id, and filtered on the plan's dates and status.
+        """
+        email_license = LicenseFactory(
+            subscription_plan=self.subscription_plan,
+            status=ASSIGNED,
+            user_email=self.user_email,
+        )
+        expired_plan = SubscriptionPlanFactory(
+            customer_agreement=self.customer_agreement,
+            is_active=True,
+            start_date=localized_utcnow() - timedelta(days=365),
+            expiration_date=localized_utcnow() - timedelta(days=1),
+        )
+        lms_user_id_license = LicenseFactory(
+            subscription_plan=expired_plan,
+            status=ACTIVATED,
+            user_email='old-email@example.com',
+            lms_user_id=self.lms_user_id,
+        )
+        # Another customer's license
+        LicenseFactory(status=ASSIGNED, user_email=self.user_email)
+
+        entitlements = LearnerEntitlement.for_user_and_customer(
+            self.user_email, self.lms_user_id, self.enterprise_customer_uuid,
+        )
+        assert {entitlement.license_id for entitlement in entitlements} == {
+            email_license.uuid, lms_user_id_license.uuid,
+        }
+
+        current_entitlements = LearnerEntitlement.for_user_and_customer(
+            self.user_email, self.lms_user_id, self.enterprise_customer_uuid, current_plans_only=True,
+        )
+        assert [entitlement.license_id for entitlement in current_entitlements] == [email_license.uuid]
+
+
 @ddt.ddt
 class SubscriptionLicenseSourceModelTests(TestCase):
     """
@@ -654,6 +1069,22 @@ class LicenseTransferJobTests(TestCase):
             _license.refresh_from_db()
             self.assertEqual(_license.subscription_plan, self.new_plan)
 
+    @mock.patch.object(LicenseTransferJob, 'CHUNK_SIZE', 2)
+    def test_transfer_all_in_chunks(self):
+        """
+        Tests that all licenses are transferred when they span several chunks.
+        """
+        old_licenses = LicenseFactory.create_batch(5, subscription_plan=self.old_plan)
+
+        job = self._create_transfer_job(transfer_all=True)
+        job.process()
+
+        self.assertEqual(self.old_plan.licenses.count(), 0)
+        self.assertCountEqual(
+            job.processed_results[0]['modified_licenses'],
+            [str(_license.uuid) for _license in old_licenses],
+        )
+
     def test_transfer_dry_run_processing(self):
         """
         Tests that a dry-run process doesn't actually modify the
@@ -1012,3 +1443,49 @@ class LicenseTransferJobTests(TestCase):
         job = self._create_transfer_job(transfer_all=True)
 
         self.assertEqual(job.get_customer_agreement(), self.customer_agreement)
+
+
+@override_settings(ROLE_ASSIGNMENT_CACHE_TIMEOUT=60)
+class SubscriptionsRoleAssignmentTests(TestCase):
+    """
+    Tests for the cached role assignments of SubscriptionsRoleAssignment.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = UserFactory()
+        self.enterprise_customer_uuid = uuid.uuid4()
+        self.assignment = self._assign_role(SUBSCRIPTIONS_ADMIN_ROLE)
+
+    def _assign_role(self, role_name):
+        return SubscriptionsRoleAssignment.objects.create(
+            user=self.user,
+            role=SubscriptionsFeatureRole.objects.get(name=role_name),
+            enterprise_customer_uuid=self.enterprise_customer_uuid,
+        )
+
+    def test_get_assignments_is_cached(self):
+        expected_assignments = [(SUBSCRIPTIONS_ADMIN_ROLE, str(self.enterprise_customer_uuid))]
+        with self.assertNumQueries(1):
+            assert list(SubscriptionsRoleAssignment.get_assignments(self.user)) == expected_assignments
+        with self.assertNumQueries(0):
+            assert list(SubscriptionsRoleAssignment.get_assignments(self.user)) == expected_assignments
+
+    def test_get_assignments_filters_role_names(self):
+        self._assign_role(SUBSCRIPTIONS_LEARNER_ROLE)
+        assignments = SubscriptionsRoleAssignment.get_assignments(self.user, role_names=[SUBSCRIPTIONS_LEARNER_ROLE])
+        assert [role_name for role_name, _ in assignments] == [SUBSCRIPTIONS_LEARNER_ROLE]
+
+    def test_saving_assignment_invalidates_cache(self):
+        list(SubscriptionsRoleAssignment.get_assignments(self.user))
+        self._assign_role(SUBSCRIPTIONS_LEARNER_ROLE)
+        assert {role_name for role_name, _ in SubscriptionsRoleAssignment.get_assignments(self.user)} == {
+            SUBSCRIPTIONS_ADMIN_ROLE,
+            SUBSCRIPTIONS_LEARNER_ROLE,
+        }
+
+    def test_deleting_assignment_invalidates_cache(self):
+        list(SubscriptionsRoleAssignment.get_assignments(self.user))
+        self.assignment.delete()
+        assert not list(SubscriptionsRoleAssignment.get_assignments(self.user))
@@ -0,0 +1,158 @@
+"""
+Tests for the scheduling module.
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from license_manager.apps.subscriptions import scheduling
+from license_manager.apps.subscriptions.tests.factories import (
+    SubscriptionPlanFactory,
+    SubscriptionPlanRenewalFactory,
+)
+from license_manager.apps.subscriptions.utils import localized_utcnow
+
+
+@override_settings(
+    EXPIRATION_AND_RENEWAL_SCHEDULING_HORIZON_HOURS=24,
+    EXPIRATION_AND_RENEWAL_CATCH_UP_DAYS=7,
+    SUBSCRIPTION_PLAN_RENEWAL_LOCK_PERIOD_HOURS=12,
+)
+@mock.patch('license_manager.apps.subscriptions.scheduling.renew_subscription_task.apply_async')
+@mock.patch('license_manager.apps.subscriptions.scheduling.expire_subscription_plan_task.apply_async')
+class SchedulingTests(TestCase):
+    """
+    Tests for scheduling plan expirations and renewals.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.now = localized_utcnow()
+
+    def tearDown(self):
+        super().tearDown()
+        cache.clear()
+
+    def test_schedule_subscription_plan_expiration(self, mock_expire, mock_renew):
+        expiration_date = self.now + timedelta(hours=2)
+        subscription_plan = SubscriptionPlanFactory(expiration_date=expiration_date)
+
+        assert scheduling.schedule_subscription_plan_expiration(subscription_plan)
+
+        mock_expire.assert_called_once_with(
+            args=(str(subscription_plan.uuid), expiration_date.isoformat()),
+            eta=expiration_date,
+        )
+        mock_renew.assert_not_called()
+
+    def test_schedule_subscription_plan_expiration_once(self, mock_expire, _):
+        subscription_plan = SubscriptionPlanFactory(expiration_date=self.now + timedelta(hours=2))
+
+        assert scheduling.schedule_subscription_plan_expiration(subscription_plan)
+        assert not scheduling.schedule_subscription_plan_expiration(subscription_plan)
+
+        assert mock_expire.call_count == 1
+
+    def test_schedule_subscription_plan_expiration_date_changed(self, mock_expire, _):
+        subscription_plan = SubscriptionPlanFactory(expiration_date=self.now + timedelta(hours=2))
+        assert scheduling.schedule_subscription_plan_expiration(subscription_plan)
+
+        subscription_plan.expiration_date = self.now + timedelta(hours=3)
+        assert scheduling.schedule_subscription_plan_expiration(subscription_plan)
+
+        assert mock_expire.call_count == 2
+        assert mock_expire.call_args.kwargs['eta'] == subscription_plan.expiration_date
+
+    def test_schedule_subscription_plan_expiration_skipped(self, mock_expire, _):
+        beyond_horizon_plan = SubscriptionPlanFactory(expiration_date=self.now + timedelta(days=2))
+        processed_plan = SubscriptionPlanFactory(
+            expiration_date=self.now + timedelta(hours=2),
+            expiration_processed=True,
+        )
+
+        assert not scheduling.schedule_subscription_plan_expiration(beyond_horizon_plan)
+        assert not scheduling.schedule_subscription_plan_expiration(processed_plan)
+
+        mock_expire.assert_not_called()
+
+    def test_schedule_renewal_processing(self, _, mock_renew):
+        renewal = SubscriptionPlanRenewalFactory(effective_date=self.now + timedelta(hours=14))
+
+        assert scheduling.schedule_renewal_processing(renewal)
+        assert not scheduling.schedule_renewal_processing(renewal)
+
+        mock_renew.assert_called_once()
+        kwargs = mock_renew.call_args.kwargs
+        assert kwargs['eta'] == renewal.effective_date - timedelta(hours=12)
+        assert kwargs['kwargs']['renewal_id'] == renewal.id
+        assert kwargs['kwargs']['subscription_plan_uuid'] == str(renewal.prior_subscription_plan.uuid)
+        assert kwargs['kwargs']['effective_date'] == renewal.effective_date.isoformat()
+
+    def test_schedule_renewal_processing_skipped(self, _, mock_renew):
+        beyond_horizon_renewal = SubscriptionPlanRenewalFactory(effective_date=self.now + timedelta(hours=40))
+        exempt_renewal = SubscriptionPlanRenewalFactory(
+            effective_date=self.now + timedelta(hours=14),
+            exempt_from_batch_processing=True,
+        )
+        processed_renewal = SubscriptionPlanRenewalFactory(
+            effective_date=self.now + timedelta(hours=14),
+            processed=True,
+        )
+
+        for renewal in (beyond_horizon_renewal, exempt_renewal, processed_renewal):
+            assert not scheduling.schedule_renewal_processing(renewal)
+
+        mock_renew.assert_not_called()
+
+    def test_schedule_due_expirations_and_renewals(self, mock_expire, mock_renew):
+        overdue_plan = SubscriptionPlanFactory(expiration_date=self.now - timedelta(days=1))
+        due_plan = SubscriptionPlanFactory(expiration_date=self.now + timedelta(hours=2))
+        # Too long overdue, beyond the horizon, and renewed plans aren't enqueued.
+        SubscriptionPlanFactory(expiration_date=self.now - timedelta(days=8))
+        SubscriptionPlanFactory(expiration_date=self.now + timedelta(days=2))
+        renewed_plan = SubscriptionPlanFactory(expiration_date=self.now + timedelta(hours=2))
+        due_renewal = SubscriptionPlanRenewalFactory(
+            prior_subscription_plan=renewed_plan,
+            effective_date=self.now + timedelta(hours=14),
+        )
+        SubscriptionPlanRenewalFactory(effective_date=self.now + timedelta(days=3))
+
+        assert scheduling.schedule_due_expirations_and_renewals() == (2, 1)
+        # The items that were already enqueued aren't enqueued again.
+        assert scheduling.schedule_due_expirations_and_renewals() == (0, 0)
+
+        assert {call.kwargs['args'][0] for call in mock_expire.call_args_list} == {
+            str(overdue_plan.uuid), str(due_plan.uuid),
+        }
+        assert mock_renew.call_args.kwargs['kwargs']['renewal_id'] == due_renewal.id
+
+    @override_settings(SCHEDULED_EXPIRATIONS_AND_RENEWALS_ENABLED=True)
+    def test_schedule_on_save(self, mock_expire, mock_renew):
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription_plan = SubscriptionPlanFactory(expiration_date=self.now + timedelta(hours=2))
+            SubscriptionPlanRenewalFactory(effective_date=self.now + timedelta(hours=14))
+
+        assert mock_expire.call_args.kwargs['args'][0] == str(subscription_plan.uuid)
+        assert mock_renew.call_count == 1
+
+        # Saves that don't change the dates don't schedule anything.
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            subscription_plan.title = 'Renamed'
+            subscription_plan.save(update_fields=['title'])
+        assert not callbacks
+
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription_plan.expiration_date = self.now + timedelta(hours=3)
+            subscription_plan.save(update_fields=['expiration_date'])
+        assert mock_expire.call_count == 2
+
+    def test_schedule_on_save_disabled(self, mock_expire, mock_renew):
+        with self.captureOnCommitCallbacks(execute=True):
+            SubscriptionPlanFactory(expiration_date=self.now + timedelta(hours=2))
+            SubscriptionPlanRenewalFactory(effective_date=self.now + timedelta(hours=14))
+
+        mock_expire.assert_not_called()
+        mock_renew.assert_not_called()
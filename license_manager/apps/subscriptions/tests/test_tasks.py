@@ -1,19 +1,25 @@
 """
 Tests for subscriptions app celery tasks
 """
+from datetime import timedelta
 from unittest import mock
 
 import ddt
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from license_manager.apps.api.utils import (
     acquire_subscription_plan_lock,
     release_subscription_plan_lock,
 )
-from license_manager.apps.subscriptions import tasks
+from license_manager.apps.subscriptions import constants, tasks
+from license_manager.apps.subscriptions.exceptions import RenewalProcessingError
+from license_manager.apps.subscriptions.models import License
 from license_manager.apps.subscriptions.tests.factories import (
+    LicenseFactory,
     SubscriptionPlanFactory,
+    SubscriptionPlanRenewalFactory,
 )
+from license_manager.apps.subscriptions.utils import localized_utcnow
 
 
 # pylint: disable=unused-argument
@@ -110,3 +116,344 @@ class ProvisionLicensesTaskTests(TestCase):
             tasks.provision_licenses_task(subscription_plan_uuid=self.subscription_plan.uuid)
 
         assert self.subscription_plan.num_licenses == 0
+
+    def test_provision_licenses_task_deferred_while_shards_in_flight(self):
+        """
+        Test provision_licenses_task waits for in-flight fast provisioning shards of the same plan.
+        """
+        self.subscription_plan.desired_num_licenses = 5
+        self.subscription_plan.save()
+
+        acquire_subscription_plan_lock(self.subscription_plan, **tasks.PROVISIONING_SHARDS_LOCK_KWARGS)
+        try:
+            with self.assertRaises(tasks.RequiredTaskUnreadyError):
+                # pylint: disable=no-value-for-parameter
+                tasks.provision_licenses_task(subscription_plan_uuid=self.subscription_plan.uuid)
+        finally:
+            release_subscription_plan_lock(self.subscription_plan, **tasks.PROVISIONING_SHARDS_LOCK_KWARGS)
+
+        assert self.subscription_plan.num_licenses == 0
+
+
+@ddt.ddt
+class ProvisionLicensesFastTaskTests(TestCase):
+    """
+    Tests for provision_licenses_fast_task.
+    """
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+
+    def tearDown(self):
+        super().tearDown()
+        release_subscription_plan_lock(self.subscription_plan)
+        release_subscription_plan_lock(self.subscription_plan, **tasks.PROVISIONING_SHARDS_LOCK_KWARGS)
+
+    @ddt.data(
+        {'num_initial_licenses': 0, 'desired_num_licenses': 12, 'expected_num_licenses': 12},
+        {'num_initial_licenses': 5, 'desired_num_licenses': 12, 'expected_num_licenses': 12},
+        {'num_initial_licenses': 12, 'desired_num_licenses': 5, 'expected_num_licenses': 12},
+        {'num_initial_licenses': 3, 'desired_num_licenses': None, 'expected_num_licenses': 3},
+    )
+    @ddt.unpack
+    @override_settings(FAST_LICENSE_PROVISIONING_BATCH_SIZE=5)
+    @mock.patch('license_manager.apps.subscriptions.models.track_licenses_provisioned')
+    def test_provision_licenses_fast_task(
+        self, mock_track_licenses_provisioned, num_initial_licenses, desired_num_licenses, expected_num_licenses,
+    ):
+        """
+        Test provision_licenses_fast_task creates the missing licenses and tracks one aggregate event.
+        """
+        self.subscription_plan.desired_num_licenses = desired_num_licenses
+        self.subscription_plan.save()
+        self.subscription_plan.bulk_provision_licenses(num_initial_licenses)
+        mock_track_licenses_provisioned.reset_mock()
+
+        # pylint: disable=no-value-for-parameter
+        tasks.provision_licenses_fast_task(subscription_plan_uuid=self.subscription_plan.uuid)
+
+        assert self.subscription_plan.num_licenses == expected_num_licenses
+        num_provisioned = expected_num_licenses - num_initial_licenses
+        if num_provisioned:
+            mock_track_licenses_provisioned.assert_called_once_with(self.subscription_plan, num_provisioned)
+        else:
+            mock_track_licenses_provisioned.assert_not_called()
+
+    @override_settings(FAST_LICENSE_PROVISIONING_SHARD_SIZE=4, FAST_LICENSE_PROVISIONING_BATCH_SIZE=3)
+    @mock.patch('license_manager.apps.subscriptions.tasks.track_licenses_provisioned')
+    @mock.patch('license_manager.apps.subscriptions.tasks.chord')
+    def test_provision_licenses_fast_task_shards(self, mock_chord, mock_track_licenses_provisioned):
+        """
+        Test provision_licenses_fast_task fans large plans out to shard tasks, and that the plan stays locked
+        until the shards have finished.
+        """
+        self.subscription_plan.desired_num_licenses = 10
+        self.subscription_plan.save()
+
+        # pylint: disable=no-value-for-parameter
+        tasks.provision_licenses_fast_task(subscription_plan_uuid=self.subscription_plan.uuid)
+
+        shard_tasks = mock_chord.call_args.args[0]
+        assert [shard.args for shard in shard_tasks] == [
+            (str(self.subscription_plan.uuid), 4),
+            (str(self.subscription_plan.uuid), 4),
+            (str(self.subscription_plan.uuid), 2),
+        ]
+        callback = mock_chord.return_value.call_args.args[0]
+        assert callback.args == (str(self.subscription_plan.uuid), 10)
+        assert not acquire_subscription_plan_lock(self.subscription_plan, **tasks.PROVISIONING_SHARDS_LOCK_KWARGS)
+
+        # Run the shards and the chord callback, as celery would.
+        for shard in shard_tasks:
+            shard.apply()
+        callback.apply()
+
+        assert self.subscription_plan.num_licenses == 10
+        mock_track_licenses_provisioned.assert_called_once_with(self.subscription_plan, 10)
+        assert acquire_subscription_plan_lock(self.subscription_plan, **tasks.PROVISIONING_SHARDS_LOCK_KWARGS)
+
+    @override_settings(FAST_LICENSE_PROVISIONING_BATCH_SIZE=2)
+    def test_provision_licenses_shard_task_retry(self):
+        """
+        Test that a shard that fails part way through creates no licenses, so that retrying it provisions
+        exactly the licenses of the shard.
+        """
+        bulk_provision = License.bulk_provision
+
+        def fail_after_first_batch(subscription_plan, num_licenses, batch_size):
+            if subscription_plan.licenses.exists():
+                raise Exception('fail')
+            return bulk_provision(subscription_plan, num_licenses, batch_size=batch_size)
+
+        with mock.patch.object(License, 'bulk_provision', side_effect=fail_after_first_batch):
+            with self.assertRaises(Exception):
+                tasks.provision_licenses_shard_task(str(self.subscription_plan.uuid), 4)
+        assert self.subscription_plan.num_licenses == 0
+
+        tasks.provision_licenses_shard_task(str(self.subscription_plan.uuid), 4)
+        assert self.subscription_plan.num_licenses == 4
+
+    @override_settings(FAST_LICENSE_PROVISIONING_SHARD_SIZE=4, FAST_LICENSE_PROVISIONING_BATCH_SIZE=3)
+    @mock.patch('license_manager.apps.subscriptions.tasks.track_licenses_provisioned')
+    @mock.patch('license_manager.apps.subscriptions.tasks.chord')
+    def test_provision_licenses_fast_task_shard_failure(self, mock_chord, mock_track_licenses_provisioned):
+        """
+        Test that when a shard fails for good, the error callback of the chord logs the failed run and releases
+        the plan-level lock, instead of leaving the plan locked until the lock times out.
+        """
+        self.subscription_plan.desired_num_licenses = 10
+        self.subscription_plan.save()
+
+        # pylint: disable=no-value-for-parameter
+        tasks.provision_licenses_fast_task(subscription_plan_uuid=self.subscription_plan.uuid)
+
+        shard_tasks = mock_chord.call_args.args[0]
+        callback = mock_chord.return_value.call_args.args[0]
+        [errback] = callback.options['link_error']
+        assert errback.task == tasks.fail_sharded_license_provisioning_task.name
+        assert errback.args == (str(self.subscription_plan.uuid),)
+
+        # Run the shards as celery would, with the last one failing once its retries are exhausted.
+        shard_tasks[0].apply()
+        shard_tasks[1].apply()
+        with mock.patch.object(License, 'bulk_provision', side_effect=Exception('fail')):
+            assert shard_tasks[2].apply().failed()
+        assert not acquire_subscription_plan_lock(self.subscription_plan, **tasks.PROVISIONING_SHARDS_LOCK_KWARGS)
+
+        with self.assertLogs(level='ERROR') as log:
+            errback.apply()
+
+        assert f'Sharded license provisioning failed for subscription plan {self.subscription_plan.uuid}' in (
+            log.output[0]
+        )
+        assert self.subscription_plan.num_licenses == 8
+        mock_track_licenses_provisioned.assert_not_called()
+        assert acquire_subscription_plan_lock(self.subscription_plan, **tasks.PROVISIONING_SHARDS_LOCK_KWARGS)
+
+
+class RenewSubscriptionTaskTests(TestCase):
+    """
+    Tests for renew_subscription_task.
+    """
+    def setUp(self):
+        super().setUp()
+        self.prior_plan = SubscriptionPlanFactory()
+        LicenseFactory.create(
+            subscription_plan=self.prior_plan,
+            status=constants.ACTIVATED,
+            user_email='activated_user@example.com',
+        )
+        self.renewal = SubscriptionPlanRenewalFactory(
+            prior_subscription_plan=self.prior_plan,
+            number_of_licenses=2,
+            license_types_to_copy=constants.LicenseTypesToRenew.ASSIGNED_AND_ACTIVATED,
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        release_subscription_plan_lock(self.prior_plan)
+
+    def test_renew_subscription_task(self):
+        """
+        Test that the task processes the renewal.
+        """
+        # pylint: disable=no-value-for-parameter
+        tasks.renew_subscription_task(
+            self.renewal.id,
+            correlation_id='renewal-corr',
+            subscription_plan_uuid=self.prior_plan.uuid,
+        )
+
+        self.renewal.refresh_from_db()
+        assert self.renewal.processed
+        future_plan = self.renewal.renewed_subscription_plan
+        assert future_plan.licenses.filter(status=constants.ACTIVATED).count() == 1
+        assert set(future_plan.license_actions.values_list('correlation_id', flat=True)) == {'renewal-corr'}
+
+    @mock.patch('license_manager.apps.subscriptions.tasks.renew_subscription')
+    def test_renew_subscription_task_already_processed(self, mock_renew_subscription):
+        """
+        Test that the task skips renewals that were already processed.
+        """
+        self.renewal.processed = True
+        self.renewal.save()
+
+        # pylint: disable=no-value-for-parameter
+        tasks.renew_subscription_task(self.renewal.id, subscription_plan_uuid=self.prior_plan.uuid)
+
+        mock_renew_subscription.assert_not_called()
+
+    @mock.patch('license_manager.apps.subscriptions.tasks.renew_subscription')
+    def test_renew_subscription_task_processing_error(self, mock_renew_subscription):
+        """
+        Test that the task logs renewal processing errors rather than retrying them.
+        """
+        mock_renew_subscription.side_effect = RenewalProcessingError
+
+        with self.assertLogs(level='ERROR') as log:
+            # pylint: disable=no-value-for-parameter
+            tasks.renew_subscription_task(self.renewal.id, subscription_plan_uuid=self.prior_plan.uuid)
+
+        assert f'Could not automatically process renewal with id: {self.renewal.id}' in log.output[0]
+
+    @mock.patch('license_manager.apps.subscriptions.tasks.renew_subscription')
+    def test_renew_subscription_task_effective_date_changed(self, mock_renew_subscription):
+        """
+        Test that a scheduled task skips the renewal if its effective date changed since it was scheduled.
+        """
+        scheduled_effective_date = self.renewal.effective_date - timedelta(days=1)
+
+        # pylint: disable=no-value-for-parameter
+        tasks.renew_subscription_task(
+            self.renewal.id,
+            subscription_plan_uuid=self.prior_plan.uuid,
+            effective_date=scheduled_effective_date.isoformat(),
+        )
+
+        mock_renew_subscription.assert_not_called()
+
+
+@mock.patch('license_manager.apps.api.tasks.license_expiration_task')
+class ExpireSubscriptionPlanTaskTests(TestCase):
+    """
+    Tests for expire_subscription_plan_task.
+    """
+    def setUp(self):
+        super().setUp()
+        self.expiration_date = localized_utcnow() - timedelta(minutes=1)
+        self.subscription_plan = SubscriptionPlanFactory(expiration_date=self.expiration_date)
+        self.activated_license = LicenseFactory(
+            subscription_plan=self.subscription_plan,
+            status=constants.ACTIVATED,
+        )
+
+    def test_expire_subscription_plan_task(self, mock_license_expiration_task):
+        """
+        Test that the task expires the plan and its licensed course enrollments.
+        """
+        tasks.expire_subscription_plan_task(str(self.subscription_plan.uuid), self.expiration_date.isoformat())
+
+        self.subscription_plan.refresh_from_db()
+        assert self.subscription_plan.expiration_processed
+        mock_license_expiration_task.assert_called_once_with(
+            [str(self.activated_license.uuid)],
+            ignore_enrollments_modified_after=None,
+        )
+
+    def test_expire_subscription_plan_task_date_changed(self, mock_license_expiration_task):
+        """
+        Test that the task does nothing if the expiration date changed since it was scheduled.
+        """
+        scheduled_expiration_date = self.expiration_date - timedelta(days=1)
+
+        tasks.expire_subscription_plan_task(str(self.subscription_plan.uuid), scheduled_expiration_date.isoformat())
+
+        self.subscription_plan.refresh_from_db()
+        assert not self.subscription_plan.expiration_processed
+        mock_license_expiration_task.assert_not_called()
+
+    def test_expire_subscription_plan_task_not_expired(self, mock_license_expiration_task):
+        """
+        Test that the task does nothing if the plan hasn't expired yet, e.g. because its task ran early.
+        """
+        expiration_date = localized_utcnow() + timedelta(hours=1)
+        self.subscription_plan.expiration_date = expiration_date
+        self.subscription_plan.save()
+
+        tasks.expire_subscription_plan_task(str(self.subscription_plan.uuid), expiration_date.isoformat())
+
+        self.subscription_plan.refresh_from_db()
+        assert not self.subscription_plan.expiration_processed
+        mock_license_expiration_task.assert_not_called()
+
+    def test_expire_subscription_plan_task_already_processed(self, mock_license_expiration_task):
+        """
+        Test that the task does nothing if the expiration was already processed.
+        """
+        self.subscription_plan.expiration_processed = True
+        self.subscription_plan.save()
+
+        tasks.expire_subscription_plan_task(str(self.subscription_plan.uuid), self.expiration_date.isoformat())
+
+        mock_license_expiration_task.assert_not_called()
+
+
+class TrackLicenseExpirationsTaskTests(TestCase):
+    """
+    Tests for track_license_expirations_task.
+    """
+    def setUp(self):
+        super().setUp()
+        self.subscription_plan = SubscriptionPlanFactory()
+        self.activated_licenses = LicenseFactory.create_batch(
+            3, subscription_plan=self.subscription_plan, status=constants.ACTIVATED,
+        )
+        self.revoked_license = LicenseFactory(subscription_plan=self.subscription_plan, status=constants.REVOKED)
+        self.renewed_license = LicenseFactory(
+            subscription_plan=self.subscription_plan,
+            status=constants.ACTIVATED,
+            renewed_to=LicenseFactory(status=constants.ACTIVATED),
+        )
+        LicenseFactory(subscription_plan=self.subscription_plan, status=constants.UNASSIGNED, user_email=None)
+
+    @mock.patch('license_manager.apps.subscriptions.tasks.TRACK_LICENSE_CHANGES_BATCH_SIZE', 2)
+    @mock.patch('license_manager.apps.subscriptions.tasks.track_license_values_changes')
+    def test_track_license_expirations_task(self, mock_track_license_values_changes):
+        """
+        Test that expiration events are tracked in batches for the licenses that weren't renewed, except for
+        unassigned licenses without a user.
+        """
+        with self.assertNumQueries(3):
+            tasks.track_license_expirations_task(str(self.subscription_plan.uuid))
+
+        assert mock_track_license_values_changes.call_count == 2
+        tracked_license_uuids = set()
+        for call in mock_track_license_values_changes.call_args_list:
+            license_values_rows, event_name, properties, is_batch_assignment = call.args
+            assert event_name == constants.SegmentEvents.LICENSE_EXPIRED
+            assert properties == {}
+            assert is_batch_assignment is False
+            tracked_license_uuids.update(row['uuid'] for row in license_values_rows)
+        assert tracked_license_uuids == {
+            license_obj.uuid for license_obj in [*self.activated_licenses, self.revoked_license]
+        }
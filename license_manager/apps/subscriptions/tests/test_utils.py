@@ -8,6 +8,8 @@ import uuid
 from unittest import TestCase, mock
 
 import ddt
+from django.test import RequestFactory
+from rest_framework.request import Request
 
 from license_manager.apps.subscriptions import utils
 
@@ -78,3 +80,26 @@ class TestBatchCounts(TestCase):
         """
         actual_batch_counts = list(utils.batch_counts(total_count, batch_size=batch_size))
         assert actual_batch_counts == expected_batch_counts
+
+
+class TestGetDecodedJwt(TestCase):
+    """
+    Tests for get_decoded_jwt().
+    """
+
+    @mock.patch('license_manager.apps.subscriptions.utils.decode_jwt_from_request')
+    def test_jwt_decoded_once_per_request(self, mock_decode):
+        mock_decode.return_value = {'user_id': 1}
+        http_request = RequestFactory().get('/')
+
+        assert utils.get_decoded_jwt(Request(http_request)) == {'user_id': 1}
+        assert utils.get_decoded_jwt(http_request) == {'user_id': 1}
+        mock_decode.assert_called_once()
+
+    @mock.patch('license_manager.apps.subscriptions.utils.decode_jwt_from_request')
+    def test_empty_jwt_not_kept(self, mock_decode):
+        mock_decode.side_effect = [None, {'user_id': 1}]
+        http_request = RequestFactory().get('/')
+
+        assert utils.get_decoded_jwt(http_request) is None
+        assert utils.get_decoded_jwt(http_request) == {'user_id': 1}
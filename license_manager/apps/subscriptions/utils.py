@@ -6,6 +6,7 @@ from base64 import b64encode
 from datetime import datetime
 
 from django.conf import settings
+from edx_rbac.utils import get_decoded_jwt as decode_jwt_from_request
 from pytz import UTC
 from requests.exceptions import HTTPError
 from rest_framework import status
@@ -27,6 +28,23 @@ def localized_utcnow():
     return UTC.localize(datetime.utcnow())  # pylint: disable=no-value-for-parameter
 
 
+def get_decoded_jwt(request):
+    """
+    Returns the decoded JWT of the given request, decoding (and verifying) it only once per request.
+
+    The decoded JWT is kept on the underlying ``HttpRequest``, so it's shared by DRF views, which get a DRF
+    ``Request``, and by the permission rules, which get the ``HttpRequest`` from crum.
+    """
+    http_request = getattr(request, '_request', request)
+    decoded_jwt = getattr(http_request, '_decoded_jwt', None)
+    if decoded_jwt is None:
+        decoded_jwt = decode_jwt_from_request(request)
+        if decoded_jwt:
+            # An empty JWT isn't kept, as the request may not have been authenticated yet.
+            http_request._decoded_jwt = decoded_jwt  # pylint: disable=protected-access
+    return decoded_jwt
+
+
 def localized_datetime_from_datetime(datetime_obj):
     """
     Helper to return a UTC-localized datetime from an existing datetime object.
@@ -197,15 +215,26 @@ def provision_licenses(subscription):
     """
     from license_manager.apps.subscriptions.tasks import (
         PROVISION_LICENSES_BATCH_SIZE,
+        provision_licenses_fast_task,
         provision_licenses_task,
     )
 
     if subscription.desired_num_licenses and not subscription.last_freeze_timestamp:
         license_count_gap = subscription.desired_num_licenses - subscription.num_licenses
+        fast_provisioning_enabled = settings.FAST_LICENSE_PROVISIONING_ENABLED
         if license_count_gap > 0:
-            if license_count_gap <= PROVISION_LICENSES_BATCH_SIZE:
-                # We can handle just one batch synchronously.
+            if subscription.uses_virtual_unassigned_licenses:
+                # Virtual unassigned licenses are just a counter on the plan, so no batching is needed.
                 subscription.increase_num_licenses(license_count_gap)
+            elif license_count_gap <= PROVISION_LICENSES_BATCH_SIZE:
+                # We can handle just one batch synchronously.
+                if fast_provisioning_enabled:
+                    subscription.bulk_provision_licenses(license_count_gap)
+                else:
+                    subscription.increase_num_licenses(license_count_gap)
+            elif fast_provisioning_enabled:
+                provision_licenses_fast_task.delay(
+                    subscription_plan_uuid=subscription.uuid)
             else:
                 # Multiple batches of licenses will need to be created, so provision them asynchronously.
                 provision_licenses_task.delay(
@@ -0,0 +1,27 @@
+"""
+ASGI config for license_manager.
+
+It exposes the ASGI callable as a module-level variable named ``application``, for ASGI servers.
+Every view of the service is synchronous, and Django runs synchronous views under ASGI one at a time on a
+single shared thread, so this entry point doesn't serve requests any more concurrently than ``wsgi.py`` does.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+"""
+from os.path import abspath, dirname
+from sys import path
+
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+from django.core.asgi import get_asgi_application
+
+
+SITE_ROOT = dirname(dirname(abspath(__file__)))
+path.append(SITE_ROOT)
+
+application = get_asgi_application()  # pylint: disable=invalid-name
+
+# Allows the app to serve static files in development environment.
+# Without this, css in django admin will not be served locally.
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
@@ -2,6 +2,7 @@
 gunicorn configuration file: http://docs.gunicorn.org/en/develop/configure.html
 """
 import multiprocessing  # pylint: disable=unused-import
+import os
 
 
 preload_app = True
@@ -9,6 +10,10 @@ timeout = 300
 bind = "0.0.0.0:18170"
 
 workers = 2
+# Each worker serves requests from a pool of threads, so that a request waiting on a slow upstream
+# service (the catalog service, LMS or Braze) doesn't block every other request of its worker.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
 
 
 def pre_request(worker, req):
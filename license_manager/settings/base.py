@@ -78,6 +78,15 @@ MIDDLEWARE = (
     # Enables monitoring utility for writing custom metrics.
     'edx_django_utils.monitoring.CachedCustomMonitoringMiddleware',
 
+    # Records DB queries, outbound calls and cache lookups for each request.
+    'license_manager.apps.core.instrumentation.HotPathInstrumentationMiddleware',
+
+    # Makes the reads of users who just wrote stick to the primary database.
+    'license_manager.apps.core.db_routers.ReplicaStickinessMiddleware',
+
+    # Loads the licenses, plans and agreements looked up by a request only once.
+    'license_manager.apps.subscriptions.identity_map.IdentityMapMiddleware',
+
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -137,6 +146,13 @@ DATABASES = {
     }
 }
 
+# Safe requests to read-heavy endpoints, and management commands run with --use-replica, read from the
+# database with this alias when it's configured. See license_manager.apps.core.db_routers.
+DATABASE_ROUTERS = ['license_manager.apps.core.db_routers.ReplicaRouter']
+REPLICA_DATABASE_ALIAS = 'replica'
+# Number of seconds the reads of a user stick to the primary database after a request of theirs wrote.
+REPLICA_STICKY_SECONDS = 10
+
 # Django Rest Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -408,6 +424,14 @@ BULK_ENROLL_REQUEST_LIMIT = os.environ.get('BULK_ENROLL_REQUEST_LIMIT', 500)
 BULK_ENROLL_JOB_AWS_BUCKET = os.environ.get('BULK_ENROLL_JOB_AWS_BUCKET', '')
 BULK_ENROLL_RESULT_CAMPAIGN = os.environ.get('BULK_ENROLL_RESULT_CAMPAIGN', '')
 
+# License assignment job specific
+# The number of emails of a license assignment job that are assigned in one transaction,
+# and the number of seconds to wait before retrying a batch when the plan is locked by another assignment.
+LICENSE_ASSIGNMENT_JOB_BATCH_SIZE = int(os.environ.get('LICENSE_ASSIGNMENT_JOB_BATCH_SIZE', 1000))
+LICENSE_ASSIGNMENT_JOB_LOCKED_RETRY_SECONDS = int(os.environ.get('LICENSE_ASSIGNMENT_JOB_LOCKED_RETRY_SECONDS', 30))
+LICENSE_ASSIGNMENT_JOB_MAX_EMAILS = int(os.environ.get('LICENSE_ASSIGNMENT_JOB_MAX_EMAILS', 100000))
+LICENSE_ASSIGNMENT_JOB_AWS_BUCKET = os.environ.get('LICENSE_ASSIGNMENT_JOB_AWS_BUCKET', '')
+
 # Set up system-to-feature roles mapping for edx-rbac
 SYSTEM_TO_FEATURE_ROLE_MAPPING = {
     SYSTEM_ENTERPRISE_OPERATOR_ROLE: [SUBSCRIPTIONS_ADMIN_ROLE],
@@ -425,6 +449,12 @@ MOBILE_STORE_URLS = os.environ.get('MOBILE_STORE_URLS', '')
 # User retirement settings
 RETIREMENT_SERVICE_WORKER_USERNAME = "replace with valid username"
 
+# User email sync settings
+# The service user allowed to send batches of changed user emails to the user email changes API
+USER_EMAIL_SYNC_SERVICE_WORKER_USERNAME = "replace with valid username"
+# How long a sync of the licenses of a learner whose email changed is only enqueued once, in seconds
+USER_EMAIL_SYNC_DEDUPE_SECONDS = 600
+
 # Feature Toggles
 FEATURES = {}
 
@@ -439,6 +469,86 @@ ENTERPRISE_SUBSIDY_CHECKSUM_MESSAGE_FORMAT = '{lms_user_id}:{course_key}:{licens
 
 SUBSCRIPTION_PLAN_RENEWAL_LOCK_PERIOD_HOURS = 12
 
+# Fast license provisioning writes licenses (and their history) with large multi-row inserts and tracks
+# a single aggregate event per plan, rather than one LICENSE_CREATED event per unassigned license.
+FAST_LICENSE_PROVISIONING_ENABLED = False
+FAST_LICENSE_PROVISIONING_BATCH_SIZE = 5000
+# When non-zero, plans that need more licenses than this are provisioned by parallel shard tasks of this size.
+FAST_LICENSE_PROVISIONING_SHARD_SIZE = 0
+
+# Bulk license writes can hand their history rows to an asynchronous writer task, instead of writing them
+# in the same transaction as the licenses themselves.
+DEFERRED_HISTORY_WRITES_ENABLED = False
+DEFERRED_HISTORY_WRITE_BATCH_SIZE = 1000
+
+# The number of rows deleted in each transaction by bulk deletions, like the deletion of the unused licenses
+# of a frozen plan, see license_manager.apps.subscriptions.bulk_deletion.
+BULK_DELETION_BATCH_SIZE = 5000
+
+# Whether license lookups by user and customer filter on the enterprise customer uuid denormalized onto licenses.
+# Only enable once the backfill_license_enterprise_customer_uuids command has filled it in for every license.
+DENORMALIZED_LICENSE_CUSTOMER_LOOKUPS_ENABLED = False
+
+# Whether the learner licenses and license subsidy endpoints read the valid licenses of learners from the
+# precomputed learner entitlement table. Only enable once the reconcile_learner_entitlements command has run.
+LEARNER_ENTITLEMENT_READS_ENABLED = False
+
+# How the licenses of a plan are searched by email, by the license list search and the filters of bulk license
+# actions: 'contains' matches emails containing the search term anywhere, with a scan of the plan's licenses, and
+# 'prefix' matches emails starting with the search term, with an indexed range lookup on the lowercased email.
+LICENSE_EMAIL_SEARCH_MODE = 'contains'
+
+# Whether license utilization emails count the licenses auto applied from a plan from its hourly auto-applied
+# license counts, rather than from its licenses. Only enable once the backfill_auto_apply_state command has run.
+AUTO_APPLIED_LICENSE_COUNTS_ENABLED = False
+
+# Whether saving a plan or renewal enqueues a task to process its expiration or renewal when it comes due,
+# see license_manager.apps.subscriptions.scheduling. Tasks are only enqueued for the items due within the
+# scheduling horizon, the schedule_expirations_and_renewals command enqueues the rest as they come within it,
+# and catches up on the items that are overdue by up to the catch-up period.
+SCHEDULED_EXPIRATIONS_AND_RENEWALS_ENABLED = False
+EXPIRATION_AND_RENEWAL_SCHEDULING_HORIZON_HOURS = 24
+EXPIRATION_AND_RENEWAL_SCHEDULING_GRACE_PERIOD_SECONDS = 60 * 60
+EXPIRATION_AND_RENEWAL_CATCH_UP_DAYS = 7
+
+# The licenses of plans that expired more than LICENSE_ARCHIVE_AFTER_DAYS ago are moved to the archive tables
+# by the archive_expired_licenses command, LICENSE_ARCHIVE_BATCH_SIZE licenses per transaction,
+# see license_manager.apps.subscriptions.archive.
+LICENSE_ARCHIVE_AFTER_DAYS = 3 * 365
+LICENSE_ARCHIVE_BATCH_SIZE = 1000
+
+# The license change feed lists the changes to licenses once they are LICENSE_CHANGE_FEED_SETTLE_SECONDS old,
+# LICENSE_CHANGE_FEED_PAGE_SIZE changes per page by default, see license_manager.apps.subscriptions.change_feed.
+# The service users listed here can read the changes to the licenses of all customers.
+# Every transaction that changes licenses must commit within LICENSE_CHANGE_FEED_SETTLE_SECONDS of changing them,
+# which is as long as celery tasks run for by default (CELERY_TASK_TIME_LIMIT).
+LICENSE_CHANGE_FEED_SETTLE_SECONDS = 5 * 60
+LICENSE_CHANGE_FEED_PAGE_SIZE = 500
+LICENSE_CHANGE_FEED_MAX_PAGE_SIZE = 5000
+LICENSE_CHANGE_FEED_SERVICE_WORKER_USERNAMES = []
+
+# Hot path instrumentation of requests and celery tasks, see license_manager.apps.core.instrumentation.
+HOT_PATH_INSTRUMENTATION_ENABLED = True
+# Number of slowest queries reported per request or task
+HOT_PATH_SLOW_QUERY_COUNT = 5
+# DB query budgets keyed by view name (e.g. 'api:v1:licenses-assign') or task name. Requests and tasks
+# without an entry get the default budget, no budget at all if it's None.
+HOT_PATH_QUERY_BUDGETS = {}
+HOT_PATH_DEFAULT_QUERY_BUDGET = None
+
+# Number of seconds the subscriptions role assignments of a user are cached for permission checks.
+# Saving or deleting one of their assignments drops the cached assignments right away.
+ROLE_ASSIGNMENT_CACHE_TIMEOUT = 60
+
+# Size of the thread pool that views fan independent outbound calls out to, see
+# license_manager.apps.api_client.concurrency.
+OUTBOUND_CALL_MAX_WORKERS = 8
+
+# Number of days of history to keep, keyed by model label (e.g. 'subscriptions.License').
+# Models without an entry are never pruned by the prune_history management command.
+HISTORY_RETENTION_DAYS = {}
+HISTORY_RETENTION_CHUNK_SIZE = 1000
+
 # Braze
 AUTOAPPLY_WITH_LEARNER_PORTAL_CAMPAIGN = ''
 AUTOAPPLY_NO_LEARNER_PORTAL_CAMPAIGN = ''
@@ -23,6 +23,17 @@ DATABASES = {
         'PORT': '',
     }
 }
+# Set ENABLE_LOCAL_REPLICA to exercise replica routing against a second SQLite database, which must be
+# migrated (./manage.py migrate --database replica) and kept in sync by hand.
+if os.environ.get('ENABLE_LOCAL_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': root('replica.db'),
+        'USER': '',
+        'PASSWORD': '',
+        'HOST': '',
+        'PORT': '',
+    }
 # END DATABASE CONFIGURATION
 
 # TOOLBAR CONFIGURATION
@@ -16,9 +16,24 @@ DATABASES = {
         'HOST': '',
         'PORT': '',
     },
+    # Only used by the tests of replica routing, which enable it by overriding REPLICA_DATABASE_ALIAS.
+    # Its tables are created straight from the models, as the data migrations only run against the default database.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'USER': '',
+        'PASSWORD': '',
+        'HOST': '',
+        'PORT': '',
+        'TEST': {'MIGRATE': False},
+    },
 }
+REPLICA_DATABASE_ALIAS = None
 # END IN-MEMORY TEST DATABASE
 
+# Tests reuse user ids across rolled back transactions, which would share cached role assignments.
+ROLE_ASSIGNMENT_CACHE_TIMEOUT = 0
+
 # BEGIN CELERY
 CELERY_TASK_ALWAYS_EAGER = True
 results_dir = tempfile.TemporaryDirectory()
@@ -3,6 +3,10 @@ Script designed for local execution.
 Reads a CSV file of email addresses and target subscription plan uuid
 as input, then chunks those up in calls to the ``assign`` view.
 
+For large files, prefer uploading the CSV to the server-side assignment job endpoint,
+``POST /api/v1/subscriptions/{subscription_plan_uuid}/licenses/assignment-jobs/``, which
+assigns licenses asynchronously and produces a downloadable results CSV.
+
 To use:
 ```
 # os environ names are meaningful and should correspond to the requested environment